@@ -0,0 +1,710 @@
+"""
+appels.py — Appels de fonds : répartition par lot et courriers PDF.
+
+Fonctions pures (ni Streamlit ni base) : la configuration des clés (voir
+repartition.config_cles) et la matrice des tantièmes sont passées en argument.
+donnees.py les enveloppe avec la configuration de l'immeuble courant ; la ligne de
+commande (python -m copro) les appelle directement.
+"""
+
+import numpy as np
+import pandas as pd
+
+from monnaie import centimes, euros, echeance
+from repartition import CLE_GENERALE
+
+# Premier mois de chaque appel trimestriel
+MOIS_TRIMESTRE = {'T1': 1, 'T2': 4, 'T3': 7, 'T4': 10}
+
+
+def periode_trimestre(label_trim, annee) -> str:
+    """« 01/04/2025 au 30/06/2025 » pour T2 2025 (période imprimée sur l'appel)."""
+    debut = pd.Timestamp(int(annee), MOIS_TRIMESTRE[label_trim], 1)
+    fin = debut + pd.offsets.QuarterEnd(0)
+    return f"{debut:%d/%m/%Y} au {fin:%d/%m/%Y}"
+
+
+def tantiemes_du_lot(cop_row, mat, config):
+    """{cle: (tantièmes, base)} d'un copropriétaire (dict ou ligne de copro_df).
+    Une clé sans aucun tantième saisi est répartie sur la clé générale, comme dans calculer_appels."""
+    tants = mat.du_lot(cop_row['id'])
+    out = {k: (tants.get(k, 0.0), cfg['total']) for k, cfg in config.items()}
+    if CLE_GENERALE in out:
+        for k, somme in mat.sommes().items():
+            if somme == 0 and k != CLE_GENERALE:
+                out[k] = out[CLE_GENERALE]
+    return out
+
+def colonne_tantiemes(cle, config):
+    """Colonne de copro_df portant les tantièmes d'une clé (colonne historique si elle existe)."""
+    return config[cle]['col'] or f"tantieme_{cle}"
+
+def prepare_copro(copro_df, config, mat=None):
+    """Convertit toutes les colonnes tantièmes en numérique et les aligne sur les tantièmes creux
+    de `mat` (une colonne par clé, pour l'affichage ; les calculs passent par la matrice)."""
+    for col in ['tantieme_general','tantiemes_ascenseur','tantiemes_special_rdc_ss',
+                  'tantieme_rdc_ssols','tantieme_ssols','tantieme_garages',
+                  'tantieme_ascenseurs','tantieme_monte_voitures','tantieme']:
+        if col in copro_df.columns:
+            copro_df[col] = pd.to_numeric(copro_df[col], errors='coerce').fillna(0)
+    if mat is not None and not copro_df.empty:
+        for key in config:
+            copro_df[colonne_tantiemes(key, config)] = mat.colonne(key)
+    # Fallback si les colonnes spécifiques ne sont pas remplies
+    if 'tantieme_general' not in copro_df.columns or copro_df['tantieme_general'].sum() == 0:
+        if 'tantieme' in copro_df.columns:
+            copro_df['tantieme_general'] = copro_df['tantieme']
+    return copro_df
+
+def calculer_appels(copro_df, montants_par_type, mat, config):
+    """Calcule la part de chaque copropriétaire selon les montants par type de charge.
+    Répartition au centime sur la matrice creuse des tantièmes `mat` (lots dans l'ordre de
+    copro_df, voir MatriceTantiemes.repartir_centimes) ; une clé sans tantièmes saisis est
+    répartie sur la clé générale."""
+    parts = mat.repartir_centimes(montants_par_type, repli=CLE_GENERALE)
+    total_gen = config[CLE_GENERALE]['total'] if CLE_GENERALE in config else 0
+    df = pd.DataFrame({
+        'Lot': copro_df['lot'].values if 'lot' in copro_df.columns else '',
+        'Copropriétaire': copro_df['nom'].values if 'nom' in copro_df.columns else '',
+        'Étage': copro_df['etage'].values if 'etage' in copro_df.columns else '',
+        'Usage': copro_df['usage'].values if 'usage' in copro_df.columns else '',
+        # quote-part du fonds Alur (tantièmes de la clé générale / total)
+        '_part_alur': mat.colonne(CLE_GENERALE) / total_gen if total_gen else 0.0,
+    })
+    for j, (k, cfg) in enumerate(config.items()):
+        df[f"{cfg['emoji']} {cfg['label']}"] = euros(parts[:, j])
+    df['💰 TOTAL Annuel (€)'] = euros(parts.sum(axis=1))
+    return df
+
+def rang_appel(periode, nb_appels) -> int:
+    """Rang (1…nb_appels) de l'appel `periode` ('T1'…'T4') dans l'exercice."""
+    return (int(str(periode)[1:]) - 1) % int(nb_appels) + 1
+
+def parts_appel(appels_df, periode, nb_appels, config) -> np.ndarray:
+    """Centimes appelés par lot et par clé pour l'appel `periode` (lots × clés) : échéance de
+    la part annuelle de calculer_appels ; les nb_appels appels d'un lot somment à sa part annuelle."""
+    annuel = centimes(appels_df[[f"{cfg['emoji']} {cfg['label']}" for cfg in config.values()]].to_numpy(dtype=float))
+    return echeance(annuel, nb_appels, rang_appel(periode, nb_appels))
+
+def completer_appel(appels_df, label_trim, nb_appels, alur_par_appel, mat, config):
+    """Colonnes de l'appel `label_trim` ajoutées à calculer_appels (sans `_part_alur`) :
+    charges appelées (parts_appel), Alur de l'appel réparti au centime sur la clé générale, total."""
+    charges = parts_appel(appels_df, label_trim, nb_appels, config).sum(axis=1)
+    alur = mat.repartir_cle_centimes(CLE_GENERALE, alur_par_appel)
+    df = appels_df.drop(columns=['_part_alur'], errors='ignore')
+    df[f'🎯 APPEL {label_trim} (€)'] = euros(charges)
+    df['🏛️ Alur (€)'] = euros(alur)
+    df[f'🎯 TOTAL {label_trim} avec Alur (€)'] = euros(charges + alur)
+    return df
+
+def lignes_appels_fonds(copro_df, appels_df, annee, periode, nb_appels, config):
+    """Lignes à figer pour un appel émis : une par lot et par clé non nulle (+ Alur).
+    appels_df vient de completer_appel (même ordre de lignes que copro_df)."""
+    parts = np.column_stack([parts_appel(appels_df, periode, nb_appels, config),
+                             centimes(appels_df['🏛️ Alur (€)'].to_numpy(dtype=float))])
+    cles = list(config) + ['alur']
+    lignes = []
+    for (cop_id, lot), ligne in zip(zip(copro_df['id'], copro_df['lot']), parts.tolist()):
+        lignes += [{'annee': int(annee), 'periode': periode, 'coproprietaire_id': int(cop_id),
+                    'lot': int(lot) if pd.notna(lot) else None, 'cle': k, 'montant': euros(c),
+                    'nb_appels': int(nb_appels)}
+                   for k, c in zip(cles, ligne) if c != 0]
+    return lignes
+
+def lignes_manquantes(emises, lignes):
+    """Lignes de `lignes` (lignes_appels_fonds) absentes de `emises`, lignes déjà figées du même
+    appel. Une émission interrompue n'est complétée que sur sa base d'origine : si une ligne
+    figée diffère de son recalcul (montant, nombre d'appels) ou n'y figure plus, ValueError."""
+    calculees = {(int(l['coproprietaire_id']), str(l['cle'])): l for l in lignes}
+    ecarts = []
+    for e in emises:
+        l = calculees.get((int(e['coproprietaire_id']), str(e['cle'])))
+        if l is None or int(e['nb_appels']) != l['nb_appels'] \
+                or centimes(float(e['montant'])) != centimes(l['montant']):
+            ecarts.append(f"lot {e.get('lot')} / {e['cle']}")
+    if ecarts:
+        raise ValueError(f"appel déjà émis en partie sur une autre base ({len(ecarts)} ligne(s) "
+                         f"différentes, dont {', '.join(ecarts[:3])}) : rétablir les montants et "
+                         f"le nombre d'appels de l'émission pour la compléter")
+    deja = {(int(e['coproprietaire_id']), str(e['cle'])) for e in emises}
+    return [l for k, l in calculees.items() if k not in deja]
+
+def montants_depuis_budget(bud_an, config):
+    """Montants annuels par type de charge d'après les classes du budget d'une année."""
+    total_bud = float(bud_an['montant_budget'].sum())
+    montants = {}
+    for key, cfg in config.items():
+        montants[key] = float(bud_an[bud_an['classe'].isin(cfg['classes'])]['montant_budget'].sum())
+    # Classes non mappées → ajoutées aux charges générales
+    total_mappe = sum(montants.values())
+    if total_bud - total_mappe > 0.01:
+        montants['general'] = montants.get('general', 0) + (total_bud - total_mappe)
+    return montants
+
+
+def depenses_par_cle(depenses_df, config) -> dict:
+    """{cle: montant dû} des dépenses (déjà filtrées sur l'exercice) d'après leur classe."""
+    if 'classe' not in depenses_df.columns:
+        return {key: 0 for key in config}
+    return {key: float(depenses_df[depenses_df['classe'].isin(cfg['classes'])]['montant_du'].sum())
+            for key, cfg in config.items()}
+
+
+def emis_par_lot(emis_df) -> dict:
+    """{coproprietaire_id: {cle: montant appelé dans l'année, 'alur': …}} des appels émis."""
+    if emis_df.empty:
+        return {}
+    pivot = emis_df.pivot_table(index='coproprietaire_id', columns='cle', values='montant',
+                                aggfunc='sum', fill_value=0, observed=True)
+    montants = euros(centimes(pivot.to_numpy(dtype=float))).tolist()
+    return {int(c): dict(zip(pivot.columns, ligne)) for c, ligne in zip(pivot.index, montants)}
+
+
+def emis_du_lot(emis, cop_id):
+    """Appels émis d'un lot (argument `appels_emis` du PDF de régularisation), même règle
+    que regularisation_par_lot : None sans appel émis (part recalculée du budget),
+    sinon les montants du lot, {} pour un lot sans appel émis (rien de versé)."""
+    return emis.get(int(cop_id), {}) if emis else None
+
+
+def regularisation_par_lot(copro_df, budgets_appel, dep_reel_type, alur_annuel, emis, mat, config) -> pd.DataFrame:
+    """5ème appel par lot, trié par lot : Charges réelles − Appels versés.
+    Appels versés = part de `budgets_appel`, ou montants relus de `emis` (voir emis_par_lot)
+    s'il y a des appels émis ; l'Alur est informatif (pas de régularisation).
+    Parts au centime (MatriceTantiemes.repartir_centimes), écarts calculés en centimes."""
+    ids = [int(i) for i in copro_df['id']]
+    pos = np.array([-1 if p is None else p for p in map(mat.position, ids)], dtype='int64')
+
+    def par_lot(parts):
+        """Lignes de `parts` (ordre de mat) dans l'ordre de copro_df ; zéro pour un lot absent."""
+        if not len(parts):
+            return np.zeros((len(ids),) + parts.shape[1:], dtype='int64')
+        out = parts[np.maximum(pos, 0)]
+        out[pos < 0] = 0
+        return out
+
+    dep = par_lot(mat.repartir_centimes(dep_reel_type, repli=CLE_GENERALE))
+    if emis:
+        app = centimes([[emis.get(i, {}).get(k, 0.0) for k in config] for i in ids]).reshape(len(ids), len(config))
+        alur = centimes([emis.get(i, {}).get('alur', 0.0) for i in ids])
+    else:
+        app = par_lot(mat.repartir_centimes(budgets_appel, repli=CLE_GENERALE))
+        alur = par_lot(mat.repartir_cle_centimes(CLE_GENERALE, alur_annuel))
+    appels_cop, charges_cop = app.sum(axis=1), dep.sum(axis=1)
+    cinquieme = charges_cop - appels_cop
+
+    def colonne(nom):
+        return copro_df[nom].values if nom in copro_df.columns else ''
+
+    reg = pd.DataFrame({
+        'Lot':                colonne('lot'),
+        'Copropriétaire':    colonne('nom'),
+        'Étage':             colonne('etage'),
+        'Usage':             colonne('usage'),
+        'Appels versés (€)': euros(appels_cop),
+        '🏛️ Alur versé (€)': euros(alur),
+        'Charges réelles (€)': euros(charges_cop),
+        '5ème appel (€)':    euros(cinquieme),
+        'Sens': np.select([cinquieme > 1, cinquieme < -1], ['💳 À payer', '💚 À rembourser'], '✅ Soldé'),
+    })
+    for j, cfg in enumerate(config.values()):
+        reg[f"{cfg['emoji']} {cfg['label']}"] = euros(dep[:, j])
+    return reg.sort_values('Lot')
+
+
+# ==================== PDF ====================
+
+def generate_appel_pdf_bytes(syndic, cop_row, periode, label_trim, annee,
+                              montants, alur_par_appel, nb_appels, mat, config):
+    """Génère le PDF d'appel de fonds pour un copropriétaire. Retourne bytes."""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib import colors
+    from reportlab.lib.units import mm
+    from reportlab.lib.styles import ParagraphStyle
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+    from reportlab.lib.enums import TA_RIGHT, TA_CENTER
+    from io import BytesIO
+
+    JAUNE      = colors.HexColor('#FFD700')
+    JAUNE_CLAIR= colors.HexColor('#FFFACD')
+    BLEU       = colors.HexColor('#4472C4')
+    GRIS_CLAIR = colors.HexColor('#D9D9D9')
+
+    buf = BytesIO()
+    doc = SimpleDocTemplate(buf, pagesize=A4,
+        leftMargin=15*mm, rightMargin=15*mm,
+        topMargin=12*mm, bottomMargin=15*mm)
+
+    def sty(size=9, bold=False, align='LEFT', color=colors.black):
+        from reportlab.lib.enums import TA_LEFT, TA_RIGHT, TA_CENTER
+        al = {'LEFT': TA_LEFT, 'RIGHT': TA_RIGHT, 'CENTER': TA_CENTER}[align]
+        fn = 'Helvetica-Bold' if bold else 'Helvetica'
+        return ParagraphStyle('s', fontSize=size, fontName=fn, textColor=color,
+                              alignment=al, leading=size*1.3)
+
+    story = []
+
+    # --- EN-TÊTE ---
+    from datetime import date
+    date_str = date.today().strftime('%d/%m/%Y')
+    header = Table([[
+        [Paragraph("<u><b>Appel de Fonds</b></u>", sty(20, True)),
+         Paragraph(f"Période du {periode}", sty(9))],
+        [Paragraph(f"A {syndic['ville']}, le {date_str}", sty(9, align='RIGHT')),
+         Paragraph(f"<b>{syndic['nom']}</b>", sty(9, True, 'RIGHT')),
+         Paragraph(syndic['adresse'], sty(9, align='RIGHT')),
+         Paragraph(syndic['cp_ville'], sty(9, align='RIGHT'))]
+    ]], colWidths=[95*mm, 85*mm])
+    header.setStyle(TableStyle([('VALIGN',(0,0),(-1,-1),'TOP')]))
+    story.append(header)
+    story.append(Spacer(1, 6*mm))
+
+    # --- BLOC RÉF / DESTINATAIRE ---
+    nom_cop  = str(cop_row.get('nom', ''))
+    ref_cop  = f"{syndic.get('code') or '0275'}-{str(cop_row.get('lot','')).zfill(4)}"
+    login    = str(cop_row.get('login', '') or '')
+    adresse  = str(cop_row.get('adresse', '') or '')
+    cp_ville = str(cop_row.get('cp_ville', '') or '')
+
+    ref_tbl = Table([[
+        [Paragraph(f"<b>APPEL DE FONDS TRIMESTRIELS {annee}</b>", sty(9, True)),
+         Paragraph(f"Réf : {ref_cop} / {nom_cop}", sty(9)),
+         Paragraph(f"Internet Login : {login}  Mot de Passe :", sty(9))],
+        [],
+        [Paragraph(f"<b>{nom_cop}</b>", sty(9, True)),
+         Paragraph(adresse, sty(9)),
+         Paragraph(cp_ville, sty(9))]
+    ]], colWidths=[80*mm, 20*mm, 80*mm])
+    ref_tbl.setStyle(TableStyle([('VALIGN',(0,0),(-1,-1),'TOP')]))
+    story.append(ref_tbl)
+    story.append(Spacer(1, 8*mm))
+
+    # --- TABLEAU DES POSTES ---
+    col_widths = [14*mm, 82*mm, 22*mm, 22*mm, 22*mm, 22*mm]
+    thead = [['', Paragraph('Postes à répartir', sty(9, True, 'CENTER', colors.white)),
+              Paragraph('Total', sty(9, True, 'CENTER', colors.white)),
+              Paragraph('Base', sty(9, True, 'CENTER', colors.white)),
+              Paragraph('Tantièmes', sty(9, True, 'CENTER', colors.white)),
+              Paragraph('Quote-part', sty(9, True, 'CENTER', colors.white))]]
+
+    lot   = str(cop_row.get('lot',''))
+    usage = str(cop_row.get('usage',''))
+    rows  = [[Paragraph(f"<b>{lot}</b>", sty(9, True)),
+              Paragraph(f"<b>{usage}</b>", sty(9, True)),
+              '', '', '', '']]
+
+    # Parts au centime, identiques à celles de completer_appel / lignes_appels_fonds
+    i = mat.position(cop_row['id'])
+    rang = rang_appel(label_trim, nb_appels)
+    annuel = mat.repartir_centimes(montants, repli=CLE_GENERALE)[i] if i is not None else np.zeros(len(config), dtype='int64')
+    parts = echeance(annuel, nb_appels, rang)
+    total_lot = 0
+    tants = tantiemes_du_lot(cop_row, mat, config)
+    for j, (key, cfg) in enumerate(config.items()):
+        tant, base = tants[key]
+        if base == 0 or tant == 0:
+            continue
+        montant_annuel = montants.get(key, 0)
+        quote_part = euros(parts[j])
+        if quote_part == 0:
+            continue
+        total_lot += parts[j]
+        rows.append(['',
+            Paragraph(cfg['libelle_pdf'], sty(8.5)),
+            Paragraph(f"{montant_annuel/nb_appels:,.2f}", sty(8.5, align='RIGHT')),
+            Paragraph(f"{base:g}", sty(8.5, align='CENTER')),
+            Paragraph(str(int(tant)), sty(8.5, align='CENTER')),
+            Paragraph(f"{quote_part:,.2f}", sty(8.5, align='RIGHT'))])
+
+    # Ligne Alur
+    tant_gen, total_gen = tants.get(CLE_GENERALE, (0.0, 0))
+    if tant_gen > 0 and total_gen > 0 and alur_par_appel > 0:
+        alur_c = int(mat.repartir_cle_centimes(CLE_GENERALE, alur_par_appel)[i])
+        alur_cop = euros(alur_c)
+        total_lot += alur_c
+        rows.append(['',
+            Paragraph('FONDS TRAVAUX ALUR', sty(8.5)),
+            Paragraph(f"{alur_par_appel:,.2f}", sty(8.5, align='RIGHT')),
+            Paragraph(f"{total_gen:g}", sty(8.5, align='CENTER')),
+            Paragraph(str(int(tant_gen)), sty(8.5, align='CENTER')),
+            Paragraph(f"{alur_cop:,.2f}", sty(8.5, align='RIGHT'))])
+
+    total_lot = euros(total_lot)
+    dont_tva = euros(centimes(total_lot * 20 / 120))
+
+    rows.append(['', Paragraph('<b>TOTAL DU LOT</b>', sty(9, True, 'RIGHT')),
+                 '', '', '',
+                 Paragraph(f"<b>{total_lot:,.2f}</b>", sty(9, True, 'RIGHT'))])
+    rows.append(['', Paragraph('<b>DONT TVA</b>', sty(9, True, 'RIGHT')),
+                 '', '', '',
+                 Paragraph(f"<b>{dont_tva:,.2f}</b>", sty(9, True, 'RIGHT'))])
+
+    table_data = thead + rows
+    n = len(table_data)
+    n_lot = 1; n_ds = 2; n_de = n - 3; n_tot = n - 2; n_tva = n - 1
+
+    tbl = Table(table_data, colWidths=col_widths, repeatRows=1)
+    style_rules = [
+        ('BACKGROUND', (0,0), (-1,0), BLEU),
+        ('TEXTCOLOR', (0,0), (-1,0), colors.white),
+        ('ALIGN', (0,0), (-1,0), 'CENTER'),
+        ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
+        ('TOPPADDING', (0,0), (-1,0), 5), ('BOTTOMPADDING', (0,0), (-1,0), 5),
+        ('BACKGROUND', (0,n_lot), (-1,n_lot), GRIS_CLAIR),
+        ('BACKGROUND', (5,n_ds), (5,n_de), GRIS_CLAIR),
+        ('BACKGROUND', (0,n_tot), (-1,n_tot), JAUNE),
+        ('BACKGROUND', (0,n_tva), (-1,n_tva), JAUNE_CLAIR),
+        ('GRID', (0,0), (-1,-1), 0.4, colors.HexColor('#CCCCCC')),
+        ('BOX', (0,0), (-1,-1), 1, colors.HexColor('#999999')),
+        ('ALIGN', (2,1), (2,-1), 'RIGHT'),
+        ('ALIGN', (3,1), (3,-1), 'CENTER'),
+        ('ALIGN', (4,1), (4,-1), 'CENTER'),
+        ('ALIGN', (5,1), (5,-1), 'RIGHT'),
+        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+        ('TOPPADDING', (0,1), (-1,-1), 3), ('BOTTOMPADDING', (0,1), (-1,-1), 3),
+        ('LEFTPADDING', (1,0), (1,-1), 6),
+    ]
+    for i in range(n_ds, n_tot):
+        bg = colors.white if i % 2 == 0 else colors.HexColor('#F5F5F5')
+        style_rules.append(('BACKGROUND', (0,i), (4,i), bg))
+    tbl.setStyle(TableStyle(style_rules))
+    story.append(tbl)
+
+    # --- MONTANT TOTAL ---
+    story.append(Spacer(1, 6*mm))
+    mt = Table([[
+        Paragraph("Montant de l'appel de fonds", sty(11, True)),
+        Paragraph(f"<b>{total_lot:,.2f} €</b>", sty(14, True, 'RIGHT'))
+    ]], colWidths=[130*mm, 50*mm])
+    mt.setStyle(TableStyle([
+        ('VALIGN',(0,0),(-1,-1),'MIDDLE'),
+        ('LINEABOVE',(0,0),(-1,0),1.5,colors.black),
+        ('TOPPADDING',(0,0),(-1,0),6),
+    ]))
+    story.append(mt)
+
+    doc.build(story)
+    buf.seek(0)
+    return buf.getvalue()
+
+def generate_regularisation_pdf_bytes(syndic, cop_row, annee,
+                                       budgets_appel, dep_reel_type,
+                                       alur_annuel_reg, nb_appels_reg, appels_emis, mat, config):
+    """Génère le PDF du 5ème appel de régularisation pour un copropriétaire.
+    appels_emis : {clé: montant appelé dans l'année, 'alur': …} relu des appels émis
+    (emis_du_lot) ; None : la part appelée est recalculée depuis budgets_appel.
+    mat : tantièmes de l'exercice (matrice à la date de clôture)."""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib import colors
+    from reportlab.lib.units import mm
+    from reportlab.lib.styles import ParagraphStyle
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+    from reportlab.lib.enums import TA_LEFT, TA_RIGHT, TA_CENTER
+    from io import BytesIO
+    from datetime import date
+
+    JAUNE       = colors.HexColor('#FFD700')
+    JAUNE_CLAIR = colors.HexColor('#FFFACD')
+    VERT_CLAIR  = colors.HexColor('#E8F5E9')
+    ROUGE_CLAIR = colors.HexColor('#FFEBEE')
+    BLEU        = colors.HexColor('#4472C4')
+    GRIS_CLAIR  = colors.HexColor('#D9D9D9')
+
+    buf = BytesIO()
+    doc = SimpleDocTemplate(buf, pagesize=A4,
+        leftMargin=15*mm, rightMargin=15*mm,
+        topMargin=12*mm, bottomMargin=15*mm)
+
+    def sty(size=9, bold=False, align='LEFT', color=colors.black):
+        al = {'LEFT': TA_LEFT, 'RIGHT': TA_RIGHT, 'CENTER': TA_CENTER}[align]
+        return ParagraphStyle('s', fontSize=size,
+                              fontName='Helvetica-Bold' if bold else 'Helvetica',
+                              textColor=color, alignment=al, leading=size * 1.3)
+
+    story = []
+    date_str = date.today().strftime('%d/%m/%Y')
+
+    # ── EN-TÊTE ──────────────────────────────────────────────────
+    header = Table([[
+        [Paragraph("<u><b>5ème Appel de Fonds — Régularisation</b></u>", sty(16, True)),
+         Paragraph(f"Exercice {annee}", sty(9)),
+         Paragraph(f"Basé sur {nb_appels_reg} appels provisionnels versés", sty(9))],
+        [Paragraph(f"A {syndic['ville']}, le {date_str}", sty(9, align='RIGHT')),
+         Paragraph(f"<b>{syndic['nom']}</b>", sty(9, True, 'RIGHT')),
+         Paragraph(syndic['adresse'], sty(9, align='RIGHT')),
+         Paragraph(syndic['cp_ville'], sty(9, align='RIGHT'))]
+    ]], colWidths=[100*mm, 80*mm])
+    header.setStyle(TableStyle([('VALIGN', (0,0), (-1,-1), 'TOP')]))
+    story.append(header)
+    story.append(Spacer(1, 5*mm))
+
+    # ── BLOC RÉF / DESTINATAIRE ───────────────────────────────────
+    nom_cop  = str(cop_row.get('nom', ''))
+    ref_cop  = f"{syndic.get('code') or '0275'}-{str(cop_row.get('lot','')).zfill(4)}"
+    adresse  = str(cop_row.get('adresse', '') or '')
+    cp_ville = str(cop_row.get('cp_ville', '') or '')
+    login    = str(cop_row.get('login', '') or '')
+
+    ref_tbl = Table([[
+        [Paragraph(f"<b>RÉGULARISATION DES CHARGES {annee}</b>", sty(9, True)),
+         Paragraph(f"Réf : {ref_cop} / {nom_cop}", sty(9)),
+         Paragraph(f"Internet Login : {login}  Mot de Passe :", sty(9))],
+        [],
+        [Paragraph(f"<b>{nom_cop}</b>", sty(9, True)),
+         Paragraph(adresse, sty(9)),
+         Paragraph(cp_ville, sty(9))]
+    ]], colWidths=[80*mm, 20*mm, 80*mm])
+    ref_tbl.setStyle(TableStyle([('VALIGN', (0,0), (-1,-1), 'TOP')]))
+    story.append(ref_tbl)
+    story.append(Spacer(1, 6*mm))
+
+    # ── TABLEAU PRINCIPAL ─────────────────────────────────────────
+    # Colonnes : Désignation | Dép. réelles | Base | Tantièmes | Appels versés | Charges réelles | Différence
+    col_widths = [14*mm, 55*mm, 20*mm, 20*mm, 15*mm, 22*mm, 22*mm, 22*mm]
+    thead = [['',
+        Paragraph('Désignation', sty(8, True, 'CENTER', colors.white)),
+        Paragraph('Dép. réelles', sty(8, True, 'CENTER', colors.white)),
+        Paragraph('Base', sty(8, True, 'CENTER', colors.white)),
+        Paragraph('Tants', sty(8, True, 'CENTER', colors.white)),
+        Paragraph('Appels versés', sty(8, True, 'CENTER', colors.white)),
+        Paragraph('Charges réelles', sty(8, True, 'CENTER', colors.white)),
+        Paragraph('Différence', sty(8, True, 'CENTER', colors.white)),
+    ]]
+
+    lot   = str(cop_row.get('lot', ''))
+    usage = str(cop_row.get('usage', ''))
+    rows  = [[
+        Paragraph(f"<b>{lot}</b>", sty(9, True)),
+        Paragraph(f"<b>{usage}</b>", sty(9, True)),
+        '', '', '', '', '', ''
+    ]]
+
+    total_appels   = 0
+    total_charges  = 0
+    total_dep_reel = 0
+
+    # Parts au centime, identiques à celles de regularisation_par_lot
+    i = mat.position(cop_row['id'])
+    nul = np.zeros(len(config), dtype='int64')
+    parts_app = mat.repartir_centimes(budgets_appel, repli=CLE_GENERALE)[i] if i is not None else nul
+    parts_dep = mat.repartir_centimes(dep_reel_type, repli=CLE_GENERALE)[i] if i is not None else nul
+    tants = tantiemes_du_lot(cop_row, mat, config)
+    for j, (key, cfg) in enumerate(config.items()):
+        tant, base = tants[key]
+        appel_emis = (appels_emis or {}).get(key, 0)
+        if (tant == 0 or base == 0) and not appel_emis:
+            continue
+        dep_reel   = dep_reel_type.get(key, 0)
+        appel_c    = centimes(appel_emis) if appels_emis is not None else int(parts_app[j])
+        charge_c   = int(parts_dep[j])
+        appel_cop, charge_cop, diff = euros(appel_c), euros(charge_c), euros(charge_c - appel_c)
+
+        if appel_c == 0 and charge_c == 0:
+            continue
+
+        total_appels   += appel_c
+        total_charges  += charge_c
+        total_dep_reel += dep_reel
+
+        rows.append([
+            '',
+            Paragraph(cfg['libelle_pdf'], sty(8)),
+            Paragraph(f"{dep_reel:,.2f}", sty(8, align='RIGHT')),
+            Paragraph(f"{base:g}", sty(8, align='CENTER')),
+            Paragraph(str(int(tant)), sty(8, align='CENTER')),
+            Paragraph(f"{appel_cop:,.2f}", sty(8, align='RIGHT')),
+            Paragraph(f"{charge_cop:,.2f}", sty(8, align='RIGHT')),
+            Paragraph(f"{diff:+,.2f}", sty(8, align='RIGHT')),
+        ])
+
+    # Ligne Alur (informatif)
+    tant_gen, total_gen = tants.get(CLE_GENERALE, (0.0, 0))
+    if tant_gen > 0 and total_gen > 0 and alur_annuel_reg > 0:
+        alur_cop = euros(mat.repartir_cle_centimes(CLE_GENERALE, alur_annuel_reg)[i])
+        if appels_emis is not None:
+            alur_cop = euros(centimes(appels_emis.get('alur', 0)))
+        rows.append([
+            '',
+            Paragraph('FONDS TRAVAUX ALUR (info)', sty(8)),
+            Paragraph('—', sty(8, align='CENTER')),
+            Paragraph(f"{total_gen:g}", sty(8, align='CENTER')),
+            Paragraph(str(int(tant_gen)), sty(8, align='CENTER')),
+            Paragraph(f"{alur_cop:,.2f}", sty(8, align='RIGHT')),
+            Paragraph(f"{alur_cop:,.2f}", sty(8, align='RIGHT')),
+            Paragraph("0,00", sty(8, align='RIGHT')),
+        ])
+
+    # Sous-total charges courantes
+    diff_total = euros(total_charges - total_appels)
+    total_appels, total_charges = euros(total_appels), euros(total_charges)
+    rows.append([
+        '',
+        Paragraph('<b>SOUS-TOTAL CHARGES</b>', sty(9, True, 'RIGHT')),
+        '', '', '',
+        Paragraph(f"<b>{total_appels:,.2f}</b>", sty(9, True, 'RIGHT')),
+        Paragraph(f"<b>{total_charges:,.2f}</b>", sty(9, True, 'RIGHT')),
+        Paragraph(f"<b>{diff_total:+,.2f}</b>", sty(9, True, 'RIGHT')),
+    ])
+
+    # DONT TVA
+    tva_appels, tva_charges = centimes(total_appels * 20 / 120), centimes(total_charges * 20 / 120)
+    dont_tva_appels, dont_tva_charges = euros(tva_appels), euros(tva_charges)
+    rows.append([
+        '',
+        Paragraph('<b>DONT TVA</b>', sty(9, True, 'RIGHT')),
+        '', '', '',
+        Paragraph(f"<b>{dont_tva_appels:,.2f}</b>", sty(9, True, 'RIGHT')),
+        Paragraph(f"<b>{dont_tva_charges:,.2f}</b>", sty(9, True, 'RIGHT')),
+        Paragraph(f"<b>{euros(tva_charges - tva_appels):+,.2f}</b>", sty(9, True, 'RIGHT')),
+    ])
+
+    table_data = thead + rows
+    n = len(table_data)
+    n_lot    = 1
+    n_ds     = 2
+    n_de     = n - 3
+    n_alur   = n - 3 if tant_gen > 0 and alur_annuel_reg > 0 else None
+    n_stotal = n - 2
+    n_tva    = n - 1
+
+    tbl = Table(table_data, colWidths=col_widths, repeatRows=1)
+    style_rules = [
+        ('BACKGROUND', (0,0), (-1,0), BLEU),
+        ('TEXTCOLOR',  (0,0), (-1,0), colors.white),
+        ('FONTNAME',   (0,0), (-1,0), 'Helvetica-Bold'),
+        ('ALIGN',      (0,0), (-1,0), 'CENTER'),
+        ('TOPPADDING', (0,0), (-1,0), 5),
+        ('BOTTOMPADDING', (0,0), (-1,0), 5),
+        ('BACKGROUND', (0,n_lot), (-1,n_lot), GRIS_CLAIR),
+        ('BACKGROUND', (0,n_stotal), (-1,n_stotal), JAUNE),
+        ('BACKGROUND', (0,n_tva),    (-1,n_tva),    JAUNE_CLAIR),
+        ('GRID', (0,0), (-1,-1), 0.4, colors.HexColor('#CCCCCC')),
+        ('BOX',  (0,0), (-1,-1), 1,   colors.HexColor('#999999')),
+        ('ALIGN', (2,1), (2,-1), 'RIGHT'),
+        ('ALIGN', (3,1), (3,-1), 'CENTER'),
+        ('ALIGN', (4,1), (4,-1), 'CENTER'),
+        ('ALIGN', (5,1), (5,-1), 'RIGHT'),
+        ('ALIGN', (6,1), (6,-1), 'RIGHT'),
+        ('ALIGN', (7,1), (7,-1), 'RIGHT'),
+        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+        ('TOPPADDING', (0,1), (-1,-1), 3),
+        ('BOTTOMPADDING', (0,1), (-1,-1), 3),
+        ('LEFTPADDING', (1,0), (1,-1), 4),
+    ]
+    # Colorer la colonne différence selon positif/négatif par ligne
+    for i in range(n_ds, n_stotal):
+        bg = colors.white if i % 2 == 0 else colors.HexColor('#F5F5F5')
+        style_rules.append(('BACKGROUND', (0,i), (6,i), bg))
+    tbl.setStyle(TableStyle(style_rules))
+    story.append(tbl)
+
+    # ── MONTANT FINAL ─────────────────────────────────────────────
+    story.append(Spacer(1, 6*mm))
+
+    sens_txt = "Montant à appeler" if diff_total >= 0 else "Montant à rembourser"
+    couleur_diff = colors.HexColor('#B71C1C') if diff_total >= 0 else colors.HexColor('#1B5E20')
+    mt = Table([[
+        Paragraph(f"<b>{sens_txt}</b>", sty(11, True)),
+        Paragraph(f"<b>{abs(diff_total):,.2f} €</b>",
+                  sty(14, True, 'RIGHT', couleur_diff))
+    ]], colWidths=[120*mm, 60*mm])
+    mt.setStyle(TableStyle([
+        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+        ('LINEABOVE', (0,0), (-1,0), 1.5, colors.black),
+        ('TOPPADDING', (0,0), (-1,0), 6),
+        ('BACKGROUND', (0,0), (-1,0), VERT_CLAIR if diff_total < 0 else ROUGE_CLAIR),
+    ]))
+    story.append(mt)
+
+    # ── NOTE BAS DE PAGE ──────────────────────────────────────────
+    story.append(Spacer(1, 8*mm))
+    note = (f"Régularisation basée sur {nb_appels_reg} appel(s) provisionnel(s) versé(s) — "
+            f"Exercice {annee} — Émis le {date_str}")
+    story.append(Paragraph(note, sty(7, color=colors.grey)))
+
+    doc.build(story)
+    buf.seek(0)
+    return buf.getvalue()
+
+
+def generate_relance_pdf_bytes(syndic, cop_row, solde, tranches, impayes):
+    """Lettre de relance pour un lot débiteur. impayes : écritures débitrices
+    encore dues (date, libelle, debit). Retourne bytes."""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib import colors
+    from reportlab.lib.units import mm
+    from reportlab.lib.styles import ParagraphStyle
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+    from reportlab.lib.enums import TA_LEFT, TA_RIGHT, TA_CENTER
+    from io import BytesIO
+    from datetime import date
+
+    BLEU       = colors.HexColor('#4472C4')
+    ROUGE_CLAIR= colors.HexColor('#FFEBEE')
+
+    buf = BytesIO()
+    doc = SimpleDocTemplate(buf, pagesize=A4,
+        leftMargin=20*mm, rightMargin=20*mm,
+        topMargin=15*mm, bottomMargin=15*mm)
+
+    def sty(size=10, bold=False, align='LEFT', color=colors.black):
+        al = {'LEFT': TA_LEFT, 'RIGHT': TA_RIGHT, 'CENTER': TA_CENTER}[align]
+        fn = 'Helvetica-Bold' if bold else 'Helvetica'
+        return ParagraphStyle('s', fontSize=size, fontName=fn, textColor=color,
+                              alignment=al, leading=size*1.35)
+
+    date_str = date.today().strftime('%d/%m/%Y')
+    nom_cop  = str(cop_row.get('nom', ''))
+    ref_cop  = f"{syndic.get('code') or '0275'}-{str(cop_row.get('lot','')).zfill(4)}"
+    story = []
+    header = Table([[
+        [Paragraph(f"<b>{syndic['nom']}</b>", sty(10, True)),
+         Paragraph(syndic['adresse'], sty(9)),
+         Paragraph(syndic['cp_ville'], sty(9))],
+        [Paragraph(f"A {syndic['ville']}, le {date_str}", sty(9, align='RIGHT')),
+         Spacer(1, 10*mm),
+         Paragraph(f"<b>{nom_cop}</b>", sty(10, True, 'RIGHT')),
+         Paragraph(str(cop_row.get('adresse', '') or ''), sty(9, align='RIGHT')),
+         Paragraph(str(cop_row.get('cp_ville', '') or ''), sty(9, align='RIGHT'))]
+    ]], colWidths=[85*mm, 85*mm])
+    header.setStyle(TableStyle([('VALIGN',(0,0),(-1,-1),'TOP')]))
+    story.append(header)
+    story.append(Spacer(1, 12*mm))
+    story.append(Paragraph(f"<b>Objet : relance — charges de copropriété impayées</b>", sty(11, True)))
+    story.append(Paragraph(f"Réf : {ref_cop} / {nom_cop} — Lot {cop_row.get('lot','')}", sty(9)))
+    story.append(Spacer(1, 6*mm))
+    story.append(Paragraph(
+        f"Madame, Monsieur,<br/><br/>Sauf erreur de notre part, votre compte présente à ce jour un solde "
+        f"débiteur de <b>{solde:,.2f} €</b>, correspondant aux appels de fonds ci-dessous.", sty(10)))
+    story.append(Spacer(1, 5*mm))
+
+    rows = [[Paragraph('<b>Date</b>', sty(9, True, 'CENTER', colors.white)),
+             Paragraph('<b>Libellé</b>', sty(9, True, 'CENTER', colors.white)),
+             Paragraph('<b>Restant dû (€)</b>', sty(9, True, 'CENTER', colors.white))]]
+    for r in impayes:
+        rows.append([Paragraph(pd.Timestamp(r['date']).strftime('%d/%m/%Y'), sty(9, align='CENTER')),
+                     Paragraph(str(r.get('libelle', '') or ''), sty(9)),
+                     Paragraph(f"{r['impaye']:,.2f}", sty(9, align='RIGHT'))])
+    rows.append(['', Paragraph('<b>TOTAL DÛ</b>', sty(9, True, 'RIGHT')),
+                 Paragraph(f"<b>{solde:,.2f}</b>", sty(9, True, 'RIGHT'))])
+    tbl = Table(rows, colWidths=[28*mm, 102*mm, 40*mm], repeatRows=1)
+    tbl.setStyle(TableStyle([
+        ('BACKGROUND', (0,0), (-1,0), BLEU),
+        ('BACKGROUND', (0,-1), (-1,-1), ROUGE_CLAIR),
+        ('GRID', (0,0), (-1,-1), 0.4, colors.HexColor('#CCCCCC')),
+        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+    ]))
+    story.append(tbl)
+    story.append(Spacer(1, 4*mm))
+    story.append(Paragraph(" — ".join(f"{k} : {v:,.2f} €" for k, v in tranches.items() if v), sty(8, color=colors.grey)))
+    story.append(Spacer(1, 6*mm))
+    story.append(Paragraph(
+        "Nous vous remercions de bien vouloir régulariser cette situation dans les meilleurs délais. "
+        "Si votre règlement a été effectué entre-temps, veuillez ne pas tenir compte de ce courrier.<br/><br/>"
+        "Veuillez agréer, Madame, Monsieur, nos salutations distinguées.", sty(10)))
+    story.append(Spacer(1, 10*mm))
+    story.append(Paragraph(f"<b>Le Syndic — {syndic['nom']}</b>", sty(10, True, 'RIGHT')))
+
+    doc.build(story)
+    buf.seek(0)
+    return buf.getvalue()
@@ -0,0 +1,14 @@
+"""
+bench — Mesures de performance sur des copropriétés synthétiques.
+
+    python -m bench                       # 20, 100, 500, 1000 et 5000 lots
+    python -m bench --lots 20 200 --sortie mesures.json --comparer mesures_avant.json
+
+Chaque taille est générée (bench/generateur.py) dans un stockage SQLite local
+(stockage.py), puis l'application est chargée sur ce stockage : les calculs sont
+chronométrés en appelant les fonctions de donnees.py, les pages de vues/
+(régularisation, Grand Livre…) en rejouant un rerun complet, le démarrage à
+froid dans un processus neuf (imports de tête d'app.py, premier rendu comparé
+à l'objectif OBJECTIF_PREMIER_RENDU). Les résultats vont en JSON ;
+`--comparer` affiche l'écart avec une mesure précédente.
+"""
@@ -0,0 +1,284 @@
+"""
+python -m bench — voir bench/__init__.py.
+"""
+
+import io
+import os
+import ast
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import contextlib
+import subprocess
+import statistics
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RACINE)
+
+from bench.generateur import generer, charger, classeur  # noqa: E402
+
+TAILLES = [20, 100, 500, 1000, 5000]
+
+# Premier rendu à froid visé (s) : processus neuf jusqu'à la fin du premier rerun
+OBJECTIF_PREMIER_RENDU = 2.5
+
+PAGES = {  # mesure → module de vues/
+    'page.repartition_regularisation': 'repartition',
+    'page.grand_livre':                'grand_livre',
+    'page.locataires':                 'locataires',
+    'page.tableau_de_bord':            'tableau_de_bord',
+}
+
+
+def chronometrer(fonction, repetitions):
+    """{'premier', 'min', 'mediane', 'repetitions'} en secondes ; le premier appel
+    (caches froids) est compté à part."""
+    durees = []
+    for _ in range(max(repetitions, 1)):
+        t0 = time.perf_counter()
+        fonction()
+        durees.append(time.perf_counter() - t0)
+    return resumer(durees)
+
+
+def resumer(durees):
+    suite = durees[1:] or durees
+    return {'premier': round(durees[0], 6), 'min': round(min(suite), 6),
+            'mediane': round(statistics.median(suite), 6), 'repetitions': len(durees)}
+
+
+def configurer(dossier):
+    """Stockage SQLite de l'application dans `dossier` (réglages COPRO_*, voir donnees.py)."""
+    os.environ.update(COPRO_STOCKAGE='sqlite',
+                      COPRO_SQLITE_CHEMIN=os.path.join(dossier, 'copro.sqlite'),
+                      COPRO_FICHIERS_DOSSIER=os.path.join(dossier, 'fichiers'),
+                      COPRO_MIROIR_DOSSIER='', COPRO_EVENEMENTS='aucun')
+
+
+def vider_caches():
+    import streamlit as st
+    st.cache_data.clear()
+    st.cache_resource.clear()
+
+
+def charger_donnees():
+    """Module donnees.py (fonctions et caches partagés par les pages), hors serveur Streamlit."""
+    import donnees
+    return donnees
+
+
+def mesurer_fonctions(app, repetitions, pdf_max):
+    import pandas as pd
+    copro = app.prepare_copro(app.get_coproprietaires())
+    budget = app.get_budget()
+    annees = sorted(int(a) for a in budget['annee'].unique())
+    bud_an = budget[budget['annee'] == annees[-1]]
+    montants = app.montants_depuis_budget(bud_an)
+    emis = app.get_appels_fonds()
+    nb_appels, alur_taux = 4, 5.0
+    alur_par_appel = round(float(bud_an['montant_budget'].sum()) * alur_taux / 100, 2) / nb_appels
+    mat = app.get_matrice_tantiemes(tuple(int(i) for i in copro['id']))
+    lots = copro.to_dict('records')[:pdf_max] if pdf_max else copro.to_dict('records')
+
+    def pdf_appels():
+        periode = f"01/01/{annees[-1]} au 31/03/{annees[-1]}"
+        for cop in lots:
+            app.generate_appel_pdf_bytes(app.syndic_info(), cop, periode, 'T1', annees[-1],
+                                         montants, alur_par_appel, nb_appels, mat)
+
+    def pdf_regularisation():
+        for cop in lots:
+            app.generate_regularisation_pdf_bytes(app.syndic_info(), cop, annees[-1], montants,
+                                                  montants, alur_par_appel * nb_appels, nb_appels, None, mat)
+
+    return {
+        'calculer_appels':       chronometrer(lambda: app.calculer_appels(copro, montants), repetitions),
+        'appels_attendus':       chronometrer(lambda: app.appels_attendus(copro, budget, annees, nb_appels,
+                                                                          alur_taux, emis), repetitions),
+        'depenses_grand_livre':  chronometrer(lambda: app.get_depenses(), repetitions),
+        'pdf.appels_de_fonds':   dict(chronometrer(pdf_appels, 1), pdfs=len(lots)),
+        'pdf.regularisation':    dict(chronometrer(pdf_regularisation, 1), pdfs=len(lots)),
+        '_lignes':               {'depenses': int(len(app.get_depenses())), 'lots': int(len(copro)),
+                                  'appels_fonds': int(len(emis)) if isinstance(emis, pd.DataFrame) else 0},
+    }
+
+
+def mesurer_memoire(app, client):
+    """{table: {'brut', 'compact'}} en Ko : table lue telle quelle, puis telle que gardée
+    en mémoire par le dépôt (compactage.py)."""
+    import pandas as pd
+    from compactage import octets
+    memoire = {}
+    for table, (_, compact) in sorted(app.get_depot().memoire().items()):
+        brut = pd.DataFrame(client.table(table).select('*').execute().data)
+        memoire[table] = {'brut': round(octets(brut) / 1024, 1), 'compact': round(compact / 1024, 1)}
+    return memoire
+
+
+def mesurer_pages(repetitions, timeout):
+    from streamlit.testing.v1 import AppTest
+    resultats = {}
+    for nom, module in PAGES.items():
+        at = AppTest.from_file(os.path.join(RACINE, 'app.py'), default_timeout=timeout)
+        at.run()
+        erreurs = []
+
+        def rerun():
+            at.switch_page(os.path.join('vues', f'{module}.py')).run()
+            if at.exception:
+                erreurs.append(at.exception[0].value[:200])
+        resultats[nom] = chronometrer(rerun, repetitions)
+        if erreurs:
+            resultats[nom]['erreur'] = erreurs[0]
+    return resultats
+
+
+def imports_app():
+    """Instructions d'import en tête d'app.py (avant la première autre instruction)."""
+    chemin = os.path.join(RACINE, 'app.py')
+    with open(chemin, encoding='utf-8') as f:
+        source = f.read()
+    tete = []
+    for noeud in ast.parse(source).body:
+        if not isinstance(noeud, (ast.Import, ast.ImportFrom)):
+            break
+        tete.append(ast.get_source_segment(source, noeud))
+    return '\n'.join(tete)
+
+
+def processus_neuf(code, timeout):
+    """Exécute `code` dans un interpréteur neuf (répertoire d'app.py) ; rend (durée mesurée par
+    le code, dernière ligne de sa sortie), durée totale du processus."""
+    t0 = time.perf_counter()
+    sortie = subprocess.run([sys.executable, '-c', code], cwd=RACINE, capture_output=True, text=True,
+                            timeout=timeout, check=True).stdout
+    return float(sortie.split()[-1]), time.perf_counter() - t0
+
+
+def mesurer_demarrage(repetitions, timeout):
+    """Démarrage à froid, chaque mesure dans un processus neuf : imports de tête d'app.py,
+    puis premier rendu (interpréteur, imports et premier rerun complet du tableau de bord)."""
+    code_imports = f"import time\nt0 = time.perf_counter()\n{imports_app()}\nprint(time.perf_counter() - t0)"
+    code_rendu = ("import time\nfrom streamlit.testing.v1 import AppTest\n"
+                  f"at = AppTest.from_file({os.path.join(RACINE, 'app.py')!r}, default_timeout={timeout})\n"
+                  "at.run()\nprint(len(at.exception))")
+    imports, rendus, erreurs = [], [], []
+    for _ in range(max(repetitions, 1)):
+        imports.append(processus_neuf(code_imports, timeout)[0])
+        exceptions, duree = processus_neuf(code_rendu, timeout)
+        rendus.append(duree)
+        if exceptions:
+            erreurs.append(f"{int(exceptions)} exception(s) au premier rerun")
+    rendu = dict(resumer(rendus), objectif=OBJECTIF_PREMIER_RENDU)
+    if erreurs:
+        rendu['erreur'] = erreurs[0]
+    return {'demarrage.imports': resumer(imports), 'demarrage.premier_rendu': rendu}
+
+
+def importer(donnees, dossier, repetitions):
+    """Lecture du classeur Excel et import (import_data.py) dans un stockage SQLite vierge."""
+    import pandas as pd
+    import import_data
+    from stockage import ClientSQLite
+    xlsx = os.path.join(dossier, 'import.xlsx')
+    classeur(donnees, xlsx)
+    handlers = {'Copropriétaires': import_data.import_coproprietaires, 'Budget': import_data.import_budget,
+                'Dépenses': import_data.import_depenses, 'Plan comptable': import_data.import_plan_comptable}
+    feuilles = {}
+
+    def lire():
+        xl = pd.ExcelFile(xlsx)
+        feuilles.update({f: xl.parse(f) for f in xl.sheet_names})
+
+    def importer_feuilles():
+        base = os.path.join(dossier, f'import_{time.perf_counter_ns()}.sqlite')
+        client = ClientSQLite(base, os.path.join(dossier, 'fichiers_import'))
+        with contextlib.redirect_stdout(io.StringIO()):
+            for feuille, handler in handlers.items():
+                handler(client, feuilles[feuille])
+    return {'import_data.lecture': chronometrer(lire, repetitions),
+            'import_data.import': chronometrer(importer_feuilles, max(1, repetitions // 2))}
+
+
+def mesurer(nb_lots, annees, repetitions, pdf_max, pages, timeout):
+    from stockage import ClientSQLite
+    dossier = tempfile.mkdtemp(prefix=f'bench_{nb_lots}_')
+    try:
+        configurer(dossier)
+        t0 = time.perf_counter()
+        donnees = generer(nb_lots, annees)
+        client = ClientSQLite(os.environ['COPRO_SQLITE_CHEMIN'], os.environ['COPRO_FICHIERS_DOSSIER'])
+        charger(client, donnees)
+        generation = time.perf_counter() - t0
+        vider_caches()
+        app = charger_donnees()
+        mesures = mesurer_fonctions(app, repetitions, pdf_max)
+        lignes = mesures.pop('_lignes')
+        memoire = mesurer_memoire(app, client)
+        if pages:
+            vider_caches()
+            mesures.update(mesurer_pages(repetitions, timeout))
+            mesures.update(mesurer_demarrage(repetitions, timeout))
+        mesures.update(importer(donnees, dossier, repetitions))
+        return {'lots': nb_lots, 'annees': annees, 'generation_s': round(generation, 3),
+                'lignes': {**{t: len(l) for t, l in donnees.items()}, **lignes}, 'memoire_ko': memoire,
+                'mesures': mesures}
+    finally:
+        vider_caches()
+        shutil.rmtree(dossier, ignore_errors=True)
+
+
+def comparer(actuel, precedent):
+    """Affiche, taille par taille, le rapport des médianes (> 1 = plus lent qu'avant)."""
+    avant = {t['lots']: t['mesures'] for t in precedent.get('tailles', [])}
+    for taille in actuel['tailles']:
+        ref = avant.get(taille['lots'])
+        if not ref:
+            continue
+        print(f"\n{taille['lots']} lots (rapport à la mesure précédente)")
+        for nom, m in taille['mesures'].items():
+            if nom in ref and ref[nom]['mediane'] > 0:
+                r = m['mediane'] / ref[nom]['mediane']
+                alerte = '  ⚠️' if r > 1.2 else ''
+                print(f"  {nom:<36} {ref[nom]['mediane']:>9.4f} s → {m['mediane']:>9.4f} s  ×{r:.2f}{alerte}")
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(prog='python -m bench', description=__doc__)
+    p.add_argument('--lots', type=int, nargs='+', default=TAILLES, help="tailles à mesurer (nombre de lots)")
+    p.add_argument('--annees', type=int, default=3, help="exercices de dépenses générés")
+    p.add_argument('--repetitions', type=int, default=5)
+    p.add_argument('--pdf-max', type=int, default=None, help="nombre maximal de PDFs par génération en masse")
+    p.add_argument('--sans-pages', action='store_true', help="ne pas chronométrer les reruns de pages")
+    p.add_argument('--timeout', type=float, default=600, help="délai maximal d'un rerun de page (s)")
+    p.add_argument('--sortie', default='bench_resultats.json')
+    p.add_argument('--comparer', help="fichier JSON d'une mesure précédente")
+    args = p.parse_args(argv)
+
+    resultats = {'date': time.strftime('%Y-%m-%dT%H:%M:%S'), 'python': platform.python_version(),
+                 'machine': platform.platform(), 'processeur': platform.processor() or platform.machine(),
+                 'tailles': []}
+    for n in args.lots:
+        print(f"⏱️  {n} lots…", flush=True)
+        taille = mesurer(n, args.annees, args.repetitions, args.pdf_max, not args.sans_pages, args.timeout)
+        resultats['tailles'].append(taille)
+        for nom, m in taille['mesures'].items():
+            print(f"  {nom:<36} médiane {m['mediane']:.4f} s (premier {m['premier']:.4f} s)"
+                  + (f"  ⚠️ objectif {m['objectif']} s" if m['mediane'] > m.get('objectif', float('inf')) else '')
+                  + (f"  ❌ {m['erreur']}" if 'erreur' in m else ''))
+        for table, m in taille['memoire_ko'].items():
+            print(f"  mémoire.{table:<29} {m['brut']:>9.1f} Ko → {m['compact']:>9.1f} Ko")
+        with open(args.sortie, 'w', encoding='utf-8') as f:
+            json.dump(resultats, f, ensure_ascii=False, indent=2)
+    print(f"\n✅ Résultats : {args.sortie}")
+    if args.comparer:
+        with open(args.comparer, encoding='utf-8') as f:
+            comparer(resultats, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""
+bench/generateur.py — Copropriété synthétique pour les mesures.
+
+`generer(nb_lots, nb_annees)` produit les tables d'un immeuble (dicts prêts à
+insérer) : lots avec tantièmes sur chaque clé de CLES_DEFAUT (sommes égales aux
+totaux déclarés), budget et dépenses sur le plan comptable, appels figés, AG,
+contrats et locataires. Tirage reproductible (graine fixe).
+"""
+
+import numpy as np
+import pandas as pd
+
+from repartition import CLES_DEFAUT
+
+# Plan comptable type : (compte, libellé, classe, famille, budget annuel pour 20 lots)
+PLAN_COMPTABLE = [
+    ('601', 'Eau froide',                   '1A', 'Fluides',       3200),
+    ('602', 'Électricité parties communes', '1A', 'Fluides',       2400),
+    ('606', 'Produits d\'entretien',        '1A', 'Entretien',      600),
+    ('611', 'Nettoyage des locaux',         '1A', 'Entretien',     7800),
+    ('612', 'Espaces verts',                '1B', 'Entretien',     1800),
+    ('613', 'Assurance immeuble',           '1A', 'Assurances',    4200),
+    ('615', 'Entretien portail garages',    '4',  'Entretien',      900),
+    ('616', 'Éclairage sous-sols',          '3',  'Fluides',        300),
+    ('617', 'Entretien parking RDC',        '2',  'Entretien',     1100),
+    ('621', 'Honoraires syndic',            '1A', 'Honoraires',    6000),
+    ('622', 'Frais postaux',                '1A', 'Administratif',  250),
+    ('614', 'Contrat ascenseur',            '5',  'Ascenseurs',    3600),
+    ('618', 'Dépannages ascenseur',         '5',  'Ascenseurs',     800),
+    ('619', 'Monte-voitures',               '6',  'Équipements',   1500),
+    ('671', 'Travaux votés',                '7',  'Travaux',       5000),
+]
+
+FOURNISSEURS = ['OTIS', 'EDF', 'VEOLIA', 'ISS PROPRETÉ', 'AXA', 'FONCIA', 'JARDINS DU SUD',
+                'ÉLEC SERVICES', 'PORTAILS AZUR', 'LA POSTE', 'SCHINDLER', 'PLOMBERIE NIÇOISE']
+
+USAGES = ['studio', '2 pieces', '3 pieces', '3 pieces duplex', 'parking']
+
+
+def _repartir(poids, total):
+    """Tantièmes entiers proportionnels à `poids`, de somme exactement `total` (plus forts restes)."""
+    poids = np.asarray(poids, dtype=float)
+    if poids.sum() <= 0:
+        return np.zeros(len(poids), dtype=int)
+    brut = poids / poids.sum() * total
+    entier = np.floor(brut).astype(int)
+    reste = int(total - entier.sum())
+    entier[np.argsort(entier - brut)[:reste]] += 1
+    return entier
+
+
+def generer(nb_lots, nb_annees=3, annee_fin=2025, graine=0) -> dict:
+    """{table: [lignes]} d'une copropriété de `nb_lots` lots sur `nb_annees` exercices."""
+    rng = np.random.default_rng(graine)
+    annees = list(range(annee_fin - nb_annees + 1, annee_fin + 1))
+    echelle = max(nb_lots / 20, 1.0)
+
+    # ── Lots et tantièmes ────────────────────────────────────────
+    usages = rng.choice(USAGES, size=nb_lots, p=[0.2, 0.3, 0.25, 0.05, 0.2])
+    parking = usages == 'parking'
+    surface = np.where(parking, rng.uniform(12, 15, nb_lots), rng.uniform(25, 110, nb_lots))
+    etage = np.where(parking, -1, rng.integers(0, 9, nb_lots))
+    poids = {
+        'general':    surface,
+        'ascenseurs': np.where(parking | (etage == 0), 0, surface * (1 + etage / 10)),
+        'rdc_ssols':  np.where(etage <= 0, surface, 0),
+        'ssols_elec': np.where(parking, 1.0, 0),
+        'garages':    np.where(parking, surface, 0),
+        'ssols':      np.where(parking, 1.0, 0),
+    }
+    tantiemes = {c['colonne']: _repartir(poids[c['cle']], c['total']) for c in CLES_DEFAUT}
+    coproprietaires = [{
+        'id': i + 1, 'lot': i + 1, 'nom': f"PROPRIÉTAIRE {i + 1:04d}",
+        'etage': 'SS' if etage[i] < 0 else str(int(etage[i])), 'usage': str(usages[i]),
+        'email': f"lot{i + 1}@exemple.fr" if rng.random() < 0.7 else None,
+        'telephone': None, 'whatsapp': False,
+        **{col: float(v[i]) for col, v in tantiemes.items()},
+    } for i in range(nb_lots)]
+
+    # ── Budget et dépenses ───────────────────────────────────────
+    plan = [{'id': k + 1, 'compte': c, 'libelle_compte': l, 'classe': cl, 'famille': f}
+            for k, (c, l, cl, f, _) in enumerate(PLAN_COMPTABLE)]
+    budget, depenses = [], []
+    nb_dep_an = int(100 + nb_lots // 5)
+    for annee in annees:
+        for c, l, cl, f, m in PLAN_COMPTABLE:
+            budget.append({'id': len(budget) + 1, 'annee': annee, 'compte': c, 'libelle_compte': l,
+                           'classe': cl, 'famille': f,
+                           'montant_budget': round(m * echelle * rng.uniform(0.9, 1.1), 2)})
+        postes = rng.integers(0, len(PLAN_COMPTABLE), nb_dep_an)
+        jours = rng.integers(0, 365, nb_dep_an)
+        for p, j in zip(postes, jours):
+            c, l, cl, f, m = PLAN_COMPTABLE[p]
+            date = pd.Timestamp(year=annee, month=1, day=1) + pd.Timedelta(days=int(j))
+            montant = round(float(m * echelle / nb_dep_an * len(PLAN_COMPTABLE) * rng.lognormal(0, 0.5)), 2)
+            depenses.append({'id': len(depenses) + 1, 'date': date.strftime('%Y-%m-%d'), 'compte': c,
+                             'fournisseur': str(rng.choice(FOURNISSEURS)), 'montant_du': montant,
+                             'montant_paye': montant if date.year < annee_fin else 0, 'classe': cl,
+                             'famille': f, 'commentaire': None, 'facture_path': None, 'deleted': False})
+
+    # ── Appels figés (exercices clos) ────────────────────────────
+    appels = []
+    for annee in annees[:-1]:
+        bud = sum(b['montant_budget'] for b in budget if b['annee'] == annee)
+        for n in range(1, 5):
+            for cop in coproprietaires:
+                part = bud * cop['tantieme_general'] / 10000 / 4
+                appels.append({'id': len(appels) + 1, 'annee': annee, 'periode': f"T{n}",
+                               'coproprietaire_id': cop['id'], 'lot': cop['lot'], 'cle': 'general',
+                               'montant': round(part, 2), 'nb_appels': 4})
+
+    # ── AG, contrats, locataires ─────────────────────────────────
+    ag = [{'id': k + 1, 'date': f"{annee}-06-15", 'titre': f"AG ordinaire {annee}", 'type_ag': 'Ordinaire',
+           'lieu': 'Salle commune', 'president': None, 'description': None} for k, annee in enumerate(annees)]
+    ag_items = [{'id': len(ag) * 100 + k + 1, 'ag_id': a['id'], 'ordre': k + 1, 'type': 'Résolution',
+                 'titre': f"Résolution {k + 1}", 'question': None, 'reponse': None, 'vote': 'Adopté'}
+                for a in ag for k in range(12)]
+    contrats = [{'id': k + 1, 'fournisseur': FOURNISSEURS[k % len(FOURNISSEURS)],
+                 'type_contrat': 'Entretien', 'statut': 'En cours',
+                 'montant_annuel': round(float(rng.uniform(500, 12000)) * echelle ** 0.5, 2),
+                 'date_debut': f"{annees[0]}-01-01", 'date_fin': None, 'date_echeance': f"{annee_fin + 1}-12-31",
+                 'preavis_mois': 3, 'tacite_reconduction': True, 'notes': None}
+                for k in range(10 + nb_lots // 100)]
+    locataires = [{'id': k + 1, 'lot_id': cop['id'], 'prenom': None, 'nom': f"LOCATAIRE {cop['lot']:04d}",
+                   'email': None, 'telephone': None, 'label_bal': None, 'label_interphone': None,
+                   'date_entree': f"{annees[0]}-09-01", 'notes': None, 'actif': True}
+                  for k, cop in enumerate(c for c in coproprietaires if rng.random() < 0.3)]
+
+    return {'coproprietaires': coproprietaires, 'plan_comptable': plan, 'budget': budget,
+            'depenses': depenses, 'appels_fonds': appels, 'ag': ag, 'ag_items': ag_items,
+            'contrats': contrats, 'locataires': locataires}
+
+
+def charger(client, donnees, immeuble_id=1):
+    """Insère les tables générées (par lots de 50, comme import_data)."""
+    for table, lignes in donnees.items():
+        lignes = [{'immeuble_id': immeuble_id, **l} for l in lignes]
+        for i in range(0, len(lignes), 50):
+            client.table(table).insert(lignes[i:i + 50]).execute()
+
+
+def classeur(donnees, chemin):
+    """Classeur Excel au format attendu par import_data.py (Copropriétaires, Budget, Dépenses, Plan comptable)."""
+    feuilles = {'Copropriétaires': 'coproprietaires', 'Budget': 'budget',
+                'Dépenses': 'depenses', 'Plan comptable': 'plan_comptable'}
+    with pd.ExcelWriter(chemin) as xl:
+        for feuille, table in feuilles.items():
+            pd.DataFrame(donnees[table]).drop(columns=['id']).to_excel(xl, sheet_name=feuille, index=False)
@@ -0,0 +1,54 @@
+"""
+compactage.py — Représentation compacte des tables gardées en cache.
+
+Les tables lues en base (`select('*')`) répètent les mêmes chaînes d'une ligne à
+l'autre (classe, compte, fournisseur, nom du copropriétaire de chaque lot…) et
+portent des colonnes techniques que l'application ne lit pas. `compacter()` :
+  - retire les colonnes techniques (COLONNES_TECHNIQUES) ;
+  - range les colonnes répétitives de la table (CATEGORIES) en catégories ;
+  - réduit les entiers à 32 bits quand les valeurs le permettent.
+Les montants restent en float64 : en float32, les centimes se perdent dès
+quelques centaines de milliers d'euros.
+
+Une colonne catégorielle se lit comme une chaîne (==, isin, .str, tri, groupby) ;
+pour la compléter (fillna d'une valeur absente, concaténation), passer d'abord
+par `.astype(str)`.
+"""
+
+import numpy as np
+import pandas as pd
+
+COLONNES_TECHNIQUES = ('immeuble_id', 'created_at', 'updated_at')
+
+# Colonnes rangées en catégories, par table
+CATEGORIES = {
+    'depenses':        ('compte', 'fournisseur', 'classe', 'famille'),
+    'budget':          ('compte', 'classe', 'famille'),
+    'plan_comptable':  ('classe', 'famille'),
+    'coproprietaires': ('nom', 'usage', 'etage'),
+    'appels_fonds':    ('periode', 'cle'),
+}
+
+_INT32 = np.iinfo(np.int32)
+
+
+def compacter(df: pd.DataFrame, table=None) -> pd.DataFrame:
+    """Copie compacte de `df` (lignes de `table`), mêmes lignes et mêmes valeurs."""
+    if df.empty:
+        return df
+    df = df.drop(columns=[c for c in COLONNES_TECHNIQUES if c in df.columns])
+    categories = CATEGORIES.get(table, ())
+    types = {}
+    for col in df.columns:
+        s = df[col]
+        if col in categories and (pd.api.types.is_string_dtype(s.dtype) or s.dtype == object):
+            types[col] = 'category'
+        elif (pd.api.types.is_integer_dtype(s.dtype) and s.dtype.itemsize > 4
+              and s.min() >= _INT32.min and s.max() <= _INT32.max):
+            types[col] = 'int32'
+    return df.astype(types) if types else df
+
+
+def octets(df: pd.DataFrame) -> int:
+    """Mémoire occupée par `df`, chaînes comprises."""
+    return int(df.memory_usage(deep=True).sum())
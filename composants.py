@@ -0,0 +1,187 @@
+"""
+composants.py — Éléments d'interface partagés par les pages (vues/) : graphiques,
+factures (aperçu, visionneuse, grille de miniatures, ligne dépense/facture) et pagination.
+"""
+
+import streamlit as st
+import pandas as pd
+import instrumentation
+from donnees import (MINIATURE_LARGEUR, get_facture_url, get_facture_bytes, get_miniatures_urls,
+                     upload_facture, delete_facture)
+
+def afficher_graphique(fig):
+    """st.plotly_chart compté dans la section « graphiques » du panneau de performance."""
+    with instrumentation.section('graphiques'):
+        st.plotly_chart(fig, use_container_width=True)
+
+def afficher_facture(storage_path, height=600):
+    """Affiche PDF via PDF.js servi en statique (static/pdfjs) ou image.
+    Le navigateur charge le fichier directement par URL signée : rien ne transite
+    par le websocket Streamlit et les pages sont téléchargées à la demande."""
+    from urllib.parse import quote
+    import streamlit.components.v1 as components
+    ext = str(storage_path).rsplit('.', 1)[-1].lower()
+    url = get_facture_url(storage_path)
+    if not url:
+        st.warning("⚠️ Impossible de charger la facture depuis Supabase.")
+        return
+    fname = str(storage_path).split('/')[-1]
+    if url.startswith('data:'):
+        # Stockage local : le fichier est déjà dans la page, pas d'adresse à ouvrir
+        st.download_button("⬇️ Télécharger la facture", get_facture_bytes(storage_path) or b'',
+                           file_name=fname, on_click="ignore")
+    else:
+        # Bouton téléchargement toujours disponible (Supabase force le téléchargement via ?download=)
+        sep = '&' if '?' in url else '?'
+        st.link_button("⬇️ Télécharger la facture", f"{url}{sep}download={quote(fname)}")
+    if ext == 'pdf':
+        viewer = f"app/static/pdfjs/viewer.html?file={quote(url, safe='')}&h={height}"
+        components.iframe(viewer, height=height + 50, scrolling=False)
+    else:
+        st.image(url, use_container_width=True)
+
+def apercu_facture(storage_path, thumb_url, key, height=520):
+    """Miniature de la facture ; le document complet n'est chargé qu'à la demande."""
+    if thumb_url:
+        st.image(thumb_url, width=MINIATURE_LARGEUR)
+    if st.toggle("🔍 Afficher le document", key=f"voir_{key}", value=not thumb_url):
+        afficher_facture(storage_path, height=height)
+
+def grille_miniatures(dep_df, thumbs, nb_col=6):
+    """Grille compacte des miniatures : quelques Ko par dépense."""
+    lignes = list(dep_df.itertuples(index=False))
+    for i in range(0, len(lignes), nb_col):
+        cols = st.columns(nb_col)
+        for col, r in zip(cols, lignes[i:i + nb_col]):
+            fp = getattr(r, 'facture_path', None)
+            d = r.date.strftime('%d/%m/%Y') if hasattr(r.date, 'strftime') else str(r.date)
+            legende = f"{d} · {r.fournisseur} · {r.montant_du:,.2f} €"
+            with col:
+                if fp in thumbs:
+                    st.image(thumbs[fp], caption=legende, use_container_width=True)
+                else:
+                    badge = "📄" if fp and str(fp) not in ('', 'None', 'nan') else "❌"
+                    st.markdown(
+                        f"<div style='height:120px;border:2px dashed #555;border-radius:8px;"
+                        f"display:flex;align-items:center;justify-content:center;font-size:2em;'>"
+                        f"{badge}</div>", unsafe_allow_html=True)
+                    st.caption(legende)
+
+def facture_presente(fp):
+    return bool(fp) and str(fp) not in ('', 'None', 'nan', 'NaN')
+
+def _aller_a(cle_page, page):
+    st.session_state[cle_page] = page
+
+def paginer_depenses(dep_df, prefixe, tailles=(10, 25, 50)):
+    """Contrôles de pagination + saut à une date / un fournisseur.
+    dep_df doit être trié par date décroissante. Retourne la tranche affichée."""
+    cle_page = f"{prefixe}_page"
+    c1, c2, c3, c4 = st.columns([1, 1, 2, 2])
+    with c1:
+        taille = st.selectbox("Par page", tailles, key=f"{prefixe}_taille")
+    nb_pages = max(1, -(-len(dep_df) // taille))
+    if st.session_state.get(cle_page, 1) > nb_pages:
+        st.session_state[cle_page] = nb_pages
+    with c2:
+        page = st.number_input(f"Page (/{nb_pages})", min_value=1, max_value=nb_pages,
+                               step=1, key=cle_page)
+    dates = pd.to_datetime(dep_df['date'], errors='coerce').reset_index(drop=True)
+    with c3:
+        d_saut = st.date_input("📅 Aller à la date", value=None, key=f"{prefixe}_saut_date",
+                               format="DD/MM/YYYY")
+        if d_saut is not None:
+            pos = dates[dates <= pd.Timestamp(d_saut)].index
+            cible = (int(pos[0]) if len(pos) else len(dep_df) - 1) // taille + 1
+            st.button(f"➡️ Page {cible}", key=f"{prefixe}_go_date",
+                      on_click=_aller_a, args=(cle_page, cible))
+    with c4:
+        fournisseurs = sorted(dep_df['fournisseur'].dropna().astype(str).unique())
+        f_saut = st.selectbox("🏢 Aller au fournisseur", [""] + fournisseurs,
+                              key=f"{prefixe}_saut_fourn")
+        if f_saut:
+            pos = dep_df['fournisseur'].astype(str).reset_index(drop=True)
+            cible = int(pos[pos == f_saut].index[0]) // taille + 1
+            st.button(f"➡️ Page {cible}", key=f"{prefixe}_go_fourn",
+                      on_click=_aller_a, args=(cle_page, cible))
+    debut = (int(page) - 1) * taille
+    st.caption(f"Dépenses {debut + 1 if len(dep_df) else 0}–{min(debut + taille, len(dep_df))} "
+               f"sur {len(dep_df)}")
+    return dep_df.iloc[debut:debut + taille]
+
+@st.fragment
+def ligne_facture(row, thumb_url, prefixe, height=520):
+    """Une dépense en vis-à-vis avec sa facture. Fragment : uploader ou supprimer
+    une facture ne relance que cette ligne, pas toute la liste."""
+    dep_id = int(row['id'])
+    cle_fp = f"fac_maj_{dep_id}"
+    fp = st.session_state.get(cle_fp, row.get('facture_path', ''))
+    if cle_fp in st.session_state:
+        thumb_url = get_miniatures_urls((str(fp),)).get(str(fp)) if facture_presente(fp) else None
+    a_facture = facture_presente(fp)
+    badge = "✅" if a_facture else "❌"
+    date_fmt = row['date'].strftime('%d/%m/%Y') if hasattr(row['date'], 'strftime') else str(row['date'])
+
+    with st.expander(
+        f"{badge}  {date_fmt}  ·  {row.get('fournisseur','')}  ·  "
+        f"{row['montant_du']:,.2f} €  ·  {str(row.get('libelle_compte',''))[:40]}",
+        expanded=cle_fp in st.session_state
+    ):
+        col_dep, col_fac = st.columns([1, 2])
+
+        # ── Infos dépense + upload ──────────────
+        with col_dep:
+            st.markdown("**📄 Dépense**")
+            st.markdown(f"""
+| | |
+|---|---|
+| **Date** | {date_fmt} |
+| **Compte** | {row.get('compte','')} |
+| **Libellé** | {str(row.get('libelle_compte',''))[:45]} |
+| **Fournisseur** | {row.get('fournisseur','')} |
+| **Montant** | **{row['montant_du']:,.2f} €** |
+| **Classe** | {row.get('classe','')} |
+| **Commentaire** | {row.get('commentaire','') or '—'} |
+""")
+            st.markdown("---")
+            uploaded = st.file_uploader(
+                "📤 Uploader la facture",
+                type=['pdf','png','jpg','jpeg','webp'],
+                key=f"upload_{prefixe}_{dep_id}",
+                help="PDF ou image (JPG, PNG)"
+            )
+            if uploaded:
+                if st.button("💾 Enregistrer la facture",
+                             key=f"save_fac_{prefixe}_{dep_id}",
+                             use_container_width=True, type="primary"):
+                    try:
+                        st.session_state[cle_fp] = upload_facture(dep_id, uploaded.getvalue(), uploaded.name)
+                        get_miniatures_urls.clear()
+                        st.rerun(scope="fragment")
+                    except Exception as e:
+                        st.error(f"❌ {e}")
+            if a_facture:
+                if st.button("🗑️ Supprimer la facture",
+                             key=f"del_fac_{prefixe}_{dep_id}",
+                             use_container_width=True):
+                    try:
+                        delete_facture(dep_id, str(fp))
+                        st.session_state[cle_fp] = None
+                        get_miniatures_urls.clear()
+                        st.rerun(scope="fragment")
+                    except Exception as e:
+                        st.error(f"❌ {e}")
+
+        # ── Aperçu facture ──────────────────────
+        with col_fac:
+            st.markdown("**🧾 Facture**")
+            if a_facture:
+                apercu_facture(str(fp), thumb_url, f"{prefixe}_{dep_id}", height=height)
+            else:
+                st.markdown(
+                    "<div style='height:200px;border:2px dashed #555;"
+                    "border-radius:8px;display:flex;align-items:center;"
+                    "justify-content:center;color:#888;font-size:0.95em;'>"
+                    "📂 Aucune facture — uploadez-en une à gauche"
+                    "</div>",
+                    unsafe_allow_html=True)
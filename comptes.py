@@ -0,0 +1,70 @@
+"""
+comptes.py — Comptes des copropriétaires : écritures, soldes courants, impayés.
+
+Chaque lot (ligne de `coproprietaires`) a un compte :
+  - débit  : appel de fonds émis, régularisation, frais ;
+  - crédit : paiement reçu (virement rapproché, chèque…), avoir.
+Chaque écriture porte le solde du compte après elle (solde > 0 = dû par le
+copropriétaire). Le solde courant de chaque lot est conservé à part et tenu par
+la base : la fonction SQL `passer_ecritures_copro` (setup_supabase.sql) passe les
+écritures et met à jour ces soldes dans une même transaction, sans relire l'historique.
+"""
+
+import pandas as pd
+
+NATURES = {
+    'appel':          "📤 Appel de fonds",
+    'regularisation': "🔄 Régularisation",
+    'paiement':       "📥 Paiement",
+    'ajustement':     "✏️ Ajustement",
+}
+
+TRANCHES = (30, 90)  # balance âgée : 0–30 / 30–90 / 90+ jours
+
+
+def debits_impayes(ecritures: pd.DataFrame, soldes: dict) -> pd.DataFrame:
+    """Débits encore (partiellement) dus, avec la colonne `impaye`.
+
+    Les paiements soldent les débits les plus anciens d'abord : le solde restant
+    correspond donc aux débits les plus récents. Vectorisé sur tous les lots.
+    """
+    dus = {c: s for c, s in soldes.items() if s > 0.005}
+    if not dus or ecritures.empty:
+        return ecritures.iloc[0:0].assign(impaye=pd.Series(dtype=float))
+    deb = ecritures[(ecritures['debit'].fillna(0) > 0) & ecritures['coproprietaire_id'].isin(dus.keys())]
+    deb = deb.assign(date=pd.to_datetime(deb['date']), debit=deb['debit'].astype(float))
+    deb = deb.sort_values(['coproprietaire_id', 'date', 'id'], ascending=[True, False, False])
+    cumul = deb.groupby('coproprietaire_id')['debit'].cumsum()
+    du = deb['coproprietaire_id'].map(dus)
+    # Part de chaque débit encore impayée : ce qui reste du solde une fois les débits plus récents imputés
+    deb = deb.assign(impaye=(du - (cumul - deb['debit'])).clip(lower=0, upper=deb['debit']).round(2))
+    return deb[deb['impaye'] > 0.005].sort_values(['coproprietaire_id', 'date', 'id'])
+
+
+def balance_agee(ecritures: pd.DataFrame, soldes: dict, date_ref=None, tranches=TRANCHES) -> pd.DataFrame:
+    """Ventile le solde dû de chaque lot par ancienneté (voir `debits_impayes`).
+
+    Colonnes : coproprietaire_id, solde, '0–30 j', '30–90 j', '90+ j', plus_ancien.
+    """
+    a, b = tranches
+    cols = ['coproprietaire_id', 'solde', f'0–{a} j', f'{a}–{b} j', f'{b}+ j', 'plus_ancien']
+    dus = {c: s for c, s in soldes.items() if s > 0.005}
+    if not dus or ecritures.empty:
+        return pd.DataFrame(columns=cols)
+    date_ref = pd.Timestamp(date_ref or pd.Timestamp.today()).normalize()
+
+    deb = debits_impayes(ecritures, dus)
+    age = (date_ref - deb['date']).dt.days
+    deb = deb.assign(tranche=pd.cut(age, [-10**6, a, b, 10**6], labels=cols[2:5], right=False))
+
+    out = deb.pivot_table(index='coproprietaire_id', columns='tranche', values='impaye',
+                          aggfunc='sum', fill_value=0, observed=False)
+    out = out.reindex(index=list(dus), columns=cols[2:5], fill_value=0)
+    out.columns.name = None
+    # Solde antérieur au premier débit connu (report à nouveau) : classé dans la plus ancienne tranche
+    out['solde'] = pd.Series(dus)
+    out[cols[4]] += (out['solde'] - out[cols[2:5]].sum(axis=1)).clip(lower=0)
+    out[cols[2:5]] = out[cols[2:5]].round(2)
+    out['plus_ancien'] = deb.groupby('coproprietaire_id')['date'].min()
+    out.index.name = 'coproprietaire_id'
+    return out.reset_index()[cols].sort_values('solde', ascending=False).reset_index(drop=True)
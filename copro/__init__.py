@@ -0,0 +1,16 @@
+"""
+copro — Opérations trimestrielles en ligne de commande, sans Streamlit.
+
+    python -m copro appels --year 2025 --trimestre T2 --pdf --zip --send
+    python -m copro regularisation --year 2024 --zip
+    python -m copro --immeuble 0275 appels --year 2025 --trimestre T3 --processus 8
+
+Mêmes réglages que l'application (.streamlit/secrets.toml, puis variables
+d'environnement COPRO_<NOM>) et mêmes calculs (appels.py) : les CSV et PDF
+sont ceux des boutons de 🔄 Répartition, avec les montants proposés par défaut
+(budget de l'année, Alur à 5 %). `--send` envoie à chaque copropriétaire ayant
+un email son PDF en pièce jointe, via Brevo (comme 📬 Communications).
+
+Les PDF sont produits par un pool de processus (`--processus`, un par cœur par
+défaut) ; pandas, reportlab et le client Supabase ne sont importés qu'à l'usage.
+"""
@@ -0,0 +1,378 @@
+"""
+python -m copro — voir copro/__init__.py.
+"""
+
+import os
+import sys
+import json
+import time
+import base64
+import zipfile
+import argparse
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RACINE)
+
+BREVO = "https://api.brevo.com/v3/smtp/email"
+PAGE = 1000  # lignes par requête (limite par défaut de l'API Supabase)
+
+
+# ==================== RÉGLAGES ET DONNÉES ====================
+
+def lire_secrets(chemin) -> dict:
+    import tomllib
+    try:
+        with open(chemin, 'rb') as f:
+            return tomllib.load(f)
+    except (OSError, tomllib.TOMLDecodeError):
+        return {}
+
+
+class Reglages:
+    """Comme reglage() dans donnees.py : secrets.toml, sinon variable d'environnement COPRO_<NOM>."""
+
+    def __init__(self, secrets):
+        self.secrets = secrets
+
+    def __call__(self, nom, defaut=None):
+        if nom in self.secrets:
+            return self.secrets[nom]
+        return os.environ.get(f"COPRO_{nom.upper()}", defaut)
+
+
+def connecter(reglage):
+    """Client de données de l'application (Supabase, ou stockage.ClientSQLite si `stockage = "sqlite"`)."""
+    if reglage("stockage", "supabase") == "sqlite":
+        from stockage import ClientSQLite
+        return ClientSQLite(reglage("sqlite_chemin", os.path.join("donnees", "copro.sqlite")),
+                            reglage("fichiers_dossier", os.path.join("donnees", "fichiers")))
+    url, cle = reglage("SUPABASE_URL"), reglage("SUPABASE_KEY")
+    if not url or not cle:
+        sys.exit("❌ Supabase non configuré : SUPABASE_URL et SUPABASE_KEY (secrets.toml ou COPRO_SUPABASE_URL/KEY)")
+    from supabase import create_client
+    return create_client(url, cle)
+
+
+def lire(client, table, **egal) -> list:
+    """Lignes de `table` (filtres d'égalité `egal`), par pages de PAGE."""
+    lignes = []
+    while True:
+        q = client.table(table).select('*')
+        for colonne, valeur in egal.items():
+            q = q.eq(colonne, valeur)
+        page = q.order('id').range(len(lignes), len(lignes) + PAGE - 1).execute().data
+        lignes += page
+        if len(page) < PAGE:
+            return lignes
+
+
+def choisir_immeuble(client, demande):
+    """Ligne de `immeubles` d'id ou de code `demande` (le premier par nom si vide)."""
+    from immeubles import IMMEUBLE_DEFAUT
+    try:
+        lignes = client.table('immeubles').select('*').order('nom').execute().data
+    except Exception:
+        lignes = []
+    lignes = lignes or [IMMEUBLE_DEFAUT]
+    if not demande:
+        return lignes[0]
+    for l in lignes:
+        if str(demande) in (str(l['id']), str(l.get('code') or '')):
+            return l
+    sys.exit(f"❌ Immeuble inconnu : {demande} (connus : {', '.join(str(l.get('code') or l['id']) for l in lignes)})")
+
+
+class Copropriete:
+    """Données d'un immeuble nécessaires aux appels : clés, tantièmes, lots, budget."""
+
+    def __init__(self, client, immeuble):
+        import pandas as pd
+        from immeubles import ClientImmeuble
+        from repartition import CLES_DEFAUT, config_cles, lignes_tantiemes, IndexTantiemes
+        import appels
+
+        self.immeuble = immeuble
+        self.syndic = {k: str(immeuble.get(k) or '') for k in ('nom', 'adresse', 'cp_ville', 'ville', 'code')}
+        self.client = ClientImmeuble(client, lambda: int(immeuble['id']))
+        try:
+            cles = self.client.table('cles_repartition').select('*').execute().data
+        except Exception:
+            cles = []
+        self.config = config_cles(cles or CLES_DEFAUT)
+        copro = pd.DataFrame(lire(self.client, 'coproprietaires'))
+        if copro.empty:
+            sys.exit(f"❌ Aucun copropriétaire pour {immeuble.get('nom')}")
+        try:
+            tantiemes = pd.DataFrame(lire(self.client, 'tantiemes_lots'))
+        except Exception:
+            tantiemes = pd.DataFrame()
+        self.index = IndexTantiemes(lignes_tantiemes(tantiemes, copro if tantiemes.empty else None, self.config),
+                                    self.config)
+        self.lots = tuple(int(i) for i in copro['id'])
+        self.copro = appels.prepare_copro(copro, self.config, self.index.matrice(self.lots))
+        self.budget = pd.DataFrame(lire(self.client, 'budget'))
+
+    def matrice(self, date_ref):
+        return self.index.matrice(self.lots, date_ref)
+
+    def budget_annee(self, annee):
+        if self.budget.empty:
+            return self.budget
+        return self.budget[self.budget['annee'].astype(int) == int(annee)]
+
+    def ids_exclus(self):
+        """Dépenses affectées au fonds Alur ou transférées en travaux votés."""
+        ids = set()
+        for table in ('loi_alur', 'travaux_votes'):
+            try:
+                ids |= {l['depense_id'] for l in lire(self.client, table) if l.get('depense_id')}
+            except Exception:
+                pass
+        return ids
+
+
+# ==================== PDF (POOL DE PROCESSUS) ====================
+
+_commun = {}
+
+
+def _initialiser(commun):
+    _commun.update(commun)
+
+
+def _pdf(cop_row):
+    """(nom de fichier, PDF) d'un copropriétaire ; exécuté dans un processus du pool."""
+    import appels
+    c = _commun
+    lot = str(cop_row.get('lot', '')).zfill(4)
+    try:
+        if c['type'] == 'appel':
+            pdf = appels.generate_appel_pdf_bytes(c['syndic'], cop_row, c['periode'], c['label_trim'], c['annee'],
+                                                  c['montants'], c['alur_par_appel'], c['nb_appels'],
+                                                  c['mat'], c['config'])
+            return f"appel_{c['label_trim']}_{c['annee']}_lot{lot}.pdf", pdf, None
+        pdf = appels.generate_regularisation_pdf_bytes(c['syndic'], cop_row, c['annee'], c['budgets_appel'],
+                                                       c['dep_reel_type'], c['alur_annuel'], c['nb_appels'],
+                                                       appels.emis_du_lot(c['emis'], cop_row['id']),
+                                                       c['mat'], c['config'])
+        return f"regularisation_{c['annee']}_lot{lot}.pdf", pdf, None
+    except Exception as e:
+        return f"lot {cop_row.get('lot', '?')}", None, str(e)
+
+
+def generer_pdfs(copro_df, commun, processus):
+    """[(cop_row, nom de fichier, PDF)] pour chaque lot ; les erreurs sont affichées et sautées."""
+    lignes = copro_df.to_dict('records')
+    if processus <= 1 or len(lignes) < 2:
+        _initialiser(commun)
+        resultats = [_pdf(l) for l in lignes]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(processus, initializer=_initialiser, initargs=(commun,)) as pool:
+            resultats = list(pool.map(_pdf, lignes, chunksize=max(1, len(lignes) // (processus * 4))))
+    pdfs = []
+    for cop_row, (nom, pdf, erreur) in zip(lignes, resultats):
+        if erreur:
+            print(f"  ⚠️ Erreur {nom} : {erreur}", file=sys.stderr)
+        else:
+            pdfs.append((cop_row, nom, pdf))
+    return pdfs
+
+
+def ecrire(pdfs, dossier, nom, archive):
+    """PDFs dans `dossier/nom.zip` (archive) ou `dossier/nom/`."""
+    if archive:
+        chemin = os.path.join(dossier, f"{nom}.zip")
+        with zipfile.ZipFile(chemin, 'w', zipfile.ZIP_DEFLATED) as zf:
+            for _, fichier, pdf in pdfs:
+                zf.writestr(fichier, pdf)
+    else:
+        chemin = os.path.join(dossier, nom)
+        os.makedirs(chemin, exist_ok=True)
+        for _, fichier, pdf in pdfs:
+            with open(os.path.join(chemin, fichier), 'wb') as f:
+                f.write(pdf)
+    print(f"📦 {len(pdfs)} PDFs → {chemin}")
+
+
+# ==================== ENVOI (BREVO) ====================
+
+def config_brevo(reglage):
+    """(clé API, email et nom de l'expéditeur), comme 📬 Communications."""
+    cle, expediteur = reglage("brevo_api_key", ""), reglage("brevo_from_email", "")
+    if not cle or not expediteur:
+        sys.exit("❌ Envoi impossible : brevo_api_key et brevo_from_email (secrets.toml ou COPRO_BREVO_*)")
+    return cle, expediteur, reglage("brevo_from_name", "Syndic Copropriété")
+
+
+def envoyer(pdfs, reglage, sujet, corps):
+    """Un email par copropriétaire avec son PDF en pièce jointe ({nom} remplacé dans le corps)."""
+    import urllib.request
+    import urllib.error
+    cle, expediteur, nom_expediteur = config_brevo(reglage)
+    envoyes, erreurs = 0, []
+    for cop_row, fichier, pdf in pdfs:
+        email = str(cop_row.get('email', '') or '').strip()
+        if not email or email in ('None', 'nan'):
+            erreurs.append(f"{cop_row.get('nom')} — pas d'email")
+            continue
+        texte = corps.replace("{nom}", str(cop_row.get('nom', '')))
+        charge = json.dumps({
+            "sender":      {"name": nom_expediteur, "email": expediteur},
+            "to":          [{"email": email, "name": str(cop_row.get('nom', ''))}],
+            "subject":     sujet,
+            "textContent": texte,
+            "htmlContent": f"<html><body style='font-family:Arial,sans-serif'><p>{texte.replace(chr(10), '<br>')}</p></body></html>",
+            "attachment":  [{"name": fichier, "content": base64.b64encode(pdf).decode('ascii')}],
+        }).encode('utf-8')
+        requete = urllib.request.Request(BREVO, data=charge, method="POST", headers={
+            "accept": "application/json", "content-type": "application/json", "api-key": cle})
+        try:
+            with urllib.request.urlopen(requete) as reponse:
+                reponse.read()
+            envoyes += 1
+        except urllib.error.HTTPError as e:
+            erreurs.append(f"{cop_row.get('nom')} — HTTP {e.code}: {e.read().decode('utf-8', errors='ignore')[:200]}")
+        except Exception as e:
+            erreurs.append(f"{cop_row.get('nom')} — {e}")
+    print(f"📧 {envoyes} email(s) envoyé(s) via Brevo")
+    for e in erreurs:
+        print(f"  ❌ {e}", file=sys.stderr)
+    return not erreurs
+
+
+# ==================== COMMANDES ====================
+
+def commande_appels(args, copro, reglage):
+    """Appel provisionnel d'un trimestre : CSV et PDFs de 🔄 Répartition › Appels T1-T4."""
+    import appels
+    import monnaie
+    annee, label_trim, nb_appels = int(args.year), args.trimestre, args.nb_appels
+    bud_an = copro.budget_annee(annee)
+    if bud_an.empty:
+        sys.exit(f"❌ Aucun budget pour {annee}")
+    total_bud = float(bud_an['montant_budget'].sum())
+    # Montants proposés par la page : budget par clé, arrondi au centime
+    montants = {k: monnaie.euros(monnaie.centimes(v))
+                for k, v in appels.montants_depuis_budget(bud_an, copro.config).items()}
+    alur_par_appel = round(round(total_bud * args.alur / 100, 2) / nb_appels, 2)
+
+    date_appel = f"{annee}-{appels.MOIS_TRIMESTRE[label_trim]:02d}-01"
+    mat = copro.matrice(date_appel)
+    appels_df = appels.completer_appel(appels.calculer_appels(copro.copro, montants, mat, copro.config),
+                                       label_trim, nb_appels, alur_par_appel, mat, copro.config)
+
+    csv = os.path.join(args.sortie, f"appel_{label_trim}_{annee}.csv")
+    appels_df.to_csv(csv, index=False, sep=';', decimal=',', encoding='utf-8-sig')
+    print(f"📋 Appel {label_trim} {annee} : {appels_df[f'🎯 TOTAL {label_trim} avec Alur (€)'].sum():,.2f} € "
+          f"sur {len(appels_df)} lots → {csv}")
+
+    if not (args.pdf or args.zip or args.send):
+        return True
+    pdfs = generer_pdfs(copro.copro, {
+        'type': 'appel', 'syndic': copro.syndic, 'periode': appels.periode_trimestre(label_trim, annee),
+        'label_trim': label_trim, 'annee': annee, 'montants': montants, 'alur_par_appel': alur_par_appel,
+        'nb_appels': nb_appels, 'mat': mat, 'config': copro.config}, args.processus)
+    if args.pdf or args.zip:
+        ecrire(pdfs, args.sortie, f"appels_{label_trim}_{annee}", args.zip)
+    if args.send:
+        return envoyer(pdfs, reglage, f"Appel de fonds {label_trim} {annee} — {copro.syndic['nom']}",
+                       "Madame, Monsieur {nom},\n\nVeuillez trouver ci-joint votre appel de fonds "
+                       f"{label_trim} {annee}.\n\nCordialement,\nLe Syndic")
+    return True
+
+
+def commande_regularisation(args, copro, reglage):
+    """5ème appel d'un exercice : CSV et PDFs de 🔄 Répartition › 5ème appel."""
+    import pandas as pd
+    import appels
+    annee = int(args.year)
+    depenses = pd.DataFrame(lire(copro.client, 'depenses'))
+    if depenses.empty:
+        sys.exit("❌ Aucune dépense disponible")
+    if 'deleted' in depenses.columns:
+        depenses = depenses[depenses['deleted'] != True]
+    depenses['date'] = pd.to_datetime(depenses['date'])
+    depenses['montant_du'] = pd.to_numeric(depenses['montant_du'], errors='coerce')
+    dep_net = depenses[(depenses['date'].dt.year == annee) & ~depenses['id'].isin(copro.ids_exclus())]
+    dep_reel_type = appels.depenses_par_cle(dep_net, copro.config)
+
+    mat = copro.matrice(f"{annee}-12-31")  # tantièmes en vigueur à la clôture
+    emis_df = pd.DataFrame(lire(copro.client, 'appels_fonds', annee=annee))
+    if not emis_df.empty:
+        emis_df['montant'] = pd.to_numeric(emis_df['montant'], errors='coerce').fillna(0)
+    emis = appels.emis_par_lot(emis_df)
+    nb_appels = args.nb_appels
+    if emis:
+        # Priorité aux montants figés à l'émission
+        nb_appels = emis_df['periode'].nunique()
+        budgets_appel = {k: float(emis_df.loc[emis_df['cle'] == k, 'montant'].sum()) for k in copro.config}
+        alur_annuel = round(float(emis_df.loc[emis_df['cle'] == 'alur', 'montant'].sum()), 2)
+    else:
+        bud_reg = copro.budget_annee(annee)
+        budgets_appel = {k: round(float(bud_reg[bud_reg['classe'].isin(cfg['classes'])]['montant_budget'].sum()), 2)
+                         if not bud_reg.empty else 0.0 for k, cfg in copro.config.items()}
+        alur_annuel = round(sum(budgets_appel.values()) * args.alur / 100, 2)
+    if sum(budgets_appel.values()) == 0:
+        sys.exit(f"❌ Ni appel émis ni budget pour {annee}")
+
+    reg_df = appels.regularisation_par_lot(copro.copro, budgets_appel, dep_reel_type, alur_annuel,
+                                           emis, mat, copro.config)
+    csv = os.path.join(args.sortie, f"5eme_appel_{annee}.csv")
+    reg_df.to_csv(csv, index=False, sep=';', decimal=',', encoding='utf-8-sig')
+    print(f"📋 5ème appel {annee} : {reg_df[reg_df['5ème appel (€)'] > 0.01]['5ème appel (€)'].sum():,.2f} € à appeler, "
+          f"{reg_df[reg_df['5ème appel (€)'] < -0.01]['5ème appel (€)'].sum():,.2f} € à rembourser → {csv}")
+
+    if not (args.pdf or args.zip or args.send):
+        return True
+    pdfs = generer_pdfs(copro.copro, {
+        'type': 'regularisation', 'syndic': copro.syndic, 'annee': annee, 'budgets_appel': budgets_appel,
+        'dep_reel_type': dep_reel_type, 'alur_annuel': alur_annuel, 'nb_appels': nb_appels,
+        'emis': emis, 'mat': mat, 'config': copro.config}, args.processus)
+    if args.pdf or args.zip:
+        ecrire(pdfs, args.sortie, f"regularisation_{annee}", args.zip)
+    if args.send:
+        return envoyer(pdfs, reglage, f"Régularisation des charges {annee} — {copro.syndic['nom']}",
+                       "Madame, Monsieur {nom},\n\nVeuillez trouver ci-joint la régularisation de vos charges "
+                       f"de l'exercice {annee} (5ème appel).\n\nCordialement,\nLe Syndic")
+    return True
+
+
+COMMANDES = {'appels': commande_appels, 'regularisation': commande_regularisation}
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(prog='python -m copro', description=__doc__)
+    p.add_argument('--immeuble', help="id ou code de l'immeuble (le premier par nom par défaut)")
+    p.add_argument('--secrets', default=os.path.join('.streamlit', 'secrets.toml'),
+                   help="fichier de réglages de l'application")
+    sous = p.add_subparsers(dest='commande', required=True)
+    for nom, aide in (('appels', "appel provisionnel d'un trimestre"), ('regularisation', "5ème appel d'un exercice")):
+        c = sous.add_parser(nom, help=aide)
+        c.add_argument('--year', '--annee', type=int, required=True)
+        if nom == 'appels':
+            c.add_argument('--trimestre', choices=['T1', 'T2', 'T3', 'T4'], required=True)
+        c.add_argument('--nb-appels', type=int, choices=[4, 3, 2, 1], default=4,
+                       help="appels par an (régularisation : nombre d'appels versés, si aucun n'a été émis)")
+        c.add_argument('--alur', type=float, default=5.0, help="taux du fonds de travaux Alur (%%)")
+        c.add_argument('--pdf', action='store_true', help="un PDF par lot dans un dossier")
+        c.add_argument('--zip', action='store_true', help="les PDFs dans une archive ZIP")
+        c.add_argument('--send', action='store_true', help="envoyer à chaque lot son PDF par email (Brevo)")
+        c.add_argument('--sortie', default='.', help="dossier des CSV, PDFs et ZIP")
+        c.add_argument('--processus', type=int, default=os.cpu_count() or 1, help="processus de génération des PDFs")
+    args = p.parse_args(argv)
+
+    t0 = time.perf_counter()
+    reglage = Reglages(lire_secrets(args.secrets))
+    if args.send:
+        config_brevo(reglage)  # avant de générer les PDFs
+    client = connecter(reglage)
+    copro = Copropriete(client, choisir_immeuble(client, args.immeuble))
+    os.makedirs(args.sortie, exist_ok=True)
+    ok = COMMANDES[args.commande](args, copro, reglage)
+    print(f"⏱️  {time.perf_counter() - t0:.2f} s — {copro.syndic['nom']}")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,154 @@
+"""
+depot.py — Tables gardées en mémoire et mises à jour par les écritures locales.
+
+Un `Depot` par immeuble, partagé par toutes les sessions. Une table y est chargée
+entière une fois ; les écritures passées par le dépôt (`inserer`, `modifier`,
+`supprimer`) appliquent directement à la copie en mémoire les lignes renvoyées
+par la base : ajouter une ligne puis réafficher la liste ne relit rien.
+
+Cohérence : chaque table est associée à l'état de la sonde au chargement
+(versions_tables ou événements poussés, voir immeubles.py / evenements.py). Nos
+propres écritures font avancer cette version ; le dépôt les compte et n'accepte
+l'avance que si elle s'explique par elles. Une écriture d'un autre poste, une
+ligne renvoyée qui ne correspond pas à la copie (id absent ou déjà présent,
+aucune ligne modifiée) ou un écart du nombre de lignes invalident la table :
+elle sera relue entière à la prochaine lecture.
+
+Avec un miroir local (voir miroir.py), les écritures acceptées y sont reportées ;
+sans réseau, elles y sont mises en file et appliquées aux copies en mémoire avec
+des ids provisoires.
+
+`preparer(df, table) -> df` (voir compactage.py) est appliqué à chaque table
+chargée et à chaque copie modifiée : les sessions lisent toujours la même forme.
+"""
+
+import threading
+
+import pandas as pd
+
+from miroir import HORS_LIGNE
+
+
+class _TableEnMemoire:
+    def __init__(self, df, etat):
+        self.df = df
+        self.etat = etat
+        self.instructions = 0  # écritures locales (trigger par instruction)
+        self.lignes = 0        # lignes écrites localement (un événement poussé par ligne)
+
+    def valide(self, etat) -> bool:
+        if etat is None or self.etat is None or etat[0] == 'ttl' or self.etat[0] == 'ttl':
+            return etat == self.etat
+        epoque, n = etat
+        epoque0, n0 = self.etat
+        absorbe = self.lignes if epoque else self.instructions
+        return epoque == epoque0 and n0 <= n <= n0 + absorbe
+
+
+class Depot:
+    """Tables d'un immeuble en mémoire (DataFrames lus en base, passés par `preparer`)."""
+
+    def __init__(self, miroir=None, preparer=None):
+        self._tables = {}
+        self._verrou = threading.Lock()
+        self.miroir = miroir
+        self._preparer = preparer or (lambda df, table: df)
+
+    # ── Lecture ──────────────────────────────────────────────────
+    def lire(self, table, etat, charger) -> pd.DataFrame:
+        """Copie de la table ; `charger()` n'est appelé que si la copie en mémoire n'est plus
+        valable pour `etat` (voir immeubles.etat_tables, un seul nom de table)."""
+        t = self._tables.get(table)
+        if t is None or not t.valide(etat):
+            t = _TableEnMemoire(self._preparer(charger(), table), etat)
+            with self._verrou:
+                self._tables[table] = t
+        return t.df.copy()
+
+    def vider(self, table=None):
+        with self._verrou:
+            if table is None:
+                self._tables.clear()
+            else:
+                self._tables.pop(table, None)
+
+    def memoire(self) -> dict:
+        """{table: (lignes, octets)} des copies tenues en mémoire."""
+        with self._verrou:
+            tables = dict(self._tables)
+        return {nom: (len(t.df), int(t.df.memory_usage(deep=True).sum())) for nom, t in tables.items()}
+
+    # ── Écritures ────────────────────────────────────────────────
+    def _appliquer(self, table, nb_lignes, fonction):
+        """Applique `fonction(df) -> df` (None = incohérence) à la copie de `table`."""
+        with self._verrou:
+            t = self._tables.get(table)
+            if t is None:
+                return
+            nouveau = fonction(t.df)
+            if nouveau is None:
+                self._tables.pop(table, None)
+                return
+            t.df = self._preparer(nouveau, table)
+            t.instructions += 1
+            t.lignes += nb_lignes
+
+    def _executer(self, requete, table, operation, donnees=None, id_=None):
+        """Lignes renvoyées par `requete()` ; hors ligne, écriture mise en file du miroir."""
+        try:
+            lignes = requete().execute().data or []
+        except HORS_LIGNE:
+            if self.miroir is None:
+                raise
+            self.miroir.coupure()
+            return self.miroir.mettre_en_file(table, operation, donnees, id_)
+        if self.miroir is not None:
+            if operation == 'delete':
+                self.miroir.appliquer(table, supprimes=[l['id'] for l in lignes if 'id' in l])
+            else:
+                self.miroir.appliquer(table, lignes=[l for l in lignes if 'id' in l])
+        return lignes
+
+    def inserer(self, client, table, donnees) -> list:
+        """Insère une ligne (dict) ou plusieurs (liste) ; retourne les lignes créées."""
+        attendu = 1 if isinstance(donnees, dict) else len(donnees)
+        lignes = self._executer(lambda: client.table(table).insert(donnees), table, 'insert',
+                                [donnees] if isinstance(donnees, dict) else list(donnees))
+
+        def ajouter(df):
+            if len(lignes) != attendu or ('id' in df.columns and df['id'].isin([l.get('id') for l in lignes]).any()):
+                return None
+            return pd.concat([df, pd.DataFrame(lignes)], ignore_index=True) if not df.empty else pd.DataFrame(lignes)
+        self._appliquer(table, len(lignes), ajouter)
+        return lignes
+
+    def modifier(self, client, table, id_, valeurs) -> dict:
+        """Modifie la ligne `id_` ; retourne la ligne telle qu'enregistrée."""
+        lignes = self._executer(lambda: client.table(table).update(valeurs).eq('id', id_),
+                                table, 'update', valeurs, id_)
+
+        def remplacer(df):
+            if len(lignes) != 1 or 'id' not in df.columns:
+                return None
+            pos = (df['id'] == lignes[0]['id']).to_numpy().nonzero()[0]
+            if len(pos) != 1:
+                return None
+            i = int(pos[0])
+            return pd.concat([df.iloc[:i], pd.DataFrame(lignes), df.iloc[i + 1:]], ignore_index=True)
+        self._appliquer(table, len(lignes), remplacer)
+        return lignes[0] if lignes else {}
+
+    def supprimer(self, client, table, ids) -> int:
+        """Supprime les lignes `ids` ; retourne le nombre de lignes supprimées."""
+        ids = [int(i) for i in ids]
+        if not ids:
+            return 0
+        lignes = self._executer(lambda: client.table(table).delete().in_('id', ids), table, 'delete', id_=ids)
+
+        def retirer(df):
+            ok = df['id'].isin(ids) if 'id' in df.columns else pd.Series(False, index=df.index)
+            if len(lignes) != len(ids) or int(ok.sum()) != len(ids):
+                return None
+            return df[~ok].reset_index(drop=True)
+        self._appliquer(table, len(lignes), retirer)
+        return len(lignes)
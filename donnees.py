@@ -0,0 +1,720 @@
+"""
+donnees.py — Données de l'immeuble courant, partagées par les pages (vues/).
+
+Client restreint à l'immeuble choisi, caches cloisonnés par immeuble, lecture des
+tables, factures, recherche plein texte, et calculs d'appels de fonds (appels.py)
+sur la configuration de l'immeuble. Importé une fois par processus : un rerun ne
+redéfinit ni ne redécore aucune de ces fonctions.
+"""
+
+import streamlit as st
+import pandas as pd
+import os
+import json
+from doublons import IndexDoublons
+from repartition import CLES_DEFAUT, CLE_GENERALE, config_cles, lignes_tantiemes, IndexTantiemes
+from monnaie import euros
+from immeubles import (IMMEUBLE_DEFAUT, ClientImmeuble, Generations, cache_par_immeuble, etat_tables)
+from evenements import Diffusion, SourceLocale, SourceRealtime
+from depot import Depot
+from compactage import compacter
+from miroir import Miroir, HORS_LIGNE
+from stockage import ClientSQLite
+import instrumentation
+from instrumentation import ClientReleve, chronometre
+import appels
+
+def reglage(nom, defaut=None):
+    """Réglage lu dans secrets.toml, sinon dans la variable d'environnement COPRO_<NOM>."""
+    try:
+        if nom in st.secrets:
+            return st.secrets[nom]
+    except Exception:
+        pass  # pas de secrets.toml
+    return os.environ.get(f"COPRO_{nom.upper()}", defaut)
+
+# Stockage des données : "supabase" (défaut) ou "sqlite" (fichier local + dossier de fichiers, stockage.py)
+STOCKAGE = reglage("stockage", "supabase")
+
+@st.cache_resource
+def init_supabase():
+    if STOCKAGE == "sqlite":
+        # Hors de static/ : les factures passent par l'application (URL data:) au lieu
+        # d'être publiées par Streamlit à une adresse devinable
+        return ClientSQLite(reglage("sqlite_chemin", os.path.join("donnees", "copro.sqlite")),
+                            reglage("fichiers_dossier", os.path.join("donnees", "fichiers")))
+    try:
+        url = st.secrets["SUPABASE_URL"]
+        key = st.secrets["SUPABASE_KEY"]
+        if not url or not key or url == "https://xxxxxxxxxxxxxxxxxxxx.supabase.co":
+            return None
+        from supabase import create_client
+        return create_client(url, key)
+    except Exception:
+        return None
+
+# ==================== IMMEUBLE COURANT ====================
+# Un seul processus sert toutes les copropriétés : chaque table porte `immeuble_id`,
+# le client ne lit et n'écrit que les lignes de l'immeuble choisi dans la barre latérale.
+def immeuble_courant():
+    return int(st.session_state.get('immeuble_id') or IMMEUBLE_DEFAUT['id'])
+
+# Requêtes relevées dans le panneau de performance du rerun en cours, s'il est ouvert
+supabase = ClientImmeuble(ClientReleve(init_supabase), immeuble_courant)
+
+# Compteurs d'invalidation des caches par immeuble (partagés par toutes les sessions)
+GENERATIONS = Generations()
+
+def cache_immeuble(tables=(), **options):
+    """st.cache_data cloisonné par immeuble ; relu seulement si une des `tables` a changé (voir immeubles.py)."""
+    return cache_par_immeuble(st.cache_data, immeuble_courant, GENERATIONS, 'donnees',
+                              tables=tables, sonde=lambda: sonde_versions(),
+                              observateur=instrumentation.cache, **options)
+
+def ressource_immeuble(tables=(), **options):
+    """st.cache_resource cloisonné par immeuble : un objet partagé par immeuble."""
+    return cache_par_immeuble(st.cache_resource, immeuble_courant, GENERATIONS, 'ressources',
+                              tables=tables, sonde=lambda: sonde_versions(),
+                              observateur=instrumentation.cache, **options)
+
+def vider_cache_immeuble():
+    """Invalide les données en cache de l'immeuble courant ; les autres immeubles restent en cache."""
+    GENERATIONS.invalider(immeuble_courant(), 'donnees')
+    get_depot().vider()
+
+# ==================== IMMEUBLES ====================
+def dossier_miroir():
+    """Dossier des copies locales (secrets `miroir_dossier`, '.miroir' par défaut ; vide = sans miroir)."""
+    dossier = reglage("miroir_dossier", "" if STOCKAGE == "sqlite" else ".miroir")
+    if dossier:
+        os.makedirs(dossier, exist_ok=True)
+    return dossier
+
+@st.cache_data(ttl=300)
+def get_immeubles():
+    """Copropriétés gérées : {id: ligne de `immeubles`} (résidence d'origine si la table est absente).
+    La liste est gardée dans le dossier du miroir pour démarrer sans réseau."""
+    copie = os.path.join(dossier_miroir(), 'immeubles.json') if dossier_miroir() else None
+    try:
+        lignes = supabase.table('immeubles').select('*').order('nom').execute().data
+        if copie and lignes:
+            with open(copie, 'w', encoding='utf-8') as f:
+                json.dump(lignes, f, default=str)
+    except HORS_LIGNE:
+        try:
+            with open(copie, encoding='utf-8') as f:
+                lignes = json.load(f)
+        except (OSError, TypeError, ValueError):
+            lignes = []
+    except:
+        lignes = []
+    return {int(l['id']): l for l in lignes or [IMMEUBLE_DEFAUT]}
+
+def syndic_info():
+    """Coordonnées de l'immeuble courant (table `immeubles`) ; code = préfixe des références copropriétaires."""
+    immeuble = get_immeubles().get(immeuble_courant()) or IMMEUBLE_DEFAUT
+    return {k: str(immeuble.get(k) or '') for k in ('nom', 'adresse', 'cp_ville', 'ville', 'code')}
+
+# v20260218_111053 — Fix Alur base = total_bud
+# ==================== FONCTIONS DB ====================
+SONDE_TTL = 5  # secondes entre deux sondes de changement (partagées par toutes les sessions)
+
+@cache_immeuble(ttl=SONDE_TTL)
+def get_versions_tables():
+    """Sonde de changement : {table: version} de l'immeuble courant, tenu à jour par trigger
+    (quelques octets par table). None si `versions_tables` n'existe pas : repli sur les TTL."""
+    try:
+        res = supabase.table('versions_tables').select('table_name,version').execute()
+        return {r['table_name']: int(r['version']) for r in res.data}
+    except:
+        return None
+
+@st.cache_resource
+def get_diffusion():
+    """Changements poussés par la base (evenements.py), un abonnement pour tout le processus.
+    secrets `evenements` : 'realtime' (défaut), 'local' (source en mémoire) ou 'aucun'."""
+    diffusion = Diffusion()
+    mode = reglage("evenements", "aucun" if STOCKAGE == "sqlite" else "realtime")
+    if mode == "local":
+        diffusion.source = SourceLocale()
+    elif mode == "realtime":
+        diffusion.source = SourceRealtime(st.secrets["SUPABASE_URL"], st.secrets["SUPABASE_KEY"])
+    else:
+        return diffusion
+    diffusion.source.demarrer(diffusion)
+    return diffusion
+
+def sonde_versions():
+    """Versions des tables de l'immeuble courant : poussées si l'abonnement est actif
+    (aucune requête), sinon lues par la sonde."""
+    versions = get_diffusion().versions(immeuble_courant())
+    return versions if versions is not None else get_versions_tables()
+
+# Tables copiées localement (colonne updated_at, voir setup_supabase.sql)
+TABLES_MIROIR = ('budget', 'depenses', 'coproprietaires', 'plan_comptable', 'loi_alur',
+                 'travaux_votes', 'ag', 'contrats', 'locataires')
+
+@ressource_immeuble()
+def get_miroir():
+    """Copie locale SQLite des tables de l'immeuble courant (miroir.py), None si désactivée."""
+    dossier = dossier_miroir()
+    return Miroir(os.path.join(dossier, f"immeuble_{immeuble_courant()}.sqlite")) if dossier else None
+
+@ressource_immeuble()
+def get_depot():
+    """Tables de l'immeuble tenues en mémoire et mises à jour par nos écritures (depot.py).
+    Écrire par get_depot().inserer / modifier / supprimer évite de relire la table.
+    Les tables y sont compactées (compactage.py) : colonnes répétitives en catégories."""
+    return Depot(get_miroir(), compacter)
+
+def lire_table(table, ttl=30, ordre=None, desc=False):
+    """Table entière de l'immeuble courant, relue seulement si elle a changé ailleurs.
+    Avec le miroir, seules les lignes modifiées depuis la dernière synchronisation
+    transitent ; sans réseau, la copie locale est servie."""
+    def charger():
+        miroir = get_miroir()
+        if miroir is not None:
+            try:
+                if miroir.synchroniser(supabase, table) or miroir.connue(table):
+                    return miroir.lire(table)
+            except HORS_LIGNE:
+                raise
+            except Exception:
+                pass  # table sans updated_at : lecture directe
+        return pd.DataFrame(supabase.table(table).select('*').execute().data)
+    suivi = instrumentation.cache(f"depot:{table}")
+    if suivi is None:
+        df = get_depot().lire(table, etat_tables((table,), sonde_versions(), ttl), charger)
+    else:
+        def charger_suivi():
+            suivi.recalcule = True
+            return charger()
+        with suivi:
+            df = suivi.resultat = get_depot().lire(table, etat_tables((table,), sonde_versions(), ttl), charger_suivi)
+    if ordre and ordre in df.columns and not df.empty:
+        df = df.sort_values(ordre, ascending=not desc, kind='stable').reset_index(drop=True)
+    return df
+
+
+def get_budget():
+    try:
+        return lire_table('budget')
+    except Exception as e:
+        st.error(f"❌ Erreur budget: {e}"); return pd.DataFrame()
+
+def get_depenses(date_debut=None, date_fin=None):
+    try:
+        df = lire_table('depenses')
+        if date_debut and not df.empty: df = df[df['date'] >= date_debut.strftime('%Y-%m-%d')]
+        if date_fin and not df.empty:   df = df[df['date'] <= date_fin.strftime('%Y-%m-%d')]
+        if not df.empty and 'deleted' in df.columns:
+            df = df[df['deleted'] != True]
+        return df
+    except Exception as e:
+        st.error(f"❌ Erreur dépenses: {e}"); return pd.DataFrame()
+
+MINIATURE_LARGEUR = 240
+
+def miniature_path(storage_path):
+    """Chemin de la miniature, rangée à côté de l'original dans le bucket."""
+    return f"{storage_path}.thumb.png"
+
+def generer_miniature(file_bytes, ext, largeur=MINIATURE_LARGEUR):
+    """PNG de la 1re page (PDF, via pypdfium2) ou copie réduite (image).
+    Retourne None si le format n'est pas géré ou si le rendu échoue."""
+    import io
+    from PIL import Image
+    try:
+        if ext == 'pdf':
+            try:
+                import pypdfium2 as pdfium
+            except ImportError:
+                return None
+            pdf = pdfium.PdfDocument(file_bytes)
+            try:
+                page = pdf[0]
+                w_pt = page.get_width() or largeur
+                img = page.render(scale=largeur / w_pt).to_pil()
+            finally:
+                pdf.close()
+        else:
+            img = Image.open(io.BytesIO(file_bytes))
+            img.thumbnail((largeur, largeur * 2))
+        if img.mode not in ('RGB', 'L'):
+            img = img.convert('RGB')
+        buf = io.BytesIO()
+        img.save(buf, format='PNG', optimize=True)
+        return buf.getvalue()
+    except Exception:
+        return None
+
+def extraire_texte_facture(file_bytes, ext, max_car=50000):
+    """Texte des PDF (couche texte, pas d'OCR) pour la recherche plein texte."""
+    if ext != 'pdf':
+        return ''
+    try:
+        import pypdfium2 as pdfium
+    except ImportError:
+        return ''
+    try:
+        pdf = pdfium.PdfDocument(file_bytes)
+        try:
+            morceaux, total = [], 0
+            for page in pdf:
+                t = page.get_textpage().get_text_range()
+                morceaux.append(t); total += len(t)
+                if total >= max_car:
+                    break
+        finally:
+            pdf.close()
+        return ' '.join(' '.join(morceaux).split())[:max_car]
+    except Exception:
+        return ''
+
+def upload_miniature(storage_path, file_bytes):
+    """Génère et dépose la miniature de storage_path. Retourne True si déposée."""
+    ext = str(storage_path).rsplit('.', 1)[-1].lower()
+    png = generer_miniature(file_bytes, ext)
+    if png is None:
+        return False
+    supabase.storage.from_('factures').upload(
+        miniature_path(storage_path), png,
+        file_options={"content-type": "image/png", "upsert": "true"}
+    )
+    return True
+
+def upload_facture(dep_id, file_bytes, filename):
+    ext = filename.rsplit('.', 1)[-1].lower()
+    storage_path = f"depenses/{dep_id}/{filename}"
+    content_type = 'application/pdf' if ext == 'pdf' else f'image/{ext}'
+    supabase.storage.from_('factures').upload(
+        storage_path, file_bytes,
+        file_options={"content-type": content_type, "upsert": "true"}
+    )
+    get_depot().modifier(supabase, 'depenses', dep_id, {'facture_path': storage_path})
+    try:
+        upload_miniature(storage_path, file_bytes)
+    except Exception:
+        pass  # la miniature est facultative : la facture reste consultable
+    try:
+        texte = extraire_texte_facture(file_bytes, ext)
+        supabase.table('factures_texte').upsert({'depense_id': dep_id, 'texte': texte}).execute()
+        indexer_texte_facture(dep_id, texte)
+        get_factures_texte.clear()
+    except Exception:
+        pass  # idem pour le texte indexé
+    return storage_path
+
+@st.cache_data(ttl=3000, show_spinner=False)
+def _signed_url(storage_path):
+    r = supabase.storage.from_('factures').create_signed_url(storage_path, 3600)
+    if isinstance(r, dict):
+        url = r.get('signedURL') or r.get('signedUrl') or r.get('signed_url', '')
+    else:
+        url = getattr(r, 'signed_url', '') or getattr(r, 'signedURL', '')
+    if not url:
+        raise ValueError(f"URL signée vide pour {storage_path}")
+    return url
+
+def get_facture_url(storage_path):
+    """Retourne l'URL signée (1h) — compatible toutes versions supabase-py.
+    Mise en cache 50 min : une URL encore valide est réutilisée entre les reruns."""
+    try:
+        return _signed_url(storage_path)
+    except:
+        return ''
+
+@st.cache_data(ttl=3000, show_spinner=False)
+def get_miniatures_urls(storage_paths):
+    """URLs signées des miniatures en un seul appel : {storage_path: url}.
+    Les factures sans miniature (anciennes, format non géré) sont absentes."""
+    chemins = [p for p in storage_paths if p]
+    if not chemins:
+        return {}
+    try:
+        r = supabase.storage.from_('factures').create_signed_urls(
+            [miniature_path(p) for p in chemins], 3600)
+    except Exception:
+        return {}
+    urls = {}
+    for p, item in zip(chemins, r):
+        url = item.get('signedURL') or item.get('signedUrl') if isinstance(item, dict) else None
+        if url and not item.get('error'):
+            urls[p] = url
+    return urls
+
+def get_facture_bytes(storage_path):
+    """Télécharge les bytes du fichier depuis Supabase Storage."""
+    try:
+        data = supabase.storage.from_('factures').download(storage_path)
+        return bytes(data)
+    except:
+        return None
+
+def delete_facture(dep_id, storage_path):
+    supabase.storage.from_('factures').remove([storage_path, miniature_path(storage_path)])
+    get_depot().modifier(supabase, 'depenses', dep_id, {'facture_path': None})
+    try:
+        supabase.table('factures_texte').delete().eq('depense_id', dep_id).execute()
+        indexer_texte_facture(dep_id, '')
+        get_factures_texte.clear()
+    except Exception:
+        pass
+
+@cache_immeuble(tables=('depenses',), ttl=30)
+def get_index_doublons():
+    """Index des clés de dépenses (doublons exacts et proches), voir doublons.py."""
+    return IndexDoublons.depuis_df(get_depenses())
+
+@cache_immeuble(tables=('releve_bancaire',), ttl=30)
+def get_releve_bancaire():
+    try:
+        return compacter(pd.DataFrame(supabase.table('releve_bancaire').select('*').order('date').execute().data))
+    except Exception as e:
+        st.error(f"❌ Erreur relevé bancaire: {e}"); return pd.DataFrame()
+
+@cache_immeuble(tables=('appels_fonds',), ttl=30)
+def get_appels_fonds(annee=None, coproprietaire_id=None):
+    """Appels émis, une ligne par (lot, appel, clé) : annee, periode, coproprietaire_id,
+    lot, cle (clé de get_config_cles() ou 'alur'), montant. Lignes figées à l'émission."""
+    try:
+        q = supabase.table('appels_fonds').select('*')
+        if annee is not None:
+            q = q.eq('annee', int(annee))
+        if coproprietaire_id is not None:
+            q = q.eq('coproprietaire_id', int(coproprietaire_id))
+        df = pd.DataFrame(q.execute().data)
+        if not df.empty:
+            df['montant'] = pd.to_numeric(df['montant'], errors='coerce').fillna(0)
+        return compacter(df, 'appels_fonds')
+    except Exception as e:
+        st.error(f"❌ Erreur appels émis: {e}"); return pd.DataFrame()
+
+@cache_immeuble(tables=('compte_copro_soldes',), ttl=30)
+def get_soldes_copro():
+    """Solde courant de chaque lot : {coproprietaire_id: solde} (> 0 = dû)."""
+    try:
+        res = supabase.table('compte_copro_soldes').select('coproprietaire_id,solde').execute()
+        return {int(r['coproprietaire_id']): float(r['solde'] or 0) for r in res.data}
+    except:
+        return {}
+
+@cache_immeuble(tables=('compte_copro_ecritures',), ttl=30)
+def get_ecritures_copro(coproprietaire_ids=None, debits_seuls=False):
+    """Écritures des comptes copropriétaires (d'un ensemble de lots si précisé)."""
+    try:
+        q = supabase.table('compte_copro_ecritures').select('*')
+        if coproprietaire_ids is not None:
+            q = q.in_('coproprietaire_id', list(coproprietaire_ids))
+        if debits_seuls:
+            q = q.gt('debit', 0)
+        df = pd.DataFrame(q.order('id').execute().data)
+        if not df.empty:
+            df['date'] = pd.to_datetime(df['date'])
+            for c in ('debit', 'credit', 'solde'):
+                df[c] = pd.to_numeric(df[c], errors='coerce').fillna(0)
+        return compacter(df)
+    except Exception as e:
+        st.error(f"❌ Erreur comptes copropriétaires: {e}"); return pd.DataFrame()
+
+def passer_ecritures(ecritures):
+    """Enregistre des écritures (dicts : coproprietaire_id, date, nature, libelle,
+    debit, credit, reference) et met à jour les soldes courants des lots concernés,
+    dans une même transaction (fonction SQL `passer_ecritures_copro`).
+    Les références déjà passées sont ignorées. Retourne le nombre d'écritures passées."""
+    if not ecritures:
+        return 0
+    lignes = [{'coproprietaire_id': int(e['coproprietaire_id']), 'date': str(e['date']),
+               'nature': e['nature'], 'libelle': e.get('libelle'),
+               'debit': round(float(e.get('debit') or 0), 2), 'credit': round(float(e.get('credit') or 0), 2),
+               'reference': e['reference']} for e in ecritures]
+    n = supabase.rpc('passer_ecritures_copro',
+                     {'p_immeuble_id': immeuble_courant(), 'p_ecritures': lignes}).execute().data
+    get_soldes_copro.clear(); get_ecritures_copro.clear()
+    return int(n or 0)
+
+def get_coproprietaires():
+    try:
+        return lire_table('coproprietaires')
+    except Exception as e:
+        st.error(f"❌ Erreur copropriétaires: {e}"); return pd.DataFrame()
+
+@cache_immeuble(tables=('cles_repartition',), ttl=30)
+def get_cles_repartition():
+    """Lignes de `cles_repartition` (clés par défaut de la résidence si la table est vide)."""
+    try:
+        lignes = supabase.table('cles_repartition').select('*').execute().data
+        return lignes or CLES_DEFAUT
+    except:
+        return CLES_DEFAUT
+
+@cache_immeuble(tables=('tantiemes_lots', 'coproprietaires', 'cles_repartition'), ttl=30)
+def get_tantiemes_lots():
+    """Historique des tantièmes creux : id, coproprietaire_id, cle, tantiemes, date_debut,
+    date_fin (lignes non nulles uniquement ; dates vides = sans limite).
+    Tant que `tantiemes_lots` est vide, ils sont lus dans les colonnes de `coproprietaires`."""
+    try:
+        df = pd.DataFrame(supabase.table('tantiemes_lots').select('*').execute().data)
+    except:
+        df = pd.DataFrame()
+    return lignes_tantiemes(df, get_coproprietaires() if df.empty else None, config_cles(get_cles_repartition()))
+
+@ressource_immeuble(tables=('tantiemes_lots', 'coproprietaires', 'cles_repartition'), ttl=30)
+def get_index_tantiemes():
+    """Index d'intervalles sur tout l'historique des tantièmes (chargé une fois, partagé)."""
+    return IndexTantiemes(get_tantiemes_lots(), config_cles(get_cles_repartition()))
+
+def get_matrice_tantiemes(lots, date_ref=None):
+    """Matrice creuse lots × clés valable à `date_ref` (aujourd'hui par défaut) pour les
+    copropriétaires `lots` (tuple d'ids, dans cet ordre)."""
+    return get_index_tantiemes().matrice(lots, date_ref)
+
+def matrice_courante():
+    """Matrice des tantièmes en vigueur pour tous les copropriétaires."""
+    return get_matrice_tantiemes(tuple(int(i) for i in get_coproprietaires()['id']))
+
+def tantiemes_du_lot(cop_row, mat=None):
+    """{cle: (tantièmes, base)} d'un copropriétaire (dict ou ligne de copro_df), voir appels.py."""
+    if mat is None:
+        mat = matrice_courante()
+    return appels.tantiemes_du_lot(cop_row, mat, config_cles(get_cles_repartition()))
+
+def get_plan_comptable():
+    try:
+        return lire_table('plan_comptable')
+    except Exception as e:
+        st.error(f"❌ Erreur plan comptable: {e}"); return pd.DataFrame()
+
+def get_travaux_votes():
+    try:
+        return lire_table('travaux_votes', ordre='date')
+    except Exception as e:
+        st.error(f"❌ Erreur travaux_votes: {e}"); return pd.DataFrame()
+
+@cache_immeuble(tables=('travaux_votes',), ttl=30)
+def get_travaux_votes_depense_ids():
+    """Retourne les IDs des dépenses transférées en travaux votés."""
+    try:
+        res = supabase.table('travaux_votes').select('depense_id').not_.is_('depense_id', 'null').execute()
+        return [r['depense_id'] for r in res.data if r.get('depense_id')]
+    except:
+        return []
+
+def get_loi_alur():
+    try:
+        return lire_table('loi_alur', ordre='date')
+    except Exception as e:
+        st.error(f"❌ Erreur loi_alur: {e}"); return pd.DataFrame()
+
+@cache_immeuble(tables=('loi_alur',), ttl=30)
+def get_depenses_alur_ids():
+    """Retourne les IDs des dépenses déjà affectées au fonds Alur."""
+    try:
+        res = supabase.table('loi_alur').select('depense_id').not_.is_('depense_id', 'null').execute()
+        return [r['depense_id'] for r in res.data if r.get('depense_id')]
+    except:
+        return []
+
+# ==================== RECHERCHE PLEIN TEXTE ====================
+# Index SQLite FTS5 en mémoire, partagé par toutes les sessions du serveur.
+# Une ligne par dépense (rowid = depenses.id) ; reconstruit quand l'ensemble des
+# ids ne correspond plus ou qu'une des TABLES_INDEX a changé (y compris ailleurs),
+# mis à jour ligne à ligne à l'ajout, la modification, la suppression et l'upload
+# de facture.
+TABLES_INDEX = ('depenses', 'budget', 'plan_comptable', 'factures_texte')
+
+@ressource_immeuble()
+def get_index_recherche():
+    import sqlite3, threading
+    conn = sqlite3.connect(':memory:', check_same_thread=False)
+    conn.execute("""CREATE VIRTUAL TABLE depenses_fts USING fts5(
+        fournisseur, libelle_compte, commentaire, compte, date, facture,
+        tokenize = 'unicode61 remove_diacritics 2')""")
+    return {'conn': conn, 'lock': threading.Lock(), 'ids': set(), 'etat': None}
+
+@cache_immeuble(tables=('factures_texte',), ttl=300)
+def get_factures_texte():
+    """Texte extrait des factures PDF : {depense_id: texte}."""
+    try:
+        res = supabase.table('factures_texte').select('depense_id,texte').execute()
+        return {int(r['depense_id']): r.get('texte') or '' for r in res.data}
+    except:
+        return {}
+
+def _champs_fts(row):
+    d = row.get('date')
+    d = d.strftime('%Y-%m-%d') if hasattr(d, 'strftime') else str(d or '')
+    def txt(v):
+        return '' if v is None or str(v) in ('None', 'nan') else str(v)
+    return (txt(row.get('fournisseur')), txt(row.get('libelle_compte')),
+            txt(row.get('commentaire')), txt(row.get('compte')), d)
+
+def libelles_comptes():
+    """{compte: libellé} : premier poste du budget, à défaut le plan comptable."""
+    libelles = {}
+    for df in (get_plan_comptable(), get_budget()):
+        if not df.empty and {'compte', 'libelle_compte'} <= set(df.columns):
+            d = df.drop_duplicates(subset=['compte'], keep='first')
+            libelles.update(zip(d['compte'].astype(str), d['libelle_compte']))
+    return libelles
+
+def synchroniser_index(depenses_df):
+    """Reconstruit l'index si les ids indexés diffèrent de ceux de depenses_df (toutes
+    années) ou si une table indexée a changé depuis (versions_tables, voir etat_tables)."""
+    idx = get_index_recherche()
+    ids = set(depenses_df['id'].astype(int)) if not depenses_df.empty else set()
+    etat = etat_tables(TABLES_INDEX, sonde_versions(), 300)
+    if ids == idx['ids'] and etat == idx['etat']:
+        return
+    textes, libelles = get_factures_texte(), libelles_comptes()
+    lignes = [(int(r['id']),) + _champs_fts({**r, 'libelle_compte': libelles.get(str(r.get('compte')), r.get('libelle_compte'))})
+              + (textes.get(int(r['id']), ''),) for r in depenses_df.to_dict('records')]
+    with idx['lock']:
+        idx['conn'].execute("DELETE FROM depenses_fts")
+        idx['conn'].executemany("INSERT INTO depenses_fts(rowid, fournisseur, libelle_compte, "
+                                "commentaire, compte, date, facture) VALUES (?,?,?,?,?,?,?)", lignes)
+        idx['conn'].commit()
+        idx['ids'], idx['etat'] = ids, etat
+
+def indexer_depense(dep_id, row):
+    """Ajoute ou remplace une dépense dans l'index (le texte de facture est conservé) ;
+    le libellé suit le compte de la ligne (libelles_comptes)."""
+    row = {**row, 'libelle_compte': libelles_comptes().get(str(row.get('compte')), row.get('libelle_compte'))}
+    idx = get_index_recherche()
+    with idx['lock']:
+        c = idx['conn']
+        r = c.execute("SELECT facture FROM depenses_fts WHERE rowid=?", (int(dep_id),)).fetchone()
+        c.execute("DELETE FROM depenses_fts WHERE rowid=?", (int(dep_id),))
+        c.execute("INSERT INTO depenses_fts(rowid, fournisseur, libelle_compte, commentaire, "
+                  "compte, date, facture) VALUES (?,?,?,?,?,?,?)",
+                  (int(dep_id),) + _champs_fts(row) + (r[0] if r else '',))
+        c.commit()
+        idx['ids'].add(int(dep_id))
+
+def desindexer_depense(dep_id):
+    idx = get_index_recherche()
+    with idx['lock']:
+        idx['conn'].execute("DELETE FROM depenses_fts WHERE rowid=?", (int(dep_id),))
+        idx['conn'].commit()
+        idx['ids'].discard(int(dep_id))
+
+def indexer_texte_facture(dep_id, texte):
+    idx = get_index_recherche()
+    with idx['lock']:
+        idx['conn'].execute("UPDATE depenses_fts SET facture=? WHERE rowid=?", (texte or '', int(dep_id)))
+        idx['conn'].commit()
+
+def rechercher_depenses(requete, limite=None):
+    """Ids des dépenses correspondant à tous les mots de la requête (préfixes),
+    triés par pertinence. Ex. : "ascenseur 2023 OTIS"."""
+    import re
+    mots = re.findall(r'\w+', str(requete or ''))
+    if not mots:
+        return []
+    fts = ' '.join('"' + m + '"*' for m in mots)
+    sql = "SELECT rowid FROM depenses_fts WHERE depenses_fts MATCH ? ORDER BY bm25(depenses_fts)"
+    if limite:
+        sql += f" LIMIT {int(limite)}"
+    idx = get_index_recherche()
+    with idx['lock']:
+        return [r[0] for r in idx['conn'].execute(sql, (fts,)).fetchall()]
+
+# ==================== CONFIGURATION CLÉS DE RÉPARTITION ====================
+# Les clés (code, total, classes comptables, libellés) sont des données : table
+# `cles_repartition`, éditable dans 👥 Copropriétaires › 🔑 Tantièmes. Par défaut :
+# Classe 1A, 1B, 7 → Charges générales → /10 000 ; 2 → RDC/ss-sols → /928 ;
+# 3 → Sous-sols → /20 ; 4 → Garages → /28 ; 5 → Ascenseurs → /1 000 ; 6 → Monte-voitures → /20
+@cache_immeuble(tables=('cles_repartition',), ttl=30)
+def get_config_cles():
+    """Configuration des clés de l'immeuble courant (voir repartition.config_cles)."""
+    return config_cles(get_cles_repartition())
+
+
+@chronometre('pdf')
+def generate_appel_pdf_bytes(syndic, cop_row, periode, label_trim, annee,
+                              montants, alur_par_appel, nb_appels, mat=None):
+    """Génère le PDF d'appel de fonds pour un copropriétaire. Retourne bytes."""
+    if mat is None:
+        mat = matrice_courante()
+    return appels.generate_appel_pdf_bytes(syndic, cop_row, periode, label_trim, annee, montants,
+                                           alur_par_appel, nb_appels, mat, get_config_cles())
+
+@chronometre('pdf')
+def generate_regularisation_pdf_bytes(syndic, cop_row, annee,
+                                       budgets_appel, dep_reel_type,
+                                       alur_annuel_reg, nb_appels_reg, appels_emis=None, mat=None):
+    """Génère le PDF du 5ème appel de régularisation pour un copropriétaire (voir appels.py).
+    mat : tantièmes de l'exercice (get_matrice_tantiemes à la date de clôture)."""
+    if mat is None:
+        mat = matrice_courante()
+    return appels.generate_regularisation_pdf_bytes(syndic, cop_row, annee, budgets_appel, dep_reel_type,
+                                                    alur_annuel_reg, nb_appels_reg, appels_emis, mat,
+                                                    get_config_cles())
+
+@chronometre('pdf')
+def generate_relance_pdf_bytes(syndic, cop_row, solde, tranches, impayes):
+    """Lettre de relance pour un lot débiteur (voir appels.py). Retourne bytes."""
+    return appels.generate_relance_pdf_bytes(syndic, cop_row, solde, tranches, impayes)
+
+def colonne_tantiemes(cle):
+    """Colonne de copro_df portant les tantièmes d'une clé (colonne historique si elle existe)."""
+    return appels.colonne_tantiemes(cle, get_config_cles())
+
+def prepare_copro(copro_df):
+    """Colonnes tantièmes numériques, alignées sur les tantièmes creux en vigueur (voir appels.py)."""
+    mat = None
+    if not copro_df.empty and 'id' in copro_df.columns:
+        mat = get_matrice_tantiemes(tuple(int(i) for i in copro_df['id']))
+    return appels.prepare_copro(copro_df, get_config_cles(), mat)
+
+def calculer_appels(copro_df, montants_par_type, date_ref=None):
+    """Part de chaque copropriétaire par type de charge, sur les tantièmes valables à date_ref
+    (aujourd'hui par défaut)."""
+    mat = get_matrice_tantiemes(tuple(int(i) for i in copro_df['id']), date_ref)
+    return appels.calculer_appels(copro_df, montants_par_type, mat, get_config_cles())
+
+def lignes_appels_fonds(copro_df, appels_df, annee, periode, nb_appels):
+    """Lignes à figer pour un appel émis (voir appels.lignes_appels_fonds)."""
+    return appels.lignes_appels_fonds(copro_df, appels_df, annee, periode, nb_appels, get_config_cles())
+
+def montants_depuis_budget(bud_an):
+    """Montants annuels par type de charge d'après les classes du budget d'une année."""
+    return appels.montants_depuis_budget(bud_an, get_config_cles())
+
+def appels_attendus(copro_df, budget_df, annees, nb_appels=4, alur_taux=5.0, appels_emis=None):
+    """Appels provisionnels dus par copropriétaire (charges + Alur), un par appel.
+    Les appels déjà émis (appels_emis, voir get_appels_fonds) sont repris tels quels ;
+    les autres années sont estimées depuis le budget.
+    Colonnes : id ('cop_id:annee-Tn'), coproprietaire_id, appel, date, montant, tiers."""
+    lignes = []
+    copro_df = prepare_copro(copro_df.copy())
+    noms = dict(zip(copro_df['id'].astype(int), copro_df['nom']))
+    if appels_emis is not None and not appels_emis.empty:
+        emis = appels_emis[appels_emis['annee'].isin([int(a) for a in annees])]
+        emis = emis.groupby(['annee', 'periode', 'coproprietaire_id'], as_index=False, observed=True)['montant'].sum()
+        for r in emis.to_dict('records'):
+            n = int(r['periode'][1:])
+            lignes.append({'id': f"{int(r['coproprietaire_id'])}:{int(r['annee'])}-{r['periode']}",
+                           'coproprietaire_id': int(r['coproprietaire_id']),
+                           'appel': f"{int(r['annee'])}-{r['periode']}",
+                           'date': pd.Timestamp(year=int(r['annee']), month=1 + (n - 1) * 3, day=1),
+                           'montant': round(float(r['montant']), 2),
+                           'tiers': str(noms.get(int(r['coproprietaire_id']), '') or '')})
+        annees = [a for a in annees if int(a) not in set(emis['annee'].astype(int))]
+    for annee in annees:
+        bud_an = budget_df[budget_df['annee'] == annee] if not budget_df.empty else pd.DataFrame()
+        if bud_an.empty:
+            continue
+        alur_par_appel = round(round(float(bud_an['montant_budget'].sum()) * alur_taux / 100, 2) / nb_appels, 2)
+        date_ref = f"{int(annee)}-01-01"
+        parts = calculer_appels(copro_df, montants_depuis_budget(bud_an), date_ref)
+        alur = get_matrice_tantiemes(tuple(int(i) for i in copro_df['id']), date_ref).repartir_cle_centimes(
+            CLE_GENERALE, alur_par_appel)
+        for n in range(nb_appels):
+            date_appel = pd.Timestamp(year=int(annee), month=1 + n * 12 // nb_appels, day=1)
+            du = euros(appels.parts_appel(parts, f"T{n + 1}", nb_appels, get_config_cles()).sum(axis=1) + alur)
+            for cop_id, nom, montant in zip(copro_df['id'], copro_df['nom'], du):
+                lignes.append({'id': f"{int(cop_id)}:{int(annee)}-T{n + 1}", 'coproprietaire_id': int(cop_id),
+                               'appel': f"{int(annee)}-T{n + 1}", 'date': date_appel,
+                               'montant': float(montant), 'tiers': str(nom or '')})
+    return pd.DataFrame(lignes, columns=['id', 'coproprietaire_id', 'appel', 'date', 'montant', 'tiers'])
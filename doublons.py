@@ -0,0 +1,193 @@
+"""
+doublons.py — Détection des dépenses saisies deux fois.
+
+Utilisé par vues/depenses.py (onglet « ➕ Ajouter », rapport des doublons) et par
+import_data.py (import Excel).
+
+Deux niveaux :
+  - doublon exact  : même clé normalisée (date, montant en centimes,
+                     fournisseur normalisé, compte) ;
+  - doublon proche : même montant, dates à moins de `fenetre_jours` jours et
+                     fournisseurs ressemblants (similarité ≥ `seuil`).
+"""
+
+import re
+import bisect
+import unicodedata
+from difflib import SequenceMatcher
+
+import pandas as pd
+
+FENETRE_JOURS = 7      # écart de dates toléré pour un doublon proche
+SEUIL_SIMILARITE = 0.8 # ressemblance minimale des fournisseurs normalisés
+
+_FORMES_JURIDIQUES = re.compile(r'\b(sarl|sas|sasu|sa|eurl|sci|snc|ste|societe|ets|cie)\b')
+
+
+def normaliser_fournisseur(nom) -> str:
+    """« Ascenseurs OTIS S.A.S. » → « ascenseurs otis »."""
+    if nom is None or (isinstance(nom, float) and pd.isna(nom)):
+        return ''
+    s = unicodedata.normalize('NFKD', str(nom)).encode('ascii', 'ignore').decode().lower()
+    s = re.sub(r'[^a-z0-9]+', ' ', s.replace('.', ''))
+    s = _FORMES_JURIDIQUES.sub(' ', s)
+    return ' '.join(s.split())
+
+
+def _centimes(montant) -> int:
+    return int(round(float(montant or 0) * 100))
+
+
+def _date_iso(d) -> str:
+    return pd.Timestamp(d).strftime('%Y-%m-%d')
+
+
+def cle_doublon(date, montant, fournisseur, compte) -> tuple:
+    return (_date_iso(date), _centimes(montant), normaliser_fournisseur(fournisseur),
+            str(compte or '').strip())
+
+
+def similarite(a: str, b: str) -> float:
+    if not a or not b:
+        return 0.0
+    if a == b:
+        return 1.0
+    ta, tb = set(a.split()), set(b.split())
+    if ta <= tb or tb <= ta:
+        return 0.9  # « otis » / « ascenseurs otis »
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def _normaliser_df(df: pd.DataFrame) -> pd.DataFrame:
+    """Colonnes de travail : _date, _cts, _four, _cpt (vectorisé)."""
+    out = pd.DataFrame(index=df.index)
+    out['_date'] = pd.to_datetime(df['date'], errors='coerce').dt.normalize()
+    out['_cts'] = (pd.to_numeric(df['montant_du'], errors='coerce').fillna(0) * 100).round().astype('int64')
+    uniques = df['fournisseur'].drop_duplicates()
+    norm = dict(zip(uniques, (normaliser_fournisseur(f) for f in uniques)))
+    out['_four'] = df['fournisseur'].map(norm).fillna('')
+    out['_cpt'] = df['compte'].astype(str).str.strip() if 'compte' in df.columns else ''
+    return out
+
+
+class IndexDoublons:
+    """Index en mémoire des dépenses existantes.
+
+    - clés exactes dans un dict (O(1)) ;
+    - liste triée de (centimes, jour ordinal, id, fournisseur) parcourue par
+      bisection (O(log n) + candidats de même montant) pour les doublons proches.
+    """
+
+    def __init__(self, fenetre_jours=FENETRE_JOURS, seuil=SEUIL_SIMILARITE):
+        self.fenetre_jours = fenetre_jours
+        self.seuil = seuil
+        self._exactes = {}
+        self._tri = []
+
+    @classmethod
+    def depuis_df(cls, depenses_df: pd.DataFrame, **kwargs) -> "IndexDoublons":
+        idx = cls(**kwargs)
+        if depenses_df is None or depenses_df.empty:
+            return idx
+        n = _normaliser_df(depenses_df)
+        ok = n['_date'].notna()
+        ids = depenses_df.loc[ok, 'id'].astype(int).tolist()
+        dates = n.loc[ok, '_date'].dt.strftime('%Y-%m-%d').tolist()
+        ords = [d.toordinal() for d in n.loc[ok, '_date']]
+        for i, d, o, c, f, cp in zip(ids, dates, ords, n.loc[ok, '_cts'], n.loc[ok, '_four'], n.loc[ok, '_cpt']):
+            idx._exactes.setdefault((d, int(c), f, cp), []).append(i)
+            idx._tri.append((int(c), int(o), i, f))
+        idx._tri.sort()
+        return idx
+
+    def ajouter(self, dep_id, date, montant, fournisseur, compte):
+        cle = cle_doublon(date, montant, fournisseur, compte)
+        self._exactes.setdefault(cle, []).append(int(dep_id))
+        bisect.insort(self._tri, (cle[1], pd.Timestamp(date).toordinal(), int(dep_id), cle[2]))
+
+    def verifier(self, date, montant, fournisseur, compte) -> dict:
+        """{'exacts': [ids], 'proches': [(id, similarité)]} pour une nouvelle saisie."""
+        cle = cle_doublon(date, montant, fournisseur, compte)
+        exacts = list(self._exactes.get(cle, []))
+        jour = pd.Timestamp(date).toordinal()
+        lo = bisect.bisect_left(self._tri, (cle[1], jour - self.fenetre_jours))
+        proches = []
+        for cts, o, i, f in self._tri[lo:]:
+            if cts != cle[1] or o > jour + self.fenetre_jours:
+                break
+            if i in exacts:
+                continue
+            sim = similarite(cle[2], f)
+            if sim >= self.seuil:
+                proches.append((i, round(sim, 2)))
+        return {'exacts': exacts, 'proches': proches}
+
+
+def _paires_proches(a: pd.DataFrame, b: pd.DataFrame, fenetre_jours, seuil, meme_table=False) -> pd.DataFrame:
+    """Jointure vectorisée sur le montant, puis filtre fenêtre de dates et similarité."""
+    m = a.merge(b, on='_cts', suffixes=('_a', '_b'))
+    if meme_table:
+        m = m[m['id_a'] < m['id_b']]
+    m = m[(m['_date_a'] - m['_date_b']).abs() <= pd.Timedelta(days=fenetre_jours)]
+    if m.empty:
+        return m.assign(similarite=pd.Series(dtype=float), exact=pd.Series(dtype=bool))
+    paires = m[['_four_a', '_four_b']].drop_duplicates()
+    sims = {(x, y): similarite(x, y) for x, y in zip(paires['_four_a'], paires['_four_b'])}
+    m = m.assign(similarite=[sims[(x, y)] for x, y in zip(m['_four_a'], m['_four_b'])])
+    m = m[m['similarite'] >= seuil]
+    return m.assign(exact=(m['_date_a'] == m['_date_b']) & (m['_four_a'] == m['_four_b'])
+                    & (m['_cpt_a'] == m['_cpt_b']))
+
+
+def detecter_doublons_lot(nouveaux_df: pd.DataFrame, existants_df: pd.DataFrame,
+                          fenetre_jours=FENETRE_JOURS, seuil=SEUIL_SIMILARITE) -> pd.DataFrame:
+    """Contrôle vectorisé d'un lot à importer.
+
+    Retourne une ligne par dépense du lot qui pose problème, avec les colonnes
+    `ligne` (index dans nouveaux_df), `statut` ('exact', 'proche' ou 'dans le lot')
+    et `depense_id` (dépense existante en cause, ou None). Une dépense n'est classée
+    qu'une fois : doublon exact d'une dépense existante d'abord, puis répétition dans
+    le lot, puis proche d'une dépense existante.
+    """
+    colonnes = ['ligne', 'statut', 'depense_id']
+    if nouveaux_df is None or nouveaux_df.empty:
+        return pd.DataFrame([], columns=colonnes)
+    n_new = _normaliser_df(nouveaux_df).assign(id=nouveaux_df.index)
+    exacts, proches = {}, {}
+    if existants_df is not None and not existants_df.empty:
+        n_old = _normaliser_df(existants_df).assign(id=existants_df['id'].astype(int).values)
+        m = _paires_proches(n_new, n_old, fenetre_jours, seuil)
+        for r in m.sort_values('exact', ascending=False, kind='stable').drop_duplicates('id_a').itertuples():
+            (exacts if r.exact else proches)[r.id_a] = int(r.id_b)
+    # Doublons internes au fichier
+    cle = ['_date', '_cts', '_four', '_cpt']
+    interne = set(n_new.loc[n_new.duplicated(subset=cle, keep='first'), 'id']) - set(exacts)
+    lignes = [{'ligne': i, 'statut': 'exact', 'depense_id': d} for i, d in exacts.items()]
+    lignes += [{'ligne': i, 'statut': 'dans le lot', 'depense_id': None} for i in interne]
+    lignes += [{'ligne': i, 'statut': 'proche', 'depense_id': d} for i, d in proches.items() if i not in interne]
+    return (pd.DataFrame(lignes, columns=colonnes).astype({'depense_id': 'Int64'})
+            .sort_values('ligne', kind='stable').reset_index(drop=True))
+
+
+def rapport_doublons(depenses_df: pd.DataFrame, fenetre_jours=FENETRE_JOURS,
+                     seuil=SEUIL_SIMILARITE) -> pd.DataFrame:
+    """Toutes les paires de doublons (exacts et proches) de l'historique."""
+    cols = ['id_a', 'id_b', 'date_a', 'date_b', 'fournisseur_a', 'fournisseur_b',
+            'compte_a', 'compte_b', 'montant', 'similarite', 'exact']
+    if depenses_df is None or depenses_df.empty:
+        return pd.DataFrame(columns=cols)
+    n = _normaliser_df(depenses_df).assign(id=depenses_df['id'].astype(int).values)
+    m = _paires_proches(n, n, fenetre_jours, seuil, meme_table=True)
+    if m.empty:
+        return pd.DataFrame(columns=cols)
+    src = depenses_df.set_index(depenses_df['id'].astype(int))
+    return pd.DataFrame({
+        'id_a': m['id_a'].values, 'id_b': m['id_b'].values,
+        'date_a': m['_date_a'].dt.strftime('%d/%m/%Y').values,
+        'date_b': m['_date_b'].dt.strftime('%d/%m/%Y').values,
+        'fournisseur_a': src.loc[m['id_a'], 'fournisseur'].values,
+        'fournisseur_b': src.loc[m['id_b'], 'fournisseur'].values,
+        'compte_a': m['_cpt_a'].values, 'compte_b': m['_cpt_b'].values,
+        'montant': m['_cts'].values / 100, 'similarite': m['similarite'].round(2).values,
+        'exact': m['exact'].values,
+    }).sort_values(['exact', 'similarite'], ascending=False).reset_index(drop=True)
@@ -0,0 +1,154 @@
+"""
+evenements.py — Invalidation des caches poussée par la base.
+
+La base publie chaque insertion, modification ou suppression (Supabase Realtime,
+« postgres_changes »). `Diffusion` compte ces événements par immeuble et par
+table ; ces compteurs remplacent alors la sonde `versions_tables` dans les clés
+de cache (voir immeubles.py) : un chargeur n'est relu que si une de ses tables a
+reçu un événement, sans aucune requête entre deux changements.
+
+Sources :
+  - `SourceRealtime` : abonnement Supabase Realtime dans un fil d'exécution dédié ;
+  - `SourceLocale`   : source en mémoire (tests, développement) ; `emettre()`
+                       simule un changement en base.
+
+Tant que l'abonnement n'est pas actif (connexion en cours, coupure), `versions()`
+rend None et l'application retombe sur la sonde.
+"""
+
+import asyncio
+import logging
+import threading
+
+_LOGGER = logging.getLogger(__name__)
+
+COLONNE_IMMEUBLE = 'immeuble_id'
+
+
+class Diffusion:
+    """Compteurs d'événements par (immeuble, table), partagés par toutes les sessions.
+
+    Une suppression sans `immeuble_id` dans l'ancienne ligne (REPLICA IDENTITY par
+    défaut) compte pour tous les immeubles. Chaque (ré)abonnement ouvre une nouvelle
+    époque : les événements manqués pendant une coupure invalident tout.
+    """
+
+    def __init__(self):
+        self._compteurs = {}
+        self._epoque = 0
+        self._actif = False
+        self._abonnes = []
+        self._verrou = threading.Lock()
+        self.source = None
+
+    # ── État de l'abonnement ─────────────────────────────────────
+    def connecte(self, actif: bool):
+        with self._verrou:
+            if actif and not self._actif:
+                self._epoque += 1
+            self._actif = actif
+
+    @property
+    def actif(self) -> bool:
+        return self._actif
+
+    # ── Événements ───────────────────────────────────────────────
+    def abonner(self, rappel):
+        """rappel(evenement) appelé pour chaque événement (après mise à jour des compteurs)."""
+        self._abonnes.append(rappel)
+
+    def desabonner(self, rappel):
+        """Retire un abonné : il ne reçoit plus les événements suivants."""
+        try:
+            self._abonnes.remove(rappel)
+        except ValueError:
+            pass
+
+    def publier(self, evenement: dict):
+        """evenement : table, type ('INSERT' / 'UPDATE' / 'DELETE'), record, old_record."""
+        table = evenement.get('table')
+        if not table:
+            return
+        ligne = evenement.get('record') or evenement.get('old_record') or {}
+        immeuble = ligne.get(COLONNE_IMMEUBLE)
+        cle = (int(immeuble) if immeuble is not None else None, table)
+        with self._verrou:
+            self._compteurs[cle] = self._compteurs.get(cle, 0) + 1
+        for rappel in list(self._abonnes):
+            try:
+                rappel(evenement)
+            except Exception as e:
+                _LOGGER.warning("Abonné aux événements en erreur : %s", e)
+
+    def versions(self, immeuble_id):
+        """{table: nombre d'événements, '*': époque} pour un immeuble, None si l'abonnement est inactif."""
+        if not self._actif:
+            return None
+        with self._verrou:
+            out = {'*': self._epoque}
+            for (i, table), n in self._compteurs.items():
+                if i is None or i == immeuble_id:
+                    out[table] = out.get(table, 0) + n
+        return out
+
+
+class SourceLocale:
+    """Source d'événements en mémoire : active dès le démarrage."""
+
+    def __init__(self):
+        self.diffusion = None
+
+    def demarrer(self, diffusion: Diffusion):
+        self.diffusion = diffusion
+        diffusion.connecte(True)
+
+    def emettre(self, table, type_, record=None, old_record=None):
+        self.diffusion.publier({'table': table, 'type': type_,
+                                'record': record or {}, 'old_record': old_record or {}})
+
+
+class SourceRealtime:
+    """Abonnement Supabase Realtime aux changements du schéma `schema`.
+
+    Tourne dans un fil dédié avec sa propre boucle asyncio ; se réabonne après une
+    coupure (attente `pause` secondes entre deux tentatives).
+    """
+
+    def __init__(self, url, cle, schema='public', pause=60):
+        self.url = url.rstrip('/') + '/realtime/v1'
+        self.cle = cle
+        self.schema = schema
+        self.pause = pause
+
+    def demarrer(self, diffusion: Diffusion):
+        threading.Thread(target=lambda: asyncio.run(self._ecouter(diffusion)),
+                         name='evenements-realtime', daemon=True).start()
+
+    async def _ecouter(self, diffusion):
+        from realtime import AsyncRealtimeClient, RealtimeSubscribeStates
+
+        def statut(etat, erreur=None):
+            diffusion.connecte(etat == RealtimeSubscribeStates.SUBSCRIBED)
+            if erreur:
+                _LOGGER.warning("Abonnement Realtime : %s (%s)", etat, erreur)
+
+        while True:
+            client = None
+            try:
+                client = AsyncRealtimeClient(self.url, token=self.cle, params={'apikey': self.cle})
+                await client.connect()
+                canal = client.channel('copro-changements')
+                canal.on_postgres_changes('*', schema=self.schema,
+                                          callback=lambda p: diffusion.publier(p.get('data') or {}))
+                await canal.subscribe(statut)
+                while client.is_connected:
+                    await asyncio.sleep(self.pause / 2)
+            except Exception as e:
+                _LOGGER.warning("Connexion Realtime impossible : %s", e)
+            diffusion.connecte(False)
+            if client is not None:
+                try:
+                    await client.close()
+                except Exception:
+                    pass
+            await asyncio.sleep(self.pause)
@@ -0,0 +1,192 @@
+"""
+immeubles.py — Plusieurs copropriétés servies par un seul processus.
+
+Chaque table métier porte une colonne `immeuble_id` (table `immeubles` : code,
+nom, adresse). `ClientImmeuble` enveloppe le client Supabase : toute lecture,
+mise à jour ou suppression est filtrée sur l'immeuble courant et toute
+insertion le renseigne ; les pages gardent leurs `supabase.table(...)`.
+
+Les caches sont cloisonnés par immeuble : l'id de l'immeuble et un numéro de
+génération entrent dans la clé du cache (`cache_par_immeuble`). Invalider un
+immeuble incrémente ses générations sans toucher aux entrées des autres ; les
+entrées périmées disparaissent au TTL ou par éviction (max_entries).
+
+Sonde de changement : un trigger tient à jour, par immeuble et par table, un
+compteur de versions (`versions_tables`). Un chargeur qui déclare ses tables
+ajoute leurs versions à la clé du cache : il ne relit la table que si elle a
+changé. Sans sonde (table absente), repli sur le TTL d'origine. Les versions
+peuvent aussi être poussées par la base (voir evenements.py).
+
+Un `observateur` (voir instrumentation.cache) peut suivre chaque lecture : il
+apprend si la valeur venait du cache ou a été recalculée.
+"""
+
+import time
+import threading
+
+COLONNE = 'immeuble_id'
+
+# Résidence d'origine : immeuble n° 1 des tables migrées
+IMMEUBLE_DEFAUT = {
+    'id': 1, 'code': '0275', 'nom': 'VILLA TOBIAS (0275)',
+    'adresse': '52 RUE SMOLETT', 'cp_ville': '06300 NICE', 'ville': 'NICE',
+}
+
+TABLES_COMMUNES = frozenset({'immeubles'})
+
+# Entrées par fonction cachée, tous immeubles confondus (≈ 50 immeubles × quelques variantes d'arguments)
+MAX_ENTREES = 256
+
+# Durée de vie d'une entrée validée par la sonde (la sonde décide du rafraîchissement)
+CONSERVATION = 3600
+
+
+# ==================== CLIENT ====================
+
+def _avec_immeuble(donnees, immeuble_id):
+    if isinstance(donnees, dict):
+        return {COLONNE: immeuble_id, **donnees}
+    return [{COLONNE: immeuble_id, **d} for d in donnees]
+
+
+class _TableImmeuble:
+    """Requêtes d'une table restreintes à un immeuble."""
+
+    def __init__(self, table, immeuble_id):
+        self._table = table
+        self._immeuble_id = immeuble_id
+
+    def select(self, *args, **kwargs):
+        return self._table.select(*args, **kwargs).eq(COLONNE, self._immeuble_id)
+
+    def update(self, donnees, **kwargs):
+        return self._table.update(donnees, **kwargs).eq(COLONNE, self._immeuble_id)
+
+    def delete(self, **kwargs):
+        return self._table.delete(**kwargs).eq(COLONNE, self._immeuble_id)
+
+    def insert(self, donnees, **kwargs):
+        return self._table.insert(_avec_immeuble(donnees, self._immeuble_id), **kwargs)
+
+    def upsert(self, donnees, **kwargs):
+        return self._table.upsert(_avec_immeuble(donnees, self._immeuble_id), **kwargs)
+
+
+class ClientImmeuble:
+    """Client Supabase restreint à l'immeuble rendu par `immeuble_courant()`.
+
+    Les tables de `tables_communes` et le stockage ne sont pas filtrés ; `brut`
+    donne accès au client d'origine (ex. retrouver l'immeuble d'un lien public).
+    """
+
+    def __init__(self, client, immeuble_courant, tables_communes=TABLES_COMMUNES):
+        self.brut = client
+        self._immeuble_courant = immeuble_courant
+        self._communes = frozenset(tables_communes)
+
+    def table(self, nom):
+        t = self.brut.table(nom)
+        if nom in self._communes:
+            return t
+        return _TableImmeuble(t, self._immeuble_courant())
+
+    from_ = table
+
+    def __getattr__(self, nom):
+        return getattr(self.brut, nom)
+
+
+# ==================== CACHES ====================
+
+class Generations:
+    """Compteurs d'invalidation par (fonction, immeuble), partagés par toutes les sessions."""
+
+    def __init__(self):
+        self._valeurs = {}
+        self._groupes = {}
+        self._verrou = threading.Lock()
+
+    def enregistrer(self, nom, groupe):
+        self._groupes[nom] = groupe
+
+    def valeur(self, nom, immeuble_id) -> int:
+        return self._valeurs.get((nom, immeuble_id), 0)
+
+    def incrementer(self, immeuble_id, *noms):
+        with self._verrou:
+            for nom in noms:
+                self._valeurs[(nom, immeuble_id)] = self._valeurs.get((nom, immeuble_id), 0) + 1
+
+    def invalider(self, immeuble_id, groupe):
+        """Invalide, pour un immeuble, toutes les fonctions d'un groupe."""
+        self.incrementer(immeuble_id, *[n for n, g in list(self._groupes.items()) if g == groupe])
+
+
+def etat_tables(tables, versions, ttl):
+    """Partie de la clé de cache qui change quand une des `tables` change.
+
+    versions : {table: version} rendu par la sonde (clé '*' éventuelle : version commune
+    à toutes les tables), ou None si elle est indisponible (on retombe alors sur une
+    tranche de temps de `ttl` secondes).
+    """
+    if versions is None:
+        return ('ttl', int(time.time() // (ttl or CONSERVATION)))
+    return (versions.get('*', 0),) + tuple(versions.get(t, 0) for t in tables)
+
+
+_calculs = threading.local()
+
+
+def _pile_calculs():
+    if not hasattr(_calculs, 'pile'):
+        _calculs.pile = []
+    return _calculs.pile
+
+
+def cache_par_immeuble(cache, immeuble_courant, generations, groupe, tables=(), sonde=None,
+                       observateur=None, **options):
+    """Décorateur : `cache` (st.cache_data ou st.cache_resource) cloisonné par immeuble.
+
+    tables : tables lues par la fonction ; avec `sonde` (() → {table: version} ou None),
+    une entrée reste valable tant que ces tables n'ont pas changé.
+    observateur : nom → contexte (ou None) dont les attributs `recalcule` et `resultat` sont renseignés.
+    La fonction décorée garde sa signature ; `.clear()` n'invalide que l'immeuble courant.
+    """
+    options.setdefault('max_entries', MAX_ENTREES)
+    sondee = bool(tables) and sonde is not None
+    ttl = options.get('ttl')
+    if sondee:
+        options['ttl'] = CONSERVATION
+
+    def decorer(fonction):
+        nom = f"{fonction.__module__}.{fonction.__qualname__}"
+        generations.enregistrer(nom, groupe)
+
+        def _par_immeuble(immeuble_id, generation, etat, *args, **kwargs):
+            pile = _pile_calculs()
+            if pile:
+                pile[-1] = True  # exécutée : absente du cache
+            return fonction(*args, **kwargs)
+        # Nom propre à chaque fonction : Streamlit range les caches par module + nom qualifié
+        _par_immeuble.__module__ = fonction.__module__
+        _par_immeuble.__qualname__ = f"{fonction.__qualname__}[immeuble]"
+        cachee = cache(**options)(_par_immeuble)
+
+        def appel(*args, **kwargs):
+            i = immeuble_courant()
+            etat = etat_tables(tables, sonde(), ttl) if sondee else None
+            suivi = observateur(nom) if observateur is not None else None
+            if suivi is None:
+                return cachee(i, generations.valeur(nom, i), etat, *args, **kwargs)
+            pile = _pile_calculs()
+            pile.append(False)
+            with suivi:
+                try:
+                    suivi.resultat = cachee(i, generations.valeur(nom, i), etat, *args, **kwargs)
+                finally:
+                    suivi.recalcule = pile.pop()
+            return suivi.resultat
+        appel.__name__, appel.__qualname__, appel.__doc__ = fonction.__name__, fonction.__qualname__, fonction.__doc__
+        appel.clear = lambda: generations.incrementer(immeuble_courant(), nom)
+        return appel
+    return decorer
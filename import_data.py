@@ -8,28 +8,44 @@ Usage :
 
 Remplissez SUPABASE_URL et SUPABASE_KEY ci-dessous,
 ou définissez les variables d'environnement correspondantes.
+IMMEUBLE_ID désigne la copropriété (table `immeubles`) qui reçoit les données.
 """
 
 import os
 import pandas as pd
 from supabase import create_client
+from doublons import detecter_doublons_lot
 
 # ── Configuration ────────────────────────────────────────────
 SUPABASE_URL = os.getenv("SUPABASE_URL", "https://xxxxxxxxxxxxxxxxxxxx.supabase.co")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY", "votre-anon-key")
 EXCEL_FILE   = "suivi_copropriete_automatise.xlsx"
+IMMEUBLE_ID  = int(os.getenv("IMMEUBLE_ID", "1"))
+PAGE         = 1000  # lignes par requête (limite par défaut de l'API Supabase)
 
 # ─────────────────────────────────────────────────────────────
 
 def connect():
     return create_client(SUPABASE_URL, SUPABASE_KEY)
 
+def lire_depenses(client) -> pd.DataFrame:
+    """Dépenses déjà en base pour IMMEUBLE_ID (champs du contrôle des doublons), par pages de PAGE."""
+    lignes = []
+    while True:
+        page = (client.table("depenses").select("id,date,montant_du,fournisseur,compte")
+                .eq("immeuble_id", IMMEUBLE_ID).order("id")
+                .range(len(lignes), len(lignes) + PAGE - 1).execute().data)
+        lignes += page
+        if len(page) < PAGE:
+            return pd.DataFrame(lignes)
+
 def import_coproprietaires(client, df: pd.DataFrame):
     """Importe la feuille Copropriétaires."""
     print(f"  → {len(df)} copropriétaires trouvés")
     records = []
     for _, row in df.iterrows():
         records.append({
+            "immeuble_id":              IMMEUBLE_ID,
             "nom":                      str(row.get("nom", "") or ""),
             "lot":                      int(row["lot"]) if pd.notna(row.get("lot")) else None,
             "N° appartement":           str(row.get("description","") or ""), 
@@ -57,6 +73,7 @@ def import_budget(client, df: pd.DataFrame):
     records = []
     for _, row in df.iterrows():
         records.append({
+            "immeuble_id":    IMMEUBLE_ID,
             "annee":          int(row.get("annee", 2025)),
             "compte":         str(row.get("compte", "") or ""),
             "libelle_compte": str(row.get("libelle_compte", "") or ""),
@@ -79,6 +96,7 @@ def import_depenses(client, df: pd.DataFrame):
         else:
             continue  # date obligatoire
         records.append({
+            "immeuble_id": IMMEUBLE_ID,
             "date":        date_str,
             "compte":      str(row.get("compte", "") or ""),
             "fournisseur": str(row.get("fournisseur", "") or ""),
@@ -87,9 +105,20 @@ def import_depenses(client, df: pd.DataFrame):
             "classe":      str(row.get("classe", "") or ""),
             "famille":     str(row.get("famille", "") or ""),
         })
+    # Doublons : exacts (déjà en base ou répétés dans le fichier) ignorés,
+    # proches (même montant, dates voisines, fournisseur ressemblant) signalés
+    controle = detecter_doublons_lot(pd.DataFrame(records), lire_depenses(client))
+    a_ignorer = set(controle.loc[controle["statut"] != "proche", "ligne"])
+    for r in controle.itertuples():
+        rec = records[r.ligne]
+        origine = f"dépense #{r.depense_id}" if pd.notna(r.depense_id) else "ligne précédente du fichier"
+        marque = "⚠️  proche de" if r.statut == "proche" else "⏭️  doublon de"
+        print(f"  {marque} {origine} : {rec['date']} {rec['fournisseur']} {rec['montant_du']:.2f} €")
+    records = [rec for i, rec in enumerate(records) if i not in a_ignorer]
+
     for i in range(0, len(records), 50):
         client.table("depenses").insert(records[i:i+50]).execute()
-    print(f"  ✅ {len(records)} dépenses importées")
+    print(f"  ✅ {len(records)} dépenses importées ({len(a_ignorer)} doublon(s) ignoré(s))")
 
 def import_plan_comptable(client, df: pd.DataFrame):
     """Importe la feuille Plan Comptable."""
@@ -97,6 +126,7 @@ def import_plan_comptable(client, df: pd.DataFrame):
     records = []
     for _, row in df.iterrows():
         records.append({
+            "immeuble_id":    IMMEUBLE_ID,
             "compte":         str(row.get("compte", "") or ""),
             "libelle_compte": str(row.get("libelle_compte", "") or ""),
             "classe":         str(row.get("classe", "") or ""),
@@ -109,7 +139,7 @@ def import_plan_comptable(client, df: pd.DataFrame):
 def main():
     print(f"\n🔌 Connexion à Supabase...")
     client = connect()
-    print("✅ Connecté\n")
+    print(f"✅ Connecté — immeuble n° {IMMEUBLE_ID}\n")
 
     try:
         xl = pd.ExcelFile(EXCEL_FILE)
@@ -0,0 +1,321 @@
+"""
+instrumentation.py — Mesures d'un rerun, pour le panneau de performance.
+
+Un `Releve` par rerun, attaché au fil d'exécution du script (un fil par session) :
+  - requêtes : table, opération, filtres, lignes rendues, octets (JSON), durée ;
+  - caches : fonction, trouvé en cache ou recalculé, durée, taille du DataFrame rendu ;
+  - sections : temps exclusif par section (« données », « pdf », « graphiques »…),
+    une section imbriquée étant déduite de la section englobante ; le reste du
+    rerun est compté en « calcul et affichage ».
+
+Tant qu'aucun relevé n'est démarré, `section()` et `cache()` ne coûtent qu'un test.
+`journaliser()` ajoute le relevé (une ligne JSON) à un journal tournant.
+"""
+
+import json
+import time
+import logging
+import threading
+import contextlib
+from logging.handlers import RotatingFileHandler
+
+AUTRES = 'calcul et affichage'
+
+_local = threading.local()
+
+
+class Releve:
+    def __init__(self, page=''):
+        self.page = page
+        self.debut = time.perf_counter()
+        self.fin = None
+        self.requetes = []
+        self.caches = []
+        self.sections = {}
+        self._pile = []  # [nom, début, durée des sections filles]
+
+    # ── Sections ─────────────────────────────────────────────────
+    def entrer(self, nom):
+        self._pile.append([nom, time.perf_counter(), 0.0])
+
+    def sortir(self):
+        nom, debut, filles = self._pile.pop()
+        duree = time.perf_counter() - debut
+        self.sections[nom] = self.sections.get(nom, 0.0) + duree - filles
+        if self._pile:
+            self._pile[-1][2] += duree
+        return duree
+
+    def terminer(self):
+        while self._pile:
+            self.sortir()
+        self.fin = time.perf_counter()
+
+    @property
+    def total(self) -> float:
+        return (self.fin or time.perf_counter()) - self.debut
+
+    def repartition(self) -> dict:
+        """{section: secondes}, reste du rerun compris."""
+        out = dict(self.sections)
+        out[AUTRES] = max(self.total - sum(self.sections.values()), 0.0)
+        return out
+
+    def resume(self) -> dict:
+        return {
+            'date': time.strftime('%Y-%m-%dT%H:%M:%S'), 'page': self.page, 'total_s': round(self.total, 4),
+            'sections_s': {k: round(v, 4) for k, v in self.repartition().items()},
+            'requetes': self.requetes, 'caches': self.caches,
+        }
+
+
+# ==================== RELEVÉ COURANT ====================
+
+def demarrer(page='') -> Releve:
+    _local.releve = Releve(page)
+    return _local.releve
+
+
+def courant():
+    return getattr(_local, 'releve', None)
+
+
+def arreter():
+    r = courant()
+    _local.releve = None
+    if r is not None:
+        r.terminer()
+    return r
+
+
+@contextlib.contextmanager
+def section(nom):
+    r = courant()
+    if r is None:
+        yield
+        return
+    r.entrer(nom)
+    try:
+        yield
+    finally:
+        r.sortir()
+
+
+def chronometre(nom):
+    """Décorateur : le temps de la fonction est compté dans la section `nom`."""
+    def decorer(fonction):
+        def appel(*args, **kwargs):
+            if courant() is None:
+                return fonction(*args, **kwargs)
+            with section(nom):
+                return fonction(*args, **kwargs)
+        appel.__name__, appel.__qualname__, appel.__doc__ = fonction.__name__, fonction.__qualname__, fonction.__doc__
+        appel.__wrapped__ = fonction
+        return appel
+    return decorer
+
+
+class _SuiviCache:
+    """Contexte d'une lecture de cache ; l'appelant renseigne `recalcule` et `resultat`."""
+
+    def __init__(self, releve, nom):
+        self._releve = releve
+        self.nom = nom
+        self.recalcule = False
+        self.resultat = None
+
+    def __enter__(self):
+        self._releve.entrer('données')
+        return self
+
+    def __exit__(self, *exc):
+        duree = self._releve.sortir()
+        self._releve.caches.append({'fonction': self.nom.rsplit('.', 1)[-1], 'resultat': 'recalculé' if self.recalcule else 'en cache',
+                                    'ms': round(duree * 1000, 2), 'ko': _ko(self.resultat)})
+        return False
+
+
+def _ko(resultat):
+    """Mémoire d'un DataFrame rendu par un cache (Ko), None pour les autres résultats."""
+    memoire = getattr(resultat, 'memory_usage', None)
+    if memoire is None or not hasattr(resultat, 'columns'):
+        return None
+    return round(int(memoire(deep=True).sum()) / 1024, 1)
+
+
+def cache(nom):
+    """Contexte de suivi d'une lecture de cache, None hors relevé."""
+    r = courant()
+    return _SuiviCache(r, nom) if r is not None else None
+
+
+# ==================== CLIENT MESURÉ ====================
+
+def _decrire(valeur):
+    texte = str(list(valeur) if isinstance(valeur, (list, tuple, set)) else valeur)
+    return texte if len(texte) <= 60 else texte[:57] + '…'
+
+
+def _octets(donnees) -> int:
+    if isinstance(donnees, (bytes, bytearray)):
+        return len(donnees)
+    try:
+        return len(json.dumps(donnees, default=str).encode('utf-8'))
+    except (TypeError, ValueError):
+        return 0
+
+
+class _RequeteMesuree:
+    """Enveloppe un constructeur de requête ; `execute()` est chronométré et relevé."""
+
+    OPERATIONS = ('select', 'insert', 'upsert', 'update', 'delete')
+
+    def __init__(self, requete, releve, table, operation='select', filtres=()):
+        self._requete = requete
+        self._releve = releve
+        self._table = table
+        self._operation = operation
+        self._filtres = list(filtres)
+
+    def _suite(self, objet, nom, args):
+        operation, filtres = self._operation, list(self._filtres)
+        if nom in self.OPERATIONS:
+            operation = nom
+        elif nom not in ('not_',):
+            filtres.append(f"{nom}({', '.join(_decrire(a) for a in args)})")
+        else:
+            filtres.append('not')
+        return _RequeteMesuree(objet, self._releve, self._table, operation, filtres)
+
+    def __getattr__(self, nom):
+        attribut = getattr(self._requete, nom)
+        if not callable(attribut):
+            return self._suite(attribut, nom, ()) if hasattr(attribut, 'execute') else attribut
+
+        def methode(*args, **kwargs):
+            resultat = attribut(*args, **kwargs)
+            return self._suite(resultat, nom, args) if hasattr(resultat, 'execute') else resultat
+        return methode
+
+    def execute(self, *args, **kwargs):
+        self._releve.entrer('données')
+        reponse, erreur = None, None
+        try:
+            reponse = self._requete.execute(*args, **kwargs)
+        except Exception as e:
+            erreur = str(e)[:120]
+            raise
+        finally:
+            duree = self._releve.sortir()
+            donnees = getattr(reponse, 'data', None)
+            self._releve.requetes.append({
+                'table': self._table, 'operation': self._operation,
+                'filtres': ' · '.join(self._filtres),
+                'lignes': len(donnees) if isinstance(donnees, list) else (1 if donnees else 0),
+                'octets': _octets(donnees), 'ms': round(duree * 1000, 2),
+                **({'erreur': erreur} if erreur else {}),
+            })
+        return reponse
+
+
+class _SeauMesure:
+    def __init__(self, seau, releve, nom):
+        self._seau = seau
+        self._releve = releve
+        self._nom = nom
+
+    def __getattr__(self, nom):
+        methode = getattr(self._seau, nom)
+        if not callable(methode):
+            return methode
+
+        def appel(*args, **kwargs):
+            self._releve.entrer('données')
+            resultat, erreur = None, None
+            try:
+                resultat = methode(*args, **kwargs)
+            except Exception as e:
+                erreur = str(e)[:120]
+                raise
+            finally:
+                duree = self._releve.sortir()
+                envoye = args[1] if nom == 'upload' and len(args) > 1 else None
+                self._releve.requetes.append({
+                    'table': f"stockage:{self._nom}", 'operation': nom,
+                    'filtres': _decrire(args[0]) if args else '',
+                    'lignes': len(resultat) if isinstance(resultat, list) else (0 if erreur else 1),
+                    'octets': _octets(envoye if envoye is not None else resultat), 'ms': round(duree * 1000, 2),
+                    **({'erreur': erreur} if erreur else {}),
+                })
+            return resultat
+        return appel
+
+
+class _StockageMesure:
+    def __init__(self, stockage, releve):
+        self._stockage = stockage
+        self._releve = releve
+
+    def from_(self, seau):
+        return _SeauMesure(self._stockage.from_(seau), self._releve, seau)
+
+    def __getattr__(self, nom):
+        return getattr(self._stockage, nom)
+
+
+class ClientMesure:
+    """Client (Supabase ou stockage.ClientSQLite) dont chaque requête est relevée dans `releve`."""
+
+    def __init__(self, client, releve):
+        self._client = client
+        self._releve = releve
+        self.storage = _StockageMesure(client.storage, releve)
+
+    def table(self, nom):
+        return _RequeteMesuree(self._client.table(nom), self._releve, nom)
+
+    from_ = table
+
+    def __getattr__(self, nom):
+        return getattr(self._client, nom)
+
+
+class ClientReleve:
+    """Client rendu par `fournir()`, relevé comme ClientMesure tant qu'un relevé est en cours
+    sur le fil (un même objet sert toutes les sessions, relevé ou non)."""
+
+    def __init__(self, fournir):
+        self._fournir = fournir
+
+    def _client(self):
+        client, r = self._fournir(), courant()
+        return ClientMesure(client, r) if r is not None else client
+
+    def table(self, nom):
+        return self._client().table(nom)
+
+    from_ = table
+
+    def __getattr__(self, nom):
+        return getattr(self._client(), nom)
+
+
+# ==================== JOURNAL ====================
+
+_journaux = {}
+_verrou = threading.Lock()
+
+
+def journaliser(releve, chemin, taille_max=5_000_000, copies=3):
+    """Ajoute le relevé au journal `chemin` (JSON, une ligne par rerun ; rotation à `taille_max` octets)."""
+    with _verrou:
+        journal = _journaux.get(chemin)
+        if journal is None:
+            journal = logging.getLogger(f"{__name__}.{len(_journaux)}")
+            journal.propagate = False
+            journal.setLevel(logging.INFO)
+            gestionnaire = RotatingFileHandler(chemin, maxBytes=taille_max, backupCount=copies, encoding='utf-8')
+            gestionnaire.setFormatter(logging.Formatter('%(message)s'))
+            journal.addHandler(gestionnaire)
+            _journaux[chemin] = journal
+    journal.info(json.dumps(releve.resume(), ensure_ascii=False, default=str))
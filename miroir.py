@@ -0,0 +1,245 @@
+"""
+miroir.py — Copie locale (SQLite) des tables d'un immeuble, synchronisée par filigrane.
+
+Chaque table miroir est rangée ligne à ligne (JSON, tel que renvoyé par l'API)
+dans un fichier SQLite par immeuble. La synchronisation ne rapatrie que les
+lignes dont `updated_at` dépasse le filigrane de la table (pagination par
+(updated_at, id)) ; les suppressions sont repérées en comparant le nombre de
+lignes, puis la liste des ids si besoin. `updated_at = now()` est l'heure de
+début de la transaction : une ligne validée après la synchronisation peut porter
+une heure antérieure au filigrane. Chaque synchronisation relit donc les
+CHEVAUCHEMENT dernières secondes avant le filigrane (lignes réécrites par id).
+
+Sans réseau, les lectures servent la copie locale et les écritures sont mises en
+file (appliquées tout de suite à la copie, avec des ids provisoires négatifs),
+puis rejouées dans l'ordre au retour de la connexion. Une écriture refusée par la
+base est retirée de la file et signalée dans `rejets` ; la copie est remise en
+accord avec la base (lignes provisoires retirées, lignes modifiées ou supprimées
+relues).
+"""
+
+import json
+import time
+import sqlite3
+import threading
+
+import pandas as pd
+
+try:
+    import httpx
+    HORS_LIGNE = (OSError, httpx.TransportError)
+except ImportError:  # pragma: no cover
+    HORS_LIGNE = (OSError,)
+
+PAGE = 1000          # lignes par requête (limite par défaut de PostgREST)
+NOUVEL_ESSAI = 30    # secondes avant de retenter le réseau après une coupure
+CHEVAUCHEMENT = 5    # secondes relues avant le filigrane (transactions validées en retard)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS lignes (
+    tbl TEXT NOT NULL, id INTEGER NOT NULL, donnees TEXT NOT NULL, PRIMARY KEY (tbl, id));
+CREATE TABLE IF NOT EXISTS filigranes (
+    tbl TEXT PRIMARY KEY, maj TEXT, id INTEGER);
+CREATE TABLE IF NOT EXISTS file_ecritures (
+    num INTEGER PRIMARY KEY AUTOINCREMENT, tbl TEXT NOT NULL, operation TEXT NOT NULL,
+    donnees TEXT, id INTEGER, cree_le TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS ids_provisoires (
+    tbl TEXT NOT NULL, provisoire INTEGER NOT NULL, definitif INTEGER NOT NULL, PRIMARY KEY (tbl, provisoire));
+"""
+
+
+def _horodatage(v) -> str:
+    """Horodatage PostgREST → ISO UTC « …Z » (un « +00:00 » passe mal dans l'URL)."""
+    t = pd.Timestamp(v)
+    t = t.tz_localize('UTC') if t.tzinfo is None else t.tz_convert('UTC')
+    return t.strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+
+class Miroir:
+    """Copie locale des tables d'un immeuble (un fichier SQLite)."""
+
+    def __init__(self, chemin):
+        self._conn = sqlite3.connect(chemin, check_same_thread=False)
+        self._verrou = threading.RLock()
+        self._echec = 0.0
+        self.hors_ligne = False
+        self.rejets = []
+        with self._verrou, self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    # ── Réseau ───────────────────────────────────────────────────
+    def coupure(self):
+        """Note une coupure : pas de nouvel essai réseau avant NOUVEL_ESSAI secondes."""
+        self.hors_ligne, self._echec = True, time.monotonic()
+
+    def _reseau(self, fonction):
+        """Appelle `fonction()` sauf coupure récente ; False si hors ligne."""
+        if self.hors_ligne and time.monotonic() - self._echec < NOUVEL_ESSAI:
+            return False
+        try:
+            fonction()
+        except HORS_LIGNE:
+            self.coupure()
+            return False
+        self.hors_ligne = False
+        return True
+
+    # ── Lecture locale ───────────────────────────────────────────
+    def lire(self, table) -> pd.DataFrame:
+        with self._verrou:
+            lignes = self._conn.execute(
+                "SELECT donnees FROM lignes WHERE tbl=? ORDER BY id < 0, ABS(id)", (table,)).fetchall()
+        return pd.DataFrame([json.loads(l[0]) for l in lignes])
+
+    def connue(self, table) -> bool:
+        with self._verrou:
+            return self._conn.execute("SELECT 1 FROM filigranes WHERE tbl=?", (table,)).fetchone() is not None
+
+    def _enregistrer(self, table, lignes):
+        self._conn.executemany("INSERT OR REPLACE INTO lignes (tbl, id, donnees) VALUES (?,?,?)",
+                               [(table, int(l['id']), json.dumps(l, default=str)) for l in lignes])
+
+    def _retirer(self, table, ids):
+        self._conn.executemany("DELETE FROM lignes WHERE tbl=? AND id=?", [(table, int(i)) for i in ids])
+
+    # ── Synchronisation ──────────────────────────────────────────
+    def synchroniser(self, client, table) -> bool:
+        """Rapatrie les lignes modifiées depuis le filigrane et retire les lignes supprimées.
+        False si le réseau est indisponible (la copie locale reste servie)."""
+        return self._reseau(lambda: self._tirer(client, table))
+
+    def _tirer(self, client, table):
+        with self._verrou:
+            f = self._conn.execute("SELECT maj, id FROM filigranes WHERE tbl=?", (table,)).fetchone()
+        maj, dernier = f if f else (None, None)
+        depuis = _horodatage(pd.Timestamp(maj) - pd.Timedelta(seconds=CHEVAUCHEMENT)) if maj else None
+        while True:
+            q = client.table(table).select('*')
+            if depuis:
+                q, depuis = q.gte('updated_at', depuis), None
+            elif maj:
+                q = q.or_(f"updated_at.gt.{maj},and(updated_at.eq.{maj},id.gt.{dernier})")
+            lignes = q.order('updated_at').order('id').limit(PAGE).execute().data or []
+            if lignes:
+                maj, dernier = _horodatage(lignes[-1]['updated_at']), int(lignes[-1]['id'])
+                with self._verrou, self._conn:
+                    self._enregistrer(table, lignes)
+                    self._conn.execute("INSERT OR REPLACE INTO filigranes (tbl, maj, id) VALUES (?,?,?)",
+                                       (table, maj, dernier))
+            elif not f:
+                with self._verrou, self._conn:
+                    self._conn.execute("INSERT OR REPLACE INTO filigranes (tbl, maj, id) VALUES (?,NULL,NULL)", (table,))
+            if len(lignes) < PAGE:
+                break
+        # Suppressions : invisibles au filigrane, repérées par le nombre de lignes
+        total = client.table(table).select('id', count='exact').limit(1).execute().count
+        with self._verrou:
+            locaux = {r[0] for r in self._conn.execute("SELECT id FROM lignes WHERE tbl=? AND id > 0", (table,))}
+        if total is not None and total != len(locaux):
+            distants, debut = set(), 0
+            while True:
+                page = client.table(table).select('id').order('id').range(debut, debut + PAGE - 1).execute().data or []
+                distants |= {int(r['id']) for r in page}
+                if len(page) < PAGE:
+                    break
+                debut += PAGE
+            with self._verrou, self._conn:
+                self._retirer(table, locaux - distants)
+
+    # ── Écritures ────────────────────────────────────────────────
+    def appliquer(self, table, lignes=(), supprimes=()):
+        """Reporte dans la copie des écritures acceptées par la base."""
+        with self._verrou, self._conn:
+            self._enregistrer(table, lignes)
+            self._retirer(table, supprimes)
+
+    def mettre_en_file(self, table, operation, donnees=None, id_=None) -> list:
+        """Écriture hors ligne : appliquée à la copie et mise en file. Retourne les lignes
+        locales concernées (insérées ou modifiées ; supprimées pour 'delete')."""
+        with self._verrou, self._conn:
+            maintenant = pd.Timestamp.now(tz='UTC').isoformat()
+            if operation == 'insert':
+                mini = self._conn.execute("SELECT MIN(id) FROM lignes WHERE tbl=?", (table,)).fetchone()[0] or 0
+                lignes = [{**d, 'id': min(mini, 0) - 1 - k} for k, d in enumerate(donnees)]
+                self._enregistrer(table, lignes)
+                self._conn.execute("INSERT INTO file_ecritures (tbl, operation, donnees, cree_le) VALUES (?,?,?,?)",
+                                   (table, operation, json.dumps(lignes, default=str), maintenant))
+                return lignes
+            ids = [int(id_)] if operation == 'update' else [int(i) for i in id_]
+            lignes = [json.loads(r[0]) for i in ids for r in self._conn.execute(
+                "SELECT donnees FROM lignes WHERE tbl=? AND id=?", (table, i))]
+            if operation == 'update':
+                lignes = [{**l, **donnees} for l in lignes]
+                self._enregistrer(table, lignes)
+            else:
+                self._retirer(table, ids)
+            self._conn.execute("INSERT INTO file_ecritures (tbl, operation, donnees, id, cree_le) VALUES (?,?,?,?,?)",
+                               (table, operation, json.dumps(donnees if operation == 'update' else ids, default=str),
+                                ids[0] if operation == 'update' else None, maintenant))
+            return lignes
+
+    def en_attente(self) -> int:
+        with self._verrou:
+            return self._conn.execute("SELECT COUNT(*) FROM file_ecritures").fetchone()[0]
+
+    def rejouer(self, client) -> int:
+        """Envoie les écritures en file, dans l'ordre. Retourne le nombre d'écritures traitées
+        (0 aussi si le réseau manque encore)."""
+        faites = []
+        self._reseau(lambda: self._rejouer(client, faites))
+        return len(faites)
+
+    def _rejouer(self, client, faites):
+        with self._verrou:
+            file = self._conn.execute(
+                "SELECT num, tbl, operation, donnees, id FROM file_ecritures ORDER BY num").fetchall()
+        for num, table, operation, donnees, id_ in file:
+            donnees = json.loads(donnees) if donnees else None
+
+            def definitif(i):
+                if i >= 0:
+                    return i
+                r = self._conn.execute("SELECT definitif FROM ids_provisoires WHERE tbl=? AND provisoire=?",
+                                       (table, i)).fetchone()
+                return r[0] if r else None
+            try:
+                if operation == 'insert':
+                    envoi = [{k: v for k, v in l.items() if k != 'id'} for l in donnees]
+                    recues = client.table(table).insert(envoi).execute().data or []
+                    with self._verrou, self._conn:
+                        self._retirer(table, [l['id'] for l in donnees])
+                        self._enregistrer(table, recues)
+                        self._conn.executemany("INSERT OR REPLACE INTO ids_provisoires VALUES (?,?,?)",
+                                               [(table, l['id'], r['id']) for l, r in zip(donnees, recues)])
+                elif operation == 'update':
+                    i = definitif(id_)
+                    if i is not None:
+                        recues = client.table(table).update(donnees).eq('id', i).execute().data or []
+                        with self._verrou, self._conn:
+                            self._enregistrer(table, recues)
+                else:
+                    ids = [j for j in (definitif(i) for i in donnees) if j is not None]
+                    if ids:
+                        client.table(table).delete().in_('id', ids).execute()
+            except HORS_LIGNE:
+                raise
+            except Exception as e:
+                self.rejets.append(f"{table} · {operation} : {e}")
+                if operation == 'insert':
+                    with self._verrou, self._conn:
+                        self._retirer(table, [l['id'] for l in donnees])
+                else:
+                    ids = [definitif(id_)] if operation == 'update' else [definitif(i) for i in donnees]
+                    self._relire(client, table, [i for i in ids if i is not None])
+            with self._verrou, self._conn:
+                self._conn.execute("DELETE FROM file_ecritures WHERE num=?", (num,))
+            faites.append(num)
+
+    def _relire(self, client, table, ids):
+        """Remplace dans la copie les lignes `ids` par leur état en base (retirées si absentes)."""
+        if not ids:
+            return
+        lignes = client.table(table).select('*').in_('id', ids).execute().data or []
+        with self._verrou, self._conn:
+            self._retirer(table, set(ids) - {int(l['id']) for l in lignes})
+            self._enregistrer(table, lignes)
@@ -0,0 +1,79 @@
+"""
+monnaie.py — Montants en centimes entiers (int64).
+
+Les montants saisis et stockés restent en euros ; les calculs de répartition
+passent par les centimes pour que les parts somment exactement au total réparti :
+  - centimes / euros : conversions (arrondi au centime le plus proche, demi-centime
+    arrondi en s'éloignant de zéro, sur l'écriture décimale du montant : 1.005 → 1.01) ;
+  - repartir : répartition d'un total au prorata de poids, au plus fort reste ;
+  - echeance : part d'un montant annuel pour l'un des appels de l'exercice.
+
+Fonctions pures, vectorisées (scalaires, listes, tableaux numpy ou Series).
+"""
+
+from decimal import Decimal, ROUND_HALF_UP
+
+import numpy as np
+
+_CENTIME = Decimal('0.01')
+
+
+def _arrondir(montant) -> int:
+    # repr : écriture décimale la plus courte du float (1.005, et non 1.00499999…)
+    return int(Decimal(repr(float(montant))).quantize(_CENTIME, ROUND_HALF_UP).scaleb(2))
+
+
+def centimes(montant):
+    """Euros → centimes entiers (int pour un scalaire, tableau int64 sinon)."""
+    m = np.asarray(montant, dtype=float)
+    if m.ndim == 0:
+        return _arrondir(m)
+    return np.fromiter(map(_arrondir, m.ravel()), dtype='int64', count=m.size).reshape(m.shape)
+
+
+def euros(centimes_):
+    """Centimes → euros (float pour un scalaire, tableau float64 sinon)."""
+    e = np.asarray(centimes_, dtype='int64') / 100
+    return float(e) if e.ndim == 0 else e
+
+
+def repartir(totaux, poids, bases=None):
+    """Répartit chaque total (centimes) sur les lignes de `poids`, au plus fort reste.
+
+    totaux : centimes, un par colonne (ou un scalaire pour un vecteur de poids) ;
+    poids  : lignes × colonnes (tantièmes) ;
+    bases  : dénominateur de chaque colonne (total déclaré des tantièmes), somme des
+             poids par défaut. Si la base dépasse la somme des poids, la part de
+             l'écart n'est attribuée à aucune ligne.
+    Chaque ligne reçoit la partie entière de sa part exacte ; les centimes restants
+    vont un à un aux plus fortes parties décimales (à égalité, à la première ligne).
+    Avec une base égale à la somme des poids, les parts somment exactement au total.
+    """
+    p = np.asarray(poids, dtype=float)
+    vecteur = p.ndim == 1
+    if vecteur:
+        p = p[:, None]
+    t = np.atleast_1d(np.asarray(totaux, dtype='int64'))
+    b = p.sum(axis=0) if bases is None else np.atleast_1d(np.asarray(bases, dtype=float))
+    # Ligne fictive : écart entre la base déclarée et les poids saisis
+    p = np.vstack([p, np.clip(b - p.sum(axis=0), 0, None)])
+    signe, a = np.sign(t), np.abs(t)
+    exacte = np.divide(a * p, b, out=np.zeros_like(p), where=b > 0)
+    entiere = np.floor(exacte + 1e-9).astype('int64')
+    reste = np.where(b > 0, a - entiere.sum(axis=0), 0)
+    decimales = np.where(p > 0, exacte - entiere, -1.0)
+    ordre = np.argsort(-decimales, axis=0, kind='stable')
+    rang = np.empty_like(ordre)
+    np.put_along_axis(rang, ordre, np.arange(len(p))[:, None], axis=0)
+    parts = ((entiere + (rang < reste)) * signe)[:-1]
+    return parts[:, 0] if vecteur else parts
+
+
+def echeance(annuel, nb_appels, rang):
+    """Part (centimes) de l'appel `rang` (1…nb_appels) d'un montant annuel en centimes :
+    les centimes indivisibles vont aux premiers appels ; les nb_appels échéances
+    somment exactement au montant annuel."""
+    a = np.asarray(annuel, dtype='int64')
+    signe, a = np.sign(a), np.abs(a)
+    e = (a // nb_appels + (rang <= a % nb_appels)) * signe
+    return int(e) if e.ndim == 0 else e
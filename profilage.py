@@ -0,0 +1,154 @@
+"""
+profilage.py — Profil d'un rerun (cProfile ou échantillonnage), produit localement.
+
+Deux modes :
+  - 'cprofile'     : cProfile sur le fil du script ; rend le fichier .pstats
+                     (snakeviz, `python -m pstats`) et les fonctions les plus coûteuses ;
+  - 'echantillons' : un fil relève la pile du script toutes les `intervalle`
+                     secondes ; rend les piles repliées (format flamegraph.pl) et une
+                     flamme SVG autonome (`flamme_svg`).
+
+Seul le fil qui démarre le profil est observé : les sessions voisines ne
+ralentissent pas et n'apparaissent pas dans le profil.
+"""
+
+import io
+import os
+import sys
+import html
+import time
+import pstats
+import cProfile
+import tempfile
+import threading
+
+MODES = ('cprofile', 'echantillons')
+
+
+class Profileur:
+    def __init__(self, mode='cprofile', intervalle=0.002):
+        self.mode = mode if mode in MODES else 'cprofile'
+        self.intervalle = intervalle
+        self._profil = None
+        self._fil = None
+        self._arret = threading.Event()
+        self.piles = {}
+        self.echantillons = 0
+        self.duree = 0.0
+
+    # ── Démarrage / arrêt ────────────────────────────────────────
+    def demarrer(self):
+        self._debut = time.perf_counter()
+        if self.mode == 'cprofile':
+            self._profil = cProfile.Profile()
+            self._profil.enable()  # ValueError si un autre profileur est déjà actif
+        else:
+            cible = threading.get_ident()
+            self._fil = threading.Thread(target=self._echantillonner, args=(cible,),
+                                         name='profilage-echantillons', daemon=True)
+            self._fil.start()
+        return self
+
+    def arreter(self):
+        if self._profil is not None:
+            self._profil.disable()
+        if self._fil is not None:
+            self._arret.set()
+            self._fil.join()
+        self.duree = time.perf_counter() - self._debut
+        return self
+
+    def _echantillonner(self, cible):
+        moi = os.path.abspath(__file__)
+        while not self._arret.wait(self.intervalle):
+            cadre = sys._current_frames().get(cible)
+            pile = []
+            while cadre is not None:
+                code = cadre.f_code
+                if os.path.abspath(code.co_filename) != moi:
+                    pile.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{cadre.f_lineno})")
+                cadre = cadre.f_back
+            if pile:
+                cle = ';'.join(reversed(pile))
+                self.piles[cle] = self.piles.get(cle, 0) + 1
+                self.echantillons += 1
+
+    # ── Résultats ────────────────────────────────────────────────
+    def pstats_octets(self) -> bytes:
+        """Fichier .pstats (mode cprofile)."""
+        with tempfile.NamedTemporaryFile(suffix='.pstats', delete=False) as f:
+            chemin = f.name
+        try:
+            self._profil.dump_stats(chemin)
+            with open(chemin, 'rb') as f:
+                return f.read()
+        finally:
+            os.remove(chemin)
+
+    def plus_couteuses(self, n=25, tri='cumulative') -> list:
+        """[{fonction, appels, propre_s, cumul_s}] triées par `tri` (mode cprofile)."""
+        stats = pstats.Stats(self._profil, stream=io.StringIO())
+        stats.sort_stats(tri)
+        out = []
+        for (fichier, ligne, nom) in stats.fcn_list[:n]:
+            cc, nc, propre, cumul, _ = stats.stats[(fichier, ligne, nom)]
+            out.append({'fonction': f"{nom} ({os.path.basename(fichier)}:{ligne})", 'appels': nc,
+                        'propre_s': round(propre, 4), 'cumul_s': round(cumul, 4)})
+        return out
+
+    def piles_repliees(self) -> str:
+        """Une ligne « racine;…;feuille nombre » par pile (mode echantillons)."""
+        return '\n'.join(f"{p} {n}" for p, n in sorted(self.piles.items()))
+
+
+# ==================== FLAMME SVG ====================
+
+def _arbre(piles):
+    racine = {'nom': 'rerun', 'n': 0, 'enfants': {}}
+    for pile, n in piles.items():
+        noeud = racine
+        noeud['n'] += n
+        for nom in pile.split(';'):
+            noeud = noeud['enfants'].setdefault(nom, {'nom': nom, 'n': 0, 'enfants': {}})
+            noeud['n'] += n
+    return racine
+
+
+def _couleur(nom):
+    h = sum(ord(c) for c in nom)
+    return f"rgb({205 + h % 50},{90 + h * 7 % 120},{40 + h * 13 % 50})"
+
+
+def flamme_svg(piles: dict, largeur=1200, hauteur_ligne=16, titre="Profil du rerun") -> str:
+    """Flamme SVG (racine en bas, largeur ∝ échantillons), survol = détail de la fonction."""
+    racine = _arbre(piles)
+    total = racine['n'] or 1
+    rects = []
+
+    def profondeur(noeud):
+        return 1 + max((profondeur(e) for e in noeud['enfants'].values()), default=0)
+    niveaux = profondeur(racine)
+    hauteur = (niveaux + 2) * hauteur_ligne
+
+    def dessiner(noeud, x, niveau):
+        l = noeud['n'] / total * largeur
+        if l < 0.3:
+            return
+        y = hauteur - (niveau + 1) * hauteur_ligne
+        nom = html.escape(noeud['nom'])
+        texte = nom if l > 7 * len(noeud['nom']) else (nom[:int(l / 7) - 1] + '…' if l > 21 else '')
+        rects.append(
+            f'<g><title>{nom} — {noeud["n"]} échantillon(s), {noeud["n"] / total:.1%}</title>'
+            f'<rect x="{x:.1f}" y="{y}" width="{l:.1f}" height="{hauteur_ligne - 1}" '
+            f'fill="{_couleur(noeud["nom"])}" rx="2"/>'
+            f'<text x="{x + 3:.1f}" y="{y + hauteur_ligne - 4}">{texte}</text></g>')
+        for enfant in sorted(noeud['enfants'].values(), key=lambda e: e['nom']):
+            dessiner(enfant, x, niveau + 1)
+            x += enfant['n'] / total * largeur
+
+    dessiner(racine, 0.0, 0)
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" width="{largeur}" height="{hauteur}" '
+            f'font-family="monospace" font-size="11">'
+            f'<rect width="100%" height="100%" fill="#fdfdf6"/>'
+            f'<text x="4" y="{hauteur_ligne - 3}" font-size="13">{html.escape(titre)} — {racine["n"]} échantillons</text>'
+            + ''.join(rects) + '</svg>')
@@ -0,0 +1,241 @@
+"""
+rapprochement.py — Import des relevés bancaires et rapprochement automatique.
+
+Formats lus : CSV (export banque, séparateur ; ou ,), OFX et CAMT.053 (XML ISO 20022).
+Chaque relevé devient un DataFrame normalisé :
+    date (Timestamp), montant (float, négatif = débit), libelle (str), reference (str)
+
+Le rapprochement associe chaque ligne à au plus un « attendu » (dépense à régler
+ou appel de fonds à encaisser) : index trié sur les montants en centimes,
+recherche par bisection dans la tolérance, filtre de fenêtre de dates, puis
+affectation gloutonne un-pour-un par score. O(n log n + candidats).
+"""
+
+import io
+import re
+import csv
+import hashlib
+import unicodedata
+import xml.etree.ElementTree as ET
+
+import numpy as np
+import pandas as pd
+
+from doublons import normaliser_fournisseur, similarite
+
+COLONNES = ['date', 'montant', 'libelle', 'reference']
+
+
+# ==================== LECTURE DES RELEVÉS ====================
+
+def _sans_accents(s) -> str:
+    return unicodedata.normalize('NFKD', str(s)).encode('ascii', 'ignore').decode().lower().strip()
+
+
+def _nombre(v) -> float:
+    """« 1 234,56 », « -1234.56 », « 1.234,56 » → float (NaN si vide)."""
+    if v is None or (isinstance(v, float) and pd.isna(v)):
+        return float('nan')
+    if isinstance(v, (int, float, np.number)):
+        return float(v)
+    s = str(v).strip().replace(' ', '').replace(' ', '').replace('€', '')
+    if not s:
+        return float('nan')
+    if ',' in s and '.' in s:
+        s = s.replace('.', '').replace(',', '.') if s.rfind(',') > s.rfind('.') else s.replace(',', '')
+    else:
+        s = s.replace(',', '.')
+    try:
+        return float(s)
+    except ValueError:
+        return float('nan')
+
+
+def _references(df: pd.DataFrame) -> pd.Series:
+    """Référence stable pour les lignes sans identifiant banque (ré-import sans doublon)."""
+    base = (df['date'].dt.strftime('%Y-%m-%d') + '|' + df['montant'].map('{:.2f}'.format)
+            + '|' + df['libelle'].astype(str))
+    rang = base.groupby(base).cumcount().astype(str)
+    return (base + '|' + rang).map(lambda s: 'H' + hashlib.sha1(s.encode('utf-8')).hexdigest()[:20])
+
+
+def _finaliser(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.dropna(subset=['date', 'montant']).copy()
+    df['libelle'] = df['libelle'].fillna('').astype(str).str.strip()
+    if 'reference' not in df.columns:
+        df['reference'] = ''
+    df['reference'] = df['reference'].fillna('').astype(str).str.strip()
+    sans_ref = df['reference'] == ''
+    if sans_ref.any():
+        df.loc[sans_ref, 'reference'] = _references(df[sans_ref])
+    return df[COLONNES].sort_values('date').reset_index(drop=True)
+
+
+def _lire_csv(texte: str) -> pd.DataFrame:
+    # Les exports bancaires ont souvent quelques lignes d'en-tête avant le tableau
+    lignes = texte.splitlines()
+    debut = next((i for i, l in enumerate(lignes[:30])
+                  if 'date' in _sans_accents(l) and re.search(r'montant|debit|credit|amount', _sans_accents(l))), 0)
+    corps = '\n'.join(lignes[debut:])
+    try:
+        sep = csv.Sniffer().sniff(corps[:2000], delimiters=';,\t').delimiter
+    except csv.Error:
+        sep = ';'
+    brut = pd.read_csv(io.StringIO(corps), sep=sep, dtype=str, keep_default_na=False)
+    cols = {_sans_accents(c): c for c in brut.columns}
+
+    def trouver(*motifs):
+        for m in motifs:
+            for k, c in cols.items():
+                if re.search(m, k):
+                    return c
+        return None
+
+    c_date = trouver(r'^date( d.?operation)?$', r'date')
+    c_mont = trouver(r'^montant', r'amount')
+    c_deb, c_cre = trouver(r'debit'), trouver(r'credit')
+    c_lib = trouver(r'libelle', r'label', r'description', r'intitule', r'detail')
+    c_ref = trouver(r'^reference', r'^ref')
+    if c_date is None or (c_mont is None and c_deb is None and c_cre is None):
+        raise ValueError("Colonnes date / montant introuvables dans le CSV.")
+
+    if c_mont is not None:
+        montant = brut[c_mont].map(_nombre)
+    else:
+        deb = brut[c_deb].map(_nombre).fillna(0).abs() if c_deb else 0
+        cre = brut[c_cre].map(_nombre).fillna(0).abs() if c_cre else 0
+        montant = cre - deb
+    return pd.DataFrame({
+        'date': pd.to_datetime(brut[c_date], dayfirst=True, errors='coerce'),
+        'montant': montant,
+        'libelle': brut[c_lib] if c_lib else '',
+        'reference': brut[c_ref] if c_ref else '',
+    })
+
+
+def _lire_ofx(texte: str) -> pd.DataFrame:
+    """OFX 1.x (SGML, balises non fermées) comme 2.x (XML)."""
+    def champ(bloc, tag):
+        m = re.search(rf'<{tag}>([^<\r\n]*)', bloc, re.I)
+        return m.group(1).strip() if m else ''
+    lignes = []
+    for bloc in re.findall(r'<STMTTRN>(.*?)(?:</STMTTRN>|(?=<STMTTRN>)|</BANKTRANLIST>)', texte, re.S | re.I):
+        libelle = ' '.join(x for x in (champ(bloc, 'NAME'), champ(bloc, 'MEMO')) if x)
+        lignes.append({
+            'date': pd.to_datetime(champ(bloc, 'DTPOSTED')[:8], format='%Y%m%d', errors='coerce'),
+            'montant': _nombre(champ(bloc, 'TRNAMT')),
+            'libelle': libelle,
+            'reference': champ(bloc, 'FITID'),
+        })
+    return pd.DataFrame(lignes, columns=COLONNES)
+
+
+def _lire_camt(contenu: bytes) -> pd.DataFrame:
+    """CAMT.053 : une ligne par <Ntry> (les sous-transactions groupées ne sont pas éclatées)."""
+    racine = ET.fromstring(contenu)
+    for el in racine.iter():
+        el.tag = el.tag.split('}')[-1]  # espace de noms camt.053.001.xx ignoré
+
+    def texte(noeud, chemin):
+        x = noeud.find(chemin)
+        return x.text.strip() if x is not None and x.text else ''
+
+    lignes = []
+    for ntry in racine.iter('Ntry'):
+        montant = _nombre(texte(ntry, 'Amt'))
+        if texte(ntry, 'CdtDbtInd') == 'DBIT':
+            montant = -abs(montant)
+        date = texte(ntry, 'BookgDt/Dt') or texte(ntry, 'BookgDt/DtTm')[:10] or texte(ntry, 'ValDt/Dt')
+        libs = [texte(ntry, 'AddtlNtryInf')]
+        for chemin in ('.//RltdPties/Cdtr/Nm', './/RltdPties/Dbtr/Nm', './/RmtInf/Ustrd'):
+            libs += [x.text.strip() for x in ntry.findall(chemin) if x.text]
+        lignes.append({
+            'date': pd.to_datetime(date, errors='coerce'),
+            'montant': montant,
+            'libelle': ' '.join(dict.fromkeys(l for l in libs if l)),
+            'reference': texte(ntry, 'AcctSvcrRef') or texte(ntry, 'NtryRef'),
+        })
+    return pd.DataFrame(lignes, columns=COLONNES)
+
+
+def lire_releve(contenu: bytes, nom_fichier: str) -> pd.DataFrame:
+    """Lit un relevé CSV, OFX ou CAMT.053 (détecté par extension puis contenu)."""
+    ext = nom_fichier.rsplit('.', 1)[-1].lower()
+    debut = contenu[:500].lstrip()
+    if ext == 'ofx' or b'<OFX>' in contenu[:4000].upper() or b'OFXHEADER' in debut.upper():
+        df = _lire_ofx(contenu.decode('latin-1'))
+    elif ext == 'xml' or debut.startswith(b'<?xml'):
+        df = _lire_camt(contenu)
+    else:
+        try:
+            texte = contenu.decode('utf-8-sig')
+        except UnicodeDecodeError:
+            texte = contenu.decode('latin-1')
+        df = _lire_csv(texte)
+    return _finaliser(df)
+
+
+# ==================== RAPPROCHEMENT ====================
+
+def rapprocher(lignes: pd.DataFrame, attendus: pd.DataFrame, tolerance_montant=0.0,
+               jours_avant=5, jours_apres=60) -> pd.DataFrame:
+    """Associe des lignes bancaires à des montants attendus.
+
+    lignes   : index quelconque, colonnes date, montant (> 0), libelle
+    attendus : colonnes id, date, montant (> 0, reste dû), tiers
+    Une ligne est candidate pour un attendu si |écart montant| ≤ tolerance_montant
+    et si sa date tombe entre date attendue - jours_avant et date attendue + jours_apres.
+    Retourne les couples retenus : ligne, id, ecart_jours, ecart_montant, similarite.
+    """
+    vide = pd.DataFrame(columns=['ligne', 'id', 'ecart_jours', 'ecart_montant', 'similarite'])
+    if lignes.empty or attendus.empty:
+        return vide
+
+    # Index trié des attendus par montant (centimes)
+    att = attendus.assign(_cts=(attendus['montant'] * 100).round().astype('int64')).sort_values('_cts')
+    a_cts = att['_cts'].to_numpy()
+    l_cts = (lignes['montant'].to_numpy() * 100).round().astype('int64')
+    tol = int(round(tolerance_montant * 100))
+    lo = np.searchsorted(a_cts, l_cts - tol, side='left')
+    hi = np.searchsorted(a_cts, l_cts + tol, side='right')
+    nb = hi - lo
+    if nb.sum() == 0:
+        return vide
+
+    # Expansion des intervalles de candidats (vectorisé)
+    pos_l = np.repeat(np.arange(len(lignes)), nb)
+    decal = np.arange(nb.sum()) - np.repeat(np.cumsum(nb) - nb, nb)
+    pos_a = np.repeat(lo, nb) + decal
+
+    l_dates = pd.to_datetime(lignes['date']).to_numpy()
+    a_dates = pd.to_datetime(att['date']).to_numpy()
+    ecart = (l_dates[pos_l] - a_dates[pos_a]).astype('timedelta64[D]').astype(int)
+    ok = (ecart >= -jours_avant) & (ecart <= jours_apres)
+    pos_l, pos_a, ecart = pos_l[ok], pos_a[ok], ecart[ok]
+    if len(pos_l) == 0:
+        return vide
+
+    cand = pd.DataFrame({
+        'ligne': lignes.index.to_numpy()[pos_l],
+        'id': att['id'].to_numpy()[pos_a],
+        'ecart_jours': ecart,
+        'ecart_montant': (l_cts[pos_l] - a_cts[pos_a]) / 100,
+        '_lib': lignes['libelle'].to_numpy()[pos_l],
+        '_tiers': att['tiers'].to_numpy()[pos_a],
+    })
+    # Ressemblance libellé bancaire / tiers, calculée une fois par couple distinct
+    paires = cand[['_lib', '_tiers']].drop_duplicates()
+    sims = {(l, t): similarite(normaliser_fournisseur(t), normaliser_fournisseur(l))
+            for l, t in zip(paires['_lib'], paires['_tiers'])}
+    cand['similarite'] = [sims[(l, t)] for l, t in zip(cand['_lib'], cand['_tiers'])]
+
+    # Affectation gloutonne : meilleur nom, puis montant exact, puis date la plus proche
+    cand['_score'] = (cand['similarite'] * 100 - cand['ecart_montant'].abs() * 10
+                      - cand['ecart_jours'].abs() * 0.5)
+    cand = cand.sort_values('_score', ascending=False)
+    pris_l, pris_a, garde = set(), set(), []
+    for i, (l, a) in enumerate(zip(cand['ligne'], cand['id'])):
+        if l in pris_l or a in pris_a:
+            continue
+        pris_l.add(l); pris_a.add(a); garde.append(i)
+    return cand.iloc[garde][vide.columns].reset_index(drop=True)
@@ -0,0 +1,294 @@
+"""
+repartition.py — Clés de répartition et tantièmes des lots.
+
+Les clés sont des données (table `cles_repartition`) : code, total, classes
+comptables couvertes, libellés. Les tantièmes sont stockés creux (table
+`tantiemes_lots` : une ligne par lot et par clé non nulle), la plupart des lots
+n'ayant rien sur les clés spéciales.
+
+`MatriceTantiemes` range ces lignes en matrice creuse (format CSR : lots en
+lignes, clés en colonnes) ; la répartition d'un montant par clé ne parcourt que
+les tantièmes non nuls.
+
+Les tantièmes sont historisés (date_debut incluse, date_fin exclue, vides =
+sans limite) : `IndexTantiemes` découpe l'historique en intervalles où rien ne
+change et rend la matrice valable à une date donnée par une seule recherche
+dichotomique.
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+import monnaie
+
+# Clés de la résidence d'origine (et colonnes historiques de `coproprietaires`)
+CLES_DEFAUT = [
+    {'cle': 'general',    'colonne': 'tantieme_general',         'total': 10000, 'libelle': 'Charges générales',        'emoji': '🏢', 'classes': ['1A', '1B', '7'], 'libelle_pdf': 'CHARGES COMMUNES GENERALES'},
+    {'cle': 'ascenseurs', 'colonne': 'tantiemes_ascenseur',      'total': 1000,  'libelle': 'Ascenseurs',               'emoji': '🛗', 'classes': ['5'],             'libelle_pdf': 'ASCENSEURS'},
+    {'cle': 'rdc_ssols',  'colonne': 'tantiemes_special_rdc_ss', 'total': 928,   'libelle': 'Charges spéc. RDC S/Sols', 'emoji': '🅿️', 'classes': ['2'],             'libelle_pdf': 'CHARGES SPECIALES RDC S/SOLS'},
+    {'cle': 'ssols_elec', 'colonne': 'tantieme_ssols',           'total': 20,    'libelle': 'Charges spéc. S/Sols',     'emoji': '⬇️', 'classes': ['3'],             'libelle_pdf': 'CHARGES SPECIALES S/SOLS'},
+    {'cle': 'garages',    'colonne': 'tantieme_garages',         'total': 28,    'libelle': 'Garages / Parkings',       'emoji': '🔑', 'classes': ['4'],             'libelle_pdf': 'CHARGES GARAGES/PARKINGS'},
+    {'cle': 'ssols',      'colonne': 'tantieme_monte_voitures',  'total': 20,    'libelle': 'Monte-voitures',           'emoji': '🚗', 'classes': ['6'],             'libelle_pdf': 'MONTE VOITURES'},
+]
+
+CLE_GENERALE = 'general'  # clé de repli et base du fonds de travaux Alur
+
+
+def config_cles(lignes) -> dict:
+    """Lignes de `cles_repartition` → {cle: {'col', 'total', 'label', 'emoji', 'classes', 'libelle_pdf'}}.
+
+    Les classes peuvent venir de la base sous forme de texte « 1A,1B,7 ».
+    """
+    config = {}
+    for l in sorted(lignes, key=lambda l: (l.get('ordre') or 0)):
+        classes = l.get('classes') or []
+        if isinstance(classes, str):
+            classes = [c.strip() for c in classes.split(',') if c.strip()]
+        config[str(l['cle'])] = {
+            'col':         l.get('colonne'),
+            'total':       float(l.get('total') or 0),
+            'label':       str(l.get('libelle') or l['cle']),
+            'emoji':       str(l.get('emoji') or '🔑'),
+            'classes':     [str(c) for c in classes],
+            'libelle_pdf': str(l.get('libelle_pdf') or l.get('libelle') or l['cle']).upper(),
+        }
+    return config
+
+
+def mapping_classes(config: dict) -> dict:
+    """{classe comptable: cle} d'après la configuration des clés."""
+    return {c: cle for cle, cfg in config.items() for c in cfg['classes']}
+
+
+def tantiemes_depuis_colonnes(copro_df: pd.DataFrame, config: dict) -> pd.DataFrame:
+    """Colonnes historiques de `coproprietaires` → lignes creuses (coproprietaire_id, cle, tantiemes)."""
+    morceaux = []
+    for cle, cfg in config.items():
+        col = cfg.get('col')
+        if not col or col not in copro_df.columns:
+            continue
+        t = pd.to_numeric(copro_df[col], errors='coerce').fillna(0)
+        ok = t != 0
+        morceaux.append(pd.DataFrame({'coproprietaire_id': copro_df.loc[ok, 'id'].astype(int).values,
+                                      'cle': cle, 'tantiemes': t[ok].astype(float).values}))
+    if not morceaux:
+        return pd.DataFrame(columns=['coproprietaire_id', 'cle', 'tantiemes'])
+    return pd.concat(morceaux, ignore_index=True)
+
+
+def lignes_tantiemes(lignes: pd.DataFrame, copro_df, config: dict) -> pd.DataFrame:
+    """Lignes de `tantiemes_lots` typées (tantièmes numériques, dates) pour IndexTantiemes.
+    Tant que la table est vide, elles sont lues dans les colonnes de `copro_df`."""
+    if lignes.empty:
+        if copro_df is None or copro_df.empty:
+            return pd.DataFrame(columns=['coproprietaire_id', 'cle', 'tantiemes', 'date_debut', 'date_fin'])
+        if 'tantieme' in copro_df.columns and pd.to_numeric(copro_df.get('tantieme_general'), errors='coerce').fillna(0).sum() == 0:
+            copro_df = copro_df.assign(tantieme_general=copro_df['tantieme'])
+        lignes = tantiemes_depuis_colonnes(copro_df, config)
+    lignes['tantiemes'] = pd.to_numeric(lignes['tantiemes'], errors='coerce').fillna(0)
+    for c in ('date_debut', 'date_fin'):
+        lignes[c] = pd.to_datetime(lignes[c], errors='coerce') if c in lignes.columns else pd.NaT
+    return lignes
+
+
+class MatriceTantiemes:
+    """Tantièmes creux lots × clés (CSR).
+
+    lots : ids de copropriétaires (ordre des lignes) ; cles : codes (ordre des colonnes)
+    indptr / indices / valeurs : stockage CSR des tantièmes non nuls.
+    """
+
+    def __init__(self, lots, cles, indptr, indices, valeurs, totaux):
+        self.lots = np.asarray(lots, dtype='int64')
+        self.cles = list(cles)
+        self.indptr = indptr
+        self.indices = indices
+        self.valeurs = valeurs
+        self.totaux = np.asarray(totaux, dtype=float)
+        self._pos_lot = {int(l): i for i, l in enumerate(self.lots)}
+        self._pos_cle = {c: j for j, c in enumerate(self.cles)}
+        self._sommes = None
+        self._parts = {}
+        self._csc = None
+
+    @classmethod
+    def depuis_lignes(cls, lignes: pd.DataFrame, lots, config: dict) -> "MatriceTantiemes":
+        """lignes : coproprietaire_id, cle, tantiemes ; lots : ordre voulu des lignes de la matrice."""
+        cles = list(config)
+        lots = np.asarray(list(lots), dtype='int64')
+        pos_lot = pd.Series(np.arange(len(lots)), index=lots)
+        pos_cle = pd.Series(np.arange(len(cles)), index=cles, dtype='int64')
+        l = lignes[lignes['cle'].isin(cles) & lignes['coproprietaire_id'].isin(lots)]
+        l = l[pd.to_numeric(l['tantiemes'], errors='coerce').fillna(0) != 0]
+        r = pos_lot.reindex(l['coproprietaire_id'].astype('int64')).to_numpy()
+        c = pos_cle.reindex(l['cle']).to_numpy()
+        v = pd.to_numeric(l['tantiemes']).to_numpy(dtype=float)
+        ordre = np.lexsort((c, r))
+        r, c, v = r[ordre], c[ordre], v[ordre]
+        indptr = np.zeros(len(lots) + 1, dtype='int64')
+        np.cumsum(np.bincount(r, minlength=len(lots)), out=indptr[1:])
+        return cls(lots, cles, indptr, c, v, [config[k]['total'] for k in cles])
+
+    # ── Lecture ──────────────────────────────────────────────────
+    def _lignes(self) -> np.ndarray:
+        return np.repeat(np.arange(len(self.lots)), np.diff(self.indptr))
+
+    def _par_cle(self):
+        """Tantièmes rangés par clé (CSC) : (lignes, valeurs, bornes) ; ceux de la clé j
+        sont aux positions bornes[j]:bornes[j+1], lignes croissantes."""
+        if self._csc is None:
+            ordre = np.argsort(self.indices, kind='stable')
+            bornes = np.zeros(len(self.cles) + 1, dtype='int64')
+            np.cumsum(np.bincount(self.indices, minlength=len(self.cles)), out=bornes[1:])
+            self._csc = (self._lignes()[ordre], self.valeurs[ordre], bornes)
+        return self._csc
+
+    def du_lot(self, coproprietaire_id) -> dict:
+        """{cle: tantièmes} non nuls d'un lot."""
+        i = self._pos_lot.get(int(coproprietaire_id))
+        if i is None:
+            return {}
+        a, b = self.indptr[i], self.indptr[i + 1]
+        return {self.cles[j]: float(v) for j, v in zip(self.indices[a:b], self.valeurs[a:b])}
+
+    def position(self, coproprietaire_id):
+        """Ligne d'un lot dans la matrice, None s'il n'y figure pas."""
+        return self._pos_lot.get(int(coproprietaire_id))
+
+    def colonne(self, cle) -> np.ndarray:
+        """Vecteur dense des tantièmes d'une clé (ordre des lots)."""
+        out = np.zeros(len(self.lots))
+        j = self._pos_cle.get(cle)
+        if j is not None:
+            m = self.indices == j
+            out[self._lignes()[m]] = self.valeurs[m]
+        return out
+
+    def sommes(self) -> dict:
+        """Total des tantièmes saisis par clé (à comparer au total déclaré)."""
+        if self._sommes is None:
+            s = np.bincount(self.indices, weights=self.valeurs, minlength=len(self.cles))
+            self._sommes = {k: float(v) for k, v in zip(self.cles, s)}
+        return dict(self._sommes)
+
+    # ── Calcul ───────────────────────────────────────────────────
+    def repartir(self, montants: dict, repli: str = None) -> np.ndarray:
+        """Part de chaque lot pour chaque clé : matrice dense lots × clés (non arrondie).
+
+        montants : {cle: montant à répartir}. Une clé sans aucun tantième saisi est
+        répartie sur la clé `repli` si elle est donnée (au prorata de ses tantièmes).
+        """
+        m = np.array([float(montants.get(k, 0) or 0) for k in self.cles])
+        coef = np.divide(m, self.totaux, out=np.zeros_like(m), where=self.totaux > 0)
+        out = np.zeros((len(self.lots), len(self.cles)))
+        np.add.at(out, (self._lignes(), self.indices), self.valeurs * coef[self.indices])
+        if repli in self._pos_cle:
+            j_repli = self._pos_cle[repli]
+            vides = [j for j, s in enumerate(np.bincount(self.indices, minlength=len(self.cles)))
+                     if s == 0 and m[j] != 0 and j != j_repli]
+            if vides and self.totaux[j_repli] > 0:
+                base = self.colonne(repli) / self.totaux[j_repli]
+                for j in vides:
+                    out[:, j] = base * m[j]
+        return out
+
+    def repartir_centimes(self, montants: dict, repli: str = None) -> np.ndarray:
+        """Comme `repartir`, en centimes entiers (int64, lots × clés), au plus fort reste
+        (monnaie.repartir) : quand les tantièmes saisis couvrent le total déclaré d'une clé,
+        les parts des lots somment exactement au montant de la clé.
+        Le résultat est conservé par montants ; il est en lecture seule."""
+        m = monnaie.centimes([float(montants.get(k, 0) or 0) for k in self.cles])
+        cle = (tuple(m.tolist()), repli)
+        if cle not in self._parts:
+            lignes, valeurs, bornes = self._par_cle()
+            parts = np.zeros((len(self.lots), len(self.cles)), dtype='int64')
+            j_repli = self._pos_cle.get(repli)
+            if j_repli is not None and self.totaux[j_repli] <= 0:
+                j_repli = None
+            # Une clé à la fois, sur les seuls lots qui y ont des tantièmes ; une clé sans
+            # tantième saisi est répartie sur ceux de la clé de repli
+            for j in np.flatnonzero(m):
+                k = j_repli if bornes[j] == bornes[j + 1] and j_repli is not None else j
+                a, b = bornes[k], bornes[k + 1]
+                if a < b:
+                    parts[lignes[a:b], j] = monnaie.repartir(m[j], valeurs[a:b], self.totaux[k])
+            parts.flags.writeable = False
+            if len(self._parts) >= 32:
+                self._parts.clear()
+            self._parts[cle] = parts
+        return self._parts[cle]
+
+    def repartir_cle_centimes(self, cle, montant) -> np.ndarray:
+        """Comme `repartir_cle`, en centimes entiers au plus fort reste."""
+        j = self._pos_cle.get(cle)
+        parts = np.zeros(len(self.lots), dtype='int64')
+        if j is None or self.totaux[j] <= 0:
+            return parts
+        lignes, valeurs, bornes = self._par_cle()
+        a, b = bornes[j], bornes[j + 1]
+        if a < b:
+            parts[lignes[a:b]] = monnaie.repartir(monnaie.centimes(montant), valeurs[a:b], self.totaux[j])
+        return parts
+
+    def repartir_cle(self, cle, montant) -> np.ndarray:
+        """Répartit un montant sur une seule clé (ex. fonds Alur sur la clé générale)."""
+        j = self._pos_cle.get(cle)
+        if j is None or self.totaux[j] <= 0:
+            return np.zeros(len(self.lots))
+        return self.colonne(cle) / self.totaux[j] * float(montant)
+
+
+class IndexTantiemes:
+    """Index d'intervalles sur l'historique des tantièmes.
+
+    lignes : coproprietaire_id, cle, tantiemes, date_debut, date_fin (NaT = sans limite).
+    Les dates de début et de fin découpent le temps en segments ; la matrice d'un
+    segment (pour un ensemble de lots) est construite à la première demande puis
+    conservée, dans la limite des MATRICES_MAX dernières utilisées.
+    """
+
+    MATRICES_MAX = 16
+
+    def __init__(self, lignes: pd.DataFrame, config: dict):
+        self.config = config
+        l = lignes.copy()
+        for c in ('date_debut', 'date_fin'):
+            l[c] = pd.to_datetime(l[c], errors='coerce') if c in l.columns else pd.NaT
+        self._debut = l['date_debut'].fillna(pd.Timestamp.min).to_numpy()
+        self._fin = l['date_fin'].fillna(pd.Timestamp.max).to_numpy()
+        self.lignes = l
+        self.bornes = np.unique(pd.concat([l['date_debut'], l['date_fin']]).dropna().to_numpy())
+        self._matrices = OrderedDict()
+        self._verrou = threading.Lock()
+
+    def segment(self, date) -> int:
+        """Numéro du segment contenant `date` (0 = avant la première borne)."""
+        return int(np.searchsorted(self.bornes, np.datetime64(pd.Timestamp(date).normalize()), side='right'))
+
+    def debut_segment(self, date):
+        """Date à partir de laquelle les tantièmes valables à `date` s'appliquent (None = depuis toujours)."""
+        k = self.segment(date)
+        return pd.Timestamp(self.bornes[k - 1]) if k > 0 else None
+
+    def lignes_au(self, date) -> pd.DataFrame:
+        d = np.datetime64(pd.Timestamp(date).normalize())
+        return self.lignes[(self._debut <= d) & (d < self._fin)]
+
+    def matrice(self, lots, date=None) -> MatriceTantiemes:
+        """Matrice des tantièmes valables à `date` (aujourd'hui par défaut) pour `lots`."""
+        date = pd.Timestamp(date) if date is not None else pd.Timestamp.today()
+        cle = (self.segment(date), tuple(int(x) for x in lots))
+        with self._verrou:
+            mat = self._matrices.get(cle)
+            if mat is not None:
+                self._matrices.move_to_end(cle)
+                return mat
+        mat = MatriceTantiemes.depuis_lignes(self.lignes_au(date), cle[1], self.config)
+        with self._verrou:
+            self._matrices[cle] = mat
+            while len(self._matrices) > self.MATRICES_MAX:
+                self._matrices.popitem(last=False)
+        return mat
@@ -1 +1,279 @@
+-- Tables et colonnes ajoutées au schéma existant (à exécuter dans l'éditeur SQL Supabase).
 
+-- Texte extrait des factures PDF, pour la recherche plein texte des dépenses
+CREATE TABLE IF NOT EXISTS factures_texte (
+    depense_id  BIGINT PRIMARY KEY REFERENCES depenses(id) ON DELETE CASCADE,
+    texte       TEXT,
+    updated_at  TIMESTAMPTZ DEFAULT now()
+);
+
+-- Règlements des dépenses (mis à jour par le rapprochement bancaire)
+ALTER TABLE depenses ADD COLUMN IF NOT EXISTS montant_paye NUMERIC(12,2) DEFAULT 0;
+
+-- Lignes des relevés bancaires importés et leur rapprochement
+CREATE TABLE IF NOT EXISTS releve_bancaire (
+    id                 BIGSERIAL PRIMARY KEY,
+    date               DATE NOT NULL,
+    montant            NUMERIC(12,2) NOT NULL,      -- négatif = débit
+    libelle            TEXT,
+    reference          TEXT UNIQUE NOT NULL,        -- FITID / AcctSvcrRef, ou empreinte de la ligne
+    depense_id         BIGINT REFERENCES depenses(id) ON DELETE SET NULL,
+    coproprietaire_id  BIGINT REFERENCES coproprietaires(id) ON DELETE SET NULL,
+    appel              TEXT,                        -- ex. '2025-T2'
+    created_at         TIMESTAMPTZ DEFAULT now()
+);
+CREATE INDEX IF NOT EXISTS releve_bancaire_date_idx ON releve_bancaire(date);
+
+-- Comptes des copropriétaires : écritures (appels, régularisations, paiements, ajustements)
+-- avec le solde après chaque écriture (> 0 = dû par le copropriétaire)
+CREATE TABLE IF NOT EXISTS compte_copro_ecritures (
+    id                 BIGSERIAL PRIMARY KEY,
+    coproprietaire_id  BIGINT NOT NULL REFERENCES coproprietaires(id) ON DELETE CASCADE,
+    date               DATE NOT NULL,
+    nature             TEXT NOT NULL,               -- appel | regularisation | paiement | ajustement
+    libelle            TEXT,
+    debit              NUMERIC(12,2) DEFAULT 0,
+    credit             NUMERIC(12,2) DEFAULT 0,
+    solde              NUMERIC(12,2) NOT NULL,
+    reference          TEXT UNIQUE NOT NULL,        -- ex. 'appel:2025-T2:12', 'banque:<réf. relevé>'
+    created_at         TIMESTAMPTZ DEFAULT now()
+);
+CREATE INDEX IF NOT EXISTS compte_copro_ecritures_cop_idx ON compte_copro_ecritures(coproprietaire_id, id);
+
+-- Solde courant de chaque lot, tenu à jour à chaque écriture (évite de relire l'historique)
+CREATE TABLE IF NOT EXISTS compte_copro_soldes (
+    coproprietaire_id  BIGINT PRIMARY KEY REFERENCES coproprietaires(id) ON DELETE CASCADE,
+    solde              NUMERIC(12,2) NOT NULL DEFAULT 0,
+    updated_at         TIMESTAMPTZ DEFAULT now()
+);
+
+-- Appels de fonds émis : une ligne par lot, appel et clé de répartition (+ 'alur'),
+-- écrites en bloc à l'émission puis figées (relues par la régularisation et les relevés)
+CREATE TABLE IF NOT EXISTS appels_fonds (
+    id                 BIGSERIAL PRIMARY KEY,
+    annee              INTEGER NOT NULL,
+    periode            TEXT NOT NULL,               -- 'T1' … 'T4'
+    coproprietaire_id  BIGINT NOT NULL REFERENCES coproprietaires(id),
+    lot                INTEGER,
+    cle                TEXT NOT NULL,               -- clé de CHARGES_CONFIG ou 'alur'
+    montant            NUMERIC(12,2) NOT NULL,
+    nb_appels          INTEGER NOT NULL,
+    created_at         TIMESTAMPTZ DEFAULT now(),
+    UNIQUE (annee, periode, coproprietaire_id, cle)
+);
+CREATE INDEX IF NOT EXISTS appels_fonds_cop_idx ON appels_fonds(coproprietaire_id);
+
+CREATE OR REPLACE FUNCTION appels_fonds_immuable() RETURNS trigger AS $$
+BEGIN
+    RAISE EXCEPTION 'appels_fonds : un appel émis ne peut être ni modifié ni supprimé';
+END;
+$$ LANGUAGE plpgsql;
+DROP TRIGGER IF EXISTS appels_fonds_immuable ON appels_fonds;
+CREATE TRIGGER appels_fonds_immuable BEFORE UPDATE OR DELETE ON appels_fonds
+    FOR EACH ROW EXECUTE FUNCTION appels_fonds_immuable();
+
+-- Clés de répartition (données, éditables dans l'application) ; vide = clés par défaut de la résidence
+CREATE TABLE IF NOT EXISTS cles_repartition (
+    cle          TEXT PRIMARY KEY,                  -- ex. 'general', 'ascenseurs'
+    libelle      TEXT NOT NULL,
+    emoji        TEXT,
+    total        NUMERIC(12,2) NOT NULL,            -- total des tantièmes de la clé
+    classes      TEXT,                              -- classes du budget couvertes, ex. '1A,1B,7'
+    libelle_pdf  TEXT,
+    colonne      TEXT,                              -- colonne historique de coproprietaires, le cas échéant
+    ordre        INTEGER DEFAULT 0
+);
+
+-- Tantièmes creux : une ligne par lot et par clé non nulle
+CREATE TABLE IF NOT EXISTS tantiemes_lots (
+    coproprietaire_id  BIGINT NOT NULL REFERENCES coproprietaires(id) ON DELETE CASCADE,
+    cle                TEXT NOT NULL,
+    tantiemes          NUMERIC(12,2) NOT NULL,
+    PRIMARY KEY (coproprietaire_id, cle)
+);
+CREATE INDEX IF NOT EXISTS tantiemes_lots_cle_idx ON tantiemes_lots(cle);
+
+-- Reprise des colonnes historiques (à exécuter une fois)
+INSERT INTO tantiemes_lots (coproprietaire_id, cle, tantiemes)
+SELECT id, cle, t FROM coproprietaires,
+    LATERAL (VALUES ('general',    tantieme_general),
+                    ('ascenseurs', tantiemes_ascenseur),
+                    ('rdc_ssols',  tantiemes_special_rdc_ss),
+                    ('ssols_elec', tantieme_ssols),
+                    ('garages',    tantieme_garages),
+                    ('ssols',      tantieme_monte_voitures)) AS v(cle, t)
+WHERE COALESCE(t, 0) <> 0
+ON CONFLICT DO NOTHING;
+
+-- Historique des tantièmes : chaque ligne vaut du date_debut (inclus) au date_fin (exclu),
+-- dates vides = sans limite. Une modification clôt la ligne en vigueur et en ouvre une nouvelle.
+ALTER TABLE tantiemes_lots ADD COLUMN IF NOT EXISTS id BIGSERIAL;
+ALTER TABLE tantiemes_lots ADD COLUMN IF NOT EXISTS date_debut DATE;
+ALTER TABLE tantiemes_lots ADD COLUMN IF NOT EXISTS date_fin DATE;
+ALTER TABLE tantiemes_lots DROP CONSTRAINT IF EXISTS tantiemes_lots_pkey;
+ALTER TABLE tantiemes_lots ADD PRIMARY KEY (id);
+CREATE UNIQUE INDEX IF NOT EXISTS tantiemes_lots_version_idx
+    ON tantiemes_lots(coproprietaire_id, cle, COALESCE(date_debut, '-infinity'::date));
+
+-- Plusieurs copropriétés dans une même base : chaque table métier porte immeuble_id
+-- (les données existantes sont rattachées à l'immeuble n° 1, la résidence d'origine)
+CREATE TABLE IF NOT EXISTS immeubles (
+    id        BIGSERIAL PRIMARY KEY,
+    code      TEXT UNIQUE NOT NULL,                 -- préfixe des références copropriétaires, ex. '0275'
+    nom       TEXT NOT NULL,
+    adresse   TEXT,
+    cp_ville  TEXT,
+    ville     TEXT
+);
+INSERT INTO immeubles (id, code, nom, adresse, cp_ville, ville)
+VALUES (1, '0275', 'VILLA TOBIAS (0275)', '52 RUE SMOLETT', '06300 NICE', 'NICE')
+ON CONFLICT DO NOTHING;
+SELECT setval(pg_get_serial_sequence('immeubles', 'id'), GREATEST((SELECT MAX(id) FROM immeubles), 1));
+
+DO $$
+DECLARE t TEXT;
+BEGIN
+    FOREACH t IN ARRAY ARRAY['ag', 'ag_documents', 'ag_items', 'appels_fonds', 'budget',
+                             'cles_repartition', 'compte_copro_ecritures', 'compte_copro_soldes',
+                             'contrats', 'coproprietaires', 'depenses', 'factures_texte',
+                             'fiches_tokens', 'locataires', 'loi_alur', 'plan_comptable',
+                             'releve_bancaire', 'tantiemes_lots', 'travaux_votes']
+    LOOP
+        EXECUTE format('ALTER TABLE %I ADD COLUMN IF NOT EXISTS immeuble_id BIGINT NOT NULL DEFAULT 1 REFERENCES immeubles(id)', t);
+        EXECUTE format('CREATE INDEX IF NOT EXISTS %I ON %I(immeuble_id)', t || '_immeuble_idx', t);
+    END LOOP;
+END $$;
+
+-- Unicités propres à chaque immeuble
+ALTER TABLE releve_bancaire DROP CONSTRAINT IF EXISTS releve_bancaire_reference_key;
+ALTER TABLE releve_bancaire ADD CONSTRAINT releve_bancaire_reference_key UNIQUE (immeuble_id, reference);
+ALTER TABLE compte_copro_ecritures DROP CONSTRAINT IF EXISTS compte_copro_ecritures_reference_key;
+ALTER TABLE compte_copro_ecritures ADD CONSTRAINT compte_copro_ecritures_reference_key UNIQUE (immeuble_id, reference);
+ALTER TABLE cles_repartition DROP CONSTRAINT IF EXISTS cles_repartition_pkey;
+ALTER TABLE cles_repartition ADD PRIMARY KEY (immeuble_id, cle);
+
+-- Sonde de changement : version de chaque table par immeuble, incrémentée à chaque écriture.
+-- L'application lit cette petite table au lieu de relire les tables qui n'ont pas changé.
+CREATE TABLE IF NOT EXISTS versions_tables (
+    immeuble_id  BIGINT NOT NULL REFERENCES immeubles(id),
+    table_name   TEXT NOT NULL,
+    version      BIGINT NOT NULL DEFAULT 1,
+    modifie_le   TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (immeuble_id, table_name)
+);
+
+CREATE OR REPLACE FUNCTION versions_tables_maj() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO versions_tables AS v (immeuble_id, table_name)
+        SELECT DISTINCT immeuble_id, TG_TABLE_NAME FROM nouvelles
+        ON CONFLICT (immeuble_id, table_name) DO UPDATE SET version = v.version + 1, modifie_le = now();
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO versions_tables AS v (immeuble_id, table_name)
+        SELECT DISTINCT immeuble_id, TG_TABLE_NAME FROM anciennes
+        ON CONFLICT (immeuble_id, table_name) DO UPDATE SET version = v.version + 1, modifie_le = now();
+    ELSE
+        INSERT INTO versions_tables AS v (immeuble_id, table_name)
+        SELECT immeuble_id, TG_TABLE_NAME FROM nouvelles UNION SELECT immeuble_id, TG_TABLE_NAME FROM anciennes
+        ON CONFLICT (immeuble_id, table_name) DO UPDATE SET version = v.version + 1, modifie_le = now();
+    END IF;
+    RETURN NULL;
+END $$;
+
+-- Un trigger par instruction (et non par ligne) : un insert de 50 lignes = une incrémentation
+DO $$
+DECLARE t TEXT;
+BEGIN
+    FOREACH t IN ARRAY ARRAY['ag', 'ag_documents', 'ag_items', 'appels_fonds', 'budget',
+                             'cles_repartition', 'compte_copro_ecritures', 'compte_copro_soldes',
+                             'contrats', 'coproprietaires', 'depenses', 'factures_texte',
+                             'fiches_tokens', 'locataires', 'loi_alur', 'plan_comptable',
+                             'releve_bancaire', 'tantiemes_lots', 'travaux_votes']
+    LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', t || '_version_ins', t);
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', t || '_version_upd', t);
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', t || '_version_del', t);
+        EXECUTE format('CREATE TRIGGER %I AFTER INSERT ON %I REFERENCING NEW TABLE AS nouvelles '
+                       'FOR EACH STATEMENT EXECUTE FUNCTION versions_tables_maj()', t || '_version_ins', t);
+        EXECUTE format('CREATE TRIGGER %I AFTER UPDATE ON %I REFERENCING OLD TABLE AS anciennes NEW TABLE AS nouvelles '
+                       'FOR EACH STATEMENT EXECUTE FUNCTION versions_tables_maj()', t || '_version_upd', t);
+        EXECUTE format('CREATE TRIGGER %I AFTER DELETE ON %I REFERENCING OLD TABLE AS anciennes '
+                       'FOR EACH STATEMENT EXECUTE FUNCTION versions_tables_maj()', t || '_version_del', t);
+    END LOOP;
+END $$;
+
+-- Changements poussés (Supabase Realtime) : tables publiées, anciennes lignes complètes
+-- dans les suppressions pour connaître leur immeuble
+DO $$
+DECLARE t TEXT;
+BEGIN
+    FOREACH t IN ARRAY ARRAY['ag', 'ag_documents', 'ag_items', 'appels_fonds', 'budget',
+                             'cles_repartition', 'compte_copro_ecritures', 'compte_copro_soldes',
+                             'contrats', 'coproprietaires', 'depenses', 'factures_texte',
+                             'fiches_tokens', 'locataires', 'loi_alur', 'plan_comptable',
+                             'releve_bancaire', 'tantiemes_lots', 'travaux_votes']
+    LOOP
+        EXECUTE format('ALTER TABLE %I REPLICA IDENTITY FULL', t);
+        BEGIN
+            EXECUTE format('ALTER PUBLICATION supabase_realtime ADD TABLE %I', t);
+        EXCEPTION WHEN duplicate_object OR undefined_object THEN
+            NULL;  -- déjà publiée, ou base sans Realtime
+        END;
+    END LOOP;
+END $$;
+
+-- Miroir local (miroir.py) : horodatage de dernière modification, filigrane de la
+-- synchronisation incrémentale
+CREATE OR REPLACE FUNCTION updated_at_maj() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.updated_at = now();
+    RETURN NEW;
+END $$;
+
+DO $$
+DECLARE t TEXT;
+BEGIN
+    FOREACH t IN ARRAY ARRAY['ag', 'budget', 'contrats', 'coproprietaires', 'depenses',
+                             'locataires', 'loi_alur', 'plan_comptable', 'travaux_votes']
+    LOOP
+        EXECUTE format('ALTER TABLE %I ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now()', t);
+        EXECUTE format('CREATE INDEX IF NOT EXISTS %I ON %I (immeuble_id, updated_at, id)', t || '_updated_at_idx', t);
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', t || '_updated_at', t);
+        EXECUTE format('CREATE TRIGGER %I BEFORE UPDATE ON %I '
+                       'FOR EACH ROW EXECUTE FUNCTION updated_at_maj()', t || '_updated_at', t);
+    END LOOP;
+END $$;
+
+-- Passation d'écritures sur les comptes copropriétaires (donnees.passer_ecritures) :
+-- écritures et soldes courants dans une même transaction. Le solde de chaque lot est
+-- verrouillé par l'upsert : deux passations simultanées sur un lot se suivent au lieu
+-- d'écraser le solde l'une de l'autre. Les références déjà passées sont ignorées.
+CREATE OR REPLACE FUNCTION passer_ecritures_copro(p_immeuble_id BIGINT, p_ecritures JSONB)
+RETURNS INTEGER LANGUAGE plpgsql AS $$
+DECLARE
+    e RECORD;
+    v_solde NUMERIC(12,2);
+    n INTEGER := 0;
+BEGIN
+    FOR e IN
+        -- WITH ORDINALITY n'accepte pas de liste de définition de colonnes : ROWS FROM
+        SELECT * FROM ROWS FROM (jsonb_to_recordset(p_ecritures)
+                                 AS (coproprietaire_id BIGINT, date DATE, nature TEXT, libelle TEXT,
+                                     debit NUMERIC, credit NUMERIC, reference TEXT)) WITH ORDINALITY
+            AS x(coproprietaire_id, date, nature, libelle, debit, credit, reference, rang)
+        ORDER BY rang
+    LOOP
+        CONTINUE WHEN EXISTS (SELECT 1 FROM compte_copro_ecritures
+                              WHERE immeuble_id = p_immeuble_id AND reference = e.reference);
+        INSERT INTO compte_copro_soldes AS s (coproprietaire_id, solde, immeuble_id)
+        VALUES (e.coproprietaire_id, COALESCE(e.debit, 0) - COALESCE(e.credit, 0), p_immeuble_id)
+        ON CONFLICT (coproprietaire_id) DO UPDATE SET solde = s.solde + EXCLUDED.solde, updated_at = now()
+        RETURNING solde INTO v_solde;
+        INSERT INTO compte_copro_ecritures
+            (coproprietaire_id, date, nature, libelle, debit, credit, solde, reference, immeuble_id)
+        VALUES (e.coproprietaire_id, e.date, e.nature, e.libelle, COALESCE(e.debit, 0),
+                COALESCE(e.credit, 0), v_solde, e.reference, p_immeuble_id);
+        n := n + 1;
+    END LOOP;
+    RETURN n;
+END $$;
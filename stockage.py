@@ -0,0 +1,632 @@
+"""
+stockage.py — Stockage local (SQLite + fichiers) à la place de Supabase.
+
+`ClientSQLite` reprend la partie de l'API du client Supabase dont se sert
+l'application, si bien que les pages ne savent pas où vivent les données :
+
+    client.table(nom)
+        .select('*' | 'a,b', count='exact', head=False)
+        .insert(ligne | lignes) / .upsert(..., on_conflict='a,b') / .update(valeurs) / .delete()
+        .eq / .neq / .gt / .gte / .lt / .lte / .in_ / .is_ / .not_.is_ / .or_
+        .order(col, desc=False) / .limit(n) / .range(debut, fin)
+        .execute()  → réponse avec `.data` (liste de dicts) et `.count`
+    client.rpc(fonction, parametres).execute()  → fonctions SQL de setup_supabase.sql
+        reprises en Python (méthodes `_rpc_<fonction>`), dans une seule transaction
+    client.storage.from_(seau)
+        .upload / .download / .remove / .create_signed_url / .create_signed_urls / .list
+
+Les lignes sont rangées sans schéma (JSON, une ligne SQLite par enregistrement) :
+aucune migration à jouer, les colonnes sont celles que l'application écrit. Les
+tables à clé `id` reçoivent un id croissant à l'insertion ; `created_at` et
+`updated_at` sont renseignés comme le feraient les valeurs par défaut et le
+trigger de setup_supabase.sql, et `versions_tables` est tenue à jour à chaque
+écriture (sonde de changement, voir immeubles.py).
+
+`id` et `immeuble_id` sont aussi recopiés dans des colonnes SQLite indexées : les
+filtres eq / in_ / gt / gte / lt / lte sur ces colonnes deviennent un WHERE, qui ne
+lit que les lignes candidates. Les filtres restent ensuite évalués en Python (types
+alignés comme PostgreSQL) : le WHERE ne fait qu'écarter des lignes qu'ils refuseraient.
+Prévu pour une copropriété ou quelques-unes, pour les installations sans réseau,
+les essais et les mesures de charge.
+
+Fichiers : un dossier par seau. Les URL « signées » sont des URL `data:`, ou
+l'adresse sous laquelle un serveur publie le dossier (`url_fichiers`).
+"""
+
+import os
+import re
+import json
+import base64
+import sqlite3
+import threading
+import mimetypes
+from datetime import datetime, timezone
+
+# Clés primaires qui ne sont pas un id auto-incrémenté (setup_supabase.sql)
+CLES_PRIMAIRES = {
+    'factures_texte':      ('depense_id',),
+    'compte_copro_soldes': ('coproprietaire_id',),
+    'cles_repartition':    ('immeuble_id', 'cle'),
+    'versions_tables':     ('immeuble_id', 'table_name'),
+}
+
+# Colonnes recopiées hors du JSON (valeur entière) et indexées avec la table
+COLONNES_INDEXEES = ('id', 'immeuble_id')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS lignes (
+    num INTEGER PRIMARY KEY AUTOINCREMENT, tbl TEXT NOT NULL, donnees TEXT NOT NULL,
+    id INTEGER, immeuble_id INTEGER);
+"""
+
+_INDEX = """
+DROP INDEX IF EXISTS lignes_tbl;
+CREATE INDEX IF NOT EXISTS lignes_tbl_id ON lignes (tbl, id);
+CREATE INDEX IF NOT EXISTS lignes_tbl_immeuble ON lignes (tbl, immeuble_id);
+"""
+
+
+class ErreurStockage(Exception):
+    """Requête refusée par le stockage local (équivalent des erreurs PostgREST / Storage)."""
+
+
+def _maintenant() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+# ==================== COMPARAISONS ====================
+
+def _aligner(a, b):
+    """Rend deux valeurs comparables, comme PostgreSQL convertit le texte du filtre
+    vers le type de la colonne."""
+    if isinstance(a, bool) or isinstance(b, bool):
+        vrai = {'true': True, 'false': False}
+        a = vrai.get(str(a).lower(), a) if isinstance(a, str) else a
+        b = vrai.get(str(b).lower(), b) if isinstance(b, str) else b
+        return a, b
+    if isinstance(a, (int, float)) and isinstance(b, str):
+        try:
+            return a, float(b)
+        except ValueError:
+            return str(a), b
+    if isinstance(b, (int, float)) and isinstance(a, str):
+        try:
+            return float(a), b
+        except ValueError:
+            return a, str(b)
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        return a, b
+    a, b = str(a), str(b)
+    if _HORODATAGE.match(a) and _HORODATAGE.match(b):
+        # timestamptz : « …+00:00 » et « …Z » désignent le même instant
+        try:
+            return _instant(a), _instant(b)
+        except ValueError:
+            pass
+    return a, b
+
+
+_HORODATAGE = re.compile(r'^\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}')
+
+
+def _instant(texte):
+    t = datetime.fromisoformat(texte)
+    return t.replace(tzinfo=timezone.utc) if t.tzinfo is None else t
+
+
+def _comparer(valeur, operateur, ref) -> bool:
+    if operateur == 'is':
+        ref = None if str(ref).lower() == 'null' else ref
+        if ref is None:
+            return valeur is None
+        return valeur is not None and _aligner(valeur, ref)[0] == _aligner(valeur, ref)[1]
+    if operateur == 'in':
+        return valeur is not None and any(_comparer(valeur, 'eq', r) for r in ref)
+    if valeur is None:
+        return False
+    if operateur in ('like', 'ilike'):
+        motif = '^' + re.escape(str(ref)).replace('%', '.*').replace('_', '.') + '$'
+        return re.match(motif, str(valeur), re.S | (re.I if operateur == 'ilike' else 0)) is not None
+    a, b = _aligner(valeur, ref)
+    try:
+        return {'eq': a == b, 'neq': a != b, 'gt': a > b, 'gte': a >= b,
+                'lt': a < b, 'lte': a <= b}[operateur]
+    except KeyError:
+        raise ErreurStockage(f"Opérateur non géré : {operateur}")
+    except TypeError:
+        return False
+
+
+def _entier(v):
+    """Valeur entière que _aligner jugerait égale à v (5, 5.0, '5', True → 1), sinon None."""
+    if isinstance(v, bool):
+        return int(v)
+    try:
+        f = float(v)
+    except (TypeError, ValueError):
+        return None
+    return int(f) if f.is_integer() and abs(f) < 2 ** 63 else None
+
+
+def _cle_tri(v):
+    if isinstance(v, (bool, int, float)):
+        return (0, float(v))
+    return (1, str(v))
+
+
+# ==================== FILTRES or_(...) ====================
+
+def _decouper(texte):
+    """Découpe « a,b(c,d),e » aux virgules de premier niveau."""
+    morceaux, niveau, debut = [], 0, 0
+    for i, c in enumerate(texte):
+        if c == '(':
+            niveau += 1
+        elif c == ')':
+            niveau -= 1
+        elif c == ',' and niveau == 0:
+            morceaux.append(texte[debut:i])
+            debut = i + 1
+    morceaux.append(texte[debut:])
+    return [m.strip() for m in morceaux if m.strip()]
+
+
+def _condition(expr):
+    """Expression PostgREST (« col.op.valeur », « and(...) », « or(...) ») → prédicat sur une ligne."""
+    for logique, tous in (('and(', all), ('or(', any)):
+        if expr.startswith(logique) and expr.endswith(')'):
+            sous = [_condition(e) for e in _decouper(expr[len(logique):-1])]
+            return lambda l, sous=sous, tous=tous: tous(s(l) for s in sous)
+    colonne, operateur, valeur = expr.split('.', 2)
+    nier = operateur == 'not'
+    if nier:
+        operateur, valeur = valeur.split('.', 1)
+    if operateur == 'in':
+        valeur = [v.strip().strip('"') for v in valeur.strip('()').split(',')]
+    if nier:
+        return lambda l: not _comparer(l.get(colonne), operateur, valeur)
+    return lambda l: _comparer(l.get(colonne), operateur, valeur)
+
+
+# ==================== REQUÊTES ====================
+
+class Reponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+class _Negation:
+    def __init__(self, requete):
+        self._requete = requete
+
+    def is_(self, colonne, valeur):
+        return self._requete._filtrer(lambda l: not _comparer(l.get(colonne), 'is', valeur))
+
+
+class _Appel:
+    """Appel d'une fonction SQL (`client.rpc`), exécuté par `execute()`."""
+
+    def __init__(self, client, fonction, parametres):
+        self._client = client
+        self._fonction = fonction
+        self._parametres = parametres or {}
+
+    def execute(self) -> Reponse:
+        return self._client._appeler(self._fonction, self._parametres)
+
+
+class _Requete:
+    """Requête sur une table, construite comme avec postgrest-py puis exécutée par `execute()`."""
+
+    def __init__(self, client, table):
+        self._client = client
+        self._table = table
+        self._operation = 'select'
+        self._colonnes = None
+        self._compter = False
+        self._tete = False
+        self._filtres = []
+        self._where = []
+        self._ordres = []
+        self._limite = None
+        self._plage = None
+        self._donnees = None
+        self._conflit = None
+
+    # ── Opérations ───────────────────────────────────────────────
+    def select(self, *colonnes, count=None, head=None):
+        cols = [c.strip() for c in ','.join(colonnes or ('*',)).split(',') if c.strip()]
+        self._colonnes = None if '*' in cols else cols
+        self._compter, self._tete = bool(count), bool(head)
+        return self
+
+    def insert(self, donnees, **kwargs):
+        self._operation, self._donnees = 'insert', donnees
+        return self
+
+    def upsert(self, donnees, on_conflict=None, **kwargs):
+        self._operation, self._donnees = 'upsert', donnees
+        self._conflit = tuple(c.strip() for c in on_conflict.split(',')) if on_conflict else None
+        return self
+
+    def update(self, donnees, **kwargs):
+        self._operation, self._donnees = 'update', donnees
+        return self
+
+    def delete(self, **kwargs):
+        self._operation = 'delete'
+        return self
+
+    # ── Filtres ──────────────────────────────────────────────────
+    def _filtrer(self, predicat):
+        self._filtres.append(predicat)
+        return self
+
+    def _indexer(self, colonne, operateur, valeur):
+        """WHERE sur une colonne indexée, large : il garde toute ligne que le prédicat
+        Python accepterait (celui-ci reste appliqué)."""
+        if colonne not in COLONNES_INDEXEES:
+            return
+        if operateur in ('eq', 'in'):
+            entiers = [_entier(v) for v in (valeur if operateur == 'in' else [valeur])]
+            if None not in entiers:
+                self._where.append((f"{colonne} IN (SELECT value FROM json_each(?))", [json.dumps(entiers)]))
+        elif isinstance(valeur, (int, float)) and not isinstance(valeur, bool):
+            # Une valeur non entière (colonne NULL) est laissée au prédicat Python
+            signe = {'gt': '>', 'gte': '>=', 'lt': '<', 'lte': '<='}[operateur]
+            self._where.append((f"({colonne} {signe} ? OR {colonne} IS NULL)", [valeur]))
+
+    def _comparaison(self, colonne, operateur, valeur):
+        self._indexer(colonne, operateur, valeur)
+        return self._filtrer(lambda l: _comparer(l.get(colonne), operateur, valeur))
+
+    def eq(self, colonne, valeur):
+        return self._comparaison(colonne, 'eq', valeur)
+
+    def neq(self, colonne, valeur):
+        return self._filtrer(lambda l: _comparer(l.get(colonne), 'neq', valeur))
+
+    def gt(self, colonne, valeur):
+        return self._comparaison(colonne, 'gt', valeur)
+
+    def gte(self, colonne, valeur):
+        return self._comparaison(colonne, 'gte', valeur)
+
+    def lt(self, colonne, valeur):
+        return self._comparaison(colonne, 'lt', valeur)
+
+    def lte(self, colonne, valeur):
+        return self._comparaison(colonne, 'lte', valeur)
+
+    def like(self, colonne, motif):
+        return self._filtrer(lambda l: _comparer(l.get(colonne), 'like', motif))
+
+    def ilike(self, colonne, motif):
+        return self._filtrer(lambda l: _comparer(l.get(colonne), 'ilike', motif))
+
+    def in_(self, colonne, valeurs):
+        return self._comparaison(colonne, 'in', list(valeurs))
+
+    def is_(self, colonne, valeur):
+        return self._filtrer(lambda l: _comparer(l.get(colonne), 'is', valeur))
+
+    @property
+    def not_(self):
+        return _Negation(self)
+
+    def or_(self, filtres, **kwargs):
+        return self._filtrer(_condition(f"or({filtres})"))
+
+    # ── Tri et pagination ────────────────────────────────────────
+    def order(self, colonne, desc=False, **kwargs):
+        self._ordres.append((colonne, desc))
+        return self
+
+    def limit(self, n, **kwargs):
+        self._limite = int(n)
+        return self
+
+    def range(self, debut, fin, **kwargs):
+        self._plage = (int(debut), int(fin))
+        return self
+
+    # ── Exécution ────────────────────────────────────────────────
+    def _garde(self, ligne) -> bool:
+        return all(f(ligne) for f in self._filtres)
+
+    def execute(self) -> Reponse:
+        return self._client._executer(self)
+
+    def _projeter(self, lignes):
+        total = len(lignes)
+        for colonne, desc in reversed(self._ordres):
+            # NULLS LAST en ordre croissant, NULLS FIRST en décroissant (comme PostgreSQL)
+            lignes = sorted(lignes, key=lambda l: (True, (0, 0)) if l.get(colonne) is None
+                            else (False, _cle_tri(l.get(colonne))), reverse=desc)
+        if self._plage:
+            lignes = lignes[self._plage[0]:self._plage[1] + 1]
+        if self._limite is not None:
+            lignes = lignes[:self._limite]
+        if self._colonnes is not None:
+            lignes = [{c: l.get(c) for c in self._colonnes} for l in lignes]
+        return Reponse([] if self._tete else lignes, total if self._compter else None)
+
+
+class ClientSQLite:
+    """Client de stockage local, interchangeable avec le client Supabase (voir l'en-tête)."""
+
+    def __init__(self, chemin, dossier_fichiers, url_fichiers=None):
+        dossier = os.path.dirname(os.path.abspath(chemin))
+        os.makedirs(dossier, exist_ok=True)
+        self._conn = sqlite3.connect(chemin, check_same_thread=False)
+        self._verrou = threading.RLock()
+        with self._verrou, self._conn:
+            self._conn.executescript(_SCHEMA)
+            self._migrer()
+            self._conn.executescript(_INDEX)
+        self.storage = StockageFichiers(dossier_fichiers, url_fichiers)
+
+    def table(self, nom):
+        return _Requete(self, nom)
+
+    from_ = table
+
+    def rpc(self, fonction, parametres=None):
+        return _Appel(self, fonction, parametres)
+
+    def _migrer(self):
+        """Base créée avant les colonnes indexées : colonnes ajoutées puis remplies."""
+        colonnes = {c[1] for c in self._conn.execute("PRAGMA table_info(lignes)")}
+        manquantes = [c for c in COLONNES_INDEXEES if c not in colonnes]
+        if not manquantes:
+            return
+        for c in manquantes:
+            self._conn.execute(f"ALTER TABLE lignes ADD COLUMN {c} INTEGER")
+        self._conn.executemany(
+            "UPDATE lignes SET id=?, immeuble_id=? WHERE num=?",
+            [(*self._colonnes(json.loads(d)), num)
+             for num, d in self._conn.execute("SELECT num, donnees FROM lignes").fetchall()])
+
+    # ── Lignes ───────────────────────────────────────────────────
+    def _lignes(self, table, where=()):
+        """[(num, ligne)] de la table, restreintes par les clauses (sql, paramètres) de `where`."""
+        sql = ''.join(f" AND {clause}" for clause, _ in where)
+        parametres = [p for _, ps in where for p in ps]
+        return [(num, json.loads(d)) for num, d in self._conn.execute(
+            f"SELECT num, donnees FROM lignes WHERE tbl=?{sql} ORDER BY num", (table, *parametres))]
+
+    def _cle(self, table, conflit=None):
+        return conflit or CLES_PRIMAIRES.get(table, ('id',))
+
+    def _nouvel_id(self, table):
+        return (self._conn.execute("SELECT MAX(id) FROM lignes WHERE tbl=?", (table,)).fetchone()[0] or 0) + 1
+
+    @staticmethod
+    def _colonnes(ligne):
+        return [_entier(ligne.get(c)) for c in COLONNES_INDEXEES]
+
+    def _ecrire(self, table, num, ligne):
+        texte = json.dumps(ligne, default=str)
+        if num is None:
+            self._conn.execute("INSERT INTO lignes (tbl, donnees, id, immeuble_id) VALUES (?,?,?,?)",
+                               (table, texte, *self._colonnes(ligne)))
+        else:
+            self._conn.execute("UPDATE lignes SET donnees=?, id=?, immeuble_id=? WHERE num=?",
+                               (texte, *self._colonnes(ligne), num))
+
+    def _candidates(self, table, cle, donnees):
+        """Lignes existantes pouvant entrer en conflit avec `donnees` (upsert)."""
+        for colonne in ('id', 'immeuble_id'):
+            valeurs = [_entier(d.get(colonne)) for d in donnees]
+            if colonne in cle and None not in valeurs:
+                return self._lignes(table, [(f"{colonne} IN (SELECT value FROM json_each(?))",
+                                             [json.dumps(sorted(set(valeurs)))])])
+        return self._lignes(table)
+
+    def _versionner(self, table, lignes):
+        """Une version de plus par immeuble touché (comme le trigger par instruction)."""
+        if table == 'versions_tables':
+            return
+        immeubles = {l.get('immeuble_id', 1) for l in lignes}
+        entiers = [_entier(i) for i in immeubles]
+        where = [] if None in entiers else [("immeuble_id IN (SELECT value FROM json_each(?))",
+                                             [json.dumps(entiers)])]
+        existantes = {(l.get('immeuble_id'), l.get('table_name')): (num, l)
+                      for num, l in self._lignes('versions_tables', where)}
+        for immeuble_id in immeubles:
+            num, v = existantes.get((immeuble_id, table), (None, None))
+            v = {'immeuble_id': immeuble_id, 'table_name': table,
+                 'version': (v['version'] + 1) if v else 1, 'modifie_le': _maintenant()}
+            self._ecrire('versions_tables', num, v)
+
+    def _executer(self, requete) -> Reponse:
+        table, operation = requete._table, requete._operation
+        with self._verrou, self._conn:
+            if operation == 'select':
+                return requete._projeter([l for _, l in self._lignes(table, requete._where)
+                                          if requete._garde(l)])
+
+            if operation in ('insert', 'upsert'):
+                donnees = [requete._donnees] if isinstance(requete._donnees, dict) else list(requete._donnees)
+                cle = self._cle(table, requete._conflit)
+                serie = self._cle(table) == ('id',)  # id attribué même si le conflit porte sur d'autres colonnes
+                index = {tuple(l.get(c) for c in cle): (num, l)
+                         for num, l in (self._candidates(table, cle, donnees) if operation == 'upsert' else [])}
+                prochain = self._nouvel_id(table)
+                ecrites = []
+                for d in donnees:
+                    d = json.loads(json.dumps(d, default=str))
+                    existante = index.get(tuple(d.get(c) for c in cle)) \
+                        if operation == 'upsert' and all(c in d for c in cle) else None
+                    if existante:
+                        num, l = existante
+                        ligne = {**l, **d, 'updated_at': _maintenant()}
+                    else:
+                        num, ligne = None, dict(d)
+                        if serie and ligne.get('id') is None:
+                            ligne['id'], prochain = prochain, prochain + 1
+                        elif serie:
+                            prochain = max(prochain, int(ligne['id']) + 1)
+                        ligne.setdefault('created_at', _maintenant())
+                        ligne.setdefault('updated_at', ligne['created_at'])
+                    self._ecrire(table, num, ligne)
+                    index[tuple(ligne.get(c) for c in cle)] = (num, ligne)
+                    ecrites.append(ligne)
+                self._versionner(table, ecrites)
+                return Reponse(ecrites)
+
+            touchees = [(num, l) for num, l in self._lignes(table, requete._where) if requete._garde(l)]
+            if operation == 'update':
+                valeurs = json.loads(json.dumps(requete._donnees, default=str))
+                ecrites = []
+                for num, l in touchees:
+                    ligne = {**l, **valeurs, 'updated_at': _maintenant()}
+                    self._ecrire(table, num, ligne)
+                    ecrites.append(ligne)
+                if ecrites:
+                    self._versionner(table, ecrites)
+                return Reponse(ecrites)
+
+            if operation == 'delete':
+                self._conn.executemany("DELETE FROM lignes WHERE num=?", [(num,) for num, _ in touchees])
+                if touchees:
+                    self._versionner(table, [l for _, l in touchees])
+                return Reponse([l for _, l in touchees])
+        raise ErreurStockage(f"Opération non gérée : {operation}")
+
+    # ── Fonctions (rpc) ──────────────────────────────────────────
+    def _appeler(self, fonction, parametres) -> Reponse:
+        methode = getattr(self, f"_rpc_{fonction}", None)
+        if methode is None:
+            raise ErreurStockage(f"Fonction inconnue : {fonction}")
+        with self._verrou, self._conn:
+            return Reponse(methode(**parametres))
+
+    def _rpc_passer_ecritures_copro(self, p_immeuble_id, p_ecritures):
+        """Écritures et soldes courants ensemble (fonction du même nom, setup_supabase.sql)."""
+        immeuble = [("(immeuble_id = ? OR immeuble_id IS NULL)", [_entier(p_immeuble_id)])]
+        deja = {l.get('reference') for _, l in self._lignes('compte_copro_ecritures', immeuble)
+                if l.get('immeuble_id', 1) == p_immeuble_id}
+        soldes = {l.get('coproprietaire_id'): (num, l) for num, l in self._lignes('compte_copro_soldes')}
+        prochain = self._nouvel_id('compte_copro_ecritures')
+        passees, touches = [], {}
+        for e in json.loads(json.dumps(p_ecritures, default=str)):
+            if e['reference'] in deja:
+                continue
+            debit, credit = float(e.get('debit') or 0), float(e.get('credit') or 0)
+            num, s = soldes.get(e['coproprietaire_id'], (None, None))
+            maintenant = _maintenant()
+            s = {**(s or {'coproprietaire_id': e['coproprietaire_id'], 'immeuble_id': p_immeuble_id,
+                         'solde': 0, 'created_at': maintenant}),
+                 'updated_at': maintenant}
+            s['solde'] = round(float(s['solde'] or 0) + debit - credit, 2)
+            soldes[e['coproprietaire_id']] = (num, s)
+            touches[e['coproprietaire_id']] = (num, s)
+            passees.append({'id': prochain, 'coproprietaire_id': e['coproprietaire_id'], 'date': e.get('date'),
+                            'nature': e.get('nature'), 'libelle': e.get('libelle'), 'debit': debit,
+                            'credit': credit, 'solde': s['solde'], 'reference': e['reference'],
+                            'immeuble_id': p_immeuble_id, 'created_at': maintenant})
+            deja.add(e['reference'])
+            prochain += 1
+        for ligne in passees:
+            self._ecrire('compte_copro_ecritures', None, ligne)
+        for num, s in touches.values():
+            self._ecrire('compte_copro_soldes', num, s)
+        if passees:
+            self._versionner('compte_copro_ecritures', passees)
+            self._versionner('compte_copro_soldes', [s for _, s in touches.values()])
+        return len(passees)
+
+
+# ==================== FICHIERS ====================
+
+class _Seau:
+    def __init__(self, dossier, url):
+        self._dossier = dossier
+        self._url = url
+
+    def _chemin(self, chemin):
+        chemin = str(chemin).lstrip('/')
+        if '..' in chemin.split('/'):
+            raise ErreurStockage(f"Chemin invalide : {chemin}")
+        return os.path.join(self._dossier, *chemin.split('/'))
+
+    def upload(self, path, file, file_options=None):
+        cible = self._chemin(path)
+        if os.path.exists(cible) and str((file_options or {}).get('upsert', 'false')).lower() != 'true':
+            raise ErreurStockage(f"Le fichier existe déjà : {path}")
+        os.makedirs(os.path.dirname(cible), exist_ok=True)
+        if isinstance(file, (str, os.PathLike)):
+            with open(file, 'rb') as f:
+                file = f.read()
+        with open(cible, 'wb') as f:
+            f.write(bytes(file))
+        return {'path': path, 'Key': path}
+
+    def download(self, path):
+        try:
+            with open(self._chemin(path), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            raise ErreurStockage(f"Fichier introuvable : {path}")
+
+    def remove(self, paths):
+        supprimes = []
+        for p in paths:
+            try:
+                os.remove(self._chemin(p))
+                supprimes.append({'name': p})
+            except FileNotFoundError:
+                pass
+        return supprimes
+
+    def list(self, path=None, options=None):
+        dossier = self._chemin(path or '')
+        if not os.path.isdir(dossier):
+            return []
+        return [{'name': n} for n in sorted(os.listdir(dossier))]
+
+    def _url_de(self, path):
+        cible = self._chemin(path)
+        if not os.path.exists(cible):
+            raise ErreurStockage(f"Fichier introuvable : {path}")
+        if self._url:
+            return f"{self._url}/{str(path).lstrip('/')}"
+        type_ = mimetypes.guess_type(cible)[0] or 'application/octet-stream'
+        with open(cible, 'rb') as f:
+            return f"data:{type_};base64,{base64.b64encode(f.read()).decode()}"
+
+    def create_signed_url(self, path, expires_in, options=None):
+        url = self._url_de(path)
+        return {'signedURL': url, 'signedUrl': url}
+
+    def create_signed_urls(self, paths, expires_in, options=None):
+        out = []
+        for p in paths:
+            try:
+                url, erreur = self._url_de(p), None
+            except ErreurStockage as e:
+                url, erreur = None, str(e)
+            out.append({'path': p, 'signedURL': url, 'signedUrl': url, 'error': erreur})
+        return out
+
+
+class StockageFichiers:
+    """Équivalent local de Supabase Storage : un dossier par seau.
+
+    url : préfixe d'URL sous lequel un serveur contrôlant l'accès publie le dossier,
+    complet ou depuis la racine ('/fichiers') ; sans préfixe, URL `data:` : le fichier
+    n'est servi que par la page qui l'affiche.
+    """
+
+    def __init__(self, dossier, url=None):
+        self.dossier = dossier
+        if url and '://' not in url:
+            # Relative, l'URL se résoudrait sous la page qui l'emploie (visionneuse pdf.js)
+            url = '/' + url.lstrip('/')
+        self.url = url.rstrip('/') if url else None
+        os.makedirs(dossier, exist_ok=True)
+
+    def from_(self, seau):
+        return _Seau(os.path.join(self.dossier, seau), f"{self.url}/{seau}" if self.url else None)
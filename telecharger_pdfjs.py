@@ -0,0 +1,67 @@
+"""
+telecharger_pdfjs.py — Dépose pdf.js dans static/pdfjs/ (visionneuse des factures).
+
+Usage :
+    python telecharger_pdfjs.py
+
+Télécharge le paquet npm `pdfjs-dist` à la version VERSION, vérifie son empreinte
+contre INTEGRITE (fixée ici, jamais lue dans la réponse du registre) et en extrait
+la distribution « legacy » : pdf.min.mjs et pdf.worker.min.mjs. Sans ces fichiers,
+la visionneuse bascule sur le lecteur PDF natif du navigateur (voir static/pdfjs/README.md).
+
+Changer de version : relever `dist.integrity` de la nouvelle version depuis une source
+de confiance (`npm view pdfjs-dist@<version> dist.integrity`, package-lock.json
+d'un projet vérifié) et la reporter dans INTEGRITE avec VERSION.
+"""
+
+import io
+import os
+import sys
+import base64
+import hashlib
+import tarfile
+import urllib.request
+
+# ── Configuration ────────────────────────────────────────────
+VERSION   = "4.10.38"      # ≥ 4.2.67 : CVE-2024-4367 (exécution de code via les polices)
+# Empreinte Subresource Integrity ('sha512-<base64>') de pdfjs-dist-<VERSION>.tgz
+INTEGRITE = ""
+ARCHIVE   = f"https://registry.npmjs.org/pdfjs-dist/-/pdfjs-dist-{VERSION}.tgz"
+FICHIERS  = ("pdf.min.mjs", "pdf.worker.min.mjs")
+DOSSIER   = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "pdfjs")
+
+# ─────────────────────────────────────────────────────────────
+
+def lire(url) -> bytes:
+    with urllib.request.urlopen(url, timeout=60) as r:
+        return r.read()
+
+def empreinte(archive: bytes, algo='sha512') -> str:
+    return f"{algo}-{base64.b64encode(hashlib.new(algo, archive).digest()).decode()}"
+
+def verifier(archive: bytes, integrite: str):
+    """Compare l'archive à l'empreinte Subresource Integrity attendue ('sha512-<base64>')."""
+    if not integrite:
+        raise ValueError(f"INTEGRITE non renseignée pour pdfjs-dist {VERSION} "
+                         f"(archive téléchargée : {empreinte(archive)}, à confirmer "
+                         f"auprès d'une source de confiance)")
+    algo = integrite.split('-', 1)[0]
+    if empreinte(archive, algo) != integrite:
+        raise ValueError(f"empreinte {algo} inattendue pour pdfjs-dist {VERSION}")
+
+def main():
+    archive = lire(ARCHIVE)
+    verifier(archive, INTEGRITE)
+    with tarfile.open(fileobj=io.BytesIO(archive), mode='r:gz') as tar:
+        for nom in FICHIERS:
+            contenu = tar.extractfile(f"package/legacy/build/{nom}").read()
+            with open(os.path.join(DOSSIER, nom), 'wb') as f:
+                f.write(contenu)
+            print(f"  → {nom} ({len(contenu) // 1024} Ko)")
+    print(f"✅ pdf.js {VERSION} déposé dans {DOSSIER}")
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        sys.exit(f"❌ Téléchargement de pdf.js impossible : {e}")
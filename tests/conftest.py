@@ -0,0 +1,43 @@
+"""Modules de l'application à la racine du dépôt (lancer `python -m pytest` depuis la racine)."""
+
+import os
+import sys
+
+import pytest
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RACINE)
+
+
+@pytest.fixture
+def base_locale(tmp_path, monkeypatch):
+    """Application en stockage SQLite vierge (tmp_path), sans miroir ni événements.
+    Retourne le client de la base, pour préparer les données des pages."""
+    import streamlit as st
+    import donnees
+    from stockage import ClientSQLite
+    reglages = {'STOCKAGE': 'sqlite', 'SQLITE_CHEMIN': str(tmp_path / 'copro.sqlite'),
+                'FICHIERS_DOSSIER': str(tmp_path / 'fichiers'), 'MIROIR_DOSSIER': '',
+                'EVENEMENTS': 'aucun', 'PROFIL_DOSSIER': str(tmp_path / 'profils')}
+    for nom, valeur in reglages.items():
+        monkeypatch.setenv(f"COPRO_{nom}", valeur)
+    monkeypatch.setattr(donnees, 'STOCKAGE', 'sqlite')
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    yield ClientSQLite(reglages['SQLITE_CHEMIN'], reglages['FICHIERS_DOSSIER'])
+    st.cache_data.clear()
+    st.cache_resource.clear()
+
+
+@pytest.fixture
+def page(base_locale):
+    """page('repartition') : AppTest de vues/repartition.py, ouverte depuis app.py."""
+    from streamlit.testing.v1 import AppTest
+
+    def ouvrir(nom):
+        at = AppTest.from_file(os.path.join(RACINE, 'app.py'), default_timeout=60)
+        at.run()
+        at.switch_page(os.path.join(RACINE, 'vues', f"{nom}.py")).run()
+        assert not at.exception, at.exception[0].value
+        return at
+    return ouvrir
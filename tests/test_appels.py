@@ -0,0 +1,34 @@
+import pytest
+
+import appels
+
+
+def ligne(cop, cle, montant, nb_appels=4):
+    return {'annee': 2026, 'periode': 'T2', 'coproprietaire_id': cop, 'lot': cop, 'cle': cle,
+            'montant': montant, 'nb_appels': nb_appels}
+
+
+CALCUL = [ligne(1, 'general', 120.5), ligne(1, 'alur', 6.03), ligne(2, 'general', 80.25)]
+
+
+def test_lignes_manquantes_seulement():
+    assert appels.lignes_manquantes([], CALCUL) == CALCUL
+    emises = [dict(l, id=i) for i, l in enumerate(CALCUL[:2])]
+    assert appels.lignes_manquantes(emises, CALCUL) == CALCUL[2:]
+    assert appels.lignes_manquantes(emises + [CALCUL[2]], CALCUL) == []
+
+
+def test_lignes_figees_relues_de_la_base():
+    # Montants relus en Decimal / chaîne, clés catégorielles : même base au centime
+    emises = [dict(CALCUL[0], montant='120.50', cle=appels.np.str_('general'))]
+    assert appels.lignes_manquantes(emises, CALCUL) == CALCUL[1:]
+
+
+@pytest.mark.parametrize('emise', [
+    ligne(1, 'general', 120.49),           # montants modifiés depuis l'émission
+    ligne(1, 'general', 241.0, nb_appels=2),  # nombre d'appels modifié
+    ligne(3, 'general', 10.0),             # lot ou clé disparus du calcul
+])
+def test_base_differente_refusee(emise):
+    with pytest.raises(ValueError, match='autre base'):
+        appels.lignes_manquantes([emise], CALCUL)
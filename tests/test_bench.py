@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from bench import __main__ as bench
+from bench.generateur import _repartir, charger, generer
+from repartition import CLES_DEFAUT
+from stockage import ClientSQLite
+
+
+def test_repartir_somme_exacte():
+    assert _repartir([1, 1, 1], 10).tolist() == [4, 3, 3]
+    assert _repartir([0.3, 2.9, 0, 7.1], 1000).sum() == 1000
+    assert _repartir([0, 0], 20).tolist() == [0, 0]
+
+
+def test_generation_reproductible_et_coherente():
+    donnees = generer(50, nb_annees=2, annee_fin=2025)
+    assert donnees == generer(50, nb_annees=2, annee_fin=2025)
+    assert donnees != generer(50, nb_annees=2, annee_fin=2025, graine=1)
+    assert len(donnees['coproprietaires']) == 50
+    for cle in CLES_DEFAUT:
+        assert sum(c[cle['colonne']] for c in donnees['coproprietaires']) == cle['total']
+    assert {b['annee'] for b in donnees['budget']} == {2024, 2025}
+    # Appels figés sur les exercices clos seulement : 4 appels × 50 lots
+    assert {a['annee'] for a in donnees['appels_fonds']} == {2024}
+    assert len(donnees['appels_fonds']) == 4 * 50
+
+
+def test_chargement_par_lots(tmp_path):
+    donnees = generer(60, nb_annees=2)
+    client = ClientSQLite(str(tmp_path / 'copro.sqlite'), str(tmp_path / 'fichiers'))
+    charger(client, donnees, immeuble_id=3)
+    assert all(donnees.values())
+    for table, lignes in donnees.items():
+        lues = client.table(table).select('id,immeuble_id').execute().data
+        assert sorted(l['id'] for l in lues) == sorted(l['id'] for l in lignes)
+        assert {l['immeuble_id'] for l in lues} == {3}
+
+
+def test_resumer_compte_le_premier_appel_a_part():
+    assert bench.resumer([5.0, 1.0, 3.0, 2.0]) == {'premier': 5.0, 'min': 1.0, 'mediane': 2.0, 'repetitions': 4}
+    assert bench.resumer([0.5]) == {'premier': 0.5, 'min': 0.5, 'mediane': 0.5, 'repetitions': 1}
+
+
+def test_comparer_signale_les_regressions(capsys):
+    mesure = lambda m: {'lots': 20, 'mesures': {'a': {'mediane': m}, 'b': {'mediane': 1.0}}}
+    bench.comparer({'tailles': [mesure(1.5)]}, {'tailles': [mesure(1.0), {'lots': 100, 'mesures': {}}]})
+    sortie = capsys.readouterr().out.splitlines()
+    assert any(l.strip().startswith('a ') and '×1.50  ⚠️' in l for l in sortie)
+    assert any(l.strip().startswith('b ') and '×1.00' in l and '⚠️' not in l for l in sortie)
+
+
+def test_mesure_complete_sans_pages(tmp_path, monkeypatch):
+    for nom in ('STOCKAGE', 'SQLITE_CHEMIN', 'FICHIERS_DOSSIER', 'MIROIR_DOSSIER', 'EVENEMENTS'):
+        monkeypatch.setenv(f"COPRO_{nom}", '')  # configurer() les modifie : rétablis en fin de test
+    import donnees
+    monkeypatch.setattr(donnees, 'STOCKAGE', 'sqlite')
+    sortie = tmp_path / 'bench.json'
+    bench.main(['--lots', '20', '--annees', '1', '--repetitions', '2', '--pdf-max', '1',
+                '--sans-pages', '--sortie', str(sortie)])
+    taille, = json.loads(sortie.read_text(encoding='utf-8'))['tailles']
+    assert taille['lots'] == 20 and taille['lignes']['coproprietaires'] == 20
+    assert {'calculer_appels', 'pdf.appels_de_fonds', 'import_data.import'} <= set(taille['mesures'])
+    assert all(m['repetitions'] >= 1 and 'erreur' not in m for m in taille['mesures'].values())
+    assert taille['memoire_ko']['depenses']['compact'] < taille['memoire_ko']['depenses']['brut']
@@ -0,0 +1,94 @@
+import json
+import os
+import zipfile
+
+import pandas as pd
+import pytest
+
+from bench.generateur import charger, generer
+from copro import __main__ as cli
+from stockage import ClientSQLite
+
+APPEL = '🎯 APPEL {} (€)'
+
+
+@pytest.fixture
+def base(tmp_path, monkeypatch):
+    for nom in ('SUPABASE_URL', 'SUPABASE_KEY', 'BREVO_API_KEY', 'BREVO_FROM_EMAIL'):
+        monkeypatch.delenv(f"COPRO_{nom}", raising=False)
+    monkeypatch.setenv('COPRO_STOCKAGE', 'sqlite')
+    monkeypatch.setenv('COPRO_SQLITE_CHEMIN', str(tmp_path / 'copro.sqlite'))
+    monkeypatch.setenv('COPRO_FICHIERS_DOSSIER', str(tmp_path / 'fichiers'))
+    donnees = generer(12, nb_annees=2, annee_fin=2025)
+    charger(ClientSQLite(str(tmp_path / 'copro.sqlite'), str(tmp_path / 'fichiers')), donnees)
+    return donnees
+
+
+def lancer(tmp_path, *args):
+    sortie = tmp_path / 'sortie'
+    assert cli.main(['--secrets', str(tmp_path / 'absent.toml'), *args, '--sortie', str(sortie),
+                     '--processus', '1']) == 0
+    return sortie
+
+
+def lire_csv(chemin):
+    return pd.read_csv(chemin, sep=';', decimal=',', encoding='utf-8-sig')
+
+
+def test_quatre_appels_somment_au_budget_au_centime(base, tmp_path):
+    budget = sum(b['montant_budget'] for b in base['budget'] if b['annee'] == 2025)
+    charges = 0
+    for t in ('T1', 'T2', 'T3', 'T4'):
+        sortie = lancer(tmp_path, 'appels', '--year', '2025', '--trimestre', t)
+        appel = lire_csv(sortie / f"appel_{t}_2025.csv")
+        assert len(appel) == 12
+        charges += round(appel[APPEL.format(t)].sum() * 100)
+    assert charges == round(budget * 100)
+
+
+def test_pdfs_en_archive(base, tmp_path):
+    sortie = lancer(tmp_path, 'appels', '--year', '2025', '--trimestre', 'T2', '--zip')
+    with zipfile.ZipFile(sortie / 'appels_T2_2025.zip') as zf:
+        noms = zf.namelist()
+        assert len(noms) == 12 and 'appel_T2_2025_lot0001.pdf' in noms
+        assert zf.read(noms[0]).startswith(b'%PDF')
+
+
+def test_regularisation_sur_les_appels_emis(base, tmp_path):
+    sortie = lancer(tmp_path, 'regularisation', '--year', '2024', '--pdf')
+    reg = lire_csv(sortie / '5eme_appel_2024.csv')
+    assert len(reg) == 12
+    assert len(os.listdir(sortie / 'regularisation_2024')) == 12
+
+
+def test_envoi_refuse_sans_configuration_brevo(base, tmp_path):
+    with pytest.raises(SystemExit, match='brevo_api_key'):
+        cli.main(['--secrets', str(tmp_path / 'absent.toml'), 'appels', '--year', '2025',
+                  '--trimestre', 'T1', '--send', '--sortie', str(tmp_path)])
+    assert not (tmp_path / 'appel_T1_2025.csv').exists()
+
+
+def test_envoi_un_email_par_lot(monkeypatch, capsys):
+    envoyes = []
+
+    class Reponse:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def read(self):
+            return b'{}'
+    monkeypatch.setattr('urllib.request.urlopen', lambda requete: envoyes.append(requete) or Reponse())
+    reglage = cli.Reglages({'brevo_api_key': 'cle-de-test', 'brevo_from_email': 'syndic@exemple.fr'})
+    pdfs = [({'nom': 'DUPONT', 'email': 'dupont@exemple.fr'}, 'appel_lot0001.pdf', b'%PDF-1'),
+            ({'nom': 'MARTIN', 'email': None}, 'appel_lot0002.pdf', b'%PDF-2')]
+    assert not cli.envoyer(pdfs, reglage, 'Appel T1', 'Bonjour {nom}')
+    requete, = envoyes
+    charge = json.loads(requete.data)
+    assert requete.full_url == cli.BREVO and requete.get_header('Api-key') == 'cle-de-test'
+    assert charge['to'] == [{'email': 'dupont@exemple.fr', 'name': 'DUPONT'}]
+    assert charge['textContent'] == 'Bonjour DUPONT'
+    assert charge['attachment'][0]['name'] == 'appel_lot0001.pdf'
+    assert "MARTIN — pas d'email" in capsys.readouterr().err
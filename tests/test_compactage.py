@@ -0,0 +1,66 @@
+import pandas as pd
+import pytest
+
+from bench.generateur import generer
+from compactage import CATEGORIES, compacter, octets
+from depot import Depot
+from stockage import ClientSQLite
+
+DONNEES = generer(200, nb_annees=2, annee_fin=2025)
+
+
+@pytest.mark.parametrize('table', sorted(CATEGORIES))
+def test_memes_valeurs_en_moins_de_memoire(table):
+    df = pd.DataFrame(DONNEES[table]).assign(immeuble_id=1, created_at='2025-01-01T00:00:00')
+    compact = compacter(df, table)
+    assert not {'immeuble_id', 'created_at'} & set(compact.columns)
+    for col in CATEGORIES[table]:
+        if col in compact.columns:
+            assert isinstance(compact[col].dtype, pd.CategoricalDtype), col
+    assert compact['id'].dtype == 'int32'
+    pd.testing.assert_frame_equal(compact.astype(object), df[compact.columns].astype(object))
+    assert octets(compact) < octets(df)
+
+
+def test_montants_restent_en_float64():
+    df = pd.DataFrame({'id': [1, 2], 'montant_du': [123456.78, 0.01], 'compte': ['606', '606']})
+    compact = compacter(df, 'depenses')
+    assert compact['montant_du'].dtype == 'float64'
+    assert compact['montant_du'].sum() == 123456.79
+
+
+def test_entiers_hors_int32_conserves():
+    df = pd.DataFrame({'id': [1, 2**40]})
+    assert compacter(df, 'depenses')['id'].dtype == 'int64'
+
+
+def test_lecture_comme_des_chaines():
+    compact = compacter(pd.DataFrame(DONNEES['depenses']), 'depenses')
+    classe = compact['classe'].iloc[0]
+    assert (compact['classe'] == classe).any()
+    assert compact['compte'].isin([compact['compte'].iloc[0]]).any()
+    assert compact.groupby('classe', observed=True)['montant_du'].sum().sum() == pytest.approx(compact['montant_du'].sum())
+    assert compact['fournisseur'].astype(str).fillna('').str.len().min() > 0
+
+
+def test_table_vide_inchangee():
+    vide = pd.DataFrame()
+    assert compacter(vide, 'depenses') is vide
+
+
+def test_depot_garde_la_forme_compacte(tmp_path):
+    client = ClientSQLite(str(tmp_path / 'copro.sqlite'), str(tmp_path / 'fichiers'))
+    client.table('depenses').insert(DONNEES['depenses'][:50]).execute()
+    depot = Depot(preparer=compacter)
+
+    def charger():
+        return pd.DataFrame(client.table('depenses').select('*').order('id').execute().data)
+    depot.lire('depenses', None, charger)
+    lignes, taille = depot.memoire()['depenses']
+    assert lignes == 50 and taille == octets(compacter(charger(), 'depenses'))
+
+    depot.inserer(client, 'depenses', {**{k: v for k, v in DONNEES['depenses'][60].items() if k != 'id'}, 'fournisseur': 'NOUVEAU'})
+    df = depot.lire('depenses', None, charger)
+    assert depot.memoire()['depenses'][0] == 51
+    assert isinstance(df['fournisseur'].dtype, pd.CategoricalDtype)
+    assert df['fournisseur'].iloc[-1] == 'NOUVEAU'
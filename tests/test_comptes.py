@@ -0,0 +1,56 @@
+import pandas as pd
+import pytest
+
+from comptes import balance_agee, debits_impayes
+from stockage import ClientSQLite
+
+
+def ecritures(*lignes):
+    return pd.DataFrame([{'id': i, 'coproprietaire_id': c, 'date': pd.Timestamp(d), 'debit': deb, 'credit': cre}
+                         for i, (c, d, deb, cre) in enumerate(lignes, 1)])
+
+
+def test_paiements_soldent_les_debits_anciens():
+    e = ecritures((1, '2025-01-01', 100, 0), (1, '2025-04-01', 100, 0), (1, '2025-04-15', 0, 150))
+    imp = debits_impayes(e, {1: 50.0})
+    assert imp[['id', 'impaye']].values.tolist() == [[2, 50.0]]
+
+
+def test_balance_agee_tranches():
+    e = ecritures((1, '2025-01-01', 100, 0), (1, '2025-05-15', 100, 0), (1, '2025-06-20', 100, 0),
+                  (2, '2025-06-25', 40, 0), (3, '2025-03-01', 80, 0), (3, '2025-03-02', 0, 80))
+    bal = balance_agee(e, {1: 250.0, 2: 40.0, 3: 0.0}, date_ref='2025-07-01').set_index('coproprietaire_id')
+    assert list(bal.index) == [1, 2]  # lot soldé absent, tri par solde décroissant
+    assert bal.loc[1, ['0–30 j', '30–90 j', '90+ j']].tolist() == [100, 100, 50]
+    assert bal.loc[2, ['0–30 j', '30–90 j', '90+ j']].tolist() == [40, 0, 0]
+    assert bal.loc[1, 'plus_ancien'] == pd.Timestamp('2025-01-01')
+
+
+def test_balance_agee_report_a_nouveau():
+    # Solde supérieur aux débits connus : l'excédent va dans la plus ancienne tranche
+    bal = balance_agee(ecritures((1, '2025-06-20', 100, 0)), {1: 130.0}, date_ref='2025-07-01')
+    assert bal[['0–30 j', '90+ j']].values.tolist() == [[100, 30]]
+
+
+@pytest.fixture
+def client(tmp_path):
+    return ClientSQLite(str(tmp_path / 'copro.sqlite'), str(tmp_path / 'fichiers'))
+
+
+def passer(client, lignes):
+    return client.rpc('passer_ecritures_copro', {'p_immeuble_id': 1, 'p_ecritures': lignes}).execute().data
+
+
+def test_passer_ecritures_soldes_et_references(client):
+    lignes = [
+        {'coproprietaire_id': 1, 'date': '2025-01-01', 'nature': 'appel', 'libelle': 'T1', 'debit': 100.1, 'credit': 0, 'reference': 'a'},
+        {'coproprietaire_id': 1, 'date': '2025-01-05', 'nature': 'paiement', 'libelle': 'vir', 'debit': 0, 'credit': 30, 'reference': 'b'},
+        {'coproprietaire_id': 2, 'date': '2025-01-01', 'nature': 'appel', 'libelle': 'T1', 'debit': 5, 'credit': 0, 'reference': 'c'},
+    ]
+    assert passer(client, lignes) == 3
+    # Références déjà passées ignorées ; le solde repart du solde courant
+    assert passer(client, lignes + [dict(lignes[0], reference='d')]) == 1
+    ecr = client.table('compte_copro_ecritures').select('reference,solde').order('id').execute().data
+    assert [(e['reference'], e['solde']) for e in ecr] == [('a', 100.1), ('b', 70.1), ('c', 5.0), ('d', 170.2)]
+    soldes = {s['coproprietaire_id']: s['solde'] for s in client.table('compte_copro_soldes').select('*').execute().data}
+    assert soldes == {1: 170.2, 2: 5.0}
@@ -0,0 +1,46 @@
+import os
+import subprocess
+import sys
+
+from bench.__main__ import imports_app
+from conftest import RACINE
+
+
+def modules_charges(code, env=None):
+    """Modules chargés après `code`, dans un interpréteur neuf."""
+    code += "\nimport sys\nprint('MODULES', ' '.join(sorted(sys.modules)))"
+    sortie = subprocess.run([sys.executable, '-c', code], cwd=RACINE, capture_output=True, text=True,
+                            timeout=300, check=True, env={**os.environ, **(env or {})}).stdout
+    return set(sortie.rsplit('MODULES', 1)[1].split())
+
+
+def premier_niveau(modules):
+    return {m.split('.')[0] for m in modules}
+
+
+def test_imports_de_tete_sans_graphiques_ni_client_supabase():
+    tete = imports_app()
+    assert 'import streamlit' in tete
+    # Streamlit charge déjà plotly.io pour son thème : seul ce que la tête d'app.py ajoute compte
+    ajoutes = modules_charges(tete) - modules_charges('import streamlit, pandas')
+    assert {'donnees', 'instrumentation', 'profilage'} <= ajoutes
+    assert not {'plotly', 'supabase', 'reportlab', 'twilio'} & premier_niveau(ajoutes)
+
+
+def test_premier_rendu_sqlite_sans_supabase(tmp_path):
+    env = {'COPRO_STOCKAGE': 'sqlite', 'COPRO_SQLITE_CHEMIN': str(tmp_path / 'copro.sqlite'),
+           'COPRO_FICHIERS_DOSSIER': str(tmp_path / 'fichiers'), 'COPRO_MIROIR_DOSSIER': '',
+           'COPRO_EVENEMENTS': 'aucun'}
+    code = ("from streamlit.testing.v1 import AppTest\n"
+            f"at = AppTest.from_file({os.path.join(RACINE, 'app.py')!r}, default_timeout=120).run()\n"
+            "assert not at.exception, at.exception[0].value")
+    assert 'supabase' not in premier_niveau(modules_charges(code, env))
+
+
+def test_ressources_statiques_locales():
+    with open(os.path.join(RACINE, 'app.py'), encoding='utf-8') as f:
+        app = f.read()
+    assert 'icons8' not in app
+    for nom in ('immeuble.svg', 'style.css'):
+        assert nom in app
+        assert os.path.getsize(os.path.join(RACINE, 'static', nom)) > 0
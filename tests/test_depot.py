@@ -0,0 +1,68 @@
+import pandas as pd
+import pytest
+
+from compactage import compacter
+from depot import Depot
+from stockage import ClientSQLite
+
+
+@pytest.fixture
+def client(tmp_path):
+    c = ClientSQLite(str(tmp_path / 'copro.sqlite'), str(tmp_path / 'fichiers'))
+    c.table('depenses').insert([{'fournisseur': f, 'montant_du': m, 'compte': '606'}
+                                for f, m in (('EDF', 10.0), ('OTIS', 20.0))]).execute()
+    return c
+
+
+class Chargeur:
+    """charger() de Depot.lire, avec le nombre de relectures."""
+
+    def __init__(self, client, table):
+        self.client, self.table, self.appels = client, table, 0
+
+    def __call__(self):
+        self.appels += 1
+        return pd.DataFrame(self.client.table(self.table).select('*').order('id').execute().data)
+
+
+def version(client, table='depenses'):
+    v = {r['table_name']: r['version'] for r in client.table('versions_tables').select('*').execute().data}
+    return (0, v.get(table, 0))
+
+
+def test_ecritures_appliquees_sans_relecture(client):
+    depot, charger = Depot(preparer=compacter), Chargeur(client, 'depenses')
+    assert len(depot.lire('depenses', version(client), charger)) == 2
+    ligne = depot.inserer(client, 'depenses', {'fournisseur': 'EDF', 'montant_du': 30.0, 'compte': '606'})[0]
+    depot.modifier(client, 'depenses', 1, {'montant_du': 11.0})
+    depot.supprimer(client, 'depenses', [2])
+    df = depot.lire('depenses', version(client), charger)
+    assert charger.appels == 1  # avance de version expliquée par nos trois écritures
+    assert df['id'].tolist() == [1, ligne['id']]
+    assert df['montant_du'].tolist() == [11.0, 30.0]
+    assert isinstance(df['fournisseur'].dtype, pd.CategoricalDtype)  # copie repassée par `preparer`
+
+
+def test_ecriture_d_un_autre_poste_relit(client):
+    depot, charger = Depot(), Chargeur(client, 'depenses')
+    depot.lire('depenses', version(client), charger)
+    client.table('depenses').update({'montant_du': 99.0}).eq('id', 1).execute()  # autre poste
+    df = depot.lire('depenses', version(client), charger)
+    assert charger.appels == 2 and df['montant_du'].tolist() == [99.0, 20.0]
+
+
+def test_incoherence_invalide_la_table(client):
+    depot, charger = Depot(), Chargeur(client, 'depenses')
+    depot.lire('depenses', version(client), charger)
+    client.table('depenses').delete().eq('id', 2).execute()
+    assert depot.supprimer(client, 'depenses', [2]) == 0  # ligne déjà supprimée ailleurs
+    depot.lire('depenses', version(client), charger)
+    assert charger.appels == 2
+
+
+def test_tranche_ttl(client):
+    depot, charger = Depot(), Chargeur(client, 'depenses')
+    depot.lire('depenses', ('ttl', 1), charger)
+    depot.lire('depenses', ('ttl', 1), charger)
+    depot.lire('depenses', ('ttl', 2), charger)
+    assert charger.appels == 2
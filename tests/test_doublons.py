@@ -0,0 +1,52 @@
+import pandas as pd
+
+from doublons import (IndexDoublons, detecter_doublons_lot, normaliser_fournisseur, rapport_doublons,
+                      similarite)
+
+EXISTANTES = pd.DataFrame({
+    'id': [9, 10],
+    'date': ['2025-01-01', '2025-02-01'],
+    'montant_du': [100.0, 50.0],
+    'fournisseur': ['EDF', 'Ascenseurs OTIS S.A.S.'],
+    'compte': ['606', '615'],
+})
+
+
+def test_normaliser_et_similarite():
+    assert normaliser_fournisseur('Ascenseurs OTIS S.A.S.') == 'ascenseurs otis'
+    assert normaliser_fournisseur(None) == ''
+    assert similarite('otis', 'ascenseurs otis') == 0.9
+    assert similarite('edf', '') == 0.0
+
+
+def test_index_exacts_et_proches():
+    idx = IndexDoublons.depuis_df(EXISTANTES)
+    assert idx.verifier('2025-01-01', 100, 'E.D.F.', '606') == {'exacts': [9], 'proches': []}
+    assert idx.verifier('2025-02-04', 50, 'OTIS', '615') == {'exacts': [], 'proches': [(10, 0.9)]}
+    assert idx.verifier('2025-02-20', 50, 'OTIS', '615') == {'exacts': [], 'proches': []}  # hors fenêtre
+    idx.ajouter(11, '2025-03-01', 20, 'Veolia', '601')
+    assert idx.verifier('2025-03-01', 20, 'VEOLIA', '601')['exacts'] == [11]
+
+
+def test_lot_une_seule_classification_par_ligne():
+    lot = pd.DataFrame({
+        'date': ['2025-01-01', '2025-01-01', '2025-02-03', '2025-02-03', '2025-05-01', '2025-05-01'],
+        'montant_du': [100, 100, 50, 50, 7, 7],
+        'fournisseur': ['EDF', 'EDF', 'OTIS', 'OTIS', 'Plombier', 'Plombier'],
+        'compte': ['606', '606', '615', '615', '615', '615'],
+    })
+    ctrl = detecter_doublons_lot(lot, EXISTANTES)
+    assert ctrl['ligne'].is_unique
+    assert ctrl[['ligne', 'statut']].values.tolist() == [
+        [0, 'exact'], [1, 'exact'],      # doublon exact en base, même répété dans le lot
+        [2, 'proche'], [3, 'dans le lot'],
+        [5, 'dans le lot'],
+    ]
+    assert ctrl['depense_id'].tolist()[:3] == [9, 9, 10]
+
+
+def test_rapport_paires():
+    df = pd.concat([EXISTANTES, pd.DataFrame({'id': [11], 'date': ['2025-01-03'], 'montant_du': [100.0],
+                                              'fournisseur': ['EDF SA'], 'compte': ['606']})])
+    rap = rapport_doublons(df)
+    assert rap[['id_a', 'id_b', 'exact']].values.tolist() == [[9, 11, False]]
@@ -0,0 +1,73 @@
+import os
+import re
+
+import pytest
+
+from conftest import RACINE
+from donnees import TABLES_MIROIR
+
+# Écritures laissées hors du dépôt : la page publique des locataires (pas de session
+# de syndic, pas de miroir) et le rapprochement bancaire, couplé à releve_bancaire.
+DIRECTES = {('fiche_locataire.py', 'locataires'), ('banque.py', 'depenses')}
+
+
+def test_pages_ecrivent_les_tables_copiees_par_le_depot():
+    motif = re.compile(r"supabase\.table\('(\w+)'\)\s*\.\s*(insert|update|delete|upsert)\(")
+    directes = set()
+    dossier = os.path.join(RACINE, 'vues')
+    for nom in sorted(os.listdir(dossier)):
+        if nom.endswith('.py'):
+            with open(os.path.join(dossier, nom), encoding='utf-8') as f:
+                directes |= {(nom, m.group(1)) for m in motif.finditer(f.read())
+                             if m.group(1) in TABLES_MIROIR}
+    assert directes <= DIRECTES
+
+
+@pytest.fixture
+def avec_miroir(base_locale, tmp_path, monkeypatch):
+    monkeypatch.setenv('COPRO_MIROIR_DOSSIER', str(tmp_path / 'miroir'))
+    return base_locale
+
+
+def test_copie_locale_en_echec_signalee(avec_miroir, page, monkeypatch, caplog):
+    import miroir
+
+    def echoue(self, client, table):
+        if table == 'contrats':
+            raise RuntimeError('colonne inconnue')
+    monkeypatch.setattr(miroir.Miroir, 'synchroniser', echoue)
+    at = page('contrats')
+    assert any('Copie locale incomplète, pages indisponibles hors ligne : contrats' in w.value for w in at.sidebar.warning)
+    assert 'Copie locale de contrats impossible' in caplog.text
+
+
+def test_rejeu_en_echec_signale(avec_miroir, page, monkeypatch, caplog):
+    import miroir
+
+    def echoue(self, client):
+        raise RuntimeError('file illisible')
+    monkeypatch.setattr(miroir.Miroir, 'en_attente', lambda self: 1)
+    monkeypatch.setattr(miroir.Miroir, 'rejouer', echoue)
+    at = page('contrats')
+    assert any('non rejouées : file illisible' in w.value for w in at.sidebar.warning)
+    assert 'Rejeu des écritures hors ligne interrompu' in caplog.text
+
+
+def test_renommer_une_classe_passe_par_le_depot(base_locale, page, monkeypatch):
+    import depot
+    base_locale.table('plan_comptable').insert([
+        {'immeuble_id': 1, 'compte': c, 'libelle_compte': c, 'classe': cl, 'famille': 'Charges'}
+        for c, cl in (('601', '1A'), ('602', '1A'), ('701', '7'))]).execute()
+    modifies = []
+    modifier = depot.Depot.modifier
+    monkeypatch.setattr(depot.Depot, 'modifier',
+                        lambda self, client, table, id_, valeurs: modifies.append((table, id_))
+                        or modifier(self, client, table, id_, valeurs))
+    at = page('plan_comptable')
+    at.selectbox(key='cl_rename_old').set_value('1A')
+    at.text_input(key='cl_rename_new').set_value('1B')
+    at.button(key='btn_rename_cl').click().run()
+    assert not at.exception
+    assert [t for t, _ in modifies] == ['plan_comptable'] * 2
+    lignes = base_locale.table('plan_comptable').select('compte, classe').execute().data
+    assert sorted((l['compte'], l['classe']) for l in lignes) == [('601', '1B'), ('602', '1B'), ('701', '7')]
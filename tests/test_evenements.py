@@ -0,0 +1,69 @@
+import itertools
+
+import streamlit as st
+
+from evenements import Diffusion, SourceLocale
+from immeubles import Generations, cache_par_immeuble
+
+_noms = itertools.count()
+
+
+def chargeur(diffusion, courant, lectures):
+    """Chargeur de `depenses` caché par immeuble, sondé par les compteurs de la diffusion."""
+    def get_depenses():
+        lectures.append(courant[0])
+        return courant[0]
+    get_depenses.__qualname__ = f"get_depenses_{next(_noms)}"  # un cache neuf par test
+    return cache_par_immeuble(st.cache_data, lambda: courant[0], Generations(), 'donnees',
+                              tables=('depenses',), sonde=lambda: diffusion.versions(courant[0]))(get_depenses)
+
+
+def lire(charger, courant, immeuble_id):
+    courant[0] = immeuble_id
+    return charger()
+
+
+def test_evenement_invalide_le_seul_immeuble_concerne():
+    diffusion, source = Diffusion(), SourceLocale()
+    source.demarrer(diffusion)
+    courant, lectures = [1], []
+    charger = chargeur(diffusion, courant, lectures)
+    lire(charger, courant, 1), lire(charger, courant, 2)
+    assert lectures == [1, 2]
+
+    source.emettre('depenses', 'INSERT', record={'id': 10, 'immeuble_id': 2})
+    lire(charger, courant, 1), lire(charger, courant, 2)
+    assert lectures == [1, 2, 2]
+
+    source.emettre('budget', 'UPDATE', record={'id': 3, 'immeuble_id': 1})  # table non lue
+    lire(charger, courant, 1)
+    assert lectures == [1, 2, 2]
+
+    # Suppression sans immeuble_id dans l'ancienne ligne : tous les immeubles
+    source.emettre('depenses', 'DELETE', old_record={'id': 10})
+    lire(charger, courant, 1), lire(charger, courant, 2)
+    assert lectures == [1, 2, 2, 1, 2]
+
+
+def test_reabonnement_invalide_tout_et_coupure_rend_la_main_a_la_sonde():
+    diffusion, source = Diffusion(), SourceLocale()
+    source.demarrer(diffusion)
+    assert diffusion.versions(1) == {'*': 1}
+    diffusion.connecte(False)
+    assert diffusion.versions(1) is None
+    diffusion.connecte(True)
+    assert diffusion.versions(1) == {'*': 2}
+
+
+def test_desabonnement_arrete_la_livraison():
+    diffusion, source = Diffusion(), SourceLocale()
+    source.demarrer(diffusion)
+    recus = []
+    diffusion.abonner(recus.append)
+    diffusion.abonner(lambda e: 1 / 0)  # un abonné en erreur n'empêche pas les autres
+    source.emettre('depenses', 'INSERT', record={'immeuble_id': 1})
+    diffusion.desabonner(recus.append)
+    source.emettre('depenses', 'INSERT', record={'immeuble_id': 1})
+    assert [e['type'] for e in recus] == ['INSERT']
+    assert diffusion.versions(1)['depenses'] == 2
+    diffusion.desabonner(recus.append)  # déjà retiré : sans effet
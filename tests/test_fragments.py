@@ -0,0 +1,73 @@
+import ast
+import os
+
+import pytest
+
+from bench.generateur import charger, generer
+from conftest import RACINE
+
+FRAGMENTS = {
+    'composants.py': ['ligne_facture'],
+    'vues/grand_livre.py': ['grand_livre_filtre'],
+    'vues/repartition.py': ['tableau_appels', 'tableau_regularisation', 'tableau_vue_globale'],
+    'vues/locataires.py': ['fiche_proprietaire', 'liste_locataires', 'etiquettes', 'envoi_fiches'],
+    'vues/communications.py': ['composer_message'],
+    'vues/tableau_de_bord.py': ['tableau_annee'],
+}
+
+# Lectures de tables : un fragment reçoit les tables déjà chargées par sa page
+CHARGEMENTS = {
+    'lire_table', 'get_budget', 'get_depenses', 'get_coproprietaires', 'get_plan_comptable',
+    'get_travaux_votes', 'get_travaux_votes_depense_ids', 'get_loi_alur', 'get_depenses_alur_ids',
+    'get_appels_fonds', 'get_soldes_copro', 'get_ecritures_copro', 'get_releve_bancaire',
+    'get_cles_repartition', 'get_tantiemes_lots', 'get_config_cles',
+}
+
+
+def fonctions(chemin):
+    with open(os.path.join(RACINE, chemin), encoding='utf-8') as f:
+        arbre = ast.parse(f.read())
+    return {n.name: n for n in arbre.body if isinstance(n, ast.FunctionDef)}
+
+
+def est_fragment(fonction):
+    return any(ast.unparse(d) in ('st.fragment', 'st.fragment()') for d in fonction.decorator_list)
+
+
+def appels(fonction):
+    for n in ast.walk(fonction):
+        if isinstance(n, ast.Call):
+            f = n.func
+            yield f.id if isinstance(f, ast.Name) else getattr(f, 'attr', None)
+
+
+@pytest.mark.parametrize('chemin,nom', [(c, n) for c, noms in FRAGMENTS.items() for n in noms])
+def test_fragment_sans_rechargement(chemin, nom):
+    fonction = fonctions(chemin)[nom]
+    assert est_fragment(fonction)
+    assert not CHARGEMENTS & set(appels(fonction)), f"{nom} relit une table à chaque rerun du fragment"
+
+
+@pytest.fixture
+def copropriete(base_locale):
+    charger(base_locale, generer(20, nb_annees=2, annee_fin=2025))
+    return base_locale
+
+
+def test_tableau_de_bord_change_d_annee(copropriete, page):
+    at = page('tableau_de_bord')
+    annees = at.selectbox(key='tdb_annee').options
+    assert len(annees) == 2
+    avant = [m.value for m in at.metric]
+    at.selectbox(key='tdb_annee').set_value(annees[1]).run()
+    assert not at.exception
+    assert at.selectbox(key='tdb_annee').value == int(annees[1])
+    assert [m.value for m in at.metric] != avant
+
+
+def test_repartition_detail_par_type(copropriete, page):
+    at = page('repartition')
+    colonnes = at.dataframe[0].value.shape[1]
+    at.checkbox(key='show_det').check().run()
+    assert not at.exception
+    assert at.dataframe[0].value.shape[1] > colonnes
@@ -0,0 +1,115 @@
+import itertools
+
+import pytest
+import streamlit as st
+
+from immeubles import ClientImmeuble, Generations, cache_par_immeuble, etat_tables
+from stockage import ClientSQLite
+
+_noms = itertools.count()
+
+
+@pytest.fixture
+def clients(tmp_path):
+    """Deux clients sur la même base, un par immeuble, et le client brut."""
+    brut = ClientSQLite(str(tmp_path / 'copro.sqlite'), str(tmp_path / 'fichiers'))
+    un, deux = ClientImmeuble(brut, lambda: 1), ClientImmeuble(brut, lambda: 2)
+    for client, fournisseurs in ((un, ['EDF', 'OTIS']), (deux, ['EDF', 'Veolia'])):
+        client.table('depenses').insert([{'fournisseur': f, 'montant_du': 10.0} for f in fournisseurs]).execute()
+    return un, deux, brut
+
+
+def lignes(brut, immeuble_id):
+    return sorted((l['fournisseur'], l['montant_du']) for l in
+                  brut.table('depenses').select('*').eq('immeuble_id', immeuble_id).execute().data)
+
+
+def test_insertion_renseigne_l_immeuble(clients):
+    un, deux, brut = clients
+    assert sorted(l['immeuble_id'] for l in brut.table('depenses').select('*').execute().data) == [1, 1, 2, 2]
+    r = deux.table('depenses').upsert({'id': 3, 'fournisseur': 'EDF', 'montant_du': 12.0}).execute()
+    assert r.data[0]['immeuble_id'] == 2
+
+
+def test_lecture_restreinte(clients):
+    un, deux, _ = clients
+    assert [l['fournisseur'] for l in un.table('depenses').select('*').order('id').execute().data] == ['EDF', 'OTIS']
+    assert un.table('depenses').select('id', count='exact').eq('fournisseur', 'Veolia').execute().count == 0
+
+
+def test_ecritures_sans_effet_sur_l_autre_immeuble(clients):
+    un, deux, brut = clients
+    avant = lignes(brut, 2)
+    un.table('depenses').update({'montant_du': 99.0}).eq('fournisseur', 'EDF').execute()
+    un.table('depenses').update({'montant_du': 50.0}).in_('id', [1, 2, 3, 4]).execute()
+    un.table('depenses').delete().eq('fournisseur', 'OTIS').execute()
+    assert lignes(brut, 1) == [('EDF', 50.0)]
+    assert lignes(brut, 2) == avant
+    # Même par id : la ligne de l'autre immeuble n'est ni modifiée ni supprimée
+    id_veolia = deux.table('depenses').select('id').eq('fournisseur', 'Veolia').execute().data[0]['id']
+    assert un.table('depenses').delete().eq('id', id_veolia).execute().data == []
+    assert lignes(brut, 2) == avant
+
+
+def test_tables_communes_et_rpc_non_filtres(clients):
+    un, deux, brut = clients
+    un.table('immeubles').insert([{'id': 1, 'nom': 'A'}, {'id': 2, 'nom': 'B'}]).execute()
+    assert len(deux.table('immeubles').select('*').execute().data) == 2
+    assert un.rpc('passer_ecritures_copro', {'p_immeuble_id': 1, 'p_ecritures': []}).execute().data == 0
+    assert un.storage is brut.storage
+
+
+def chargeur(courant, generations, lectures, sonde=None, tables=()):
+    def get_depenses():
+        lectures.append(courant[0])
+        return courant[0]
+    get_depenses.__qualname__ = f"get_depenses_{next(_noms)}"  # un cache neuf par test
+    return cache_par_immeuble(st.cache_data, lambda: courant[0], generations, 'donnees',
+                              tables=tables, sonde=sonde)(get_depenses)
+
+
+def test_generations_cloisonnees_par_immeuble():
+    courant, generations, lectures, autres = [1], Generations(), [], []
+    charger = chargeur(courant, generations, lectures)
+    autre = chargeur(courant, generations, autres)
+    autre()
+    for i in (1, 2, 1, 2):
+        courant[0] = i
+        assert charger() == i
+    assert lectures == [1, 2]
+    courant[0] = 1
+    charger.clear()  # n'invalide que cette fonction, pour l'immeuble courant
+    charger(), autre()
+    courant[0] = 2
+    charger()
+    assert lectures == [1, 2, 1]
+    generations.invalider(2, 'donnees')  # toutes les fonctions du groupe, pour l'immeuble 2
+    charger()
+    courant[0] = 1
+    charger()
+    assert lectures == [1, 2, 1, 2]
+    autre()
+    assert autres == [1]
+
+
+def test_sonde_ne_relit_que_si_la_table_a_change():
+    courant, lectures, versions = [1], [], {1: {'depenses': 1, 'budget': 4}, 2: {'depenses': 7}}
+    sondes = []
+    sonde = lambda: sondes.append(1) or dict(versions[courant[0]])
+    charger = chargeur(courant, Generations(), lectures, sonde, tables=('depenses',))
+    charger(), charger()
+    assert lectures == [1] and len(sondes) == 2
+    versions[1]['budget'] += 1  # table non lue par le chargeur
+    charger()
+    assert lectures == [1]
+    versions[1]['depenses'] += 1
+    charger()
+    courant[0] = 2
+    charger()
+    assert lectures == [1, 1, 2]
+
+
+def test_sans_sonde_repli_sur_le_ttl(monkeypatch):
+    monkeypatch.setattr('immeubles.time.time', lambda: 1000.0)
+    assert etat_tables(('depenses',), None, 30) == ('ttl', 33)
+    assert etat_tables(('depenses', 'budget'), {'*': 2, 'depenses': 5}, 30) == (2, 5, 0)
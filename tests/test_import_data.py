@@ -0,0 +1,58 @@
+import pandas as pd
+import pytest
+
+import import_data
+from stockage import ClientSQLite
+
+
+class ClientPlafonne:
+    """Réponses tronquées à `plafond` lignes, comme l'API Supabase (max-rows)."""
+
+    def __init__(self, client, plafond):
+        self.client, self.plafond = client, plafond
+
+    def table(self, nom):
+        return _RequetePlafonnee(self.client.table(nom), self.plafond)
+
+
+class _RequetePlafonnee:
+    def __init__(self, q, plafond):
+        self._q, self._plafond = q, plafond
+
+    def __getattr__(self, nom):
+        methode = getattr(self._q, nom)
+        if nom == 'execute':
+            def execute():
+                reponse = methode()
+                reponse.data = reponse.data[:self._plafond]
+                return reponse
+            return execute
+        return lambda *args, **kwargs: _RequetePlafonnee(methode(*args, **kwargs), self._plafond)
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(import_data, 'PAGE', 10)
+    c = ClientSQLite(str(tmp_path / 'copro.sqlite'), str(tmp_path / 'fichiers'))
+    c.table('depenses').insert([
+        {'immeuble_id': 1, 'date': f"2025-01-{1 + i % 28:02d}", 'compte': '606',
+         'fournisseur': f"Fournisseur {i}", 'montant_du': 100.0 + i} for i in range(25)]).execute()
+    c.table('depenses').insert([{'immeuble_id': 2, 'date': '2025-01-01', 'compte': '606',
+                                 'fournisseur': 'Ailleurs', 'montant_du': 1.0}]).execute()
+    return ClientPlafonne(c, 10)
+
+
+def test_lire_depenses_toutes_les_pages(client):
+    existants = import_data.lire_depenses(client)
+    assert len(existants) == 25
+    assert existants['id'].is_unique
+
+
+def test_doublon_au_dela_de_la_premiere_page_ignore(client, capsys):
+    fichier = pd.DataFrame([
+        {'date': '2025-01-25', 'compte': '606', 'fournisseur': 'Fournisseur 24', 'montant_du': 124.0},
+        {'date': '2025-02-10', 'compte': '606', 'fournisseur': 'Nouveau', 'montant_du': 42.0},
+    ])
+    import_data.import_depenses(client, fichier)
+    assert '1 dépenses importées (1 doublon(s) ignoré(s))' in capsys.readouterr().out
+    assert len(import_data.lire_depenses(client)) == 26
@@ -0,0 +1,137 @@
+import json
+
+import pytest
+
+import instrumentation
+from instrumentation import ClientMesure, ClientReleve, Releve
+from stockage import ClientSQLite, ErreurStockage
+
+
+class Horloge:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+@pytest.fixture
+def horloge(monkeypatch):
+    h = Horloge()
+    monkeypatch.setattr(instrumentation.time, 'perf_counter', h)
+    return h
+
+
+@pytest.fixture
+def releve():
+    r = instrumentation.demarrer('Test')
+    yield r
+    instrumentation.arreter()
+
+
+@pytest.fixture
+def client(tmp_path):
+    c = ClientSQLite(str(tmp_path / 'copro.sqlite'), str(tmp_path / 'fichiers'))
+    c.table('budget').insert([{'compte': str(600 + i), 'annee': 2026} for i in range(3)]).execute()
+    return c
+
+
+def test_temps_exclusif_par_section(horloge):
+    r = Releve()
+    r.entrer('données'); horloge.t = 1.0
+    r.entrer('pdf'); horloge.t = 3.0
+    assert r.sortir() == 2.0
+    horloge.t = 3.5
+    r.sortir()
+    r.entrer('données'); horloge.t = 4.0
+    r.terminer(); horloge.t = 10.0
+    assert r.total == 4.0
+    assert r.repartition() == {'données': 2.0, 'pdf': 2.0, instrumentation.AUTRES: 0.0}
+
+
+def test_sans_releve_rien_n_est_mesure():
+    assert instrumentation.courant() is None
+    with instrumentation.section('pdf'):
+        pass
+    assert instrumentation.chronometre('pdf')(lambda x: x + 1)(1) == 2
+    assert instrumentation.cache('f') is None
+
+
+def test_requetes_relevees(client, releve):
+    mesure = ClientMesure(client, releve)
+    lignes = mesure.table('budget').select('*').eq('annee', 2026).in_('compte', ['600', '601']).execute().data
+    assert len(lignes) == 2
+    mesure.table('budget').update({'annee': 2027}).eq('compte', '602').execute()
+    with pytest.raises(ErreurStockage):
+        mesure.storage.from_('factures').download('absente.pdf')
+    mesure.storage.from_('factures').upload('f.pdf', b'%PDF-1.4')
+    select, update, telechargement, envoi = releve.requetes
+    assert (select['table'], select['operation'], select['lignes']) == ('budget', 'select', 2)
+    assert select['filtres'] == "eq(annee, 2026) · in_(compte, ['600', '601'])"
+    assert select['octets'] == len(json.dumps(lignes, default=str).encode())
+    assert (update['operation'], update['lignes']) == ('update', 1)
+    assert (telechargement['table'], telechargement['lignes']) == ('stockage:factures', 0)
+    assert 'introuvable' in telechargement['erreur']
+    assert (envoi['operation'], envoi['octets']) == ('upload', 8)
+    assert set(releve.sections) == {'données'}
+
+
+def test_erreur_relevee_puis_relancee(releve):
+    class Defaillant:
+        storage = None
+
+        def table(self, nom):
+            return self
+
+        def select(self, *args):
+            return self
+
+        def execute(self):
+            raise ErreurStockage('colonne inconnue')
+    with pytest.raises(ErreurStockage):
+        ClientMesure(Defaillant(), releve).table('budget').select('x').execute()
+    assert releve.requetes[0]['erreur'] == 'colonne inconnue'
+
+
+def test_client_releve_seulement_pendant_un_releve(client):
+    partage = ClientReleve(lambda: client)
+    assert partage.table('budget').select('*').execute().data
+    r = instrumentation.demarrer()
+    try:
+        partage.table('budget').select('id').execute()
+    finally:
+        instrumentation.arreter()
+    assert len(r.requetes) == 1
+
+
+def test_suivi_des_caches(releve):
+    import pandas as pd
+    with instrumentation.cache('donnees.get_budget') as suivi:
+        suivi.recalcule, suivi.resultat = True, pd.DataFrame({'a': range(100)})
+    with instrumentation.cache('donnees.get_budget'):
+        pass
+    recalcul, trouve = releve.caches
+    assert (recalcul['fonction'], recalcul['resultat']) == ('get_budget', 'recalculé')
+    assert recalcul['ko'] > 0
+    assert (trouve['resultat'], trouve['ko']) == ('en cache', None)
+
+
+def test_journal_une_ligne_json_par_rerun(tmp_path, releve):
+    chemin = str(tmp_path / 'journal.jsonl')
+    instrumentation.journaliser(releve, chemin)
+    instrumentation.journaliser(releve, chemin)
+    lignes = [json.loads(l) for l in open(chemin, encoding='utf-8')]
+    assert len(lignes) == 2 and lignes[0]['page'] == 'Test'
+
+
+def test_panneau_affiche_avec_perf(base_locale, tmp_path, monkeypatch):
+    from streamlit.testing.v1 import AppTest
+    from conftest import RACINE
+    import os
+    monkeypatch.setenv('COPRO_PERF', '1')
+    monkeypatch.setenv('COPRO_PERF_JOURNAL', str(tmp_path / 'perf.jsonl'))
+    at = AppTest.from_file(os.path.join(RACINE, 'app.py'), default_timeout=60).run()
+    assert not at.exception
+    assert any(e.label.startswith('⏱️ Rerun') for e in at.sidebar.expander)
+    resume = json.loads(open(tmp_path / 'perf.jsonl', encoding='utf-8').readline())
+    assert resume['requetes'] and 'données' in resume['sections_s']
@@ -0,0 +1,59 @@
+import io
+
+import pytest
+from PIL import Image
+
+import donnees
+
+
+def pdf_une_page(largeur=595, hauteur=842):
+    pdfium = pytest.importorskip('pypdfium2')
+    pdf = pdfium.PdfDocument.new()
+    pdf.new_page(largeur, hauteur)
+    tampon = io.BytesIO()
+    pdf.save(tampon)
+    pdf.close()
+    return tampon.getvalue()
+
+
+def image(largeur, hauteur, format_='JPEG'):
+    tampon = io.BytesIO()
+    Image.new('RGB', (largeur, hauteur), 'white').save(tampon, format=format_)
+    return tampon.getvalue()
+
+
+def dimensions(png):
+    img = Image.open(io.BytesIO(png))
+    assert img.format == 'PNG'
+    return img.size
+
+
+def test_miniature_premiere_page_pdf():
+    largeur, hauteur = dimensions(donnees.generer_miniature(pdf_une_page(), 'pdf'))
+    assert largeur == donnees.MINIATURE_LARGEUR
+    assert hauteur == pytest.approx(donnees.MINIATURE_LARGEUR * 842 / 595, abs=1)
+
+
+def test_miniature_image_reduite():
+    assert dimensions(donnees.generer_miniature(image(1200, 600), 'jpg')) == (donnees.MINIATURE_LARGEUR, 120)
+    # Une petite image n'est pas agrandie
+    assert dimensions(donnees.generer_miniature(image(100, 50, 'PNG'), 'png')) == (100, 50)
+
+
+def test_miniature_format_non_gere():
+    assert donnees.generer_miniature(b'pas un pdf', 'pdf') is None
+    assert donnees.generer_miniature(b'<xml/>', 'xml') is None
+
+
+def test_miniature_deposee_signee_et_supprimee(base_locale):
+    base_locale.table('depenses').insert({'immeuble_id': 1, 'date': '2026-01-05', 'compte': '606',
+                                          'fournisseur': 'EDF', 'montant_du': 10.0}).execute()
+    chemin = donnees.upload_facture(1, pdf_une_page(), 'f.pdf')
+    autre = 'depenses/9/ancienne.pdf'  # facture antérieure aux miniatures
+    urls = donnees.get_miniatures_urls((chemin, autre, None))
+    assert list(urls) == [chemin]
+    assert urls[chemin].startswith('data:image/png;base64,')
+
+    donnees.delete_facture(1, chemin)
+    seau = base_locale.storage.from_('factures')
+    assert seau.list('depenses/1') == []
@@ -0,0 +1,109 @@
+import pandas as pd
+import pytest
+
+import miroir as module_miroir
+from miroir import Miroir
+from stockage import ClientSQLite, ErreurStockage
+
+
+@pytest.fixture
+def client(tmp_path):
+    c = ClientSQLite(str(tmp_path / 'copro.sqlite'), str(tmp_path / 'fichiers'))
+    c.table('budget').insert([{'compte': str(600 + i), 'montant_budget': 100.0 * i} for i in range(1, 6)]).execute()
+    return c
+
+
+@pytest.fixture
+def miroir(tmp_path):
+    return Miroir(str(tmp_path / 'miroir.sqlite'))
+
+
+def local(miroir, table='budget'):
+    df = miroir.lire(table)
+    return dict(zip(df['id'], df['montant_budget'])) if not df.empty else {}
+
+
+def distant(client, table='budget'):
+    return {r['id']: r['montant_budget'] for r in client.table(table).select('*').execute().data}
+
+
+class ClientRefusant:
+    """Écritures refusées par la base (contrainte, droits…) ; lectures servies normalement."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def table(self, nom):
+        return _TableRefusante(self.client.table(nom))
+
+
+class _TableRefusante:
+    def __init__(self, t):
+        self._t = t
+
+    def select(self, *args, **kwargs):
+        return self._t.select(*args, **kwargs)
+
+    def insert(self, *args, **kwargs):
+        raise ErreurStockage("insertion refusée")
+
+    update = delete = insert
+
+
+class ClientCoupe:
+    def table(self, nom):
+        raise OSError("réseau indisponible")
+
+
+def test_synchronisation_incrementale(client, miroir, monkeypatch):
+    monkeypatch.setattr(module_miroir, 'PAGE', 2)  # plusieurs pages par synchronisation
+    assert miroir.synchroniser(client, 'budget')
+    assert local(miroir) == {1: 100.0, 2: 200.0, 3: 300.0, 4: 400.0, 5: 500.0}
+    client.table('budget').update({'montant_budget': 250.0}).eq('id', 2).execute()
+    client.table('budget').delete().eq('id', 5).execute()
+    client.table('budget').insert({'compte': '699', 'montant_budget': 900.0}).execute()
+    assert miroir.synchroniser(client, 'budget')
+    assert local(miroir) == distant(client)
+    assert sorted(local(miroir).values()) == [100.0, 250.0, 300.0, 400.0, 900.0]
+
+
+def test_chevauchement_du_filigrane(client, miroir):
+    miroir.synchroniser(client, 'budget')
+    maj = miroir._conn.execute("SELECT maj FROM filigranes WHERE tbl='budget'").fetchone()[0]
+    # Ligne validée après la synchronisation, horodatée au début de sa transaction (avant le filigrane)
+    en_retard = (pd.Timestamp(maj) - pd.Timedelta(seconds=2)).isoformat()
+    client.table('budget').insert({'id': 7, 'compte': '607', 'montant_budget': 70.0,
+                                   'updated_at': en_retard}).execute()
+    miroir.synchroniser(client, 'budget')
+    assert local(miroir)[7] == 70.0
+
+
+def test_file_hors_ligne_rejouee(client, miroir):
+    miroir.synchroniser(client, 'budget')
+    assert not miroir.synchroniser(ClientCoupe(), 'budget')  # hors ligne : copie locale servie
+    provisoire = miroir.mettre_en_file('budget', 'insert', [{'compte': '698', 'montant_budget': 80.0}])[0]['id']
+    miroir.mettre_en_file('budget', 'update', {'montant_budget': 85.0}, provisoire)
+    miroir.mettre_en_file('budget', 'update', {'montant_budget': 150.0}, 1)
+    miroir.mettre_en_file('budget', 'delete', id_=[3])
+    assert provisoire < 0 and local(miroir)[provisoire] == 85.0
+    miroir.hors_ligne = False
+    assert miroir.rejouer(client) == 4 and miroir.en_attente() == 0
+    assert distant(client) == {1: 150.0, 2: 200.0, 4: 400.0, 5: 500.0, 6: 85.0}
+    assert local(miroir) == distant(client)
+
+
+def test_ecritures_refusees_annulees(client, miroir):
+    miroir.synchroniser(client, 'budget')
+    miroir.mettre_en_file('budget', 'insert', [{'compte': '698', 'montant_budget': 80.0}])
+    miroir.mettre_en_file('budget', 'update', {'montant_budget': 999.0}, 1)
+    miroir.mettre_en_file('budget', 'delete', id_=[2])
+    assert miroir.rejouer(ClientRefusant(client)) == 3
+    assert len(miroir.rejets) == 3 and miroir.en_attente() == 0
+    # Ligne fantôme retirée, modification et suppression remplacées par l'état de la base
+    assert local(miroir) == {1: 100.0, 2: 200.0, 3: 300.0, 4: 400.0, 5: 500.0}
+
+
+def test_rejeu_sans_reseau_garde_la_file(miroir):
+    miroir.mettre_en_file('budget', 'insert', [{'compte': '698', 'montant_budget': 80.0}])
+    assert miroir.rejouer(ClientCoupe()) == 0
+    assert miroir.en_attente() == 1 and miroir.hors_ligne
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from monnaie import centimes, echeance, euros, repartir
+
+
+@pytest.mark.parametrize('montant, attendu', [
+    (1.005, 101), (-1.005, -101), (2.675, 268), (0.125, 13), (0.0, 0), (12345678.9, 1234567890),
+])
+def test_centimes_demi_centime_loin_de_zero(montant, attendu):
+    assert centimes(montant) == attendu
+
+
+def test_centimes_tableau():
+    c = centimes([[1.005, 2.0], [0.015, -0.005]])
+    assert c.dtype == np.int64 and c.tolist() == [[101, 200], [2, -1]]
+    assert euros(c).tolist() == [[1.01, 2.0], [0.02, -0.01]]
+
+
+def test_repartir_somme_exacte():
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        poids = rng.integers(0, 1000, size=(rng.integers(1, 30), 3)) * (rng.random((1, 3)) < 0.9)
+        totaux = rng.integers(-10**7, 10**7, size=3)
+        parts = repartir(totaux, poids)
+        attendu = np.where(poids.sum(axis=0) > 0, totaux, 0)
+        assert (parts.sum(axis=0) == attendu).all()
+        assert (parts[poids == 0] == 0).all()
+
+
+def test_repartir_plus_fort_reste():
+    # 100 centimes sur 3 parts égales : le centime restant va à la première ligne
+    assert repartir(100, [1, 1, 1]).tolist() == [34, 33, 33]
+    assert repartir(-100, [1, 1, 1]).tolist() == [-34, -33, -33]
+    assert repartir(100, [1, 2, 0]).tolist() == [33, 67, 0]
+
+
+def test_repartir_base_non_couverte():
+    # Base déclarée 1000, 900 tantièmes saisis : 10 % du total n'est attribué à personne
+    parts = repartir(1000, [600, 300], 1000)
+    assert parts.tolist() == [600, 300]
+
+
+def test_echeance_somme_annuelle():
+    for annuel in (0, 1, 2, 3, 99_999, -10_001):
+        for nb in (1, 2, 3, 4):
+            assert sum(echeance(annuel, nb, r) for r in range(1, nb + 1)) == annuel
+    assert [echeance(10, 4, r) for r in (1, 2, 3, 4)] == [3, 3, 2, 2]
@@ -0,0 +1,63 @@
+import pytest
+
+
+@pytest.fixture
+def immeuble(base_locale):
+    base_locale.table('coproprietaires').insert([
+        {'immeuble_id': 1, 'lot': i, 'nom': f"Copro {i}", 'etage': '1', 'usage': 'appartement',
+         'tantieme_general': 1000, 'tantiemes_ascenseur': 100, 'tantiemes_special_rdc_ss': 100,
+         'tantieme_ssols': 2, 'tantieme_garages': 0, 'tantieme_monte_voitures': 0} for i in (1, 2, 3)]).execute()
+    base_locale.table('budget').insert([
+        {'immeuble_id': 1, 'annee': 2026, 'compte': '606', 'libelle_compte': 'Électricité',
+         'montant_budget': 1234.56, 'classe': '1A', 'famille': 'Charges'}]).execute()
+    base_locale.table('depenses').insert([
+        {'immeuble_id': 1, 'date': '2026-03-02', 'compte': '606', 'fournisseur': 'EDF',
+         'montant_du': 310.27, 'classe': '1A', 'famille': 'Charges', 'commentaire': None}]).execute()
+    return base_locale
+
+
+def test_montants_saisis_au_centime(immeuble, page):
+    at = page('repartition')
+    for prefixe in ('mont_', 'bud_reg_', 'glob_'):
+        saisies = [n for n in at.number_input if n.key and n.key.startswith(prefixe)]
+        assert saisies
+        assert all(n.step == 0.01 and isinstance(n.value, float) for n in saisies)
+    assert at.number_input(key='mont_general').value == 1234.56
+    assert at.number_input(key='glob_general').value == 1234.56
+
+
+def interrompre(client, lignes):
+    """Émission interrompue : il manque les lignes du dernier lot."""
+    import streamlit as st
+    client.table('appels_fonds').delete().eq('coproprietaire_id', lignes[-1]['coproprietaire_id']).execute()
+    st.cache_data.clear()
+
+
+def emettre(at):
+    at.button(key='btn_emettre_appel').click().run()
+    assert not at.exception
+    return at
+
+
+def test_emission_interrompue_completee_sur_sa_base(immeuble, page):
+    at = page('repartition')
+    emettre(at)
+    lignes = immeuble.table('appels_fonds').select('*').execute().data
+    assert lignes and {l['nb_appels'] for l in lignes} == {4}
+    interrompre(immeuble, lignes)
+    emettre(page('repartition'))
+    relues = immeuble.table('appels_fonds').select('*').execute().data
+    assert sorted((l['coproprietaire_id'], l['cle'], l['montant']) for l in relues) == \
+        sorted((l['coproprietaire_id'], l['cle'], l['montant']) for l in lignes)
+
+
+def test_emission_refusee_si_la_base_a_change(immeuble, page):
+    at = page('repartition')
+    emettre(at)
+    lignes = immeuble.table('appels_fonds').select('*').execute().data
+    interrompre(immeuble, lignes)
+    at = page('repartition')
+    at.selectbox(key='nb_appels').set_value(2).run()
+    emettre(at)
+    assert any('autre base' in e.value for e in at.error)
+    assert len(immeuble.table('appels_fonds').select('id').execute().data) < len(lignes)
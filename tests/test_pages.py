@@ -0,0 +1,48 @@
+import os
+
+import pytest
+
+from bench.generateur import charger, generer
+from conftest import RACINE
+
+MODULES = sorted(n[:-3] for n in os.listdir(os.path.join(RACINE, 'vues')) if n.endswith('.py'))
+
+
+def pages_app():
+    import ast
+    with open(os.path.join(RACINE, 'app.py'), encoding='utf-8') as f:
+        arbre = ast.parse(f.read())
+    pages, = [ast.literal_eval(n.value) for n in arbre.body
+              if isinstance(n, ast.Assign) and getattr(n.targets[0], 'id', None) == 'PAGES']
+    return [module for module, _, _ in pages]
+
+
+def test_une_page_par_module():
+    assert sorted(pages_app()) == [m for m in MODULES if m != 'fiche_locataire']
+
+
+@pytest.fixture
+def copropriete(base_locale):
+    charger(base_locale, generer(20, nb_annees=2, annee_fin=2025))
+    return base_locale
+
+
+@pytest.mark.parametrize('nom', pages_app())
+def test_page_vide(page, nom):
+    page(nom)
+
+
+@pytest.mark.parametrize('nom', pages_app())
+def test_page_sur_une_copropriete(copropriete, page, nom):
+    at = page(nom)
+    assert not [e.value for e in at.error]
+
+
+def test_fiche_publique_seule(base_locale):
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(os.path.join(RACINE, 'app.py'), default_timeout=60)
+    at.query_params['fiche'] = 'jeton-inconnu'
+    at.run()
+    assert not at.exception
+    assert [e.value for e in at.error] == ["Ce lien est invalide ou a expiré."]  # icône à part
+    assert not at.sidebar.selectbox and not at.sidebar.expander
@@ -0,0 +1,52 @@
+from streamlit.testing.v1 import AppTest
+
+
+def vue_paginee():
+    import pandas as pd
+    import streamlit as st
+    from composants import paginer_depenses
+    dep_df = pd.DataFrame({
+        'id': range(60, 0, -1),
+        'date': pd.date_range('2026-01-01', periods=60, freq='D')[::-1].strftime('%Y-%m-%d'),
+        'fournisseur': [f"F{i % 7}" for i in range(60)],
+    })
+    page = paginer_depenses(dep_df, 'vis')
+    st.session_state['ids_affiches'] = page['id'].tolist()
+
+
+def ouvrir():
+    at = AppTest.from_function(vue_paginee)
+    at.run()
+    assert not at.exception
+    return at
+
+
+def test_seule_la_page_courante_est_rendue():
+    at = ouvrir()
+    assert at.session_state['ids_affiches'] == list(range(60, 50, -1))
+    at.selectbox(key='vis_taille').set_value(25).run()
+    at.number_input(key='vis_page').set_value(3).run()
+    assert at.session_state['ids_affiches'] == list(range(10, 0, -1))
+    assert 'Dépenses 51–60 sur 60' in at.caption[0].value
+
+
+def test_page_ramenee_a_la_derniere_si_la_taille_augmente():
+    at = ouvrir()
+    at.number_input(key='vis_page').set_value(6).run()
+    at.selectbox(key='vis_taille').set_value(50).run()
+    assert at.number_input(key='vis_page').value == 2
+    assert len(at.session_state['ids_affiches']) == 10
+
+
+def test_saut_a_une_date_et_a_un_fournisseur():
+    import datetime
+    at = ouvrir()
+    # Trié par date décroissante : le 05/01 est la 56e ligne → page 6 par 10
+    at.date_input(key='vis_saut_date').set_value(datetime.date(2026, 1, 5)).run()
+    at.button(key='vis_go_date').click().run()
+    assert at.number_input(key='vis_page').value == 6
+    assert 5 in at.session_state['ids_affiches']
+    at.selectbox(key='vis_saut_fourn').set_value('F6').run()
+    at.button(key='vis_go_fourn').click().run()
+    assert at.number_input(key='vis_page').value == 1
+    assert 54 in at.session_state['ids_affiches']
@@ -0,0 +1,92 @@
+import io
+import json
+import re
+import shutil
+import subprocess
+import tarfile
+from pathlib import Path
+
+import pytest
+
+import telecharger_pdfjs
+
+VIEWER = Path(__file__).resolve().parent.parent / 'static' / 'pdfjs' / 'viewer.html'
+
+
+def archive_npm(fichiers):
+    tampon = io.BytesIO()
+    with tarfile.open(fileobj=tampon, mode='w:gz') as tar:
+        for nom, contenu in fichiers.items():
+            info = tarfile.TarInfo(f"package/legacy/build/{nom}")
+            info.size = len(contenu)
+            tar.addfile(info, io.BytesIO(contenu))
+    return tampon.getvalue()
+
+
+def test_verifier_empreinte():
+    archive = b'pdfjs'
+    telecharger_pdfjs.verifier(archive, telecharger_pdfjs.empreinte(archive))
+    with pytest.raises(ValueError, match='inattendue'):
+        telecharger_pdfjs.verifier(b'autre', telecharger_pdfjs.empreinte(archive))
+
+
+def test_verifier_refuse_sans_empreinte_fixee():
+    with pytest.raises(ValueError, match='INTEGRITE non renseignée'):
+        telecharger_pdfjs.verifier(b'pdfjs', '')
+
+
+def test_installation_contre_empreinte_fixee(tmp_path, monkeypatch):
+    archive = archive_npm({nom: nom.encode() for nom in telecharger_pdfjs.FICHIERS})
+    demandes = []
+    monkeypatch.setattr(telecharger_pdfjs, 'lire', lambda url: demandes.append(url) or archive)
+    monkeypatch.setattr(telecharger_pdfjs, 'DOSSIER', str(tmp_path))
+
+    monkeypatch.setattr(telecharger_pdfjs, 'INTEGRITE', telecharger_pdfjs.empreinte(b'autre archive'))
+    with pytest.raises(ValueError):
+        telecharger_pdfjs.main()
+    assert list(tmp_path.iterdir()) == []
+
+    monkeypatch.setattr(telecharger_pdfjs, 'INTEGRITE', telecharger_pdfjs.empreinte(archive))
+    telecharger_pdfjs.main()
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(telecharger_pdfjs.FICHIERS)
+    # Seule l'archive est téléchargée : aucune métadonnée du registre n'est consultée
+    assert demandes == [telecharger_pdfjs.ARCHIVE] * 2
+
+
+def test_version_corrigee_cve_2024_4367():
+    version = tuple(int(x) for x in telecharger_pdfjs.VERSION.split('.'))
+    assert version >= (4, 2, 67)
+    assert 'isEvalSupported: false' in VIEWER.read_text(encoding='utf-8')
+
+
+def url_autorisee(adresses, base='https://copro.example/app/static/pdfjs/viewer.html?h=600'):
+    if not shutil.which('node'):
+        pytest.skip('node absent')
+    html = VIEWER.read_text(encoding='utf-8')
+    fonction = re.search(r'function urlAutorisee\(.*?\n  \}\n', html, flags=re.S).group(0)
+    script = (f"{fonction}\nconsole.log(JSON.stringify("
+              f"{json.dumps(adresses)}.map(a => urlAutorisee(a, {json.dumps(base)}))));")
+    sortie = subprocess.run(['node', '-e', script], capture_output=True, text=True, check=True).stdout
+    return json.loads(sortie)
+
+
+def test_viewer_accepte_meme_origine_https_et_pdf_en_ligne():
+    assert url_autorisee([
+        '/app/static/fichiers/f.pdf',
+        'https://projet.supabase.co/storage/v1/object/sign/factures/f.pdf?token=x',
+        'data:application/pdf;base64,JVBERi0xLjQ=',
+    ]) == [
+        'https://copro.example/app/static/fichiers/f.pdf',
+        'https://projet.supabase.co/storage/v1/object/sign/factures/f.pdf?token=x',
+        'data:application/pdf;base64,JVBERi0xLjQ=',
+    ]
+
+
+def test_viewer_refuse_les_autres_schemas():
+    assert url_autorisee([
+        'javascript:alert(document.cookie)',
+        'data:text/html,<script>alert(1)</script>',
+        'data:text/html;application/pdf,<script>alert(1)</script>',
+        'http://ailleurs.example/f.pdf',
+        'http://[invalide',
+    ]) == ['', '', '', '', '']
@@ -0,0 +1,64 @@
+import os
+import pstats
+import time
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from profilage import Profileur, flamme_svg
+
+
+def charge_profilee(n=20000):
+    return sum(i * i for i in range(n))
+
+
+def attente_profilee(duree=0.1):
+    fin = time.perf_counter() + duree
+    while time.perf_counter() < fin:
+        pass
+
+
+def test_cprofile_fonctions_et_fichier_pstats(tmp_path):
+    p = Profileur('cprofile').demarrer()
+    charge_profilee()
+    p.arreter()
+    assert p.duree > 0
+    assert any(f['fonction'].startswith('charge_profilee (test_profilage.py:') for f in p.plus_couteuses(50))
+    chemin = tmp_path / 'rerun.pstats'
+    chemin.write_bytes(p.pstats_octets())
+    assert any(nom == 'charge_profilee' for (_, _, nom) in pstats.Stats(str(chemin)).stats)
+
+
+def test_mode_inconnu_retombe_sur_cprofile():
+    assert Profileur('perf').mode == 'cprofile'
+
+
+def test_echantillons_du_seul_fil_observe():
+    p = Profileur('echantillons', intervalle=0.001).demarrer()
+    attente_profilee()
+    p.arreter()
+    assert p.echantillons > 0
+    assert any('attente_profilee (test_profilage.py:' in pile for pile in p.piles)
+    assert not any('profilage.py' in pile.replace('test_profilage.py', '') for pile in p.piles)
+    lignes = p.piles_repliees().splitlines()
+    assert sum(int(l.rsplit(' ', 1)[1]) for l in lignes) == p.echantillons
+
+
+def test_flamme_svg_valide_et_echappee():
+    svg = flamme_svg({'main (app.py:1);lire <df> (donnees.py:9)': 3, 'main (app.py:1)': 1}, titre='Dépenses & co')
+    racine = ET.fromstring(svg)
+    titres = [t.text for t in racine.iter('{http://www.w3.org/2000/svg}title')]
+    assert 'lire <df> (donnees.py:9) — 3 échantillon(s), 75.0%' in titres
+    assert titres[0].startswith('rerun — 4 échantillon(s)')
+
+
+@pytest.mark.parametrize('jeton, profil', [('secret', True), ('autre', False)])
+def test_profil_reserve_au_jeton(base_locale, monkeypatch, jeton, profil):
+    from streamlit.testing.v1 import AppTest
+    from conftest import RACINE
+    monkeypatch.setenv('COPRO_PROFIL_JETON', 'secret')
+    at = AppTest.from_file(os.path.join(RACINE, 'app.py'), default_timeout=60)
+    at.query_params['profile'] = jeton
+    at.run()
+    assert not at.exception
+    assert any(e.label.startswith('🔬 Profil') for e in at.sidebar.expander) is profil
@@ -0,0 +1,54 @@
+import pandas as pd
+
+from rapprochement import lire_releve, rapprocher
+
+CSV = """Relevé de compte
+Compte n° 123
+Date;Libellé;Débit;Crédit
+03/02/2025;PRLV OTIS SA;120,50;
+10/02/2025;VIR M DUPONT;;316,25
+"""
+
+OFX = """OFXHEADER:100
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20250203<TRNAMT>-120.50<FITID>A1<NAME>PRLV OTIS
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20250210<TRNAMT>316.25<FITID>A2<NAME>VIR DUPONT
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+
+def test_lire_csv_debit_credit():
+    df = lire_releve(CSV.encode('utf-8'), 'releve.csv')
+    assert df['montant'].tolist() == [-120.5, 316.25]
+    assert df['date'].tolist() == [pd.Timestamp('2025-02-03'), pd.Timestamp('2025-02-10')]
+    # Sans référence bancaire, une référence stable est calculée pour chaque ligne
+    assert df['reference'].str.len().gt(0).all()
+    assert df['reference'].tolist() == lire_releve(CSV.encode('utf-8'), 'releve.csv')['reference'].tolist()
+
+
+def test_lire_ofx():
+    df = lire_releve(OFX.encode('latin-1'), 'releve.ofx')
+    assert df[['montant', 'reference']].values.tolist() == [[-120.5, 'A1'], [316.25, 'A2']]
+
+
+def test_rapprocher_meilleur_candidat():
+    lignes = pd.DataFrame({'date': pd.to_datetime(['2025-02-03', '2025-02-10', '2025-02-11']),
+                           'montant': [120.5, 316.25, 316.25],
+                           'libelle': ['PRLV OTIS SA', 'VIR M DUPONT', 'VIR MARTIN']},
+                          index=[10, 11, 12])
+    attendus = pd.DataFrame({'id': [1, 2, 3, 4],
+                             'date': pd.to_datetime(['2025-02-01', '2025-01-01', '2025-01-01', '2025-02-01']),
+                             'montant': [120.5, 316.25, 316.25, 99.0],
+                             'tiers': ['Ascenseurs Otis', 'MARTIN', 'DUPONT', 'EDF']})
+    r = rapprocher(lignes, attendus).sort_values('ligne')
+    # Chaque ligne et chaque attendu pris au plus une fois, au nom le plus ressemblant
+    assert r[['ligne', 'id']].values.tolist() == [[10, 1], [11, 3], [12, 2]]
+    assert r['ecart_jours'].tolist() == [2, 40, 41]
+
+
+def test_rapprocher_fenetre_et_tolerance():
+    lignes = pd.DataFrame({'date': pd.to_datetime(['2025-01-01']), 'montant': [100.4], 'libelle': ['EDF']})
+    attendus = pd.DataFrame({'id': [1], 'date': pd.to_datetime(['2025-01-03']), 'montant': [100.0], 'tiers': ['EDF']})
+    assert rapprocher(lignes, attendus).empty
+    assert rapprocher(lignes, attendus, tolerance_montant=0.5)['id'].tolist() == [1]
+    assert rapprocher(lignes, attendus, tolerance_montant=0.5, jours_avant=1).empty
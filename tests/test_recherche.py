@@ -0,0 +1,51 @@
+import pytest
+
+import donnees
+
+
+@pytest.fixture
+def depenses(base_locale):
+    base_locale.table('plan_comptable').insert([
+        {'immeuble_id': 1, 'compte': '614', 'libelle_compte': 'Entretien ascenseur', 'classe': '5', 'famille': 'F'},
+        {'immeuble_id': 1, 'compte': '606', 'libelle_compte': 'Électricité', 'classe': '1A', 'famille': 'F'}]).execute()
+    base_locale.table('depenses').insert([
+        {'immeuble_id': 1, 'date': '2023-05-02', 'compte': '614', 'fournisseur': 'OTIS',
+         'montant_du': 800.0, 'commentaire': 'Visite trimestrielle'},
+        {'immeuble_id': 1, 'date': '2024-02-10', 'compte': '606', 'fournisseur': 'EDF',
+         'montant_du': 310.0, 'commentaire': None},
+        {'immeuble_id': 1, 'date': '2024-03-15', 'compte': '614', 'fournisseur': 'Kone',
+         'montant_du': 950.0, 'commentaire': 'Dépannage cabine'}]).execute()
+    base_locale.table('factures_texte').insert(
+        {'immeuble_id': 1, 'depense_id': 2, 'texte': 'Facture contrat Tarif Bleu n° 4471'}).execute()
+    donnees.synchroniser_index(donnees.get_depenses())
+    return base_locale
+
+
+def test_tous_les_mots_prefixes_sans_accents(depenses):
+    assert sorted(donnees.rechercher_depenses('ascens')) == [1, 3]       # libellé du compte
+    assert donnees.rechercher_depenses('ascenseur 2023 otis') == [1]
+    assert donnees.rechercher_depenses('depannage') == [3]               # commentaire, sans accent
+    assert donnees.rechercher_depenses('electricite') == [2]
+    assert donnees.rechercher_depenses('tarif bleu') == [2]              # texte de la facture
+    assert donnees.rechercher_depenses('otis kone') == []
+    assert donnees.rechercher_depenses(' ;"* ') == []
+
+
+def test_mises_a_jour_ligne_a_ligne(depenses):
+    donnees.indexer_depense(2, {'date': '2024-02-10', 'compte': '606', 'fournisseur': 'Enedis'})
+    assert donnees.rechercher_depenses('enedis') == [2]
+    assert donnees.rechercher_depenses('edf') == []
+    assert donnees.rechercher_depenses('tarif') == [2]                   # texte de facture conservé
+    donnees.indexer_texte_facture(2, 'Avoir')
+    assert donnees.rechercher_depenses('tarif') == []
+    donnees.desindexer_depense(2)
+    assert donnees.rechercher_depenses('enedis') == []
+
+
+def test_index_reconstruit_quand_une_table_indexee_change(depenses):
+    # Libellé modifié ailleurs (autre session, autre serveur) : vu à la sonde suivante
+    depenses.table('plan_comptable').update({'libelle_compte': 'Contrat élévateur'}).eq('compte', '614').execute()
+    donnees.get_versions_tables.clear()
+    donnees.synchroniser_index(donnees.get_depenses())
+    assert sorted(donnees.rechercher_depenses('elevateur')) == [1, 3]
+    assert donnees.rechercher_depenses('ascenseur') == []
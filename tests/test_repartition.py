@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import monnaie
+from repartition import IndexTantiemes, MatriceTantiemes
+
+CONFIG = {'general': {'total': 1000}, 'ascenseurs': {'total': 500}, 'garages': {'total': 40}}
+
+
+def matrice_aleatoire(rng):
+    lots, cles = np.arange(1, rng.integers(2, 40) + 1), list(CONFIG)
+    dense = (rng.random((len(lots), len(cles))) < 0.6) * rng.integers(1, 200, (len(lots), len(cles)))
+    if rng.random() < 0.5:
+        dense[:, rng.integers(1, len(cles))] = 0  # clé sans tantième saisi
+    r, c = np.nonzero(dense)
+    lignes = pd.DataFrame({'coproprietaire_id': lots[r], 'cle': np.array(cles)[c], 'tantiemes': dense[r, c]})
+    config = {k: {'total': int(dense[:, j].sum() + rng.integers(0, 3) * 10)} for j, k in enumerate(cles)}
+    return MatriceTantiemes.depuis_lignes(lignes, lots, config), dense.astype(float), config
+
+
+def repartir_dense(dense, totaux, montants, repli):
+    """Référence : répartition sur la matrice dense (clé vide → tantièmes de la clé de repli)."""
+    poids, bases = dense.copy(), np.array(totaux, dtype=float)
+    j_repli = list(CONFIG).index(repli) if repli else None
+    if j_repli is not None and bases[j_repli] > 0:
+        vides = dense.sum(axis=0) == 0
+        vides[j_repli] = False
+        poids[:, vides] = poids[:, [j_repli]]
+        bases[vides] = bases[j_repli]
+    return monnaie.repartir(montants, poids, bases)
+
+
+@pytest.mark.parametrize('graine', range(20))
+def test_repartir_centimes_creux_egal_dense(graine):
+    rng = np.random.default_rng(graine)
+    mat, dense, config = matrice_aleatoire(rng)
+    montants = {k: float(rng.integers(-10**6, 10**7)) / 100 for k in CONFIG}
+    cts = monnaie.centimes([montants[k] for k in CONFIG])
+    totaux = [config[k]['total'] for k in CONFIG]
+    for repli in (None, 'general'):
+        attendu = repartir_dense(dense, totaux, cts, repli)
+        assert np.array_equal(mat.repartir_centimes(montants, repli=repli), attendu)
+    for j, k in enumerate(CONFIG):
+        attendu = monnaie.repartir(cts[j], dense[:, j], totaux[j]) if totaux[j] > 0 else np.zeros(len(dense))
+        assert np.array_equal(mat.repartir_cle_centimes(k, montants[k]), attendu)
+
+
+def test_repartir_centimes_lecture_seule_et_conserve():
+    mat, _, _ = matrice_aleatoire(np.random.default_rng(1))
+    parts = mat.repartir_centimes({'general': 1234.56})
+    assert parts is mat.repartir_centimes({'general': 1234.56})
+    with pytest.raises(ValueError):
+        parts[0, 0] = 1
+
+
+def test_repartir_non_arrondi_egal_dense():
+    mat, dense, config = matrice_aleatoire(np.random.default_rng(2))
+    montants = {'general': 1000.0, 'ascenseurs': 300.0, 'garages': 40.0}
+    totaux = np.array([config[k]['total'] for k in CONFIG], dtype=float)
+    coef = np.divide([montants[k] for k in CONFIG], totaux, out=np.zeros(3), where=totaux > 0)
+    assert np.allclose(mat.repartir(montants), dense * coef)
+
+
+def test_index_tantiemes_segments_et_limite():
+    lignes = pd.DataFrame({
+        'coproprietaire_id': [1, 2, 1], 'cle': ['general'] * 3, 'tantiemes': [400, 600, 300],
+        'date_debut': [None, None, '2024-07-01'], 'date_fin': ['2024-07-01', None, None]})
+    index = IndexTantiemes(lignes, CONFIG)
+    avant = index.matrice([1, 2], '2024-01-15')
+    assert avant is index.matrice([1, 2], '2024-06-30')
+    assert avant.du_lot(1) == {'general': 400.0}
+    assert index.matrice([1, 2], '2024-07-01').du_lot(1) == {'general': 300.0}
+    assert index.debut_segment('2025-01-01') == pd.Timestamp('2024-07-01')
+    for n in range(3, 3 + 2 * IndexTantiemes.MATRICES_MAX):
+        index.matrice([1, 2, n], '2025-01-01')
+    assert len(index._matrices) == IndexTantiemes.MATRICES_MAX
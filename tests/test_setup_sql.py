@@ -0,0 +1,71 @@
+import os
+import re
+from pathlib import Path
+
+import pytest
+
+SCRIPT = Path(__file__).resolve().parent.parent / 'setup_supabase.sql'
+
+
+def corps_fonctions(sql):
+    """Corps `$$ … $$` des fonctions et blocs DO du script."""
+    return re.findall(r'\$\$(.*?)\$\$', sql, flags=re.S)
+
+
+def sans_commentaires(sql):
+    return re.sub(r'--[^\n]*', '', sql)
+
+
+def test_corps_fonctions_equilibres():
+    sql = SCRIPT.read_text(encoding='utf-8')
+    assert sql.count('$$') % 2 == 0
+    corps = corps_fonctions(sql)
+    assert any('passer_ecritures' in c or 'compte_copro_soldes' in c for c in corps)
+    for c in corps:
+        assert c.count('(') == c.count(')')
+
+
+def test_with_ordinality_sans_liste_de_definition():
+    # Postgres refuse « f(...) WITH ORDINALITY AS x(col TYPE, ...) » à l'exécution :
+    # la liste de définition doit rester dans ROWS FROM (f(...) AS (col TYPE, ...)).
+    sql = sans_commentaires(SCRIPT.read_text(encoding='utf-8'))
+    occurrences = list(re.finditer(r'WITH\s+ORDINALITY\s+AS\s+\w+\s*\(([^)]*)\)', sql, flags=re.I))
+    assert occurrences
+    for m in occurrences:
+        avant = sql[:m.start()]
+        assert re.search(r'ROWS\s+FROM\s*\(', avant[-400:], flags=re.I), m.group(0)
+        for colonne in m.group(1).split(','):
+            assert len(colonne.split()) == 1, f"colonne typée après WITH ORDINALITY : {colonne.strip()}"
+
+
+def test_passer_ecritures_colonnes_alignees():
+    sql = sans_commentaires(SCRIPT.read_text(encoding='utf-8'))
+    m = re.search(r'jsonb_to_recordset\(p_ecritures\)\s*AS\s*\(([^)]*)\)\)\s*WITH\s+ORDINALITY\s+AS\s+x\(([^)]*)\)',
+                  sql, flags=re.I)
+    assert m
+    typees = [c.split()[0] for c in m.group(1).split(',')]
+    alias = [c.strip() for c in m.group(2).split(',')]
+    assert alias == typees + ['rang']
+
+
+def test_script_analyse_par_postgres():
+    pglast = pytest.importorskip('pglast')
+    sql = SCRIPT.read_text(encoding='utf-8')
+    pglast.parse_sql(sql)
+    for fonction in re.findall(r'CREATE OR REPLACE FUNCTION.*?\$\$.*?\$\$[^;]*;', sql, flags=re.S):
+        pglast.parser.parse_plpgsql(fonction)
+
+
+@pytest.mark.skipif(not os.environ.get('COPRO_TEST_POSTGRES'),
+                    reason="COPRO_TEST_POSTGRES (DSN d'une base au schéma d'origine) non défini")
+def test_passer_ecritures_execute():
+    # Le FOR … IN est préparé à la première exécution : un appel suffit à révéler
+    # les erreurs d'analyse, même sans écriture. Tout est annulé en fin de test.
+    psycopg = pytest.importorskip('psycopg')
+    with psycopg.connect(os.environ['COPRO_TEST_POSTGRES']) as cnx:
+        try:
+            cnx.execute(SCRIPT.read_text(encoding='utf-8'))
+            n = cnx.execute("SELECT passer_ecritures_copro(1, '[]'::jsonb)").fetchone()[0]
+            assert n == 0
+        finally:
+            cnx.rollback()
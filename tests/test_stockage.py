@@ -0,0 +1,152 @@
+import json
+import sqlite3
+
+import pytest
+
+from stockage import ClientSQLite, ErreurStockage, StockageFichiers, _condition, _decouper
+
+
+@pytest.fixture
+def client(tmp_path):
+    c = ClientSQLite(str(tmp_path / 'copro.sqlite'), str(tmp_path / 'fichiers'))
+    c.table('depenses').insert([
+        {'date': '2025-01-10', 'fournisseur': 'EDF', 'montant_du': 120.5, 'compte': '606', 'commentaire': None},
+        {'date': '2025-02-03', 'fournisseur': 'OTIS', 'montant_du': 80.0, 'compte': '615', 'commentaire': 'contrat'},
+        {'date': '2025-03-15', 'fournisseur': 'Veolia', 'montant_du': 45.2, 'compte': '601', 'commentaire': None},
+        {'date': '2024-12-20', 'fournisseur': 'EDF', 'montant_du': 99.0, 'compte': '606', 'commentaire': 'régul'},
+    ]).execute()
+    return c
+
+
+def ids(reponse):
+    return [l['id'] for l in reponse.data]
+
+
+def test_filtres(client):
+    t = lambda: client.table('depenses').select('*').order('id')
+    assert ids(t().eq('fournisseur', 'EDF').execute()) == [1, 4]
+    assert ids(t().neq('compte', 606).execute()) == [2, 3]  # texte comparé comme la colonne
+    assert ids(t().gte('date', '2025-01-01').lt('date', '2025-03-01').execute()) == [1, 2]
+    assert ids(t().gt('montant_du', '80').execute()) == [1, 4]
+    assert ids(t().in_('compte', ['601', '615']).execute()) == [2, 3]
+    assert ids(t().is_('commentaire', 'null').execute()) == [1, 3]
+    assert ids(t().not_.is_('commentaire', 'null').execute()) == [2, 4]
+    assert ids(t().ilike('fournisseur', 'v%').execute()) == [3]
+
+
+def test_or_imbrique(client):
+    r = client.table('depenses').select('id').order('id') \
+        .or_("montant_du.lt.50,and(fournisseur.eq.EDF,date.gte.2025-01-01)").execute()
+    assert ids(r) == [1, 3]
+    r = client.table('depenses').select('id').order('id') \
+        .or_('compte.in.("601","615"),commentaire.not.is.null').execute()
+    assert ids(r) == [2, 3, 4]
+
+
+def test_decoupage_or():
+    assert _decouper("a.eq.1, and(b.eq.2,c.gt.3) ,d.is.null") == ['a.eq.1', 'and(b.eq.2,c.gt.3)', 'd.is.null']
+    cond = _condition("or(a.eq.1,and(b.eq.x,c.gt.3))")
+    assert cond({'a': 1}) and cond({'b': 'x', 'c': 4}) and not cond({'b': 'x', 'c': 3})
+
+
+def test_horodatages_compares_comme_instants(client):
+    ligne = client.table('depenses').select('*').eq('id', 1).execute().data[0]
+    maj = ligne['updated_at']  # « …+00:00 »
+    en_z = maj.replace('+00:00', 'Z')
+    assert ids(client.table('depenses').select('id').eq('updated_at', en_z).execute()) == [1]
+    r = client.table('depenses').select('id').or_(f"updated_at.gt.{en_z},and(updated_at.eq.{en_z},id.gt.0)")
+    assert 1 in ids(r.execute())
+
+
+def test_tri_pagination_comptage(client):
+    r = client.table('depenses').select('id,montant_du', count='exact').order('fournisseur').order('date', desc=True) \
+        .range(0, 2).execute()
+    assert ids(r) == [1, 4, 2] and r.count == 4
+    assert set(r.data[0]) == {'id', 'montant_du'}
+    r = client.table('depenses').select('id', count='exact', head=True).eq('compte', '606').execute()
+    assert r.data == [] and r.count == 2
+    assert ids(client.table('depenses').select('id').order('montant_du', desc=True).limit(1).execute()) == [1]
+
+
+def test_ecritures_et_versions(client):
+    client.table('depenses').update({'montant_du': 1.0}).eq('fournisseur', 'EDF').execute()
+    client.table('depenses').delete().eq('id', 3).execute()
+    assert [l['montant_du'] for l in client.table('depenses').select('*').order('id').execute().data] == [1.0, 80.0, 1.0]
+    versions = client.table('versions_tables').select('*').execute().data
+    assert [(v['table_name'], v['version']) for v in versions] == [('depenses', 3)]
+
+
+def test_upsert(client):
+    client.table('releve_bancaire').upsert([{'immeuble_id': 1, 'reference': 'r1', 'montant': 10.0},
+                                            {'immeuble_id': 1, 'reference': 'r2', 'montant': 20.0}],
+                                           on_conflict='immeuble_id,reference').execute()
+    client.table('releve_bancaire').upsert({'immeuble_id': 1, 'reference': 'r1', 'montant': 15.0},
+                                           on_conflict='immeuble_id,reference').execute()
+    lignes = client.table('releve_bancaire').select('*').order('id').execute().data
+    assert [(l['id'], l['reference'], l['montant']) for l in lignes] == [(1, 'r1', 15.0), (2, 'r2', 20.0)]
+    # Clé primaire propre à la table (CLES_PRIMAIRES)
+    client.table('compte_copro_soldes').upsert({'coproprietaire_id': 3, 'solde': 5}).execute()
+    client.table('compte_copro_soldes').upsert({'coproprietaire_id': 3, 'solde': 7}).execute()
+    assert client.table('compte_copro_soldes').select('solde').execute().data == [{'solde': 7}]
+
+
+def test_filtres_indexes_gardent_l_alignement_des_types(client):
+    client.table('depenses').insert([{'id': '7', 'immeuble_id': 1.0, 'fournisseur': 'texte'},
+                                     {'id': 8.5, 'immeuble_id': 2, 'fournisseur': 'decimal'}]).execute()
+    assert ids(client.table('depenses').select('id').eq('id', 7).execute()) == ['7']
+    assert ids(client.table('depenses').select('id').in_('immeuble_id', ['1']).execute()) == ['7']
+    assert ids(client.table('depenses').select('id').gt('id', 7).execute()) == [8.5]
+    assert ids(client.table('depenses').select('id').lte('id', 2).order('id').execute()) == [1, 2]
+    assert client.table('depenses').select('id').in_('id', []).execute().data == []
+    client.table('depenses').update({'commentaire': 'x'}).eq('id', '7').execute()
+    client.table('depenses').delete().gte('id', 8).execute()
+    assert [(l['id'], l['commentaire']) for l in client.table('depenses').select('*').gte('id', 4).execute().data] \
+        == [(4, 'régul'), ('7', 'x')]
+    assert client.table('depenses').insert({'fournisseur': 'suivant'}).execute().data[0]['id'] == 8
+
+
+def test_filtre_indexe_ne_lit_que_les_lignes_visees(client, monkeypatch):
+    client.table('depenses').insert([{'fournisseur': f"F{i}", 'immeuble_id': 1 + i % 2} for i in range(200)]).execute()
+    lues = []
+    loads = json.loads
+    monkeypatch.setattr(json, 'loads', lambda texte, *a, **k: lues.append(1) or loads(texte, *a, **k))
+    assert ids(client.table('depenses').select('id').eq('id', 150).execute()) == [150]
+    assert len(lues) == 1
+    del lues[:]
+    client.table('depenses').update({'commentaire': 'vu'}).eq('immeuble_id', 2).eq('id', 10).execute()
+    assert len(lues) == 3  # valeurs écrites, ligne visée, version de la table
+
+
+def test_base_sans_colonnes_indexees_migree(tmp_path):
+    chemin = str(tmp_path / 'ancienne.sqlite')
+    with sqlite3.connect(chemin) as cnx:
+        cnx.executescript("""
+            CREATE TABLE lignes (num INTEGER PRIMARY KEY AUTOINCREMENT, tbl TEXT NOT NULL, donnees TEXT NOT NULL);
+            CREATE INDEX lignes_tbl ON lignes (tbl);""")
+        cnx.executemany("INSERT INTO lignes (tbl, donnees) VALUES ('depenses', ?)",
+                        [(json.dumps({'id': i, 'immeuble_id': 2, 'fournisseur': f"F{i}"}),) for i in (1, 2, 5)])
+    c = ClientSQLite(chemin, str(tmp_path / 'fichiers'))
+    assert ids(c.table('depenses').select('id').eq('immeuble_id', 2).gte('id', 2).order('id').execute()) == [2, 5]
+    assert c.table('depenses').insert({'fournisseur': 'F6', 'immeuble_id': 2}).execute().data[0]['id'] == 6
+
+
+def test_fonction_inconnue(client):
+    with pytest.raises(ErreurStockage):
+        client.rpc('inconnue', {}).execute()
+
+
+def test_fichiers(client):
+    seau = client.storage.from_('factures')
+    seau.upload('2025/f.pdf', b'%PDF-1.4')
+    assert seau.download('2025/f.pdf') == b'%PDF-1.4'
+    assert seau.create_signed_url('2025/f.pdf', 60)['signedURL'].startswith('data:application/pdf')
+
+
+def test_fichiers_prefixe_depuis_la_racine(tmp_path):
+    # Un préfixe relatif se résoudrait sous la page de la visionneuse (/app/static/pdfjs/…)
+    fichiers = StockageFichiers(str(tmp_path), 'fichiers/')
+    seau = fichiers.from_('factures')
+    seau.upload('f.pdf', b'%PDF-1.4')
+    assert seau.create_signed_url('f.pdf', 60)['signedURL'] == '/fichiers/factures/f.pdf'
+    https = StockageFichiers(str(tmp_path), 'https://cdn.example/copro').from_('factures')
+    assert https.create_signed_url('f.pdf', 60)['signedURL'] == 'https://cdn.example/copro/factures/f.pdf'
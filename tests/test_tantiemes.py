@@ -0,0 +1,53 @@
+import pandas as pd
+import pytest
+
+import donnees
+from repartition import IndexTantiemes, lignes_tantiemes
+
+CONFIG = {'general': {'total': 1000, 'col': 'tantieme_general'},
+          'garages': {'total': 40, 'col': 'tantieme_garages'}}
+
+
+def test_lignes_lues_dans_les_colonnes_tant_que_la_table_est_vide():
+    copro = pd.DataFrame({'id': [1, 2], 'tantieme_general': ['600', 400], 'tantieme_garages': [0, 40]})
+    lignes = lignes_tantiemes(pd.DataFrame(), copro, CONFIG)
+    assert sorted(zip(lignes['coproprietaire_id'], lignes['cle'], lignes['tantiemes'])) == \
+        [(1, 'general', 600.0), (2, 'garages', 40.0), (2, 'general', 400.0)]
+    assert lignes[['date_debut', 'date_fin']].isna().all().all()
+
+
+def test_debut_inclus_fin_exclue():
+    lignes = lignes_tantiemes(pd.DataFrame({
+        'coproprietaire_id': [1, 1, 2], 'cle': ['general'] * 3, 'tantiemes': ['400', '300', 600],
+        'date_debut': [None, '2025-07-01', None], 'date_fin': ['2025-07-01', None, '2026-01-01']}),
+        None, CONFIG)
+    index = IndexTantiemes(lignes, CONFIG)
+    assert index.matrice([1, 2], '2025-06-30').colonne('general').tolist() == [400.0, 600.0]
+    assert index.matrice([1, 2], '2025-07-01').colonne('general').tolist() == [300.0, 600.0]
+    # Lot 2 fusionné au 01/01/2026 : plus aucun tantième ensuite
+    assert index.matrice([1, 2], '2026-01-01').colonne('general').tolist() == [300.0, 0.0]
+    assert index.debut_segment('2025-06-30') is None
+    assert index.debut_segment('2026-03-01') == pd.Timestamp('2026-01-01')
+
+
+@pytest.fixture
+def historique(base_locale):
+    base_locale.table('coproprietaires').insert([
+        {'immeuble_id': 1, 'lot': i, 'nom': f"Copro {i}", 'tantieme_general': 5000} for i in (1, 2)]).execute()
+    base_locale.table('tantiemes_lots').insert([
+        {'immeuble_id': 1, 'coproprietaire_id': 1, 'cle': 'general', 'tantiemes': 5000,
+         'date_debut': None, 'date_fin': '2025-07-01'},
+        {'immeuble_id': 1, 'coproprietaire_id': 1, 'cle': 'general', 'tantiemes': 2500,
+         'date_debut': '2025-07-01', 'date_fin': None},
+        {'immeuble_id': 1, 'coproprietaire_id': 2, 'cle': 'general', 'tantiemes': 5000,
+         'date_debut': None, 'date_fin': None}]).execute()
+    return base_locale
+
+
+def test_chaque_calcul_lit_les_tantiemes_de_sa_date(historique):
+    avant = donnees.get_matrice_tantiemes((1, 2), '2025-04-01')
+    apres = donnees.get_matrice_tantiemes((1, 2), '2025-10-01')
+    assert avant.colonne('general').tolist() == [5000.0, 5000.0]
+    assert apres.colonne('general').tolist() == [2500.0, 5000.0]
+    # Même segment (avant le 01/07/2025) : matrice construite une seule fois
+    assert donnees.get_matrice_tantiemes((1, 2), '2024-01-01') is donnees.get_matrice_tantiemes((1, 2), '2025-04-01')
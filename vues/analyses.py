@@ -0,0 +1,88 @@
+"""
+vues/analyses.py — 📈 Analyses
+
+Évolution du budget et des dépenses sur plusieurs années.
+"""
+
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+from donnees import get_depenses, get_budget
+from composants import afficher_graphique
+
+st.markdown("<h1 class='main-header'>📈 Analyses Avancées</h1>", unsafe_allow_html=True)
+depenses_df = get_depenses()
+budget_df = get_budget()
+
+if not depenses_df.empty and not budget_df.empty:
+    depenses_df['date'] = pd.to_datetime(depenses_df['date'])
+    depenses_df['annee'] = depenses_df['date'].dt.year
+    depenses_df['montant_du'] = pd.to_numeric(depenses_df['montant_du'], errors='coerce')
+
+    annees = sorted(depenses_df['annee'].unique(), reverse=True)
+    annee_a = st.selectbox("📅 Année", annees, key="anal_annee")
+    dep_a = depenses_df[depenses_df['annee'] == annee_a].copy()
+    bud_a = budget_df[budget_df['annee'] == annee_a].copy()
+
+    st.divider()
+    st.subheader(f"📊 Analyse Budget vs Réalisé par Classe — {annee_a}")
+
+    classes_labels = {
+        '1A':'Charges courantes', '1B':'Entretien courant', '2':'Élec. RDC/ss-sols',
+        '3':'Élec. sous-sols', '4':'Garages/Parkings', '5':'Ascenseurs',
+        '6':'Monte-voitures', '7':'Travaux/Divers'
+    }
+    rows = []
+    tot_bud = 0; tot_dep = 0
+    for cl, lib in classes_labels.items():
+        b = float(bud_a[bud_a['classe']==cl]['montant_budget'].sum()) if 'classe' in bud_a.columns else 0
+        d = float(dep_a[dep_a['classe']==cl]['montant_du'].sum()) if 'classe' in dep_a.columns else 0
+        rows.append({'Classe': cl, 'Libellé': lib, 'Budget (€)': b, 'Dépenses (€)': d,
+                     'Écart (€)': b-d, '% Réalisé': round(d/b*100,1) if b > 0 else 0})
+        tot_bud += b; tot_dep += d
+    rows.append({'Classe':'TOTAL','Libellé':'','Budget (€)':tot_bud,'Dépenses (€)':tot_dep,
+                 'Écart (€)':tot_bud-tot_dep,'% Réalisé':round(tot_dep/tot_bud*100,1) if tot_bud>0 else 0})
+
+    anal_df = pd.DataFrame(rows)
+    st.dataframe(anal_df, use_container_width=True, hide_index=True,
+        column_config={
+            "Budget (€)": st.column_config.NumberColumn(format="%,.0f"),
+            "Dépenses (€)": st.column_config.NumberColumn(format="%,.2f"),
+            "Écart (€)": st.column_config.NumberColumn(format="%,.2f"),
+            "% Réalisé": st.column_config.NumberColumn(format="%.1f%%"),
+        })
+
+    st.divider()
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader("Budget vs Dépenses par Classe")
+        fig = go.Figure()
+        df_no_total = anal_df[anal_df['Classe'] != 'TOTAL']
+        fig.add_trace(go.Bar(name='Budget', x=df_no_total['Classe'], y=df_no_total['Budget (€)'], marker_color='lightblue'))
+        fig.add_trace(go.Bar(name='Dépenses', x=df_no_total['Classe'], y=df_no_total['Dépenses (€)'], marker_color='salmon'))
+        fig.update_layout(barmode='group')
+        afficher_graphique(fig)
+    with col2:
+        st.subheader("Top Fournisseurs")
+        if not dep_a.empty and 'fournisseur' in dep_a.columns:
+            top_f = dep_a.groupby('fournisseur', observed=True)['montant_du'].agg(['sum','count']).reset_index()
+            top_f.columns = ['Fournisseur','Total (€)','Nb factures']
+            top_f = top_f.sort_values('Total (€)', ascending=False).head(10)
+            fig = px.bar(top_f, x='Fournisseur', y='Total (€)', color='Nb factures', text='Total (€)')
+            fig.update_traces(texttemplate='%{text:,.0f}€', textposition='outside')
+            fig.update_layout(xaxis_tickangle=45)
+            afficher_graphique(fig)
+
+    st.subheader(f"📅 Évolution Mensuelle — {annee_a}")
+    if not dep_a.empty:
+        dep_a['mois'] = dep_a['date'].dt.to_period('M').astype(str)
+        ev = dep_a.groupby('mois')['montant_du'].sum().reset_index()
+        fig = px.area(ev, x='mois', y='montant_du', labels={'montant_du':'Montant (€)','mois':'Mois'},
+            title=f"Évolution mensuelle {annee_a}")
+        afficher_graphique(fig)
+
+    st.download_button("📥 Exporter l'analyse CSV",
+        anal_df.to_csv(index=False).encode('utf-8'), f"analyse_{annee_a}.csv", "text/csv")
+else:
+    st.warning("⚠️ Données insuffisantes pour les analyses")
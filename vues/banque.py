@@ -0,0 +1,250 @@
+"""
+vues/banque.py — 🏦 Banque
+
+Relevés bancaires et rapprochement avec les dépenses et les appels de fonds.
+"""
+
+import streamlit as st
+import pandas as pd
+from rapprochement import lire_releve, rapprocher
+from donnees import (get_depenses, get_coproprietaires, get_budget, get_releve_bancaire,
+                     appels_attendus, get_appels_fonds, supabase, passer_ecritures,
+                     get_depot, vider_cache_immeuble)
+
+st.markdown("<h1 class='main-header'>🏦 Banque & Rapprochement</h1>", unsafe_allow_html=True)
+st.caption("Import des relevés (CSV, OFX, CAMT.053) et rapprochement automatique avec les dépenses et les appels de fonds")
+
+dep_bq   = get_depenses()
+copro_bq = get_coproprietaires()
+bud_bq   = get_budget()
+rel_bq   = get_releve_bancaire()
+
+if not dep_bq.empty:
+    dep_bq['date'] = pd.to_datetime(dep_bq['date'], errors='coerce')
+    dep_bq['montant_du'] = pd.to_numeric(dep_bq['montant_du'], errors='coerce').fillna(0)
+    if 'montant_paye' not in dep_bq.columns:
+        dep_bq['montant_paye'] = 0.0
+    dep_bq['montant_paye'] = pd.to_numeric(dep_bq['montant_paye'], errors='coerce').fillna(0)
+for col_r in ['reference', 'depense_id', 'coproprietaire_id', 'appel']:
+    if col_r not in rel_bq.columns:
+        rel_bq[col_r] = None
+
+def encaisse_par_appel():
+    """Montants déjà encaissés par (copropriétaire, appel)."""
+    enc = rel_bq[rel_bq['coproprietaire_id'].notna() & rel_bq['appel'].notna()]
+    if enc.empty:
+        return {}
+    enc = enc.assign(montant=pd.to_numeric(enc['montant'], errors='coerce').fillna(0))
+    return {(int(c), a): m for (c, a), m in enc.groupby(['coproprietaire_id', 'appel'])['montant'].sum().items()}
+
+def attendus_depenses():
+    if dep_bq.empty:
+        return pd.DataFrame(columns=['id', 'date', 'montant', 'tiers'])
+    reste = (dep_bq['montant_du'] - dep_bq['montant_paye']).round(2)
+    a = dep_bq[reste > 0.005]
+    return pd.DataFrame({'id': a['id'].astype(int), 'date': a['date'],
+                         'montant': reste[reste > 0.005], 'tiers': a['fournisseur'].astype(object).fillna('')})
+
+def attendus_appels(annees, nb):
+    if copro_bq.empty or bud_bq.empty:
+        return pd.DataFrame(columns=['id', 'coproprietaire_id', 'appel', 'date', 'montant', 'tiers'])
+    att = appels_attendus(copro_bq, bud_bq, annees, nb, st.session_state.get('alur_taux', 5.0),
+                          get_appels_fonds())
+    deja = encaisse_par_appel()
+    if deja:
+        att['montant'] = [round(m - deja.get((c, a), 0), 2)
+                          for c, a, m in zip(att['coproprietaire_id'], att['appel'], att['montant'])]
+    return att[att['montant'] > 0.005]
+
+tab_imp, tab_nr, tab_hist = st.tabs(["📥 Importer & rapprocher", "❓ Non rapprochées", "📜 Historique"])
+
+# ── IMPORT & RAPPROCHEMENT AUTOMATIQUE ──────────────────────────
+with tab_imp:
+    fichier_bq = st.file_uploader("📤 Relevé bancaire", type=['csv', 'txt', 'ofx', 'xml'], key="bq_fichier",
+                                  help="CSV exporté de la banque, OFX/QFX, ou CAMT.053 (XML)")
+    c1, c2, c3, c4 = st.columns(4)
+    with c1:
+        tol_bq = st.number_input("Tolérance montant (€)", min_value=0.0, max_value=50.0, value=0.0,
+                                 step=0.01, format="%.2f", key="bq_tol")
+    with c2:
+        jav_bq = st.number_input("Jours avant l'échéance", min_value=0, max_value=90, value=5, key="bq_jav")
+    with c3:
+        jap_bq = st.number_input("Jours après l'échéance", min_value=0, max_value=365, value=90, key="bq_jap")
+    with c4:
+        nb_app_bq = st.selectbox("Nb appels / an", [4, 3, 2, 1], key="bq_nb_appels")
+
+    if fichier_bq:
+        try:
+            lignes_bq = lire_releve(fichier_bq.getvalue(), fichier_bq.name)
+        except Exception as e:
+            st.error(f"❌ Relevé illisible : {e}"); lignes_bq = pd.DataFrame()
+
+        if not lignes_bq.empty:
+            deja_imp = lignes_bq['reference'].isin(set(rel_bq['reference'].dropna()))
+            if deja_imp.any():
+                st.info(f"⏭️ {int(deja_imp.sum())} ligne(s) déjà importée(s) ignorée(s).")
+            lignes_bq = lignes_bq[~deja_imp]
+
+        if not lignes_bq.empty:
+            debits  = lignes_bq[lignes_bq['montant'] < 0].assign(montant=lambda d: -d['montant'])
+            credits = lignes_bq[lignes_bq['montant'] > 0]
+            att_dep = attendus_depenses()
+            annees_cr = sorted(set(credits['date'].dt.year) | set(credits['date'].dt.year - 1))
+            att_app = attendus_appels(annees_cr, nb_app_bq)
+
+            r_dep = rapprocher(debits, att_dep, tol_bq, jav_bq, jap_bq)
+            r_app = rapprocher(credits, att_app, tol_bq, jav_bq, jap_bq)
+
+            lignes_bq = lignes_bq.assign(depense_id=None, coproprietaire_id=None, appel=None)
+            if not r_dep.empty:
+                lignes_bq.loc[r_dep['ligne'], 'depense_id'] = r_dep['id'].astype(int).values
+            if not r_app.empty:
+                app_idx = att_app.set_index('id')
+                lignes_bq.loc[r_app['ligne'], 'coproprietaire_id'] = app_idx.loc[r_app['id'], 'coproprietaire_id'].values
+                lignes_bq.loc[r_app['ligne'], 'appel'] = app_idx.loc[r_app['id'], 'appel'].values
+            non_rap = lignes_bq['depense_id'].isna() & lignes_bq['coproprietaire_id'].isna()
+
+            m1, m2, m3, m4 = st.columns(4)
+            m1.metric("Lignes importées", len(lignes_bq))
+            m2.metric("💸 Dépenses réglées", len(r_dep))
+            m3.metric("📥 Appels encaissés", len(r_app))
+            m4.metric("❓ Non rapprochées", int(non_rap.sum()))
+
+            if not r_dep.empty:
+                st.subheader("💸 Débits rapprochés des dépenses")
+                vue = r_dep.merge(lignes_bq[['date', 'montant', 'libelle']], left_on='ligne', right_index=True)
+                vue = vue.merge(dep_bq[['id', 'date', 'fournisseur', 'montant_du', 'montant_paye']]
+                                .rename(columns={'date': 'date_facture'}), on='id')
+                vue['date'] = vue['date'].dt.strftime('%d/%m/%Y')
+                vue['date_facture'] = vue['date_facture'].dt.strftime('%d/%m/%Y')
+                st.dataframe(vue[['date', 'libelle', 'montant', 'id', 'date_facture', 'fournisseur',
+                                  'montant_du', 'montant_paye', 'ecart_jours', 'similarite']],
+                             hide_index=True, use_container_width=True,
+                             column_config={"id": "Dépense", "montant": st.column_config.NumberColumn("Montant (€)", format="%.2f")})
+            if not r_app.empty:
+                st.subheader("📥 Crédits rapprochés des appels de fonds")
+                vue = r_app.merge(lignes_bq[['date', 'montant', 'libelle']], left_on='ligne', right_index=True)
+                vue = vue.merge(att_app[['id', 'appel', 'tiers', 'montant']].rename(columns={'montant': 'du'}), on='id')
+                vue['date'] = vue['date'].dt.strftime('%d/%m/%Y')
+                st.dataframe(vue[['date', 'libelle', 'montant', 'tiers', 'appel', 'du', 'ecart_jours', 'similarite']],
+                             hide_index=True, use_container_width=True,
+                             column_config={"tiers": "Copropriétaire", "du": st.column_config.NumberColumn("Dû (€)", format="%.2f"),
+                                            "montant": st.column_config.NumberColumn("Montant (€)", format="%.2f")})
+            if non_rap.any():
+                st.subheader("❓ Lignes non rapprochées")
+                vue = lignes_bq[non_rap].copy()
+                vue['date'] = vue['date'].dt.strftime('%d/%m/%Y')
+                st.dataframe(vue[['date', 'libelle', 'montant', 'reference']], hide_index=True,
+                             use_container_width=True)
+
+            if st.button("💾 Enregistrer le relevé et le rapprochement", type="primary", key="bq_save"):
+                try:
+                    recs = [{'date': r['date'].strftime('%Y-%m-%d'), 'montant': round(float(r['montant']), 2),
+                             'libelle': r['libelle'], 'reference': r['reference'],
+                             'depense_id': int(r['depense_id']) if pd.notna(r['depense_id']) else None,
+                             'coproprietaire_id': int(r['coproprietaire_id']) if pd.notna(r['coproprietaire_id']) else None,
+                             'appel': r['appel'] if pd.notna(r['appel']) else None}
+                            for r in lignes_bq.to_dict('records')]
+                    for i in range(0, len(recs), 50):
+                        supabase.table('releve_bancaire').upsert(recs[i:i+50], on_conflict='immeuble_id,reference').execute()
+                    # Seule la colonne montant_paye est écrite, dépense par dépense
+                    if not r_dep.empty:
+                        regle = r_dep.merge(debits[['montant']], left_on='ligne', right_index=True) \
+                                     .groupby('id')['montant'].sum()
+                        brut = get_depenses()
+                        brut = brut[brut['id'].isin(regle.index)]
+                        paye = pd.to_numeric(brut['montant_paye'], errors='coerce').fillna(0) \
+                            if 'montant_paye' in brut.columns else pd.Series(0.0, index=brut.index)
+                        for dep_id, montant_paye in zip(brut['id'], (paye + brut['id'].map(regle)).round(2)):
+                            get_depot().modifier(supabase, 'depenses', int(dep_id),
+                                                 {'montant_paye': float(montant_paye)})
+                    # Crédits encaissés : paiement porté au compte du copropriétaire
+                    passer_ecritures([{
+                        'coproprietaire_id': int(r['coproprietaire_id']), 'date': r['date'].strftime('%Y-%m-%d'),
+                        'nature': 'paiement', 'libelle': f"Virement — {r['appel']}",
+                        'debit': 0.0, 'credit': round(float(r['montant']), 2),
+                        'reference': f"banque:{r['reference']}",
+                    } for r in lignes_bq.to_dict('records') if pd.notna(r['coproprietaire_id'])])
+                    st.success(f"✅ {len(recs)} ligne(s) enregistrée(s), {len(r_dep)} dépense(s) réglée(s), "
+                               f"{len(r_app)} appel(s) encaissé(s).")
+                    vider_cache_immeuble(); st.rerun()
+                except Exception as e:
+                    st.error(f"❌ {e}")
+
+# ── LIGNES NON RAPPROCHÉES (saisie manuelle) ────────────────────
+with tab_nr:
+    if rel_bq.empty:
+        st.info("Aucun relevé importé.")
+    else:
+        nr = rel_bq[rel_bq['depense_id'].isna() & rel_bq['coproprietaire_id'].isna()].copy()
+        st.metric("❓ Lignes non rapprochées", len(nr))
+        if not nr.empty:
+            nr['montant'] = pd.to_numeric(nr['montant'], errors='coerce').fillna(0)
+            st.dataframe(nr[['date', 'libelle', 'montant', 'reference']], hide_index=True, use_container_width=True)
+            st.divider()
+            st.subheader("🔗 Rapprocher manuellement")
+            ligne_id = st.selectbox("Ligne bancaire", nr['id'].tolist(), key="bq_nr_ligne",
+                format_func=lambda x: (lambda r: f"{r['date']} · {r['libelle'][:50]} · {r['montant']:,.2f} €")(
+                    nr[nr['id'] == x].iloc[0]))
+            ligne_sel = nr[nr['id'] == ligne_id].iloc[0]
+            if ligne_sel['montant'] < 0:
+                att = attendus_depenses()
+                if att.empty:
+                    st.info("Aucune dépense restant à régler.")
+                else:
+                    att = att.assign(_ecart=(att['montant'] + ligne_sel['montant']).abs()).sort_values('_ecart')
+                    dep_choix = st.selectbox("Dépense", att['id'].tolist(), key="bq_nr_dep",
+                        format_func=lambda x: (lambda r: f"#{x} · {r['date']:%d/%m/%Y} · {r['tiers']} · reste {r['montant']:,.2f} €")(
+                            att[att['id'] == x].iloc[0]))
+                    if st.button("🔗 Associer", key="bq_nr_ok_dep", type="primary"):
+                        try:
+                            paye = float(dep_bq.loc[dep_bq['id'] == dep_choix, 'montant_paye'].iloc[0])
+                            supabase.table('depenses').update(
+                                {'montant_paye': round(paye - float(ligne_sel['montant']), 2)}).eq('id', int(dep_choix)).execute()
+                            supabase.table('releve_bancaire').update({'depense_id': int(dep_choix)}).eq('id', int(ligne_id)).execute()
+                            st.success("✅ Ligne rapprochée."); vider_cache_immeuble(); st.rerun()
+                        except Exception as e:
+                            st.error(f"❌ {e}")
+            else:
+                annee_l = pd.Timestamp(ligne_sel['date']).year
+                att = attendus_appels([annee_l - 1, annee_l], st.session_state.get('bq_nb_appels', 4))
+                if att.empty:
+                    st.info("Aucun appel restant à encaisser.")
+                else:
+                    att = att.assign(_ecart=(att['montant'] - ligne_sel['montant']).abs()).sort_values('_ecart')
+                    app_choix = st.selectbox("Appel de fonds", att['id'].tolist(), key="bq_nr_app",
+                        format_func=lambda x: (lambda r: f"{r['tiers']} · {r['appel']} · reste {r['montant']:,.2f} €")(
+                            att[att['id'] == x].iloc[0]))
+                    if st.button("🔗 Associer", key="bq_nr_ok_app", type="primary"):
+                        try:
+                            r = att[att['id'] == app_choix].iloc[0]
+                            supabase.table('releve_bancaire').update(
+                                {'coproprietaire_id': int(r['coproprietaire_id']), 'appel': r['appel']}).eq('id', int(ligne_id)).execute()
+                            passer_ecritures([{
+                                'coproprietaire_id': int(r['coproprietaire_id']),
+                                'date': pd.Timestamp(ligne_sel['date']).strftime('%Y-%m-%d'),
+                                'nature': 'paiement', 'libelle': f"Virement — {r['appel']}",
+                                'debit': 0.0, 'credit': round(float(ligne_sel['montant']), 2),
+                                'reference': f"banque:{ligne_sel['reference']}",
+                            }])
+                            st.success("✅ Ligne rapprochée."); vider_cache_immeuble(); st.rerun()
+                        except Exception as e:
+                            st.error(f"❌ {e}")
+
+# ── HISTORIQUE ──────────────────────────────────────────────────
+with tab_hist:
+    if rel_bq.empty:
+        st.info("Aucun relevé importé.")
+    else:
+        hist = rel_bq.copy()
+        hist['montant'] = pd.to_numeric(hist['montant'], errors='coerce').fillna(0)
+        hist['Statut'] = ['💸 Dépense #' + str(int(d)) if pd.notna(d) else
+                          ('📥 ' + str(a) if pd.notna(c) else '❓')
+                          for d, c, a in zip(hist['depense_id'], hist['coproprietaire_id'], hist['appel'])]
+        h1, h2, h3 = st.columns(3)
+        h1.metric("Lignes", len(hist))
+        h2.metric("Débits", f"{-hist.loc[hist['montant'] < 0, 'montant'].sum():,.2f} €")
+        h3.metric("Crédits", f"{hist.loc[hist['montant'] > 0, 'montant'].sum():,.2f} €")
+        st.dataframe(hist[['date', 'libelle', 'montant', 'Statut', 'reference']].sort_values('date', ascending=False),
+                     hide_index=True, use_container_width=True,
+                     column_config={"montant": st.column_config.NumberColumn("Montant (€)", format="%.2f")})
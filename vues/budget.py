@@ -0,0 +1,219 @@
+"""
+vues/budget.py — 💰 Budget
+
+Budget prévisionnel par compte et par année.
+"""
+
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+from donnees import get_budget, get_depot, supabase, get_plan_comptable
+from composants import afficher_graphique
+
+st.markdown("<h1 class='main-header'>💰 Gestion du Budget</h1>", unsafe_allow_html=True)
+budget_df = get_budget()
+
+if not budget_df.empty:
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        annees = sorted(budget_df['annee'].unique(), reverse=True)
+        annee_filter = st.selectbox("📅 Année", annees, key="budget_annee")
+    with col2:
+        classe_filter = st.multiselect("🏷️ Classe", options=sorted(budget_df['classe'].unique()))
+    with col3:
+        famille_filter = st.multiselect("📂 Famille", options=sorted(budget_df['famille'].unique()))
+    with col4:
+        alur_taux_bud = st.number_input("🏛️ Taux Alur (%)", min_value=5.0, max_value=20.0,
+            value=5.0, step=0.5, key="alur_taux_bud",
+            help="Minimum légal = 5% du budget voté en AG (loi Alur art. 14-2)")
+
+    filt = budget_df[budget_df['annee'] == annee_filter].copy()
+    if classe_filter: filt = filt[filt['classe'].isin(classe_filter)]
+    if famille_filter: filt = filt[filt['famille'].isin(famille_filter)]
+    bud_total_annee = float(budget_df[budget_df['annee'] == annee_filter]['montant_budget'].sum())
+    alur_annuel_bud = round(bud_total_annee * alur_taux_bud / 100, 2)
+
+    st.divider()
+    bud_prec = float(budget_df[budget_df['annee'] == annee_filter - 1]['montant_budget'].sum())
+    c1, c2, c3, c4, c5 = st.columns(5)
+    c1.metric("Postes budgétaires", len(filt))
+    c2.metric("Budget charges", f"{bud_total_annee:,.0f} €")
+    c3.metric(f"🏛️ Alur ({alur_taux_bud:.0f}%)", f"{alur_annuel_bud:,.0f} €",
+        help=f"{alur_taux_bud}% × {bud_total_annee:,.0f} € = fonds de travaux obligatoire")
+    c4.metric("💰 TOTAL à appeler", f"{bud_total_annee + alur_annuel_bud:,.0f} €")
+    if bud_prec > 0:
+        c5.metric("vs N-1", f"{(bud_total_annee - bud_prec) / bud_prec * 100:+.1f}%",
+            delta=f"{bud_total_annee - bud_prec:+,.0f} €")
+    else:
+        c5.metric("vs N-1", "N/A")
+
+    # Bloc Alur détaillé
+    st.info(f"🏛️ **Loi Alur** — Fonds de travaux : **{alur_annuel_bud:,.0f} €/an** "
+            f"({alur_taux_bud:.0f}% × {bud_total_annee:,.0f} €) "
+            f"— soit **{alur_annuel_bud/4:,.2f} €/trimestre** par appel de fonds")
+    st.divider()
+
+    tab1, tab2, tab3 = st.tabs(["📋 Consulter", "✏️ Modifier / Ajouter / Supprimer", "➕ Créer Budget Année"])
+
+    with tab1:
+        st.subheader(f"Budget {annee_filter} — {len(filt)} postes")
+
+        # Tableau avec ligne Alur et total — utilise alur_annuel_bud/bud_total_annee déjà calculés
+        filt_display = filt[['compte','libelle_compte','montant_budget','classe','famille']].sort_values('compte').copy()
+        filt_display = pd.concat([filt_display, pd.DataFrame([
+            {'compte': 'ALUR', 'libelle_compte': f'🏛️ FONDS DE TRAVAUX — Loi Alur ({alur_taux_bud:.0f}%)',
+             'montant_budget': alur_annuel_bud, 'classe': '—', 'famille': '—'},
+            {'compte': 'TOTAL', 'libelle_compte': '💰 TOTAL BUDGET + ALUR',
+             'montant_budget': bud_total_annee + alur_annuel_bud, 'classe': '—', 'famille': '—'}
+        ])], ignore_index=True)
+
+        st.dataframe(filt_display, use_container_width=True, hide_index=True,
+            column_config={
+                "compte": st.column_config.TextColumn("Compte"),
+                "libelle_compte": st.column_config.TextColumn("Libellé"),
+                "montant_budget": st.column_config.NumberColumn("Budget (€)", format="%,.0f"),
+                "classe": st.column_config.TextColumn("Classe"),
+                "famille": st.column_config.TextColumn("Famille"),
+            })
+
+        col1, col2 = st.columns(2)
+        with col1:
+            bud_cl = filt.groupby('classe', observed=True)['montant_budget'].sum().reset_index()
+            bud_cl_graph = pd.concat([bud_cl, pd.DataFrame([
+                {'classe': f'Alur ({alur_taux_bud:.0f}%)', 'montant_budget': alur_annuel_bud}
+            ])], ignore_index=True)
+            fig = px.bar(bud_cl_graph, x='classe', y='montant_budget',
+                title=f"Budget {annee_filter} par Classe + Alur",
+                labels={'montant_budget':'Budget (€)','classe':'Classe'}, color='classe')
+            fig.update_traces(texttemplate='%{y:,.0f}€', textposition='outside')
+            afficher_graphique(fig)
+        with col2:
+            fig = px.pie(bud_cl_graph, values='montant_budget', names='classe',
+                title=f"Répartition Budget + Alur {annee_filter}")
+            fig.update_traces(textposition='inside', textinfo='percent+label')
+            afficher_graphique(fig)
+
+        st.download_button("📥 Exporter CSV (avec Alur)",
+            filt_display.to_csv(index=False, sep=';', decimal=',').encode('utf-8-sig'),
+            f"budget_{annee_filter}.csv", "text/csv")
+
+    with tab2:
+        subtab1, subtab2, subtab3 = st.tabs(["✏️ Modifier", "➕ Ajouter", "🗑️ Supprimer"])
+        with subtab1:
+            bud_edit_df = filt[['id','compte','libelle_compte','montant_budget','classe','famille']].copy()
+            bud_edit_df['compte'] = bud_edit_df['compte'].astype(str).fillna('')
+            bud_edit_df['libelle_compte'] = bud_edit_df['libelle_compte'].astype(str).fillna('')
+            bud_edit_df['montant_budget'] = pd.to_numeric(bud_edit_df['montant_budget'], errors='coerce').fillna(0.0)
+            bud_edit_df['classe'] = bud_edit_df['classe'].astype(str).fillna('')
+            bud_edit_df['famille'] = bud_edit_df['famille'].astype(str).fillna('')
+            edited = st.data_editor(
+                bud_edit_df,
+                use_container_width=True, hide_index=True, disabled=['id'],
+                column_config={
+                    "compte": st.column_config.TextColumn("Compte"),
+                    "libelle_compte": st.column_config.TextColumn("Libellé"),
+                    "montant_budget": st.column_config.NumberColumn("Budget (€)", format="%.0f", min_value=0),
+                    "classe": st.column_config.SelectboxColumn("Classe", options=['1A','1B','2','3','4','5','6','7']),
+                    "famille": st.column_config.TextColumn("Famille"),
+                }, key="budget_editor"
+            )
+            if st.button("💾 Enregistrer", type="primary", key="save_bud"):
+                try:
+                    mods = 0
+                    for _, row in edited.iterrows():
+                        orig = filt[filt['id'] == row['id']]
+                        if orig.empty: continue
+                        o = orig.iloc[0]; updates = {}
+                        if str(row['compte']) != str(o['compte']): updates['compte'] = str(row['compte'])
+                        if str(row['libelle_compte']) != str(o['libelle_compte']): updates['libelle_compte'] = str(row['libelle_compte'])
+                        if float(row['montant_budget']) != float(o['montant_budget']): updates['montant_budget'] = int(row['montant_budget'])
+                        if str(row['classe']) != str(o['classe']): updates['classe'] = str(row['classe'])
+                        if str(row['famille']) != str(o['famille']): updates['famille'] = str(row['famille'])
+                        if updates:
+                            get_depot().modifier(supabase, 'budget', int(row['id']), updates)
+                            mods += 1
+                    if mods > 0:
+                        st.success(f"✅ {mods} ligne(s) mise(s) à jour!")
+                    else:
+                        st.info("Aucune modification")
+                    if mods > 0: st.rerun()
+                except Exception as e:
+                    st.error(f"❌ {e}")
+
+        with subtab2:
+            plan_df = get_plan_comptable()
+            new_compte = st.text_input("Numéro de compte *", key="new_compte_in")
+            compte_info = plan_df[plan_df['compte'].astype(str) == str(new_compte)] if new_compte and not plan_df.empty else pd.DataFrame()
+            if not compte_info.empty:
+                st.success(f"✅ {compte_info.iloc[0]['libelle_compte']}")
+                def_lib = compte_info.iloc[0]['libelle_compte']
+                def_cl = compte_info.iloc[0]['classe']
+                def_fam = str(compte_info.iloc[0]['famille'])
+            elif new_compte:
+                st.warning("⚠️ Compte non trouvé dans le plan comptable")
+                def_lib = ""; def_cl = "1A"; def_fam = ""
+            else:
+                def_lib = ""; def_cl = "1A"; def_fam = ""
+
+            col1, col2 = st.columns(2)
+            with col1:
+                new_lib = st.text_input("Libellé *", value=def_lib, key="new_lib_in")
+                new_montant = st.number_input("Montant (€) *", min_value=0, step=100, key="new_montant_in")
+            with col2:
+                new_classe = st.selectbox("Classe *", ['1A','1B','2','3','4','5','6','7'],
+                    index=['1A','1B','2','3','4','5','6','7'].index(def_cl) if def_cl in ['1A','1B','2','3','4','5','6','7'] else 0,
+                    key="new_classe_in")
+                new_famille = st.text_input("Famille *", value=def_fam, key="new_fam_in")
+
+            if st.button("✨ Ajouter", type="primary", key="add_bud"):
+                if new_compte and new_lib and new_famille:
+                    try:
+                        get_depot().inserer(supabase, 'budget', {
+                            'compte': new_compte, 'libelle_compte': new_lib,
+                            'montant_budget': int(new_montant), 'annee': int(annee_filter),
+                            'classe': new_classe, 'famille': new_famille
+                        })
+                        st.success("✅ Compte ajouté!"); st.rerun()
+                    except Exception as e:
+                        st.error(f"❌ {e}")
+                else:
+                    st.error("❌ Remplissez tous les champs obligatoires")
+
+        with subtab3:
+            st.warning("⚠️ La suppression est définitive.")
+            ids_del = st.multiselect("Sélectionner les postes à supprimer", options=filt['id'].tolist(),
+                format_func=lambda x: f"{filt[filt['id']==x]['compte'].values[0]} — {filt[filt['id']==x]['libelle_compte'].values[0]}")
+            if ids_del:
+                if st.button("🗑️ Confirmer la suppression", type="secondary"):
+                    get_depot().supprimer(supabase, 'budget', ids_del)
+                    st.success(f"✅ {len(ids_del)} poste(s) supprimé(s)"); st.rerun()
+
+    with tab3:
+        st.subheader("Créer un budget pour une nouvelle année")
+        c1, c2 = st.columns(2)
+        with c1:
+            nouvelle_annee = st.number_input("📅 Nouvelle année", min_value=2020, max_value=2050, value=annee_filter+1, step=1)
+        with c2:
+            annee_src = st.selectbox("Copier depuis", annees)
+        src = budget_df[budget_df['annee'] == annee_src].copy()
+        ajust = st.radio("Ajustement", ["Aucun", "Pourcentage"])
+        if ajust == "Pourcentage":
+            coeff = st.number_input("% +/-", min_value=-50.0, max_value=100.0, value=3.0, step=0.5) / 100
+            src['nouveau_montant'] = (src['montant_budget'] * (1+coeff)).round(0).astype(int)
+        else:
+            src['nouveau_montant'] = src['montant_budget']
+        st.metric(f"Budget {nouvelle_annee}", f"{src['nouveau_montant'].sum():,.0f} €")
+        existe = not budget_df[budget_df['annee'] == nouvelle_annee].empty
+        if existe:
+            st.warning(f"⚠️ Budget {nouvelle_annee} existe déjà.")
+        else:
+            if st.button(f"✨ Créer le budget {nouvelle_annee}", type="primary"):
+                try:
+                    postes = [{'compte': r['compte'], 'libelle_compte': r['libelle_compte'],
+                               'montant_budget': int(r['nouveau_montant']), 'annee': int(nouvelle_annee),
+                               'classe': r['classe'], 'famille': r['famille']} for _, r in src.iterrows()]
+                    for i in range(0, len(postes), 50):
+                        get_depot().inserer(supabase, 'budget', postes[i:i+50])
+                    st.success(f"✅ Budget {nouvelle_annee} créé ({len(postes)} postes)!"); st.rerun()
+                except Exception as e:
+                    st.error(f"❌ {e}")
@@ -0,0 +1,418 @@
+"""
+vues/coproprietaires.py — 👥 Copropriétaires
+
+Lots, tantièmes, clés de répartition et comptes des copropriétaires.
+"""
+
+import streamlit as st
+import pandas as pd
+from datetime import datetime
+import plotly.express as px
+from repartition import CLE_GENERALE, IndexTantiemes
+from comptes import balance_agee, NATURES, debits_impayes
+from donnees import (get_coproprietaires, prepare_copro, colonne_tantiemes, get_config_cles,
+                     supabase, vider_cache_immeuble, get_matrice_tantiemes, get_cles_repartition,
+                     get_index_tantiemes, get_tantiemes_lots, get_soldes_copro, get_ecritures_copro, get_depot,
+                     passer_ecritures, get_appels_fonds, generate_relance_pdf_bytes, syndic_info)
+from composants import afficher_graphique
+
+CHARGES_CONFIG = get_config_cles()
+SYNDIC_INFO = syndic_info()
+
+st.markdown("<h1 class='main-header'>👥 Copropriétaires</h1>", unsafe_allow_html=True)
+copro_df = get_coproprietaires()
+
+if not copro_df.empty:
+    copro_df = prepare_copro(copro_df)
+    tantieme_cols = [colonne_tantiemes(k) for k in CHARGES_CONFIG]
+
+    # S'assurer que les colonnes contact existent
+    for col_c in ['email','telephone','whatsapp']:
+        if col_c not in copro_df.columns:
+            copro_df[col_c] = None if col_c != 'whatsapp' else False
+
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Copropriétaires", len(copro_df))
+    c2.metric("Total tantièmes généraux", int(copro_df['tantieme_general'].sum()))
+    c3.metric("Lots parkings", len(copro_df[copro_df['usage']=='parking']) if 'usage' in copro_df.columns else "—")
+    nb_wa = int(copro_df['whatsapp'].fillna(False).astype(bool).sum())
+    c4.metric("💬 WhatsApp", nb_wa)
+
+    copro_tab1, copro_tab2, copro_tab3, copro_tab4 = st.tabs(["📋 Liste", "📞 Contacts", "🔑 Tantièmes", "💶 Comptes & impayés"])
+
+    # ── TAB 1 : Liste complète ──────────────────────────────────
+    with copro_tab1:
+        st.subheader("Liste des copropriétaires")
+        disp_cols_base = ['lot','nom','etage','usage','tantieme_general']
+        contact_disp = [c for c in ['email','telephone','whatsapp'] if c in copro_df.columns]
+        disp_cols = disp_cols_base + contact_disp
+        df_disp = copro_df[disp_cols].sort_values('lot' if 'lot' in copro_df.columns else 'nom').copy()
+        if 'whatsapp' in df_disp.columns:
+            df_disp['whatsapp'] = df_disp['whatsapp'].fillna(False).astype(bool)
+
+        st.dataframe(
+            df_disp,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                'lot':              st.column_config.NumberColumn("Lot", format="%d"),
+                'description':      st.column_config.TextColumn("Apt N."),
+                'nom':              st.column_config.TextColumn("Nom"),
+                'etage':            st.column_config.TextColumn("Étage"),
+                'usage':            st.column_config.TextColumn("Usage"),
+                'tantieme_general': st.column_config.NumberColumn("Tantièmes généraux", format="%d"),
+                'email':            st.column_config.TextColumn("📧 Email"),
+                'telephone':        st.column_config.TextColumn("📱 Téléphone"),
+                'whatsapp':         st.column_config.CheckboxColumn("💬 WhatsApp"),
+            }
+        )
+
+        # Export CSV
+        csv_copro = df_disp.to_csv(index=False, sep=';', decimal=',').encode('utf-8-sig')
+        st.download_button("📥 Exporter CSV", data=csv_copro,
+                           file_name="coproprietaires.csv", mime="text/csv", key="dl_copro")
+
+    # ── TAB 2 : Contacts (édition mail/tel/whatsapp) ───────────
+    with copro_tab2:
+        st.subheader("📞 Coordonnées & WhatsApp")
+        st.caption("Cliquez sur une cellule pour modifier directement. Enregistrez ligne par ligne.")
+
+        # Sélecteur copropriétaire
+        noms_sorted = sorted(copro_df['nom'].tolist())
+        sel_nom = st.selectbox("Sélectionner un copropriétaire", noms_sorted, key="sel_contact")
+        row_sel = copro_df[copro_df['nom'] == sel_nom].iloc[0]
+        cop_id  = int(row_sel['id'])
+
+        st.divider()
+        col_c1, col_c2, col_c3 = st.columns([3,3,1])
+        with col_c1:
+            new_email = st.text_input("📧 Email", value=str(row_sel.get('email','') or ''),
+                                      key=f"email_{cop_id}", placeholder="prenom.nom@email.com")
+        with col_c2:
+            new_tel = st.text_input("📱 Téléphone", value=str(row_sel.get('telephone','') or ''),
+                                    key=f"tel_{cop_id}", placeholder="+33 6 00 00 00 00")
+        with col_c3:
+            st.markdown("<br>", unsafe_allow_html=True)
+            new_wa = st.checkbox("💬 WhatsApp", value=bool(row_sel.get('whatsapp', False)),
+                                 key=f"wa_{cop_id}")
+
+        if st.button("💾 Enregistrer les coordonnées", key=f"save_contact_{cop_id}",
+                     type="primary", use_container_width=True):
+            try:
+                updates = {
+                    'email':     new_email.strip() or None,
+                    'telephone': new_tel.strip() or None,
+                    'whatsapp':  new_wa,
+                }
+                get_depot().modifier(supabase, 'coproprietaires', cop_id, updates)
+                st.success(f"✅ Coordonnées de **{sel_nom}** enregistrées.")
+                vider_cache_immeuble(); st.rerun()
+            except Exception as e:
+                st.error(f"❌ {e}")
+
+        st.divider()
+        st.subheader("📋 Annuaire complet")
+        # Tableau annuaire complet lecture seule
+        annuaire = copro_df[['lot','nom','email','telephone','whatsapp']].copy()
+        annuaire = annuaire.sort_values('lot')
+        annuaire['whatsapp'] = annuaire['whatsapp'].fillna(False).astype(bool)
+        # Indicateurs
+        nb_email = annuaire['email'].apply(lambda x: bool(x) and str(x) not in ('','None','nan')).sum()
+        nb_tel   = annuaire['telephone'].apply(lambda x: bool(x) and str(x) not in ('','None','nan')).sum()
+        ann1, ann2, ann3 = st.columns(3)
+        ann1.metric("📧 Avec email",     f"{nb_email}/{len(annuaire)}")
+        ann2.metric("📱 Avec téléphone", f"{nb_tel}/{len(annuaire)}")
+        ann3.metric("💬 WhatsApp",       f"{nb_wa}/{len(annuaire)}")
+
+        st.dataframe(
+            annuaire,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                'lot':       st.column_config.NumberColumn("Lot", format="%d"),
+                'description': st.column_config.TextColumn("Apt N."),
+                'nom':       st.column_config.TextColumn("Nom"),
+                'email':     st.column_config.TextColumn("📧 Email"),
+                'telephone': st.column_config.TextColumn("📱 Téléphone"),
+                'whatsapp':  st.column_config.CheckboxColumn("💬 WhatsApp"),
+            }
+        )
+
+        # Export annuaire CSV
+        csv_ann = annuaire.to_csv(index=False, sep=';', decimal=',').encode('utf-8-sig')
+        st.download_button("📥 Exporter l'annuaire CSV", data=csv_ann,
+                           file_name="annuaire_copro.csv", mime="text/csv", key="dl_ann")
+
+    # ── TAB 3 : Tantièmes ───────────────────────────────────────
+    with copro_tab3:
+        st.divider()
+        # Tantièmes saisis par clé, comparés au total déclaré de la clé
+        mat_copro = get_matrice_tantiemes(tuple(int(i) for i in copro_df['id']))
+        saisis = mat_copro.sommes()
+        st.subheader("🔑 État des clés de répartition")
+        cols = st.columns(min(len(CHARGES_CONFIG), 6) or 1)
+        for i, (key, cfg) in enumerate(CHARGES_CONFIG.items()):
+            total = saisis.get(key, 0)
+            status = "✅" if abs(total - cfg['total']) < 0.5 else ("⚠️ À remplir" if total == 0 else "⚠️")
+            cols[i % len(cols)].metric(f"{status} {cfg['emoji']} {cfg['label']}", f"{total:,g}",
+                                       delta=None if status == "✅" else f"{total - cfg['total']:+,g} / {cfg['total']:,g}",
+                                       delta_color="off")
+
+        if any(v == 0 for v in saisis.values()):
+            st.warning("⚠️ Certaines clés n'ont aucun tantième. Saisissez-les ci-dessous ; en attendant, "
+                       "leurs charges sont réparties sur les tantièmes généraux.")
+
+        st.divider()
+        col1, col2 = st.columns([1, 1])
+        with col1:
+            st.subheader("Répartition des tantièmes généraux")
+            fig = px.pie(copro_df, values='tantieme_general', names='nom')
+            fig.update_traces(textposition='inside', textinfo='percent')
+            afficher_graphique(fig)
+        with col2:
+            st.subheader("Tantièmes par copropriétaire")
+            tant_cols_disp = ['lot','nom'] + [c for c in tantieme_cols if c in copro_df.columns]
+            st.dataframe(copro_df[tant_cols_disp].sort_values('lot' if 'lot' in copro_df.columns else 'nom'),
+                use_container_width=True, hide_index=True,
+                column_config={colonne_tantiemes(k): st.column_config.NumberColumn(f"{cfg['emoji']} {cfg['label']}")
+                               for k, cfg in CHARGES_CONFIG.items()})
+
+        st.divider()
+        with st.expander("⚙️ Clés de répartition"):
+            st.caption("Une ligne par clé : code (stable, sert de référence), total des tantièmes, "
+                       "classes comptables du budget couvertes (séparées par des virgules), libellés.")
+            cles_df = pd.DataFrame([{'cle': k, 'libelle': cfg['label'], 'emoji': cfg['emoji'],
+                                     'total': cfg['total'], 'classes': ','.join(cfg['classes']),
+                                     'libelle_pdf': cfg['libelle_pdf'], 'colonne': cfg['col']}
+                                    for k, cfg in CHARGES_CONFIG.items()])
+            cles_edit = st.data_editor(cles_df, num_rows="dynamic", use_container_width=True, hide_index=True,
+                key="cles_editor", disabled=['colonne'],
+                column_config={
+                    'cle':         st.column_config.TextColumn("Code", required=True),
+                    'libelle':     st.column_config.TextColumn("Libellé", required=True),
+                    'emoji':       st.column_config.TextColumn("Emoji"),
+                    'total':       st.column_config.NumberColumn("Total tantièmes", min_value=0, required=True),
+                    'classes':     st.column_config.TextColumn("Classes"),
+                    'libelle_pdf': st.column_config.TextColumn("Libellé PDF"),
+                    'colonne':     st.column_config.TextColumn("Colonne historique"),
+                })
+            if st.button("💾 Enregistrer les clés", key="save_cles", type="primary"):
+                cles_edit = cles_edit.dropna(subset=['cle'])
+                cles_edit['cle'] = cles_edit['cle'].astype(str).str.strip()
+                if cles_edit['cle'].duplicated().any() or (cles_edit['cle'] == '').any():
+                    st.error("❌ Chaque clé doit avoir un code unique.")
+                elif CLE_GENERALE not in set(cles_edit['cle']):
+                    st.error(f"❌ La clé « {CLE_GENERALE} » est obligatoire (base du fonds Alur et clé de repli).")
+                else:
+                    try:
+                        recs = [{'cle': r['cle'], 'libelle': r['libelle'], 'emoji': r['emoji'] or None,
+                                 'total': float(r['total'] or 0), 'classes': r['classes'] or '',
+                                 'libelle_pdf': r['libelle_pdf'] or None, 'colonne': r['colonne'] or None,
+                                 'ordre': i}
+                                for i, r in enumerate(cles_edit.astype(object).where(cles_edit.notna(), None).to_dict('records'))]
+                        supabase.table('cles_repartition').upsert(recs, on_conflict='immeuble_id,cle').execute()
+                        retirees = [k for k in CHARGES_CONFIG if k not in set(cles_edit['cle'])]
+                        if retirees:
+                            supabase.table('cles_repartition').delete().in_('cle', retirees).execute()
+                        get_cles_repartition.clear(); get_index_tantiemes.clear()
+                        st.success(f"✅ {len(recs)} clé(s) enregistrée(s)."); st.rerun()
+                    except Exception as e:
+                        st.error(f"❌ {e}")
+
+        with st.expander("✏️ Saisir les tantièmes d'une clé"):
+            st.caption("Les tantièmes sont historisés : une modification (fusion ou division de lots, nouvel "
+                       "état descriptif) prend effet à la date choisie ; les exercices antérieurs gardent les anciens.")
+            ct1, ct2 = st.columns(2)
+            cle_sel = ct1.selectbox("Clé", list(CHARGES_CONFIG), key="tant_cle_sel",
+                                    format_func=lambda k: f"{CHARGES_CONFIG[k]['emoji']} {CHARGES_CONFIG[k]['label']}")
+            date_effet = ct2.date_input("Date d'effet", value=datetime.now(), key="tant_date_effet")
+            mat_effet = get_matrice_tantiemes(tuple(int(i) for i in copro_df['id']), date_effet)
+            tant_edit_df = pd.DataFrame({'id': copro_df['id'].astype(int).values,
+                                         'lot': copro_df['lot'].values, 'nom': copro_df['nom'].values,
+                                         'tantiemes': mat_effet.colonne(cle_sel)}).sort_values('lot')
+            tant_edit = st.data_editor(tant_edit_df, use_container_width=True, hide_index=True,
+                key=f"tant_editor_{cle_sel}_{date_effet}", disabled=['id', 'lot', 'nom'],
+                column_config={'id': None, 'lot': st.column_config.NumberColumn("Lot", format="%d"),
+                               'nom': "Copropriétaire",
+                               'tantiemes': st.column_config.NumberColumn(f"Tantièmes au {date_effet:%d/%m/%Y}", min_value=0)})
+            st.caption(f"Total saisi : {tant_edit['tantiemes'].sum():,g} / {CHARGES_CONFIG[cle_sel]['total']:,g}")
+            if st.button("💾 Enregistrer les tantièmes", key="save_tantiemes", type="primary"):
+                try:
+                    # Première saisie : les tantièmes lus dans les colonnes historiques sont d'abord recopiés
+                    if not supabase.table('tantiemes_lots').select('id').limit(1).execute().data:
+                        init = get_tantiemes_lots()[['coproprietaire_id', 'cle', 'tantiemes']].to_dict('records')
+                        for i in range(0, len(init), 50):
+                            supabase.table('tantiemes_lots').insert(init[i:i+50]).execute()
+                        get_tantiemes_lots.clear()
+                    effet = date_effet.strftime('%Y-%m-%d')
+                    # Lignes de la clé en vigueur à la date d'effet
+                    en_vigueur = IndexTantiemes(get_tantiemes_lots(), CHARGES_CONFIG).lignes_au(effet)
+                    en_vigueur = en_vigueur[en_vigueur['cle'] == cle_sel].set_index('coproprietaire_id')
+                    nouveaux = dict(zip(tant_edit['id'].astype(int), pd.to_numeric(tant_edit['tantiemes'], errors='coerce').fillna(0)))
+                    modifies = [c for c, v in nouveaux.items()
+                                if abs(v - float(en_vigueur['tantiemes'].get(c, 0))) > 1e-9]
+                    anciens = en_vigueur.loc[en_vigueur.index.isin(modifies)]
+                    debut = anciens['date_debut'].dt.strftime('%Y-%m-%d')
+                    # Versions commencées le jour même : remplacées ; les autres : clôturées à la date d'effet
+                    a_remplacer = [int(i) for i in anciens.loc[debut == effet, 'id']]
+                    a_clore = [int(i) for i in anciens.loc[debut != effet, 'id']]
+                    for i in range(0, len(a_remplacer), 200):
+                        supabase.table('tantiemes_lots').delete().in_('id', a_remplacer[i:i+200]).execute()
+                    for i in range(0, len(a_clore), 200):
+                        supabase.table('tantiemes_lots').update({'date_fin': effet}).in_('id', a_clore[i:i+200]).execute()
+                    recs = [{'coproprietaire_id': c, 'cle': cle_sel, 'tantiemes': float(nouveaux[c]),
+                             'date_debut': effet, 'date_fin': None}
+                            for c in modifies if nouveaux[c] != 0]
+                    for i in range(0, len(recs), 50):
+                        supabase.table('tantiemes_lots').insert(recs[i:i+50]).execute()
+                    get_tantiemes_lots.clear(); get_index_tantiemes.clear()
+                    st.success(f"✅ {len(modifies)} lot(s) modifié(s) au {date_effet:%d/%m/%Y}."); st.rerun()
+                except Exception as e:
+                    st.error(f"❌ {e}")
+
+            hist = get_tantiemes_lots()
+            hist = hist[hist['cle'] == cle_sel] if not hist.empty else hist
+            if not hist.empty and 'date_debut' in hist.columns and hist[['date_debut', 'date_fin']].notna().any().any():
+                st.markdown("**📜 Historique de la clé**")
+                hist = hist.merge(copro_df[['id', 'lot', 'nom']], left_on='coproprietaire_id', right_on='id', how='left')
+                st.dataframe(hist.sort_values(['lot', 'date_debut'])[['lot', 'nom', 'tantiemes', 'date_debut', 'date_fin']],
+                    use_container_width=True, hide_index=True,
+                    column_config={'lot': st.column_config.NumberColumn("Lot", format="%d"),
+                                   'date_debut': st.column_config.DateColumn("Du", format="DD/MM/YYYY"),
+                                   'date_fin': st.column_config.DateColumn("Au (exclu)", format="DD/MM/YYYY")})
+
+    # ── TAB 4 : Comptes copropriétaires & impayés ───────────────
+    with copro_tab4:
+        soldes = get_soldes_copro()
+        noms_lots = copro_df.set_index('id')[['lot', 'nom']]
+        lib_lot = {int(i): f"Lot {r['lot']} — {r['nom']}" for i, r in noms_lots.iterrows()}
+
+        debiteurs = {c: v for c, v in soldes.items() if v > 0.005}
+        # Seuls les débits des lots débiteurs sont relus pour la balance âgée
+        ecr_deb = get_ecritures_copro(tuple(sorted(debiteurs)), debits_seuls=True) if debiteurs else pd.DataFrame()
+        balance = balance_agee(ecr_deb, debiteurs)
+
+        m1, m2, m3, m4 = st.columns(4)
+        m1.metric("💶 Total dû", f"{sum(debiteurs.values()):,.2f} €")
+        m2.metric("Lots débiteurs", f"{len(debiteurs)}/{len(copro_df)}")
+        m3.metric("Dont > 90 j", f"{balance['90+ j'].sum() if not balance.empty else 0:,.2f} €")
+        m4.metric("Avances (soldes créditeurs)", f"{-sum(v for v in soldes.values() if v < -0.005):,.2f} €")
+
+        st.subheader("⏳ Balance âgée")
+        if balance.empty:
+            st.success("✅ Aucun impayé.")
+        else:
+            bal_disp = balance.merge(noms_lots, left_on='coproprietaire_id', right_index=True, how='left')
+            st.dataframe(bal_disp[['lot', 'nom', 'solde', '0–30 j', '30–90 j', '90+ j', 'plus_ancien']],
+                use_container_width=True, hide_index=True,
+                column_config={
+                    'lot':         st.column_config.NumberColumn("Lot", format="%d"),
+                    'nom':         st.column_config.TextColumn("Copropriétaire"),
+                    'solde':       st.column_config.NumberColumn("Solde dû (€)", format="%.2f"),
+                    '0–30 j':      st.column_config.NumberColumn("0–30 j (€)", format="%.2f"),
+                    '30–90 j':     st.column_config.NumberColumn("30–90 j (€)", format="%.2f"),
+                    '90+ j':       st.column_config.NumberColumn("90+ j (€)", format="%.2f"),
+                    'plus_ancien': st.column_config.DateColumn("Plus ancien impayé", format="DD/MM/YYYY"),
+                })
+
+        st.divider()
+        col_cpt1, col_cpt2 = st.columns([1, 2])
+        with col_cpt1:
+            st.subheader("✏️ Saisir une écriture")
+            with st.form("form_ecriture_copro", clear_on_submit=True):
+                ec_cop = st.selectbox("Copropriétaire", list(lib_lot), format_func=lib_lot.get, key="ec_cop")
+                ec_nature = st.selectbox("Nature", list(NATURES), index=list(NATURES).index('paiement'),
+                                         format_func=NATURES.get, key="ec_nature")
+                ec_date = st.date_input("Date", value=datetime.now(), key="ec_date")
+                ec_montant = st.number_input("Montant (€)", min_value=0.0, step=10.0, format="%.2f", key="ec_montant")
+                ec_sens = st.radio("Sens", ["Crédit (versement, avoir)", "Débit (somme due)"], horizontal=True,
+                                   key="ec_sens", help="Ignoré pour un paiement (toujours crédit) ou un appel (toujours débit).")
+                ec_lib = st.text_input("Libellé", key="ec_lib", placeholder="Chèque n°…, frais de relance…")
+                if st.form_submit_button("💾 Enregistrer", type="primary", use_container_width=True):
+                    if ec_montant <= 0:
+                        st.error("Le montant doit être positif.")
+                    else:
+                        credit = ec_nature == 'paiement' or (ec_nature != 'appel' and ec_sens.startswith("Crédit"))
+                        try:
+                            passer_ecritures([{
+                                'coproprietaire_id': int(ec_cop), 'date': ec_date.strftime('%Y-%m-%d'),
+                                'nature': ec_nature, 'libelle': ec_lib.strip() or NATURES[ec_nature],
+                                'debit': 0.0 if credit else round(ec_montant, 2),
+                                'credit': round(ec_montant, 2) if credit else 0.0,
+                                'reference': f"manuel:{ec_cop}:{datetime.now():%Y%m%d%H%M%S%f}",
+                            }])
+                            st.success("✅ Écriture enregistrée.")
+                            st.rerun()
+                        except Exception as e:
+                            st.error(f"❌ {e}")
+
+        with col_cpt2:
+            st.subheader("📄 Relevé de compte")
+            rel_cop = st.selectbox("Copropriétaire", list(lib_lot), format_func=lib_lot.get, key="rel_cop")
+            rel_df = get_ecritures_copro((int(rel_cop),))
+            st.metric("Solde courant", f"{soldes.get(int(rel_cop), 0.0):,.2f} €",
+                      help="> 0 : somme due par le copropriétaire ; < 0 : avance.")
+            emis_cop = get_appels_fonds(coproprietaire_id=int(rel_cop))
+            if not emis_cop.empty:
+                with st.expander(f"📤 Détail des appels émis ({emis_cop[['annee', 'periode']].drop_duplicates().shape[0]})"):
+                    libelles_cles = {k: f"{cfg['emoji']} {cfg['label']}" for k, cfg in CHARGES_CONFIG.items()}
+                    libelles_cles['alur'] = "🏛️ Alur"
+                    cles = emis_cop['cle'].astype(str)
+                    det = emis_cop.assign(appel=emis_cop['annee'].astype(str) + '-' + emis_cop['periode'].astype(str),
+                                          cle=cles.map(libelles_cles).fillna(cles))
+                    det = det.pivot_table(index='appel', columns='cle', values='montant', aggfunc='sum', fill_value=0)
+                    det['Total (€)'] = det.sum(axis=1)
+                    st.dataframe(det.sort_index(ascending=False).round(2), use_container_width=True)
+            if rel_df.empty:
+                st.info("Aucune écriture pour ce lot.")
+            else:
+                rel_df = rel_df.assign(nature=rel_df['nature'].map(NATURES).fillna(rel_df['nature']))
+                st.dataframe(rel_df[['date', 'nature', 'libelle', 'debit', 'credit', 'solde']].iloc[::-1],
+                    use_container_width=True, hide_index=True,
+                    column_config={
+                        'date':    st.column_config.DateColumn("Date", format="DD/MM/YYYY"),
+                        'nature':  st.column_config.TextColumn("Nature"),
+                        'libelle': st.column_config.TextColumn("Libellé"),
+                        'debit':   st.column_config.NumberColumn("Débit (€)", format="%.2f"),
+                        'credit':  st.column_config.NumberColumn("Crédit (€)", format="%.2f"),
+                        'solde':   st.column_config.NumberColumn("Solde (€)", format="%.2f"),
+                    })
+
+        st.divider()
+        st.subheader("📬 Relances groupées")
+        if balance.empty:
+            st.info("Aucun lot à relancer.")
+        else:
+            r1, r2 = st.columns(2)
+            seuil_rel = r1.number_input("Solde dû minimum (€)", min_value=0.0, value=50.0, step=10.0, key="rel_seuil")
+            tranche_rel = r2.selectbox("Ancienneté minimale", ['0–30 j', '30–90 j', '90+ j'], index=1, key="rel_tranche")
+            tr_cols = ['0–30 j', '30–90 j', '90+ j']
+            anciens = balance[tr_cols[tr_cols.index(tranche_rel):]].sum(axis=1)
+            a_relancer = balance[(balance['solde'] >= seuil_rel) & (anciens > 0.005)]
+            st.caption(f"{len(a_relancer)} lot(s) à relancer — {a_relancer['solde'].sum():,.2f} € dus.")
+            if not a_relancer.empty and st.button(f"📦 Générer les {len(a_relancer)} relances (ZIP)", key="btn_relances"):
+                import zipfile, io as _io
+                detail = debits_impayes(ecr_deb, debiteurs)
+                par_lot = {c: g.to_dict('records') for c, g in detail.groupby('coproprietaire_id')}
+                copro_par_id = copro_df.set_index('id')
+                zip_buf = _io.BytesIO()
+                nb_gen = 0
+                with st.spinner("Génération des relances..."):
+                    with zipfile.ZipFile(zip_buf, 'w', zipfile.ZIP_DEFLATED) as zf:
+                        for r in a_relancer.to_dict('records'):
+                            cop_id = int(r['coproprietaire_id'])
+                            try:
+                                cop_row_pdf = copro_par_id.loc[cop_id].to_dict()
+                                pdf_b = generate_relance_pdf_bytes(
+                                    SYNDIC_INFO, cop_row_pdf, float(r['solde']),
+                                    {t: float(r[t]) for t in tr_cols},
+                                    par_lot.get(cop_id, [])
+                                )
+                                zf.writestr(f"relance_lot{str(cop_row_pdf.get('lot','')).zfill(4)}.pdf", pdf_b)
+                                nb_gen += 1
+                            except Exception as e_pdf:
+                                st.warning(f"⚠️ Erreur {lib_lot.get(cop_id, cop_id)}: {e_pdf}")
+                zip_buf.seek(0)
+                st.success(f"✅ {nb_gen} relances générées")
+                st.download_button(f"⬇️ Télécharger ZIP ({nb_gen} PDFs)", zip_buf.getvalue(),
+                                   f"relances_{datetime.now():%Y%m%d}.zip", "application/zip", key="dl_zip_relances")
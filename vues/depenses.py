@@ -0,0 +1,648 @@
+"""
+vues/depenses.py — 📝 Dépenses
+
+Saisie, import, factures, doublons et recherche plein texte.
+"""
+
+import streamlit as st
+import pandas as pd
+from datetime import datetime
+import plotly.express as px
+from doublons import FENETRE_JOURS, rapport_doublons
+from donnees import (get_depenses, get_budget, synchroniser_index, rechercher_depenses,
+                     get_miniatures_urls, get_facture_bytes, upload_miniature, get_depot, supabase,
+                     indexer_depense, get_index_doublons, desindexer_depense, get_travaux_votes,
+                     get_travaux_votes_depense_ids, vider_cache_immeuble)
+from composants import (paginer_depenses, facture_presente, grille_miniatures, ligne_facture,
+                        afficher_graphique)
+
+st.markdown("<h1 class='main-header'>📝 Gestion des Dépenses</h1>", unsafe_allow_html=True)
+depenses_df = get_depenses()
+budget_df = get_budget()
+
+if not depenses_df.empty:
+    depenses_df['date'] = pd.to_datetime(depenses_df['date'])
+    depenses_df['annee'] = depenses_df['date'].dt.year
+    depenses_df['montant_du'] = pd.to_numeric(depenses_df['montant_du'], errors='coerce')
+
+    if not budget_df.empty:
+        bud_uniq = budget_df.drop_duplicates(subset=['compte'], keep='first')[['compte','libelle_compte','classe','famille']]
+        depenses_df = depenses_df.merge(bud_uniq, on='compte', how='left', suffixes=('','_bud'))
+    elif 'libelle_compte' not in depenses_df.columns:
+        depenses_df['libelle_compte'] = None  # immeuble sans budget saisi
+    synchroniser_index(depenses_df)
+
+    recherche_dep = st.text_input("🔎 Recherche (fournisseur, libellé, commentaire, contenu des factures — toutes années)",
+        key="dep_recherche", placeholder="ex. ascenseur 2023 OTIS")
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        annee_dep = st.selectbox("📅 Année", sorted(depenses_df['annee'].unique(), reverse=True), key="dep_annee",
+            disabled=bool(recherche_dep))
+    with col2:
+        cpt_filter = st.multiselect("🔢 Compte", options=sorted(depenses_df['compte'].dropna().unique()))
+    with col3:
+        cl_filter = st.multiselect("🏷️ Classe", options=sorted([c for c in depenses_df['classe'].dropna().unique() if c]))
+    with col4:
+        four_filter = st.multiselect("🏢 Fournisseur", options=sorted(depenses_df['fournisseur'].dropna().unique()))
+
+    if recherche_dep:
+        dep_f = depenses_df[depenses_df['id'].isin(rechercher_depenses(recherche_dep))].copy()
+    else:
+        dep_f = depenses_df[depenses_df['annee'] == annee_dep].copy()
+    if cpt_filter: dep_f = dep_f[dep_f['compte'].isin(cpt_filter)]
+    if cl_filter: dep_f = dep_f[dep_f['classe'].isin(cl_filter)]
+    if four_filter: dep_f = dep_f[dep_f['fournisseur'].isin(four_filter)]
+
+    st.divider()
+    c1, c2, c3, c4 = st.columns(4)
+    total_dep = dep_f['montant_du'].sum()
+    bud_tot = budget_df[budget_df['annee'] == annee_dep]['montant_budget'].sum() if not budget_df.empty and 'annee' in budget_df.columns else 0
+    c1.metric("Nb dépenses", len(dep_f))
+    c2.metric("Total", f"{total_dep:,.2f} €")
+    c3.metric("Moyenne", f"{dep_f['montant_du'].mean():,.2f} €" if len(dep_f) > 0 else "0 €")
+    if bud_tot > 0:
+        c4.metric("Réalisé vs Budget", f"{total_dep/bud_tot*100:.1f}%", delta=f"{total_dep-bud_tot:,.0f} €")
+    else:
+        c4.metric("Réalisé vs Budget", "N/A")
+    st.divider()
+
+    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["📋 Consulter", "✏️ Modifier", "➕ Ajouter", "🗑️ Supprimer", "🏗️ Travaux Votés", "📎 Factures"])
+
+    with tab1:
+        if dep_f.empty:
+            st.info("Aucune dépense pour cette période.")
+        else:
+            dep_show = dep_f.copy().sort_values('date', ascending=False)
+            dep_show['montant_du'] = pd.to_numeric(dep_show['montant_du'], errors='coerce').fillna(0)
+            has_facture_col = 'facture_path' in dep_show.columns
+
+            # Barre de contrôle
+            col_vue1, col_vue2 = st.columns([3, 1])
+            with col_vue1:
+                vue_mode = st.radio("Affichage", ["📋 Tableau", "📎 Vis-à-vis factures"],
+                    horizontal=True, key="dep_vue_mode")
+            with col_vue2:
+                st.download_button("📥 CSV",
+                    dep_f.to_csv(index=False).encode('utf-8'),
+                    f"depenses_{annee_dep}.csv", "text/csv",
+                    use_container_width=True)
+
+            # ── MODE TABLEAU ───────────────────────────────────
+            if vue_mode == "📋 Tableau":
+                disp = dep_show[['date','compte','libelle_compte','fournisseur','montant_du','classe','commentaire']].copy()
+                disp['date'] = disp['date'].dt.strftime('%d/%m/%Y')
+                if has_facture_col:
+                    disp['📎'] = dep_show['facture_path'].apply(
+                        lambda x: '✅' if x and str(x) not in ('','None','nan') else '—')
+                st.dataframe(disp, use_container_width=True, hide_index=True,
+                    column_config={"montant_du": st.column_config.NumberColumn("Montant (€)", format="%,.2f")})
+
+            # ── MODE VIS-À-VIS FACTURES ────────────────────────
+            else:
+                # Filtres
+                col_f1, col_f2 = st.columns(2)
+                with col_f1:
+                    fac_filtre = st.radio("Filtrer", ["Toutes", "✅ Avec facture", "❌ Sans facture"],
+                        horizontal=True, key="fac_filtre_tab1")
+                with col_f2:
+                    fac_search2 = st.text_input("🔍 Fournisseur", key="fac_search_tab1")
+
+                dep_vis = dep_show.copy()
+                if has_facture_col:
+                    has_fac_mask = dep_vis['facture_path'].apply(
+                        lambda x: bool(x and str(x) not in ('', 'None', 'nan')))
+                    if fac_filtre == "✅ Avec facture":
+                        dep_vis = dep_vis[has_fac_mask]
+                    elif fac_filtre == "❌ Sans facture":
+                        dep_vis = dep_vis[~has_fac_mask]
+                if fac_search2:
+                    dep_vis = dep_vis[dep_vis['id'].isin(rechercher_depenses(fac_search2))]
+
+                # Métriques
+                if has_facture_col:
+                    nb_avec = dep_show['facture_path'].apply(
+                        lambda x: bool(x and str(x) not in ('', 'None', 'nan'))).sum()
+                    mc1, mc2, mc3 = st.columns(3)
+                    mc1.metric("Total dépenses", len(dep_show))
+                    mc2.metric("✅ Avec facture", int(nb_avec))
+                    mc3.metric("❌ Sans facture", len(dep_show) - int(nb_avec))
+                    st.divider()
+
+                # Pagination : seules les dépenses de la page courante sont rendues
+                dep_page = paginer_depenses(dep_vis, "vis_tab1")
+                # Miniatures : une seule requête d'URLs signées pour toute la page
+                thumbs = get_miniatures_urls(tuple(
+                    str(x) for x in dep_page['facture_path'] if facture_presente(x))) if has_facture_col else {}
+
+                if st.toggle("🖼️ Grille de miniatures", key="fac_grille_tab1"):
+                    grille_miniatures(dep_page, thumbs)
+                    manquantes = [str(x) for x in dep_page['facture_path']
+                                  if facture_presente(x) and str(x) not in thumbs] \
+                        if has_facture_col else []
+                    if manquantes and st.button(
+                            f"🖼️ Générer les {len(manquantes)} miniature(s) manquante(s)",
+                            key="gen_thumbs_tab1"):
+                        nb_ok = 0
+                        with st.spinner("Génération des miniatures..."):
+                            for p in manquantes:
+                                fb = get_facture_bytes(p)
+                                try:
+                                    if fb and upload_miniature(p, fb): nb_ok += 1
+                                except Exception:
+                                    pass
+                        st.success(f"✅ {nb_ok} miniature(s) générée(s).")
+                        get_miniatures_urls.clear(); st.rerun()
+
+                else:
+                    # Ligne par ligne en vis-à-vis
+                    for row in dep_page.to_dict('records'):
+                        ligne_facture(row, thumbs.get(str(row.get('facture_path'))), "tab1", height=520)
+
+    with tab2:
+        dep_edit_df = dep_f[['id','date','compte','fournisseur','montant_du','commentaire']].copy()
+        dep_edit_df['compte'] = dep_edit_df['compte'].astype(str).fillna('')
+        dep_edit_df['fournisseur'] = dep_edit_df['fournisseur'].astype(str).fillna('')
+        dep_edit_df['commentaire'] = dep_edit_df['commentaire'].astype(str).fillna('')
+        dep_edit_df['montant_du'] = pd.to_numeric(dep_edit_df['montant_du'], errors='coerce').fillna(0.0)
+        edited_dep = st.data_editor(
+            dep_edit_df,
+            use_container_width=True, hide_index=True, disabled=['id'],
+            column_config={
+                "date": st.column_config.DateColumn("Date", format="DD/MM/YYYY"),
+                "compte": st.column_config.TextColumn("Compte"),
+                "fournisseur": st.column_config.TextColumn("Fournisseur"),
+                "montant_du": st.column_config.NumberColumn("Montant (€)", format="%.2f"),
+                "commentaire": st.column_config.TextColumn("Commentaire"),
+            }, key="dep_editor"
+        )
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("💾 Enregistrer", type="primary", key="save_dep"):
+                try:
+                    mods = 0
+                    for _, row in edited_dep.iterrows():
+                        orig = dep_f[dep_f['id'] == row['id']]
+                        if orig.empty: continue
+                        o = orig.iloc[0]; updates = {}
+                        date_new = pd.Timestamp(row['date']).strftime('%Y-%m-%d')
+                        if date_new != o['date'].strftime('%Y-%m-%d'): updates['date'] = date_new
+                        if str(row['compte']) != str(o['compte']): updates['compte'] = str(row['compte'])
+                        if str(row['fournisseur']) != str(o['fournisseur']): updates['fournisseur'] = str(row['fournisseur'])
+                        if float(row['montant_du']) != float(o['montant_du']): updates['montant_du'] = float(row['montant_du'])
+                        if updates:
+                            get_depot().modifier(supabase, 'depenses', int(row['id']), updates); mods += 1
+                            indexer_depense(int(row['id']), {**o.to_dict(), **updates})
+                    if mods > 0:
+                        st.success(f"✅ {mods} ligne(s) mise(s) à jour!")
+                    else:
+                        st.info("Aucune modification")
+                    if mods > 0: st.rerun()
+                except Exception as e:
+                    st.error(f"❌ {e}")
+        with col2:
+            if st.button("🔄 Annuler", key="cancel_dep"): st.rerun()
+
+    with tab3:
+        new_cpt = st.text_input("Numéro de compte *", key="new_dep_cpt")
+        cpt_bud = budget_df[budget_df['compte'].astype(str) == str(new_cpt)] if new_cpt and not budget_df.empty else pd.DataFrame()
+        if not cpt_bud.empty:
+            st.success(f"✅ {cpt_bud.iloc[0]['libelle_compte']} — Classe {cpt_bud.iloc[0]['classe']}")
+            auto_classe = str(cpt_bud.iloc[0]['classe'])
+            auto_famille = str(cpt_bud.iloc[0]['famille'])
+        else:
+            auto_classe = None; auto_famille = None
+            if new_cpt: st.warning("⚠️ Compte non trouvé dans le budget")
+        with st.form("form_dep"):
+            c1, c2 = st.columns(2)
+            with c1:
+                dep_date = st.date_input("Date *", value=datetime.now())
+                dep_four = st.text_input("Fournisseur *")
+            with c2:
+                dep_mont = st.number_input("Montant (€) *", step=0.01, format="%.2f")
+                dep_comm = st.text_area("Commentaire")
+            dep_forcer = st.checkbox("Ajouter même si un doublon est détecté", key="dep_forcer_doublon")
+            if st.form_submit_button("✨ Ajouter la dépense", type="primary", use_container_width=True):
+                doublons_dep = get_index_doublons().verifier(dep_date, dep_mont, dep_four, new_cpt) \
+                    if new_cpt and dep_four and dep_mont != 0 else {'exacts': [], 'proches': []}
+                if doublons_dep['exacts'] or doublons_dep['proches']:
+                    ids_doublons = doublons_dep['exacts'] + [i for i, _ in doublons_dep['proches']]
+                    lignes_doublons = depenses_df[depenses_df['id'].isin(ids_doublons)]
+                    st.warning(
+                        f"⚠️ {len(doublons_dep['exacts'])} doublon(s) exact(s) et "
+                        f"{len(doublons_dep['proches'])} dépense(s) très proche(s) "
+                        f"(même montant à ±{FENETRE_JOURS} jours) déjà saisie(s) :")
+                    st.dataframe(lignes_doublons[['id','date','compte','fournisseur','montant_du','commentaire']],
+                        hide_index=True, use_container_width=True)
+                if (doublons_dep['exacts'] or doublons_dep['proches']) and not dep_forcer:
+                    st.info("Cochez « Ajouter même si un doublon est détecté » pour confirmer.")
+                elif new_cpt and auto_classe and dep_four and dep_mont != 0:
+                    try:
+                        lignes = get_depot().inserer(supabase, 'depenses', {
+                            'date': dep_date.strftime('%Y-%m-%d'), 'compte': new_cpt,
+                            'fournisseur': dep_four.strip(), 'montant_du': float(dep_mont),
+                            'classe': auto_classe, 'famille': auto_famille,
+                            'commentaire': dep_comm.strip() if dep_comm else None
+                        })
+                        for r in lignes:
+                            indexer_depense(r['id'], {**r, 'libelle_compte': cpt_bud.iloc[0]['libelle_compte']})
+                        get_index_doublons.clear()
+                        st.success("✅ Dépense ajoutée!"); st.rerun()
+                    except Exception as e:
+                        st.error(f"❌ {e}")
+                else:
+                    st.error("❌ Remplissez tous les champs obligatoires (compte valide, fournisseur, montant ≠ 0)")
+
+    with tab4:
+        with st.expander("🔍 Rapport des doublons (tout l'historique)"):
+            c_d1, c_d2 = st.columns(2)
+            with c_d1:
+                fen_doublons = st.slider("Fenêtre (jours)", 0, 60, FENETRE_JOURS, key="doublons_fenetre")
+            with c_d2:
+                seuil_doublons = st.slider("Ressemblance fournisseur", 0.5, 1.0, 0.8, 0.05, key="doublons_seuil")
+            rap = rapport_doublons(depenses_df, fen_doublons, seuil_doublons)
+            if rap.empty:
+                st.success("✅ Aucun doublon détecté.")
+            else:
+                st.warning(f"⚠️ {int(rap['exact'].sum())} doublon(s) exact(s), "
+                           f"{int((~rap['exact']).sum())} paire(s) proche(s).")
+                st.dataframe(rap, hide_index=True, use_container_width=True,
+                    column_config={"montant": st.column_config.NumberColumn("Montant (€)", format="%.2f"),
+                                   "exact": st.column_config.CheckboxColumn("Exact")})
+                st.caption("Les ids peuvent être sélectionnés ci-dessous pour suppression (dépenses de l'année filtrée).")
+        st.warning("⚠️ La suppression est définitive.")
+        ids_del = st.multiselect("Sélectionner les dépenses",
+            options=dep_f['id'].tolist(),
+            format_func=lambda x: f"ID {x} — {dep_f[dep_f['id']==x]['fournisseur'].values[0]} — {dep_f[dep_f['id']==x]['montant_du'].values[0]:.2f} €")
+        if ids_del:
+            if st.button("🗑️ Confirmer la suppression", type="secondary"):
+                get_depot().supprimer(supabase, 'depenses', ids_del)
+                for i in ids_del:
+                    desindexer_depense(i)
+                get_index_doublons.clear()
+                st.success(f"✅ {len(ids_del)} dépense(s) supprimée(s)"); st.rerun()
+    with tab5:
+        st.subheader("🏗️ Travaux Votés en Assemblée Générale")
+        st.info("""
+            Les **travaux votés en AG** sont financés par appel de fonds spécifique et ne font pas partie
+            des charges courantes. Les factures affectées ici sont **déduites des dépenses courantes**
+            et n'entrent pas dans le calcul du 5ème appel de charges.
+            """)
+
+        tv_df = get_travaux_votes()
+        tv_dep_ids = get_travaux_votes_depense_ids()
+
+        # Métriques
+        if not tv_df.empty:
+            tv_df['date'] = pd.to_datetime(tv_df['date'])
+            tv_df['montant'] = pd.to_numeric(tv_df['montant'], errors='coerce').fillna(0)
+            tv_df['commentaire'] = tv_df['commentaire'].fillna('').astype(str).replace('None','')
+
+        total_tv = tv_df['montant'].sum() if not tv_df.empty else 0
+        nb_tv = len(tv_df) if not tv_df.empty else 0
+        nb_dep_transferees = len([x for x in tv_dep_ids if x])
+
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Nb travaux", nb_tv)
+        c2.metric("Montant total", f"{total_tv:,.2f} €")
+        c3.metric("Factures transférées", nb_dep_transferees)
+        # Nb dépenses courantes de l'année filtrées par les transferts
+        dep_tv_annee = dep_f[dep_f['id'].isin(tv_dep_ids)]
+        c4.metric("Déduit des charges", f"{dep_tv_annee['montant_du'].sum():,.2f} €",
+            help="Montant des factures de cette année transférées en travaux votés")
+
+        st.divider()
+
+        subtab1, subtab1b, subtab2, subtab3, subtab4 = st.tabs([
+            "📋 Liste", "✏️ Modifier", "➕ Nouveau chantier", "🔗 Transférer factures", "🗑️ Gérer"
+        ])
+
+        # ---- LISTE ----
+        with subtab1:
+            if tv_df.empty:
+                st.info("💡 Aucun travail voté enregistré.")
+            else:
+                # Grouper par objet/chantier si la colonne existe
+                disp_tv = tv_df.copy().sort_values('date', ascending=False)
+                disp_tv['date_fmt'] = disp_tv['date'].dt.strftime('%d/%m/%Y')
+                disp_tv['Source'] = disp_tv['depense_id'].apply(
+                    lambda x: '🔗 Transférée' if pd.notna(x) and x else '✏️ Saisie manuelle')
+
+                cols_show = ['date_fmt','objet','fournisseur','montant','commentaire','Source']
+                cols_show = [c for c in cols_show if c in disp_tv.columns]
+                st.dataframe(
+                    disp_tv[cols_show].rename(columns={
+                        'date_fmt':'Date','objet':'Objet / Chantier',
+                        'fournisseur':'Fournisseur','montant':'Montant (€)','commentaire':'Commentaire'
+                    }),
+                    use_container_width=True, hide_index=True,
+                    column_config={"Montant (€)": st.column_config.NumberColumn(format="%,.2f")}
+                )
+
+                # Résumé par chantier
+                if 'objet' in tv_df.columns and tv_df['objet'].notna().any():
+                    st.subheader("Résumé par chantier")
+                    by_obj = tv_df.groupby('objet')['montant'].agg(['sum','count']).reset_index()
+                    by_obj.columns = ['Chantier','Total (€)','Nb factures']
+                    by_obj = by_obj.sort_values('Total (€)', ascending=False)
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        st.dataframe(by_obj, use_container_width=True, hide_index=True,
+                            column_config={"Total (€)": st.column_config.NumberColumn(format="%,.2f")})
+                    with col2:
+                        fig = px.pie(by_obj, values='Total (€)', names='Chantier',
+                            title="Répartition par chantier")
+                        afficher_graphique(fig)
+
+                csv_tv = tv_df.to_csv(index=False, sep=';', decimal=',').encode('utf-8-sig')
+                st.download_button("📥 Exporter CSV", csv_tv, "travaux_votes.csv", "text/csv")
+
+        # ---- MODIFIER ----
+        with subtab1b:
+            st.subheader("✏️ Modifier un travail voté")
+            if tv_df.empty:
+                st.info("Aucun travail voté enregistré.")
+            else:
+                # Sélecteur
+                tv_labels = tv_df.apply(lambda r: (
+                    f"{r['date'].strftime('%d/%m/%Y')} — "
+                    f"{r.get('objet','?')} — "
+                    f"{r.get('fournisseur','?')} — "
+                    f"{float(r.get('montant',0)):,.2f} €"
+                ), axis=1).tolist()
+                sel_tv_label = st.selectbox("Sélectionner l'entrée à modifier", tv_labels, key="tv_mod_sel")
+                sel_tv_row   = tv_df.iloc[tv_labels.index(sel_tv_label)]
+                sel_tv_id    = int(sel_tv_row['id'])
+                is_transferee = pd.notna(sel_tv_row.get('depense_id'))
+
+                if is_transferee:
+                    st.info("🔗 Cette entrée est une facture transférée. "
+                            "Seul l'**objet / chantier** et le **commentaire** sont modifiables "
+                            "(les montants et dates viennent de la dépense source).")
+
+                with st.form(f"form_mod_tv_{sel_tv_id}"):
+                    mc1, mc2 = st.columns(2)
+                    with mc1:
+                        m_objet = st.text_input(
+                            "Objet / Chantier *",
+                            value=str(sel_tv_row.get('objet','') or ''),
+                            key=f"tvm_obj_{sel_tv_id}"
+                        )
+                        m_fourn = st.text_input(
+                            "Fournisseur",
+                            value=str(sel_tv_row.get('fournisseur','') or ''),
+                            disabled=is_transferee,
+                            key=f"tvm_fourn_{sel_tv_id}"
+                        )
+                    with mc2:
+                        m_date = st.date_input(
+                            "Date",
+                            value=sel_tv_row['date'].date() if pd.notna(sel_tv_row.get('date')) else datetime.now().date(),
+                            disabled=is_transferee,
+                            key=f"tvm_date_{sel_tv_id}"
+                        )
+                        m_montant = st.number_input(
+                            "Montant (€)",
+                            value=float(sel_tv_row.get('montant',0) or 0),
+                            disabled=is_transferee,
+                            key=f"tvm_mont_{sel_tv_id}"
+                        )
+                    m_comment = st.text_input(
+                        "Commentaire",
+                        value=str(sel_tv_row.get('commentaire','') or ''),
+                        key=f"tvm_com_{sel_tv_id}"
+                    )
+
+                    if st.form_submit_button("💾 Enregistrer", type="primary", use_container_width=True):
+                        if not m_objet.strip():
+                            st.error("❌ L'objet / chantier est obligatoire.")
+                        else:
+                            try:
+                                updates = {
+                                    'objet':       m_objet.strip(),
+                                    'commentaire': m_comment.strip() or None,
+                                }
+                                if not is_transferee:
+                                    updates['fournisseur'] = m_fourn.strip() or None
+                                    updates['date']        = m_date.strftime('%Y-%m-%d')
+                                    updates['montant']     = float(m_montant)
+                                get_depot().modifier(supabase, 'travaux_votes', sel_tv_id, updates)
+                                st.success("✅ Entrée mise à jour.")
+                                vider_cache_immeuble(); st.rerun()
+                            except Exception as e:
+                                st.error(f"❌ {e}")
+
+                    # ---- NOUVEAU CHANTIER / SAISIE MANUELLE ----
+        with subtab2:
+            st.subheader("Ajouter une dépense de travaux votés")
+            with st.form("form_tv"):
+                col1, col2 = st.columns(2)
+                with col1:
+                    tv_date = st.date_input("Date de la facture *", value=datetime.now())
+                    tv_objet = st.text_input("Objet / Chantier *",
+                        placeholder="Ex: Ravalement façade, Remplacement ascenseur...")
+                    tv_fournisseur = st.text_input("Fournisseur *")
+                with col2:
+                    tv_montant = st.number_input("Montant (€) *", min_value=0.0, step=0.01, format="%.2f")
+                    tv_ag = st.text_input("AG de vote", placeholder="Ex: AG du 15/03/2024")
+                    tv_comment = st.text_area("Commentaire")
+
+                if st.form_submit_button("✨ Enregistrer", type="primary", use_container_width=True):
+                    if tv_objet and tv_fournisseur and tv_montant > 0:
+                        try:
+                            get_depot().inserer(supabase, 'travaux_votes', {
+                                'date': tv_date.strftime('%Y-%m-%d'),
+                                'objet': tv_objet.strip(),
+                                'fournisseur': tv_fournisseur.strip(),
+                                'montant': float(tv_montant),
+                                'ag_vote': tv_ag.strip() if tv_ag else None,
+                                'commentaire': tv_comment.strip() if tv_comment else None,
+                                'depense_id': None
+                            })
+                            st.success("✅ Travaux enregistrés!"); st.rerun()
+                        except Exception as e:
+                            st.error(f"❌ {e}")
+                    else:
+                        st.error("❌ Remplissez tous les champs obligatoires")
+
+        # ---- TRANSFÉRER FACTURES ----
+        with subtab3:
+            st.subheader("🔗 Transférer des factures depuis les Dépenses courantes")
+            st.caption("Les factures transférées restent dans la table Dépenses mais sont marquées comme "
+                       "travaux votés et **exclues des charges courantes** (5ème appel).")
+
+            # Filtrer les dépenses non encore transférées
+            dep_non_tv = dep_f[~dep_f['id'].isin(tv_dep_ids)].copy()
+            dep_deja_tv = dep_f[dep_f['id'].isin(tv_dep_ids)].copy()
+
+            col1, col2 = st.columns(2)
+            col1.metric("Dépenses transférables", len(dep_non_tv))
+            col2.metric("Déjà transférées (cette année)", len(dep_deja_tv),
+                delta=f"{dep_deja_tv['montant_du'].sum():,.2f} €")
+
+            if dep_non_tv.empty:
+                st.info("Toutes les dépenses de cette année sont déjà transférées.")
+            else:
+                # Champ objet / AG en haut
+                col1, col2 = st.columns(2)
+                with col1:
+                    tv_objet_tr = st.text_input("Objet / Chantier *",
+                        placeholder="Ex: Ravalement façade 2025", key="tv_objet_tr")
+                with col2:
+                    tv_ag_tr = st.text_input("AG de vote",
+                        placeholder="Ex: AG du 15/03/2024", key="tv_ag_tr")
+
+                st.caption("✅ Cochez les factures à transférer puis cliquez sur le bouton.")
+
+                # Tableau éditable avec case à cocher — c'est la SEULE façon d'avoir des cases interactives
+                dep_editor = dep_non_tv[['id','date','fournisseur','montant_du','classe','commentaire']].copy()
+                dep_editor['date'] = dep_editor['date'].dt.strftime('%d/%m/%Y')
+                dep_editor['compte'] = dep_non_tv['compte'].astype(str).fillna('') if 'compte' in dep_non_tv.columns else ''
+                dep_editor['fournisseur'] = dep_editor['fournisseur'].astype(str).fillna('')
+                dep_editor['commentaire'] = dep_editor['commentaire'].astype(str).fillna('').replace('None','')
+                dep_editor['montant_du'] = pd.to_numeric(dep_editor['montant_du'], errors='coerce').fillna(0.0)
+                dep_editor['✓ Transférer'] = False  # case à cocher initiale
+
+                edited_tv = st.data_editor(
+                    dep_editor[['✓ Transférer','date','fournisseur','compte','montant_du','classe','commentaire']],
+                    use_container_width=True, hide_index=True,
+                    disabled=['date','fournisseur','compte','montant_du','classe','commentaire'],
+                    column_config={
+                        '✓ Transférer': st.column_config.CheckboxColumn("✓", help="Cocher pour transférer"),
+                        'montant_du': st.column_config.NumberColumn("Montant (€)", format="%,.2f"),
+                        'date': st.column_config.TextColumn("Date"),
+                        'fournisseur': st.column_config.TextColumn("Fournisseur"),
+                        'compte': st.column_config.TextColumn("Compte"),
+                        'classe': st.column_config.TextColumn("Classe"),
+                        'commentaire': st.column_config.TextColumn("Commentaire"),
+                    }, key="tv_dep_editor"
+                )
+
+                # Récupérer les IDs cochés
+                ids_tv_sel = dep_non_tv['id'].values[edited_tv['✓ Transférer'].values]
+
+                if len(ids_tv_sel) > 0:
+                    total_sel_tv = dep_non_tv[dep_non_tv['id'].isin(ids_tv_sel)]['montant_du'].sum()
+                    st.info(f"**{len(ids_tv_sel)}** facture(s) sélectionnée(s) — **{total_sel_tv:,.2f} €**")
+
+                if st.button("🔗 Transférer en Travaux Votés", type="primary",
+                             disabled=(len(ids_tv_sel) == 0)):
+                    if not tv_objet_tr:
+                        st.error("❌ Saisissez l'objet du chantier")
+                    else:
+                        try:
+                            lignes_tv = []
+                            for dep_id in ids_tv_sel:
+                                dep_row = dep_non_tv[dep_non_tv['id'] == dep_id].iloc[0]
+                                lignes_tv.append({
+                                    'date': dep_row['date'].strftime('%Y-%m-%d'),
+                                    'objet': tv_objet_tr.strip(),
+                                    'fournisseur': dep_row['fournisseur'],
+                                    'montant': float(dep_row['montant_du']),
+                                    'ag_vote': tv_ag_tr.strip() if tv_ag_tr else None,
+                                    'commentaire': str(dep_row.get('commentaire','') or ''),
+                                    'depense_id': int(dep_id)
+                                })
+                            for i in range(0, len(lignes_tv), 50):
+                                get_depot().inserer(supabase, 'travaux_votes', lignes_tv[i:i+50])
+                            st.success(f"✅ {len(ids_tv_sel)} facture(s) transférée(s)!"); st.rerun()
+                        except Exception as e:
+                            st.error(f"❌ {e}")
+
+            # Retransférer (annuler un transfert)
+            if not dep_deja_tv.empty:
+                st.divider()
+                st.subheader("↩️ Annuler un transfert")
+                ids_annul = st.multiselect(
+                    "Factures à ré-intégrer dans les charges courantes",
+                    options=dep_deja_tv['id'].tolist(),
+                    format_func=lambda x: (
+                        f"{dep_deja_tv[dep_deja_tv['id']==x]['date'].dt.strftime('%d/%m/%Y').values[0]} — "
+                        f"{dep_deja_tv[dep_deja_tv['id']==x]['fournisseur'].values[0]} — "
+                        f"{dep_deja_tv[dep_deja_tv['id']==x]['montant_du'].values[0]:,.2f} €"
+                    ), key="tv_annul"
+                )
+                if ids_annul and st.button("↩️ Annuler le transfert", type="secondary"):
+                    try:
+                        get_depot().supprimer(supabase, 'travaux_votes',
+                                              tv_df.loc[tv_df['depense_id'].isin(ids_annul), 'id'].tolist())
+                        st.success(f"✅ {len(ids_annul)} transfert(s) annulé(s)"); st.rerun()
+                    except Exception as e:
+                        st.error(f"❌ {e}")
+
+        # ---- GÉRER ----
+        with subtab4:
+            st.warning("⚠️ La suppression est définitive.")
+            if tv_df.empty:
+                st.info("Aucun travail voté enregistré.")
+            else:
+                tv_manuels = tv_df[tv_df['depense_id'].isna()] if 'depense_id' in tv_df.columns else tv_df
+                if not tv_manuels.empty:
+                    ids_tv_del = st.multiselect("Supprimer des entrées manuelles",
+                        options=tv_manuels['id'].tolist(),
+                        format_func=lambda x: (
+                            f"{tv_manuels[tv_manuels['id']==x]['date'].dt.strftime('%d/%m/%Y').values[0]} — "
+                            f"{tv_manuels[tv_manuels['id']==x]['objet'].values[0]} — "
+                            f"{tv_manuels[tv_manuels['id']==x]['montant'].values[0]:,.2f} €"
+                        ))
+                    if ids_tv_del and st.button("🗑️ Supprimer", type="secondary", key="del_tv"):
+                        get_depot().supprimer(supabase, 'travaux_votes', ids_tv_del)
+                        st.success(f"✅ {len(ids_tv_del)} supprimé(s)"); st.rerun()
+                else:
+                    st.info("Toutes les entrées sont des transferts (à annuler via l'onglet 🔗).")
+
+    # ==================== TAB6 : FACTURES ====================
+    with tab6:
+        st.subheader("📎 Factures — vue par dépense")
+        st.caption("Cliquez sur une dépense pour afficher, uploader ou supprimer la facture associée.")
+
+        if dep_f.empty:
+            st.info("Aucune dépense pour cette période.")
+        else:
+            # Préparer la liste des dépenses avec indicateur facture
+            dep_fac = dep_f.copy()
+            dep_fac['montant_du'] = pd.to_numeric(dep_fac['montant_du'], errors='coerce').fillna(0)
+            dep_fac['date_fmt'] = dep_fac['date'].dt.strftime('%d/%m/%Y')
+            has_facture = (
+                dep_fac['facture_path'].apply(
+                    lambda x: bool(x) and str(x) not in ('', 'None', 'nan', 'NaN')
+                ).fillna(False).astype(bool)
+            ) if 'facture_path' in dep_fac.columns else pd.Series([False] * len(dep_fac), dtype=bool)
+
+            # Filtre par statut facture
+            col_f1, col_f2 = st.columns(2)
+            with col_f1:
+                fac_filter = st.radio("Afficher", ["Toutes", "✅ Avec facture", "❌ Sans facture"],
+                    horizontal=True, key="fac_filter")
+            with col_f2:
+                fac_search = st.text_input("🔍 Recherche fournisseur", key="fac_search")
+
+            dep_fac_show = dep_fac.copy()
+            if fac_filter == "✅ Avec facture":
+                dep_fac_show = dep_fac_show[has_facture]
+            elif fac_filter == "❌ Sans facture":
+                dep_fac_show = dep_fac_show[~has_facture]
+            if fac_search:
+                dep_fac_show = dep_fac_show[dep_fac_show['id'].isin(rechercher_depenses(fac_search))]
+
+            dep_fac_show = dep_fac_show.sort_values('date', ascending=False)
+
+            # Métriques
+            total_avec = has_facture.sum()
+            total_sans = len(dep_fac) - total_avec
+            m1, m2, m3 = st.columns(3)
+            m1.metric("Total dépenses", len(dep_fac))
+            m2.metric("✅ Avec facture", total_avec)
+            m3.metric("❌ Sans facture", total_sans)
+            st.divider()
+
+            # Affichage dépense par dépense, page par page
+            dep_page = paginer_depenses(dep_fac_show, "vis_tab6")
+            thumbs = get_miniatures_urls(tuple(
+                str(x) for x in dep_page['facture_path'] if facture_presente(x))) \
+                if 'facture_path' in dep_page.columns else {}
+            for row in dep_page.to_dict('records'):
+                ligne_facture(row, thumbs.get(str(row.get('facture_path'))), "tab6", height=500)
+
+else:
+    st.info("💡 Aucune dépense. Utilisez l'onglet ➕ Ajouter.")
@@ -0,0 +1,298 @@
+"""
+vues/fiche_locataire.py — Formulaire public des locataires (lien ?fiche=TOKEN)
+
+Page seule, sans menu ni barre latérale : le propriétaire d'un lot renseigne ses locataires.
+"""
+
+import streamlit as st
+import pandas as pd
+import urllib.request as _ureq
+from immeubles import IMMEUBLE_DEFAUT
+from donnees import supabase
+
+_token = st.query_params["fiche"]
+
+# Retrouver la fiche via le token (tous immeubles : le lien désigne aussi la copropriété)
+def _get_fiche_by_token(token):
+    try:
+        r = supabase.brut.table('fiches_tokens').select('*').eq('token', token).eq('actif', True).execute()
+        return r.data[0] if r.data else None
+    except:
+        return None
+
+_fiche = _get_fiche_by_token(_token)
+
+st.markdown("""
+    <style>
+    #MainMenu, header, footer, [data-testid="stSidebar"] { display: none !important; }
+    .block-container { max-width: 700px !important; margin: 0 auto; padding-top: 2rem; }
+    </style>
+    """, unsafe_allow_html=True)
+
+if _fiche is None:
+    st.error("❌ Ce lien est invalide ou a expiré.")
+    st.info("Contactez votre syndic pour obtenir un nouveau lien.")
+    st.stop()
+
+st.session_state['immeuble_id'] = int(_fiche.get('immeuble_id') or IMMEUBLE_DEFAUT['id'])
+_prop_nom  = _fiche.get('proprietaire_nom','')
+_prop_id   = _fiche.get('proprietaire_nom','')  # nom utilisé comme clé
+
+# Charger tous les lots de ce propriétaire
+try:
+    _lots_r = supabase.table('coproprietaires').select('*').eq('nom', _prop_nom).execute()
+    _lots   = _lots_r.data or []
+except:
+    _lots = []
+
+# En-tête
+st.markdown(f"""
+    <div style="text-align:center;margin-bottom:2rem;">
+      <div style="font-size:2.5rem;">🏢</div>
+      <h2 style="color:#1f77b4;">Fiche Locataire</h2>
+      <p style="color:#aaa;">Copropriété — Mise à jour annuaire</p>
+    </div>
+    """, unsafe_allow_html=True)
+
+st.markdown(f"Bonjour **{_prop_nom.split('(')[0].strip()}**,")
+st.markdown("Merci de renseigner les informations de vos locataires actuels. "
+            "Ces données nous permettront de mettre à jour les **boîtes aux lettres** "
+            "et l'**interphone** de la résidence.")
+st.divider()
+
+USAGE_LABELS = {
+    'parking':'🅿️ Parking','studio':'🏠 Studio','studio ':'🏠 Studio',
+    '2pieces':'🏠 2 pièces','2 pieces':'🏠 2 pièces',
+    '2 pieces duplex':'🏠 2 pièces duplex','3 pieces':'🏠 3 pièces',
+    '3 pieces duplex':'🏠 3 pièces duplex',
+}
+
+_appts = [l for l in _lots if 'parking' not in str(l.get('usage','')).lower()]
+_pks   = [l for l in _lots if 'parking' in str(l.get('usage','')).lower()]
+
+if not _appts and not _pks:
+    st.warning("Aucun lot trouvé pour ce propriétaire.")
+    st.stop()
+
+with st.form("form_public_fiche"):
+    _responses = []
+
+    if _appts:
+        st.markdown("### 🏠 Appartement(s)")
+        for _lot in _appts:
+            _lot_num = _lot.get('lot','?')
+            _etage   = _lot.get('etage','?')
+            _usage   = USAGE_LABELS.get(str(_lot.get('usage','')).strip().lower(),
+                                        str(_lot.get('usage','')))
+            _lot_id  = int(_lot['id'])
+
+            st.markdown(f"**{_usage} — Lot {_lot_num} — {_etage}**")
+            _c1, _c2 = st.columns(2)
+            with _c1:
+                _occ = st.radio(f"Occupation lot {_lot_num}",
+                                ["J'occupe moi-même", "Loué"],
+                                key=f"occ_{_lot_id}", horizontal=True)
+                _l_prenom = st.text_input("Prénom du locataire", key=f"lp_{_lot_id}")
+                _l_nom    = st.text_input("Nom du locataire",    key=f"ln_{_lot_id}")
+            with _c2:
+                _l_email = st.text_input("Email du locataire",  key=f"le_{_lot_id}")
+                _l_tel   = st.text_input("Téléphone",           key=f"lt_{_lot_id}")
+                _l_bal   = st.text_input("Étiquette BAL souhaitée",
+                                         key=f"lb_{_lot_id}",
+                                         placeholder=f"Ex: DUPONT — Lot {_lot_num}",
+                                         help="Nom à inscrire sur la boîte aux lettres")
+                _l_iph   = st.text_input("Étiquette Interphone",
+                                         key=f"li_{_lot_id}",
+                                         placeholder="Ex: DUPONT",
+                                         help="Nom à afficher sur l'interphone")
+            st.divider()
+            _responses.append({
+                'lot_id': _lot_id, 'lot_num': _lot_num,
+                'occupation': _occ,
+                'prenom': _l_prenom, 'nom': _l_nom,
+                'email': _l_email, 'telephone': _l_tel,
+                'label_bal': _l_bal, 'label_interphone': _l_iph,
+                'is_parking': False,
+            })
+
+    if _pks:
+        st.markdown("### 🅿️ Parking(s)")
+        for _lot in _pks:
+            _lot_num = _lot.get('lot','?')
+            _etage   = _lot.get('etage','?')
+            _lot_id  = int(_lot['id'])
+            st.markdown(f"**🅿️ Parking — Lot {_lot_num} — {_etage}**")
+            _pk_occ = st.radio(f"Parking lot {_lot_num}",
+                               ["J'utilise moi-même", "Loué à quelqu'un"],
+                               key=f"pk_{_lot_id}", horizontal=True)
+            if _pk_occ == "Loué à quelqu'un":
+                _pk_nom = st.text_input("Nom du locataire parking", key=f"pkn_{_lot_id}")
+            else:
+                _pk_nom = ""
+            _responses.append({
+                'lot_id': _lot_id, 'lot_num': _lot_num,
+                'occupation': _pk_occ, 'nom': _pk_nom, 'prenom': '',
+                'email': '', 'telephone': '', 'label_bal': '', 'label_interphone': '',
+                'is_parking': True,
+            })
+
+    _notes_gen = st.text_area("💬 Remarques éventuelles", key="notes_gen", height=80)
+    _submit    = st.form_submit_button("✅ Envoyer ma fiche", type="primary",
+                                       use_container_width=True)
+
+if _submit:
+    try:
+        _today = pd.Timestamp.today().strftime('%Y-%m-%d')
+        _saved = 0
+        for _r in _responses:
+            if _r['is_parking']:
+                continue  # Les parkings : info simple, pas de locataire à enregistrer
+            _is_loue = _r['occupation'] == 'Loué'
+            if _is_loue and _r['nom'].strip():
+                # Désactiver l'ancien locataire actif si existant
+                _ex = supabase.table('locataires').select('id').eq(
+                    'lot_id', _r['lot_id']).eq('actif', True).execute()
+                for _ex_row in (_ex.data or []):
+                    supabase.table('locataires').update(
+                        {'actif': False, 'date_sortie': _today}
+                    ).eq('id', _ex_row['id']).execute()
+                # Insérer le nouveau locataire
+                supabase.table('locataires').insert({
+                    'lot_id':            _r['lot_id'],
+                    'prenom':            _r['prenom'].strip() or None,
+                    'nom':               _r['nom'].strip(),
+                    'email':             _r['email'].strip() or None,
+                    'telephone':         _r['telephone'].strip() or None,
+                    'label_bal':         _r['label_bal'].strip() or None,
+                    'label_interphone':  _r['label_interphone'].strip() or None,
+                    'date_entree':       _today,
+                    'actif':             True,
+                    'notes':             _notes_gen.strip() or None,
+                }).execute()
+                _saved += 1
+
+        # Marquer le token comme utilisé
+        supabase.table('fiches_tokens').update(
+            {'utilise': True}
+        ).eq('token', _token).execute()
+
+        st.success("✅ Merci ! Vos informations ont bien été enregistrées.")
+        st.balloons()
+        st.info("Vous pouvez fermer cette page. Le syndic a été notifié.")
+
+        # Notifier le syndic par email si Brevo configuré
+        try:
+            _brevo_key  = st.secrets.get("brevo_api_key","")
+            _brevo_from = st.secrets.get("brevo_from_email","")
+            if _brevo_key and _brevo_from:
+                import json as _j2
+                _prop_court = _prop_nom.split('(')[0].strip()
+                _date_envoi = pd.Timestamp.today().strftime('%d/%m/%Y à %H:%M')
+
+                # ── Corps texte ─────────────────────────────────
+                _body_txt = (
+                    f"FICHE LOCATAIRE REÇUE\n"
+                    f"{'='*40}\n"
+                    f"Propriétaire : {_prop_nom}\n"
+                    f"Date de réponse : {_date_envoi}\n\n"
+                )
+
+                # ── Corps HTML ──────────────────────────────────
+                _rows_html = ""
+                for _r in _responses:
+                    _is_loue = _r['occupation'] in ('Loué', "Loué à quelqu'un")
+                    _usage_r = '🅿️ Parking' if _r['is_parking'] else '🏠 Appartement'
+                    _statut_r = '🏠 Loué' if _is_loue else '👤 Occupé propriétaire'
+                    _bg = '#e8f5e9' if _is_loue else '#f5f5f5'
+
+                    if _is_loue and (_r.get('nom','').strip() or _r['is_parking']):
+                        _nom_loc    = f"{_r.get('prenom','')} {_r.get('nom','')}".strip()
+                        _email_loc  = _r.get('email','—') or '—'
+                        _tel_loc    = _r.get('telephone','—') or '—'
+                        _bal_loc    = _r.get('label_bal','—') or '—'
+                        _iph_loc    = _r.get('label_interphone','—') or '—'
+
+                        _body_txt += (
+                            f"LOT {_r['lot_num']} — {_usage_r}\n"
+                            f"  Statut      : {_statut_r}\n"
+                            f"  Locataire   : {_nom_loc}\n"
+                            f"  Email       : {_email_loc}\n"
+                            f"  Téléphone   : {_tel_loc}\n"
+                            f"  BAL         : {_bal_loc}\n"
+                            f"  Interphone  : {_iph_loc}\n\n"
+                        )
+                        _rows_html += f"""
+                            <tr style="background:{_bg};">
+                              <td style="padding:8px;border:1px solid #ddd;"><b>Lot {_r['lot_num']}</b></td>
+                              <td style="padding:8px;border:1px solid #ddd;">{_usage_r}</td>
+                              <td style="padding:8px;border:1px solid #ddd;">{_statut_r}</td>
+                              <td style="padding:8px;border:1px solid #ddd;"><b>{_nom_loc}</b></td>
+                              <td style="padding:8px;border:1px solid #ddd;"><a href="mailto:{_email_loc}">{_email_loc}</a></td>
+                              <td style="padding:8px;border:1px solid #ddd;"><a href="tel:{_tel_loc}">{_tel_loc}</a></td>
+                              <td style="padding:8px;border:1px solid #ddd;">{_bal_loc}</td>
+                              <td style="padding:8px;border:1px solid #ddd;">{_iph_loc}</td>
+                            </tr>"""
+                    else:
+                        _body_txt += (
+                            f"LOT {_r['lot_num']} — {_usage_r}\n"
+                            f"  Statut : {_statut_r}\n\n"
+                        )
+                        _rows_html += f"""
+                            <tr style="background:{_bg};">
+                              <td style="padding:8px;border:1px solid #ddd;"><b>Lot {_r['lot_num']}</b></td>
+                              <td style="padding:8px;border:1px solid #ddd;">{_usage_r}</td>
+                              <td colspan="6" style="padding:8px;border:1px solid #ddd;color:#888;">{_statut_r}</td>
+                            </tr>"""
+
+                if _notes_gen.strip():
+                    _body_txt += f"Notes : {_notes_gen}\n"
+
+                _body_html = f"""
+                    <html><body style="font-family:Arial,sans-serif;color:#333;">
+                      <div style="background:#1f77b4;padding:16px;border-radius:8px 8px 0 0;">
+                        <h2 style="color:white;margin:0;">📋 Fiche locataire reçue</h2>
+                      </div>
+                      <div style="border:1px solid #ddd;border-top:none;padding:20px;border-radius:0 0 8px 8px;">
+                        <p><b>Propriétaire :</b> {_prop_nom}</p>
+                        <p><b>Date de réponse :</b> {_date_envoi}</p>
+                        <table style="width:100%;border-collapse:collapse;margin-top:16px;font-size:0.9em;">
+                          <thead>
+                            <tr style="background:#1f77b4;color:white;">
+                              <th style="padding:8px;text-align:left;">Lot</th>
+                              <th style="padding:8px;text-align:left;">Type</th>
+                              <th style="padding:8px;text-align:left;">Statut</th>
+                              <th style="padding:8px;text-align:left;">Locataire</th>
+                              <th style="padding:8px;text-align:left;">Email</th>
+                              <th style="padding:8px;text-align:left;">Téléphone</th>
+                              <th style="padding:8px;text-align:left;">BAL</th>
+                              <th style="padding:8px;text-align:left;">Interphone</th>
+                            </tr>
+                          </thead>
+                          <tbody>{_rows_html}</tbody>
+                        </table>
+                        {"<p><b>Notes :</b> " + _notes_gen + "</p>" if _notes_gen.strip() else ""}
+                        <p style="margin-top:20px;color:#888;font-size:0.85em;">
+                          ✅ Ces informations ont été enregistrées automatiquement dans Supabase.
+                        </p>
+                      </div>
+                    </body></html>"""
+
+                _payload = _j2.dumps({
+                    "sender": {"name": "Copropriété", "email": _brevo_from},
+                    "to":     [{"email": _brevo_from}],
+                    "subject": f"📋 Fiche locataire — {_prop_court} — {_date_envoi}",
+                    "textContent": _body_txt,
+                    "htmlContent": _body_html,
+                }).encode('utf-8')
+                _req2 = _ureq.Request("https://api.brevo.com/v3/smtp/email",
+                    data=_payload,
+                    headers={"accept":"application/json","content-type":"application/json",
+                             "api-key":_brevo_key}, method="POST")
+                _ureq.urlopen(_req2)
+        except:
+            pass
+
+    except Exception as _e:
+        st.error(f"❌ Erreur lors de l'enregistrement : {_e}")
+
+st.stop()  # Ne pas afficher le reste de l'app
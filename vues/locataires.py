@@ -0,0 +1,642 @@
+"""
+vues/locataires.py — 🏠 Locataires
+
+Fiches locataires par lot (boîtes aux lettres, interphone).
+"""
+
+import streamlit as st
+import pandas as pd
+from donnees import lire_table, get_coproprietaires, prepare_copro, get_depot, supabase
+
+st.markdown("<h1 class='main-header'>🏠 Locataires</h1>", unsafe_allow_html=True)
+st.caption("Fiches locataires par copropriétaire — mise à jour boîtes aux lettres & interphone")
+
+def get_locataires():
+    try:
+        return lire_table('locataires')
+    except:
+        return pd.DataFrame()
+
+copro_loc = get_coproprietaires()
+if copro_loc.empty:
+    st.error("❌ Impossible de charger les copropriétaires."); st.stop()
+copro_loc = prepare_copro(copro_loc)
+loc_df    = get_locataires()
+
+# Normalisation
+if not loc_df.empty:
+    loc_df['lot_id'] = pd.to_numeric(loc_df['lot_id'], errors='coerce')
+copro_loc['id'] = pd.to_numeric(copro_loc['id'], errors='coerce')
+
+EMOJI_USAGE = {
+    'parking': '🅿️', 'studio': '🏠', 'studio ': '🏠',
+    '2pieces': '🏠', '2 pieces': '🏠', '2 pieces duplex': '🏠',
+    '3 pieces': '🏠', '3 pieces duplex': '🏠',
+}
+
+def usage_label(u):
+    u = str(u or '').strip().lower()
+    e = EMOJI_USAGE.get(u, '🏠')
+    labels = {'parking':'Parking','studio':'Studio','studio ':'Studio',
+              '2pieces':'2 pièces','2 pieces':'2 pièces',
+              '2 pieces duplex':'2 pièces duplex','3 pieces':'3 pièces',
+              '3 pieces duplex':'3 pièces duplex'}
+    return f"{e} {labels.get(u, u.title())}"
+
+# ══════════════════════════════════════════════════════════════
+# FRAGMENTS — sélections et filtres ne relancent que leur onglet
+# ══════════════════════════════════════════════════════════════
+
+@st.fragment
+def fiche_proprietaire(copro_loc, loc_df):
+    """Lots et locataires d'un propriétaire. Fragment : changer de propriétaire ne recharge
+    pas les tables ; un enregistrement relance toute la page (st.rerun)."""
+    # Grouper les lots par propriétaire (nom)
+    noms_uniques = sorted(copro_loc['nom'].unique())
+
+    col_s1, col_s2 = st.columns([3, 1])
+    with col_s1:
+        sel_proprietaire = st.selectbox("👤 Sélectionner le propriétaire",
+                                        noms_uniques, key="loc_prop_sel")
+    with col_s2:
+        st.metric("Propriétaires", len(noms_uniques))
+
+    # Tous les lots de ce propriétaire
+    lots_prop = copro_loc[copro_loc['nom'] == sel_proprietaire].sort_values('lot')
+
+    st.divider()
+
+    # En-tête fiche propriétaire
+    nb_lots   = len(lots_prop)
+    nb_appts  = len(lots_prop[~lots_prop['usage'].str.lower().str.contains('parking', na=False)])
+    nb_pk     = len(lots_prop[lots_prop['usage'].str.lower().str.contains('parking', na=False)])
+
+    h1, h2, h3, h4 = st.columns(4)
+    h1.metric("👤 Propriétaire", sel_proprietaire.split('(')[0].strip())
+    h2.metric("🔑 Lots total",   nb_lots)
+    h3.metric("🏠 Appartements", nb_appts)
+    h4.metric("🅿️ Parkings",    nb_pk)
+
+    # Contact propriétaire (depuis coproprietaires)
+    cop_row_contact = lots_prop.iloc[0]
+    email_prop = cop_row_contact.get('email','') or ''
+    tel_prop   = cop_row_contact.get('telephone','') or ''
+    if email_prop or tel_prop:
+        st.info(f"📧 {email_prop}   📱 {tel_prop}")
+
+    st.divider()
+    st.subheader("🏠 Lots & Locataires")
+
+    # Pour chaque lot, afficher + éditer le locataire
+    for _, lot_row in lots_prop.iterrows():
+        lot_id   = int(lot_row['id'])
+        lot_num  = lot_row.get('lot', '?')
+        etage    = lot_row.get('etage', '?')
+        usage    = lot_row.get('usage', '')
+        desc     = lot_row.get('description', '') or ''
+
+        # Locataire actif pour ce lot
+        loc_actif = pd.DataFrame()
+        if not loc_df.empty and 'lot_id' in loc_df.columns:
+            loc_actif = loc_df[
+                (loc_df['lot_id'] == lot_id) &
+                (loc_df['actif'] == True)
+            ]
+
+        has_loc = not loc_actif.empty
+        badge   = "✅ Loué" if has_loc else "⬜ Libre / Occupé propriétaire"
+        color   = "#1a3a2a" if has_loc else "#2a2a2a"
+
+        with st.expander(
+            f"**Lot {lot_num}** — {usage_label(usage)} — Étage : {etage}  |  {badge}",
+            expanded=True
+        ):
+            st.markdown(
+                f"<div style='background:{color};padding:8px 12px;border-radius:6px;"
+                f"margin-bottom:10px;font-size:0.9em;color:#ccc;'>"
+                f"🔑 Lot <b>{lot_num}</b> &nbsp;|&nbsp; {usage_label(usage)} "
+                f"&nbsp;|&nbsp; {etage} &nbsp;|&nbsp; {desc}</div>",
+                unsafe_allow_html=True
+            )
+
+            if has_loc:
+                loc_row = loc_actif.iloc[0]
+                loc_db_id = int(loc_row['id'])
+                col_inf, col_form = st.columns([1, 1])
+                with col_inf:
+                    st.markdown(f"**Locataire actuel**")
+                    st.markdown(f"👤 {loc_row.get('prenom','')} **{loc_row.get('nom','')}**")
+                    if loc_row.get('email'):  st.markdown(f"📧 {loc_row['email']}")
+                    if loc_row.get('telephone'): st.markdown(f"📱 {loc_row['telephone']}")
+                    if loc_row.get('label_bal'): st.markdown(f"📬 BAL : *{loc_row['label_bal']}*")
+                    if loc_row.get('label_interphone'): st.markdown(f"📞 Interphone : *{loc_row['label_interphone']}*")
+                    if loc_row.get('date_entree'): st.markdown(f"📅 Entrée : {loc_row['date_entree']}")
+                with col_form:
+                    with st.form(f"form_edit_loc_{loc_db_id}"):
+                        st.markdown("**✏️ Modifier**")
+                        e_prenom = st.text_input("Prénom", value=str(loc_row.get('prenom','') or ''), key=f"ep_{loc_db_id}")
+                        e_nom    = st.text_input("Nom",    value=str(loc_row.get('nom','') or ''),    key=f"en_{loc_db_id}")
+                        e_email  = st.text_input("Email",  value=str(loc_row.get('email','') or ''),  key=f"ee_{loc_db_id}")
+                        e_tel    = st.text_input("Téléphone", value=str(loc_row.get('telephone','') or ''), key=f"et_{loc_db_id}")
+                        e_bal    = st.text_input("Étiquette BAL",       value=str(loc_row.get('label_bal','') or ''), key=f"eb_{loc_db_id}")
+                        e_iph    = st.text_input("Étiquette Interphone",value=str(loc_row.get('label_interphone','') or ''), key=f"ei_{loc_db_id}")
+                        e_notes  = st.text_input("Notes", value=str(loc_row.get('notes','') or ''), key=f"eno_{loc_db_id}")
+                        c1f, c2f = st.columns(2)
+                        with c1f:
+                            if st.form_submit_button("💾 Enregistrer", use_container_width=True, type="primary"):
+                                get_depot().modifier(supabase, 'locataires', loc_db_id, {
+                                    'prenom': e_prenom.strip() or None,
+                                    'nom': e_nom.strip() or None,
+                                    'email': e_email.strip() or None,
+                                    'telephone': e_tel.strip() or None,
+                                    'label_bal': e_bal.strip() or None,
+                                    'label_interphone': e_iph.strip() or None,
+                                    'notes': e_notes.strip() or None,
+                                })
+                                st.rerun()
+                        with c2f:
+                            if st.form_submit_button("🚪 Départ", use_container_width=True):
+                                get_depot().modifier(supabase, 'locataires', loc_db_id, {
+                                    'actif': False,
+                                    'date_sortie': pd.Timestamp.today().strftime('%Y-%m-%d')
+                                })
+                                st.rerun()
+
+            else:
+                # Formulaire ajout nouveau locataire
+                with st.form(f"form_new_loc_{lot_id}"):
+                    st.markdown("**➕ Ajouter un locataire**")
+                    n1, n2 = st.columns(2)
+                    with n1:
+                        n_prenom = st.text_input("Prénom",    key=f"np_{lot_id}")
+                        n_nom    = st.text_input("Nom *",     key=f"nn_{lot_id}")
+                        n_email  = st.text_input("Email",     key=f"ne_{lot_id}")
+                    with n2:
+                        n_tel    = st.text_input("Téléphone", key=f"nt_{lot_id}")
+                        n_bal    = st.text_input("Étiquette BAL",       key=f"nb_{lot_id}",
+                                                 placeholder=f"Ex: DUPONT - Lot {lot_num}")
+                        n_iph    = st.text_input("Étiquette Interphone",key=f"ni_{lot_id}",
+                                                 placeholder=f"Ex: DUPONT")
+                    n_entree = st.date_input("Date d'entrée", key=f"nde_{lot_id}")
+                    n_notes  = st.text_input("Notes",         key=f"nno_{lot_id}")
+                    if st.form_submit_button("✅ Enregistrer le locataire",
+                                              use_container_width=True, type="primary"):
+                        if not n_nom.strip():
+                            st.error("❌ Le nom est obligatoire.")
+                        else:
+                            get_depot().inserer(supabase, 'locataires', {
+                                'lot_id':    lot_id,
+                                'prenom':    n_prenom.strip() or None,
+                                'nom':       n_nom.strip(),
+                                'email':     n_email.strip() or None,
+                                'telephone': n_tel.strip() or None,
+                                'label_bal': n_bal.strip() or None,
+                                'label_interphone': n_iph.strip() or None,
+                                'date_entree': n_entree.strftime('%Y-%m-%d'),
+                                'notes':     n_notes.strip() or None,
+                                'actif':     True,
+                            })
+                            st.success(f"✅ Locataire enregistré pour le lot {lot_num}.")
+                            st.rerun()
+
+@st.fragment
+def liste_locataires(merged, copro_loc):
+    """Liste filtrée des locataires (fragment)."""
+    # Filtres
+    f1, f2, f3 = st.columns(3)
+    with f1:
+        filt_actif = st.radio("Statut", ["Actifs", "Tous", "Anciens"],
+                              horizontal=True, key="loc_filt_actif")
+    with f2:
+        filt_usage = st.selectbox("Usage", ["Tous"] + sorted(
+            copro_loc['usage'].dropna().unique().tolist()), key="loc_filt_usage")
+    with f3:
+        filt_search = st.text_input("🔍 Recherche", key="loc_search",
+                                    placeholder="Nom locataire ou propriétaire…")
+
+    df_show = merged.copy()
+    if filt_actif == "Actifs":
+        df_show = df_show[df_show['actif'] == True]
+    elif filt_actif == "Anciens":
+        df_show = df_show[df_show['actif'] != True]
+    if filt_usage != "Tous":
+        df_show = df_show[df_show['usage'] == filt_usage]
+    if filt_search:
+        mask = (
+            df_show['nom'].str.contains(filt_search, case=False, na=False) |
+            df_show['prenom'].str.contains(filt_search, case=False, na=False) |
+            df_show['proprietaire'].str.contains(filt_search, case=False, na=False)
+        )
+        df_show = df_show[mask]
+
+    # Métriques
+    m1, m2, m3 = st.columns(3)
+    m1.metric("Locataires actifs",  int((merged['actif']==True).sum()))
+    m2.metric("Affichés",           len(df_show))
+    m3.metric("Lots loués / Total", f"{int((merged['actif']==True).sum())} / 70")
+
+    # Tableau
+    cols_disp = {
+        'lot': 'Lot', 'etage': 'Étage', 'usage': 'Usage',
+        'proprietaire': 'Propriétaire',
+        'prenom': 'Prénom loc.', 'nom': 'Nom loc.',
+        'email': 'Email', 'telephone': 'Téléphone',
+        'label_bal': 'BAL', 'label_interphone': 'Interphone',
+        'date_entree': 'Entrée', 'actif': 'Actif'
+    }
+    cols_ok = [c for c in cols_disp if c in df_show.columns]
+    df_tab  = df_show[cols_ok].copy()
+    df_tab.columns = [cols_disp[c] for c in cols_ok]
+    df_tab = df_tab.sort_values('Lot') if 'Lot' in df_tab.columns else df_tab
+
+    st.dataframe(df_tab, use_container_width=True, hide_index=True, height=500,
+        column_config={
+            'Actif': st.column_config.CheckboxColumn("Actif"),
+            'Lot':   st.column_config.NumberColumn("Lot", format="%d"),
+        })
+
+    csv_loc = df_tab.to_csv(index=False, sep=';', decimal=',').encode('utf-8-sig')
+    st.download_button("📥 Exporter CSV", data=csv_loc,
+                       file_name="locataires.csv", mime="text/csv", key="dl_loc")
+
+@st.fragment
+def etiquettes(df_bal):
+    """Étiquettes BAL et interphone filtrées (fragment : la liste n'est pas reconstruite)."""
+    # Filtres
+    bf1, bf2 = st.columns(2)
+    with bf1:
+        filt_bal_usage = st.radio("Afficher",
+            ["Appartements + Studios", "Tous (+ parkings)"], horizontal=True, key="bal_filt")
+    with bf2:
+        filt_bal_statut = st.selectbox("Statut", ["Tous", "🏠 Locataire", "👤 Propriétaire"],
+                                       key="bal_stat")
+
+    df_bal_show = df_bal.copy()
+    if filt_bal_usage == "Appartements + Studios":
+        df_bal_show = df_bal_show[~df_bal_show['Usage'].str.contains('Parking', na=False)]
+    if filt_bal_statut != "Tous":
+        df_bal_show = df_bal_show[df_bal_show['Statut'] == filt_bal_statut]
+
+    nb_loc_b = int((df_bal['Statut'] == '🏠 Locataire').sum())
+    nb_prop_b = int((df_bal['Statut'] == '👤 Propriétaire').sum())
+    b1, b2, b3 = st.columns(3)
+    b1.metric("🏠 Locataires",    nb_loc_b)
+    b2.metric("👤 Propriétaires", nb_prop_b)
+    b3.metric("📊 Taux location", f"{nb_loc_b/len(df_bal)*100:.0f}%")
+
+    st.dataframe(df_bal_show, use_container_width=True, hide_index=True,
+        column_config={
+            'Lot': st.column_config.NumberColumn("Lot", format="%d"),
+        })
+
+    # Export pour impression
+    csv_bal = df_bal_show.to_csv(index=False, sep=';', decimal=',').encode('utf-8-sig')
+    st.download_button("📥 Exporter liste BAL/Interphone", data=csv_bal,
+                       file_name="bal_interphone.csv", mime="text/csv", key="dl_bal")
+
+    # Vue impression étiquettes
+    st.divider()
+    st.subheader("🖨️ Aperçu étiquettes")
+    st.caption("Format compact pour impression ou copier-coller")
+    apts_only = df_bal_show[~df_bal_show['Usage'].str.contains('Parking', na=False)]
+    html_tags = "<div style='display:flex;flex-wrap:wrap;gap:8px;'>"
+    for _, r in apts_only.iterrows():
+        bg = "#1a3a2a" if "Locataire" in r['Statut'] else "#1a1a2e"
+        html_tags += (
+            f"<div style='background:{bg};border:1px solid #444;border-radius:4px;"
+            f"padding:8px 12px;min-width:160px;'>"
+            f"<div style='font-size:0.75em;color:#888;'>Lot {r['Lot']} — {r['Étage']}</div>"
+            f"<div style='font-weight:bold;color:#eee;font-size:0.95em;'>{r['📬 BAL']}</div>"
+            f"<div style='font-size:0.75em;color:#aaa;'>{r['Statut']}</div>"
+            f"</div>"
+        )
+    html_tags += "</div>"
+    st.markdown(html_tags, unsafe_allow_html=True)
+
+@st.fragment
+def envoi_fiches(copro_loc):
+    """Sélection, message et envoi des liens de fiche (fragment)."""
+    st.subheader("📨 Envoyer les fiches de renseignement")
+    st.caption("Générez un lien unique par propriétaire et envoyez-le par email, WhatsApp ou SMS.")
+
+    import hashlib as _hl
+    import urllib.parse as _up2
+
+    # URL de base de l'app
+    try:
+        _app_url = st.secrets.get("app_url", "")
+    except:
+        _app_url = ""
+
+    _app_url_input = st.text_input(
+        "🔗 URL de votre app Streamlit",
+        value=_app_url or "https://votre-app.streamlit.app",
+        key="app_url_input",
+        help="Copiez l'URL complète de votre app depuis le navigateur"
+    )
+    if not _app_url_input.startswith("http"):
+        st.warning("⚠️ Entrez l'URL complète (commençant par https://)")
+
+    st.divider()
+
+    # Sélection des propriétaires à contacter
+    st.markdown("#### 👥 Sélection des propriétaires")
+    _noms_all = sorted(copro_loc['nom'].unique())
+
+    _mode_sel_f = st.radio("Sélection",
+        ["✅ Tous les propriétaires", "🔍 Sélection manuelle"],
+        horizontal=True, key="fiche_sel_mode")
+
+    if _mode_sel_f == "🔍 Sélection manuelle":
+        _sel_props = st.multiselect("Propriétaires", _noms_all, key="fiche_sel_props")
+    else:
+        _sel_props = _noms_all
+
+    st.metric("📨 Fiches à envoyer", len(_sel_props))
+    st.divider()
+
+    # Personnalisation du message
+    st.markdown("#### ✍️ Message d'accompagnement")
+    _canal_f = st.radio("Canal", ["📧 Email", "💬 WhatsApp", "📱 SMS"],
+                        horizontal=True, key="fiche_canal")
+
+    _msg_defaut = """Bonjour {nom},
+
+Dans le cadre de la mise à jour de notre annuaire (boîtes aux lettres et interphone), merci de bien vouloir remplir la fiche ci-dessous,
+en y indiquant le nom et prenom de votre locataire ou de l'agence en charge de votre appartement :
+
+🔗 {lien}
+
+Cette démarche ne prend que 2 minutes.
+
+Merci de votre collaboration.
+Cordialement,
+Le Syndic"""
+
+    _msg_template = st.text_area("Message (utilisez {nom} et {lien})",
+        value=_msg_defaut, height=200, key="fiche_msg")
+
+    if _canal_f == "📧 Email":
+        _sujet_f = st.text_input("Objet de l'email",
+            value="📋 Mise à jour annuaire — Fiche locataire à remplir",
+            key="fiche_sujet")
+
+    st.divider()
+
+    # Génération et envoi
+    if st.button("🚀 Générer les liens et envoyer", type="primary",
+                 use_container_width=True, key="btn_send_fiches",
+                 disabled=not _sel_props):
+
+        _brevo_key_f  = ""
+        _brevo_from_f = ""
+        _brevo_name_f = "Syndic Copropriété"
+        try:
+            _brevo_key_f  = st.secrets.get("brevo_api_key","")
+            _brevo_from_f = st.secrets.get("brevo_from_email","")
+            _brevo_name_f = st.secrets.get("brevo_from_name","Syndic Copropriété")
+        except:
+            pass
+
+        import urllib.request as _ureq3, json as _j3, uuid as _uuid3
+        _today_str = pd.Timestamp.today().strftime('%Y-%m-%d')
+
+        _progress_f = st.progress(0, text="Génération des liens…")
+        _ok_f, _err_f, _liens_generes = [], [], []
+
+        for _i_f, _nom_prop in enumerate(_sel_props):
+            # Récupérer le contact du propriétaire
+            _rows_p = copro_loc[copro_loc['nom'] == _nom_prop]
+            if _rows_p.empty:
+                _err_f.append(f"❌ {_nom_prop} — introuvable")
+                continue
+            _row_p  = _rows_p.iloc[0]
+            _email_p = str(_row_p.get('email','') or '').strip()
+            _tel_p   = str(_row_p.get('telephone','') or '').strip()
+
+            # Générer un token unique
+            _token_val = _uuid3.uuid4().hex
+
+            # Stocker dans fiches_tokens
+            try:
+                # Désactiver les anciens tokens pour ce propriétaire
+                supabase.table('fiches_tokens').update(
+                    {'actif': False}
+                ).eq('proprietaire_nom', _nom_prop).execute()
+
+                # Créer le nouveau token
+                supabase.table('fiches_tokens').insert({
+                    'token':            _token_val,
+                    'proprietaire_nom': _nom_prop,
+                    'actif':            True,
+                    'utilise':          False,
+                    'created_at':       _today_str,
+                }).execute()
+            except Exception as _e_tok:
+                _err_f.append(f"❌ {_nom_prop} — erreur token: {_e_tok}")
+                continue
+
+            # Construire le lien
+            _lien_f = f"{_app_url_input.rstrip('/')}?fiche={_token_val}"
+            _liens_generes.append({'Propriétaire': _nom_prop, 'Lien': _lien_f,
+                                   'Email': _email_p, 'Tel': _tel_p})
+
+            # Personnaliser le message
+            _nom_court = _nom_prop.split('(')[0].strip()
+            _msg_perso = _msg_template.replace('{nom}', _nom_court).replace('{lien}', _lien_f)
+
+            # Envoi selon canal
+            if _canal_f == "📧 Email":
+                if not _email_p or _email_p in ('None','nan'):
+                    _err_f.append(f"⚠️ {_nom_prop} — pas d'email")
+                elif not _brevo_key_f:
+                    _err_f.append(f"⚠️ {_nom_prop} — Brevo non configuré, lien généré uniquement")
+                else:
+                    try:
+                        _html_f = _msg_perso.replace("\n","<br>")
+                        _pl_f = _j3.dumps({
+                            "sender": {"name": _brevo_name_f, "email": _brevo_from_f},
+                            "to": [{"email": _email_p, "name": _nom_court}],
+                            "subject": _sujet_f,
+                            "textContent": _msg_perso,
+                            "htmlContent": f"<html><body style='font-family:Arial'><p>{_html_f}</p></body></html>",
+                        }).encode('utf-8')
+                        _req_f = _ureq3.Request("https://api.brevo.com/v3/smtp/email",
+                            data=_pl_f,
+                            headers={"accept":"application/json",
+                                     "content-type":"application/json",
+                                     "api-key":_brevo_key_f}, method="POST")
+                        _ureq3.urlopen(_req_f)
+                        _ok_f.append(f"✅ {_nom_prop} ({_email_p})")
+                    except Exception as _e_br:
+                        _err_f.append(f"❌ {_nom_prop} — {_e_br}")
+            else:
+                # WhatsApp / SMS : liens générés, pas d'envoi automatique
+                _ok_f.append(f"🔗 {_nom_prop} — lien généré")
+
+            _progress_f.progress((_i_f+1)/len(_sel_props),
+                                 text=f"{_i_f+1}/{len(_sel_props)} — {_nom_prop[:30]}")
+
+        _progress_f.empty()
+
+        # Résultats
+        if _ok_f:
+            st.success(f"✅ {len(_ok_f)} fiche(s) traitée(s)")
+            with st.expander("Détail"):
+                for _l in _ok_f: st.markdown(_l)
+
+        if _err_f:
+            st.warning(f"⚠️ {len(_err_f)} avertissement(s)")
+            for _l in _err_f: st.markdown(_l)
+
+        # Tableau des liens générés (pour WhatsApp/SMS ou backup)
+        if _liens_generes:
+            st.divider()
+            st.markdown("#### 🔗 Liens générés")
+            df_liens = pd.DataFrame(_liens_generes)
+
+            if _canal_f in ("💬 WhatsApp", "📱 SMS"):
+                st.info("Cliquez sur chaque lien pour l'envoyer manuellement.")
+                for _, _lr in df_liens.iterrows():
+                    _nom_c  = _lr['Propriétaire'].split('(')[0].strip()
+                    _tel_c  = str(_lr.get('Tel','') or '').strip()
+                    _msg_wa = _msg_template.replace('{nom}', _nom_c).replace('{lien}', _lr['Lien'])
+                    _col_a, _col_b = st.columns([3,1])
+                    with _col_a:
+                        st.markdown(f"**{_lr['Propriétaire']}** | 📱 {_tel_c}")
+                        st.code(_lr['Lien'], language=None)
+                    with _col_b:
+                        if _canal_f == "💬 WhatsApp" and _tel_c:
+                            _tel_wa = ''.join(c for c in _tel_c if c.isdigit() or c=='+')
+                            if _tel_wa.startswith('0'): _tel_wa = '33' + _tel_wa[1:]
+                            _tel_wa = _tel_wa.replace('+','')
+                            _wa_lien = f"https://wa.me/{_tel_wa}?text={_up2.quote(_msg_wa)}"
+                            st.link_button("💬 WhatsApp", _wa_lien, use_container_width=True)
+                        elif _canal_f == "📱 SMS" and _tel_c:
+                            _sms_lien = f"sms:{_tel_c}?body={_up2.quote(_msg_wa)}"
+                            st.link_button("📱 SMS", _sms_lien, use_container_width=True)
+
+            # Export CSV des liens
+            csv_liens = df_liens.to_csv(index=False, sep=';').encode('utf-8-sig')
+            st.download_button("📥 Exporter les liens CSV", data=csv_liens,
+                               file_name="fiches_liens.csv", mime="text/csv", key="dl_liens")
+
+loc_tab1, loc_tab2, loc_tab3, loc_tab4, loc_tab5 = st.tabs([
+    "🏠 Fiches par propriétaire", "📋 Tous les locataires",
+    "🏷️ BAL & Interphone", "📊 Statistiques", "📨 Envoyer les fiches"
+])
+
+# ══════════════════════════════════════════════════════════════
+# TAB 1 — FICHES PAR PROPRIÉTAIRE
+# ══════════════════════════════════════════════════════════════
+with loc_tab1:
+    fiche_proprietaire(copro_loc, loc_df)
+
+# ══════════════════════════════════════════════════════════════
+# TAB 2 — TOUS LES LOCATAIRES
+# ══════════════════════════════════════════════════════════════
+with loc_tab2:
+    st.subheader("📋 Liste complète des locataires")
+
+    if loc_df.empty:
+        st.info("Aucun locataire enregistré.")
+    else:
+        # Joindre avec copropriétaires
+        merged = loc_df.merge(
+            copro_loc[['id','nom','lot','etage','usage']].rename(
+                columns={'id':'lot_id','nom':'proprietaire'}),
+            on='lot_id', how='left'
+        )
+
+        liste_locataires(merged, copro_loc)
+
+# ══════════════════════════════════════════════════════════════
+# TAB 3 — BAL & INTERPHONE
+# ══════════════════════════════════════════════════════════════
+with loc_tab3:
+    st.subheader("🏷️ Étiquettes — Boîtes aux lettres & Interphone")
+    st.caption("Vue synthétique pour mise à jour des étiquettes. "
+               "Affiche le nom du locataire s'il y en a un, sinon le propriétaire.")
+
+    # Construire la liste complète lots + nom affiché
+    rows_bal = []
+    for _, lot in copro_loc.iterrows():
+        lot_id_b = int(lot['id'])
+        loc_actif_b = pd.DataFrame()
+        if not loc_df.empty and 'lot_id' in loc_df.columns:
+            loc_actif_b = loc_df[(loc_df['lot_id'] == lot_id_b) & (loc_df['actif'] == True)]
+
+        if not loc_actif_b.empty:
+            lr = loc_actif_b.iloc[0]
+            nom_affiche  = f"{lr.get('prenom','')} {lr.get('nom','')}".strip()
+            label_bal    = lr.get('label_bal','') or nom_affiche
+            label_iph    = lr.get('label_interphone','') or nom_affiche.split()[-1] if nom_affiche else ''
+            statut       = "🏠 Locataire"
+        else:
+            prop_name    = lot['nom'].split('(')[0].strip()
+            nom_affiche  = prop_name
+            label_bal    = prop_name
+            label_iph    = prop_name.split()[-1] if prop_name else ''
+            statut       = "👤 Propriétaire"
+
+        is_parking = 'parking' in str(lot.get('usage','')).lower()
+        rows_bal.append({
+            'Lot':        int(lot.get('lot', 0)),
+            'Étage':      lot.get('etage',''),
+            'Usage':      usage_label(lot.get('usage','')),
+            'Statut':     statut,
+            'Nom affiché': nom_affiche,
+            '📬 BAL':     label_bal,
+            '📞 Interphone': '' if is_parking else label_iph,
+            'Propriétaire': lot['nom'].split('(')[0].strip(),
+        })
+
+    df_bal = pd.DataFrame(rows_bal).sort_values('Lot')
+
+    etiquettes(df_bal)
+
+# ══════════════════════════════════════════════════════════════
+# TAB 5 — ENVOYER LES FICHES
+# ══════════════════════════════════════════════════════════════
+with loc_tab5:
+    envoi_fiches(copro_loc)
+
+    # ══════════════════════════════════════════════════════════════
+# TAB 4 — STATISTIQUES
+# ══════════════════════════════════════════════════════════════
+with loc_tab4:
+    st.subheader("📊 Statistiques occupation")
+
+    nb_appts_total = len(copro_loc[~copro_loc['usage'].str.lower().str.contains('parking', na=False)])
+    nb_pk_total    = len(copro_loc[copro_loc['usage'].str.lower().str.contains('parking', na=False)])
+    nb_loc_actifs  = 0 if loc_df.empty else int((loc_df['actif'] == True).sum())
+
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("🏠 Lots habitation",  nb_appts_total)
+    c2.metric("🅿️ Parkings",        nb_pk_total)
+    c3.metric("🏠 Lots loués",       nb_loc_actifs)
+    c4.metric("📊 Taux loc. global", f"{nb_loc_actifs/max(nb_appts_total,1)*100:.0f}%")
+
+    st.divider()
+
+    # Lots sans info locataire
+    lots_sans_loc = []
+    for _, lot in copro_loc[~copro_loc['usage'].str.lower().str.contains('parking', na=False)].iterrows():
+        lid = int(lot['id'])
+        has = not loc_df.empty and 'lot_id' in loc_df.columns and                   not loc_df[(loc_df['lot_id']==lid) & (loc_df['actif']==True)].empty
+        if not has:
+            lots_sans_loc.append({
+                'Lot': int(lot['lot']), 'Étage': lot['etage'],
+                'Usage': usage_label(lot['usage']),
+                'Propriétaire': lot['nom'].split('(')[0].strip(),
+                'Email prop.': lot.get('email','') or '—',
+            })
+
+    if lots_sans_loc:
+        st.markdown(f"#### ⚠️ {len(lots_sans_loc)} lot(s) sans information locataire")
+        st.caption("Ces lots sont occupés par leur propriétaire ou l'information n'a pas été saisie.")
+        df_sans = pd.DataFrame(lots_sans_loc).sort_values('Lot')
+        st.dataframe(df_sans, use_container_width=True, hide_index=True,
+            column_config={'Lot': st.column_config.NumberColumn("Lot", format="%d")})
+    else:
+        st.success("✅ Tous les lots ont une information locataire !")
@@ -0,0 +1,714 @@
+"""
+vues/repartition.py — 🔄 Répartition
+
+Appels de fonds trimestriels et régularisation annuelle.
+"""
+
+import streamlit as st
+import pandas as pd
+from datetime import datetime
+import plotly.express as px
+import appels
+from monnaie import centimes, euros
+from repartition import CLE_GENERALE
+from donnees import (get_coproprietaires, get_budget, get_depenses, prepare_copro,
+                     get_matrice_tantiemes, get_config_cles, montants_depuis_budget,
+                     calculer_appels, generate_appel_pdf_bytes, syndic_info, get_appels_fonds,
+                     lignes_appels_fonds, supabase, passer_ecritures, get_depenses_alur_ids,
+                     get_travaux_votes_depense_ids, get_index_tantiemes,
+                     generate_regularisation_pdf_bytes)
+from composants import afficher_graphique
+
+CHARGES_CONFIG = get_config_cles()
+SYNDIC_INFO = syndic_info()
+
+# ==================== FRAGMENTS ====================
+# Les widgets d'affichage (détail, filtres, PDF) ne relancent que leur fragment,
+# sur les tableaux calculés au dernier rerun complet de la page.
+
+@st.fragment
+def tableau_appels(appels_df, label_trim, annee_appel, montants, alur_par_appel, nb_appels, mat_appel):
+    """Tableau, totaux et exports d'un appel provisionnel. Fragment : afficher le détail
+    ou générer les PDF ne relance pas le calcul des appels."""
+    show_detail = st.checkbox("Afficher le détail par type de charge", value=False, key="show_det")
+    detail_cols = [f"{CHARGES_CONFIG[k]['emoji']} {CHARGES_CONFIG[k]['label']}" for k in CHARGES_CONFIG]
+    base_cols = ['Lot','Copropriétaire','Étage','Usage']
+    alur_cols = ['🏛️ Alur (€)', f'🎯 TOTAL {label_trim} avec Alur (€)']
+    if show_detail:
+        display_cols = base_cols + detail_cols + ['💰 TOTAL Annuel (€)', f'🎯 APPEL {label_trim} (€)'] + alur_cols
+    else:
+        display_cols = base_cols + ['💰 TOTAL Annuel (€)', f'🎯 APPEL {label_trim} (€)'] + alur_cols
+
+    display_cols = [c for c in display_cols if c in appels_df.columns]
+
+    st.dataframe(appels_df[display_cols], use_container_width=True, hide_index=True,
+        column_config={
+            f'🎯 APPEL {label_trim} (€)': st.column_config.NumberColumn("Charges (€)", format="%.2f"),
+            '🏛️ Alur (€)': st.column_config.NumberColumn("Alur (€)", format="%.2f"),
+            f'🎯 TOTAL {label_trim} avec Alur (€)': st.column_config.NumberColumn(f"🎯 TOTAL {label_trim} (€)", format="%.2f"),
+            '💰 TOTAL Annuel (€)': st.column_config.NumberColumn("Total Annuel (€)", format="%.2f"),
+        })
+
+    st.divider()
+    c1, c2, c3, c4 = st.columns(4)
+    total_charges = appels_df[f'🎯 APPEL {label_trim} (€)'].sum()
+    total_alur_appel = appels_df['🏛️ Alur (€)'].sum()
+    total_avec_alur = appels_df[f'🎯 TOTAL {label_trim} avec Alur (€)'].sum()
+    c1.metric(f"Charges {label_trim}", f"{total_charges:,.2f} €")
+    c2.metric("Fonds Alur", f"{total_alur_appel:,.2f} €")
+    c3.metric(f"🎯 TOTAL {label_trim}", f"{total_avec_alur:,.2f} €")
+    c4.metric("Appel moyen / copro", f"{total_avec_alur/len(appels_df):,.2f} €")
+
+    csv_appel = appels_df.to_csv(index=False, sep=';', decimal=',').encode('utf-8-sig')
+
+    # ---- EXPORT CSV + PDF ----
+    col_exp1, col_exp2, col_exp3 = st.columns(3)
+    with col_exp1:
+        st.download_button(
+            f"📥 CSV — Appel {label_trim} {annee_appel}",
+            csv_appel, f"appel_{label_trim}_{annee_appel}.csv", "text/csv"
+        )
+
+    with col_exp2:
+        # PDF individuel : sélection d'un copropriétaire
+        noms_copros = appels_df['Copropriétaire'].tolist()
+        copro_sel_pdf = st.selectbox(
+            "📄 PDF individuel — Copropriétaire",
+            options=noms_copros,
+            key="pdf_copro_sel"
+        )
+        if st.button("📄 Générer PDF individuel", key="btn_pdf_indiv"):
+            cop_row_pdf = copro_df[copro_df['nom'] == copro_sel_pdf].iloc[0] if len(copro_df[copro_df['nom'] == copro_sel_pdf]) > 0 else None
+            if cop_row_pdf is not None:
+                periode_pdf = appels.periode_trimestre(label_trim, annee_appel)
+                pdf_bytes = generate_appel_pdf_bytes(
+                    SYNDIC_INFO, cop_row_pdf.to_dict(), periode_pdf,
+                    label_trim, annee_appel, montants, alur_par_appel, nb_appels, mat_appel
+                )
+                st.download_button(
+                    f"⬇️ Télécharger PDF — {copro_sel_pdf}",
+                    pdf_bytes,
+                    f"appel_{label_trim}_{annee_appel}_{cop_row_pdf.get('lot','')}.pdf",
+                    "application/pdf",
+                    key="dl_pdf_indiv"
+                )
+            else:
+                st.error("Copropriétaire non trouvé")
+
+    with col_exp3:
+        # PDF tous les copropriétaires (fusionné)
+        if st.button("📦 Générer tous les PDFs (ZIP)", key="btn_pdf_all"):
+            import zipfile, io as _io
+            periode_pdf = appels.periode_trimestre(label_trim, annee_appel)
+
+            zip_buf = _io.BytesIO()
+            nb_gen = 0
+            with st.spinner(f"Génération des PDFs en cours..."):
+                with zipfile.ZipFile(zip_buf, 'w', zipfile.ZIP_DEFLATED) as zf:
+                    for _, cop_row_pdf in copro_df.iterrows():
+                        try:
+                            pdf_b = generate_appel_pdf_bytes(
+                                SYNDIC_INFO, cop_row_pdf.to_dict(), periode_pdf,
+                                label_trim, annee_appel, montants, alur_par_appel, nb_appels, mat_appel
+                            )
+                            fname = f"appel_{label_trim}_{annee_appel}_lot{str(cop_row_pdf.get('lot','')).zfill(4)}.pdf"
+                            zf.writestr(fname, pdf_b)
+                            nb_gen += 1
+                        except Exception as e_pdf:
+                            st.warning(f"⚠️ Erreur lot {cop_row_pdf.get('lot','?')}: {e_pdf}")
+            zip_buf.seek(0)
+            st.success(f"✅ {nb_gen} PDFs générés")
+            st.download_button(
+                f"⬇️ Télécharger ZIP ({nb_gen} PDFs)",
+                zip_buf.getvalue(),
+                f"appels_{label_trim}_{annee_appel}.zip",
+                "application/zip",
+                key="dl_zip_all"
+            )
+
+@st.fragment
+def tableau_regularisation(reg_df, annee_reg, budgets_appel, dep_reel_type, alur_annuel_reg,
+                           nb_appels_reg, emis_par_lot, mat_reg):
+    """5ème appel par lot, totaux et exports. Fragment : filtrer ou détailler le tableau
+    ne relance pas la régularisation."""
+    col1, col2 = st.columns(2)
+    with col1:
+        show_zeros = st.checkbox("Afficher les lots soldés", value=True, key="show_zeros_reg")
+    with col2:
+        filtre_sens = st.selectbox("Filtrer par sens",
+            ["Tous","💳 À payer","💚 À rembourser","✅ Soldé"], key="filtre_sens")
+
+    reg_display = reg_df.copy()
+    if not show_zeros:
+        reg_display = reg_display[reg_display['5ème appel (€)'].abs() > 0.01]
+    if filtre_sens != "Tous":
+        reg_display = reg_display[reg_display['Sens'] == filtre_sens]
+
+    show_det_reg = st.checkbox("Afficher le détail par type", value=False, key="show_det_reg")
+    detail_cols_reg = [f"{cfg['emoji']} {cfg['label']}" for cfg in CHARGES_CONFIG.values()]
+    base_cols_reg   = ['Lot','Copropriétaire','Étage','Usage',
+                       'Appels versés (€)','🏛️ Alur versé (€)',
+                       'Charges réelles (€)','5ème appel (€)','Sens']
+    if show_det_reg:
+        disp_cols = ['Lot','Copropriétaire','Étage','Usage'] + detail_cols_reg +                                 ['Appels versés (€)','🏛️ Alur versé (€)','Charges réelles (€)','5ème appel (€)','Sens']
+    else:
+        disp_cols = base_cols_reg
+    disp_cols = [c for c in disp_cols if c in reg_display.columns]
+
+    num_cfg = {c: st.column_config.NumberColumn(format="%,.2f")
+               for c in disp_cols if '€' in c and c != 'Sens'}
+    num_cfg['5ème appel (€)'] = st.column_config.NumberColumn(format="%+,.2f")
+    st.dataframe(reg_display[disp_cols], use_container_width=True, hide_index=True,
+        column_config=num_cfg)
+
+    st.divider()
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Total appels versés", f"{reg_df['Appels versés (€)'].sum():,.2f} €")
+    c2.metric("Total charges réelles", f"{reg_df['Charges réelles (€)'].sum():,.2f} €")
+    a_payer = reg_df[reg_df['5ème appel (€)'] > 0.01]['5ème appel (€)'].sum()
+    a_rembourser = reg_df[reg_df['5ème appel (€)'] < -0.01]['5ème appel (€)'].sum()
+    c3.metric("💳 À appeler", f"{a_payer:,.2f} €")
+    c4.metric("💚 À rembourser", f"{a_rembourser:,.2f} €")
+
+    # ── EXPORTS CSV + PDF ──────────────────────────────────────
+    st.divider()
+    st.subheader("📥 Export")
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        csv_all = reg_df.to_csv(index=False, sep=';', decimal=',').encode('utf-8-sig')
+        st.download_button(f"📥 CSV — tous les lots",
+            csv_all, f"5eme_appel_{annee_reg}.csv", "text/csv",
+            use_container_width=True)
+
+    with col2:
+        reg_actif = reg_df[reg_df['5ème appel (€)'].abs() > 0.01]
+        csv_actif = reg_actif.to_csv(index=False, sep=';', decimal=',').encode('utf-8-sig')
+        st.download_button(f"📥 CSV — lots à régulariser ({len(reg_actif)})",
+            csv_actif, f"5eme_appel_{annee_reg}_actif.csv", "text/csv",
+            use_container_width=True)
+
+    with col3:
+        # PDF individuel
+        noms_reg = reg_df['Copropriétaire'].tolist()
+        copro_sel_reg = st.selectbox("Copropriétaire", noms_reg, key="pdf_reg_sel")
+        if st.button("📄 PDF individuel", key="btn_pdf_reg", use_container_width=True):
+            cop_match = copro_df[copro_df['nom'] == copro_sel_reg]
+            if not cop_match.empty:
+                try:
+                    pdf_b = generate_regularisation_pdf_bytes(
+                        SYNDIC_INFO,
+                        cop_match.iloc[0].to_dict(),
+                        annee_reg,
+                        budgets_appel,
+                        dep_reel_type,
+                        alur_annuel_reg,
+                        nb_appels_reg,
+                        appels.emis_du_lot(emis_par_lot, cop_match.iloc[0]['id']),
+                        mat_reg,
+                    )
+                    lot_pdf = str(cop_match.iloc[0].get('lot', ''))
+                    st.download_button(
+                        f"⬇️ {copro_sel_reg}",
+                        pdf_b,
+                        f"regularisation_{annee_reg}_lot{lot_pdf.zfill(4)}.pdf",
+                        "application/pdf",
+                        key="dl_pdf_reg_indiv",
+                        use_container_width=True,
+                    )
+                except Exception as e:
+                    st.error(f"❌ {e}")
+            else:
+                st.error("Copropriétaire non trouvé")
+
+    with col4:
+        # ZIP tous les PDFs
+        if st.button("📦 Tous les PDFs (ZIP)", key="btn_pdf_reg_all",
+                     use_container_width=True):
+            import zipfile, io as _io
+            zip_buf = _io.BytesIO()
+            nb_gen = 0
+            errors = []
+            with st.spinner("Génération des PDFs…"):
+                with zipfile.ZipFile(zip_buf, 'w', zipfile.ZIP_DEFLATED) as zf:
+                    for _, cop_row_pdf in copro_df.iterrows():
+                        try:
+                            pdf_b = generate_regularisation_pdf_bytes(
+                                SYNDIC_INFO,
+                                cop_row_pdf.to_dict(),
+                                annee_reg,
+                                budgets_appel,
+                                dep_reel_type,
+                                alur_annuel_reg,
+                                nb_appels_reg,
+                                appels.emis_du_lot(emis_par_lot, cop_row_pdf['id']),
+                                mat_reg,
+                            )
+                            lot_pdf = str(cop_row_pdf.get('lot', ''))
+                            zf.writestr(
+                                f"regularisation_{annee_reg}_lot{lot_pdf.zfill(4)}.pdf",
+                                pdf_b
+                            )
+                            nb_gen += 1
+                        except Exception as e_pdf:
+                            errors.append(f"lot {cop_row_pdf.get('lot','?')}: {e_pdf}")
+            zip_buf.seek(0)
+            if errors:
+                st.warning(f"⚠️ {len(errors)} erreur(s) : {'; '.join(errors[:3])}")
+            st.success(f"✅ {nb_gen} PDFs générés")
+            st.download_button(
+                f"⬇️ ZIP ({nb_gen} PDFs)",
+                zip_buf.getvalue(),
+                f"regularisation_{annee_reg}.zip",
+                "application/zip",
+                key="dl_zip_reg_all",
+                use_container_width=True,
+            )
+
+@st.fragment
+def tableau_vue_globale(glob_df):
+    """Vue annuelle ou par appel. Fragment : changer d'affichage ne relance pas le calcul."""
+    # Choix de vue
+    vue = st.radio("Affichage", ["Vue annuelle", "Vue par appel (T1/T2/T3/T4)"], horizontal=True, key="glob_vue")
+
+    if vue == "Vue annuelle":
+        display_cols = ['Lot','Copropriétaire','Étage','Usage',
+                        '💰 TOTAL Annuel (€)','🏛️ Alur Annuel (€)','💰 TOTAL + Alur Annuel (€)']
+    else:
+        display_cols = ['Lot','Copropriétaire','Étage','Usage']
+        for t in ['T1','T2','T3','T4']:
+            display_cols += [f'Charges {t} (€)', f'Alur {t} (€)', f'🎯 TOTAL {t} (€)']
+
+    display_cols = [c for c in display_cols if c in glob_df.columns]
+    st.dataframe(glob_df[display_cols], use_container_width=True, hide_index=True,
+        column_config={c: st.column_config.NumberColumn(format="%.2f") for c in display_cols if '€' in c})
+
+
+st.markdown("<h1 class='main-header'>🔄 Appels de Fonds & Répartition</h1>", unsafe_allow_html=True)
+
+copro_df = get_coproprietaires()
+budget_df = get_budget()
+depenses_df = get_depenses()
+
+if copro_df.empty:
+    st.error("❌ Impossible de charger les copropriétaires"); st.stop()
+
+copro_df = prepare_copro(copro_df)
+
+# Vérifier état des tantièmes : une clé sans tantièmes est répartie sur la clé générale
+mat_rep = get_matrice_tantiemes(tuple(int(i) for i in copro_df['id']))
+cles_vides = [CHARGES_CONFIG[k]['label'] for k, somme in mat_rep.sommes().items()
+              if somme == 0 and k != CLE_GENERALE]
+if cles_vides:
+    st.warning(f"⚠️ Aucun tantième saisi pour : {', '.join(cles_vides)}. Saisissez-les dans "
+               "👥 Copropriétaires › 🔑 Tantièmes. En attendant, ces charges sont réparties sur les tantièmes généraux.")
+
+tab1, tab2, tab3 = st.tabs([
+    "📅 Appels provisionnels (T1/T2/T3/T4)",
+    "🔄 5ème appel — Régularisation",
+    "📊 Vue globale annuelle"
+])
+
+# ---- Budget sélectionné ----
+if not budget_df.empty:
+    annees_bud = sorted(budget_df['annee'].unique(), reverse=True)
+else:
+    annees_bud = [datetime.now().year]
+
+# ==================== ONGLET 1 : APPELS PROVISIONNELS ====================
+with tab1:
+    st.subheader("Calcul des appels de fonds provisionnels")
+    st.info("Les appels sont calculés sur le **budget prévisionnel**, réparti selon les clés de tantièmes de votre règlement de copropriété.")
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        annee_appel = st.selectbox("📅 Année", annees_bud, key="appel_annee")
+    with col2:
+        trimestre = st.selectbox("📆 Appel", ["T1 — Janvier","T2 — Avril","T3 — Juillet","T4 — Octobre"], key="appel_trim")
+    with col3:
+        nb_appels = st.selectbox("Nb appels / an", [4, 3, 2, 1], index=0, key="nb_appels")
+
+    label_trim = trimestre.split(" ")[0]
+
+    if budget_df.empty:
+        st.warning("⚠️ Aucun budget. Créez-en un dans 💰 Budget.")
+    else:
+        bud_an = budget_df[budget_df['annee'] == annee_appel]
+        if bud_an.empty:
+            st.warning(f"⚠️ Aucun budget pour {annee_appel}.")
+        else:
+            # Budget TOTAL voté en AG — sert de base pour le calcul Alur
+            total_bud = float(bud_an['montant_budget'].sum())
+
+            # Montants par type basé sur les classes du budget
+            montants_auto = montants_depuis_budget(bud_an)
+
+            st.divider()
+            st.subheader(f"⚙️ Montants annuels par type de charge — Budget {annee_appel}")
+            st.caption("Calculés automatiquement depuis votre budget. Vous pouvez les ajuster.")
+
+            col1, col2, col3 = st.columns(3)
+            montants = {}
+            items = list(CHARGES_CONFIG.items())
+            for i, (key, cfg) in enumerate(items):
+                col = [col1, col2, col3][i % 3]
+                with col:
+                    montants[key] = st.number_input(
+                        f"{cfg['emoji']} {cfg['label']} (€/an)",
+                        min_value=0.0, value=euros(centimes(montants_auto.get(key, 0))),
+                        step=0.01, format="%.2f", key=f"mont_{key}",
+                        help=f"Réparti sur {cfg['total']:,g} tantièmes — Classes : {', '.join(cfg['classes'])}"
+                    )
+
+            total_configure = sum(montants.values())
+
+            st.divider()
+
+            # ---- LOI ALUR ----
+            st.subheader("🏛️ Loi Alur — Fonds de travaux")
+            st.caption("Cotisation obligatoire = 5% minimum du budget prévisionnel, répartie sur les tantièmes généraux.")
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                alur_taux = st.number_input("Taux Alur (%)", min_value=5.0, max_value=20.0,
+                    value=5.0, step=0.5, key="alur_taux",
+                    help="Minimum légal = 5% du budget prévisionnel voté en AG (loi Alur art. 14-2)")
+            with col2:
+                # BASE CORRECTE : budget total voté (total_bud), pas les montants configurés
+                alur_annuel = round(total_bud * alur_taux / 100, 2)
+                st.metric("Fonds de travaux annuel", f"{alur_annuel:,.2f} €",
+                    help=f"{alur_taux}% × {total_bud:,.0f} € (budget voté en AG)")
+            with col3:
+                alur_par_appel = round(alur_annuel / nb_appels, 2)
+                st.metric(f"Alur par appel ({label_trim})", f"{alur_par_appel:,.2f} €")
+
+            st.divider()
+            c1, c2, c3, c4 = st.columns(4)
+            c1.metric("Budget charges", f"{total_configure:,.0f} €")
+            c2.metric("Fonds de travaux (Alur)", f"{alur_annuel:,.2f} €")
+            total_avec_alur = total_configure + alur_annuel
+            c3.metric("Total appel annuel", f"{total_avec_alur:,.2f} €")
+            ecart_cfg = total_configure - total_bud
+            c4.metric("Écart vs budget", f"{ecart_cfg:+,.0f} €",
+                delta_color="normal" if abs(ecart_cfg) < 100 else "inverse")
+
+            if abs(ecart_cfg) > 500:
+                st.warning(f"⚠️ Différence de {abs(ecart_cfg):,.0f} € entre le total configuré et le budget.")
+
+            st.divider()
+            st.subheader(f"📋 Appel {label_trim} {annee_appel} — {100//nb_appels}% du budget annuel + Alur")
+
+            # Calcul charges + Alur
+            # Tantièmes en vigueur au début de la période appelée
+            date_appel = f"{int(annee_appel)}-{ {'T1':1,'T2':4,'T3':7,'T4':10}[label_trim]:02d}-01"
+            mat_appel = get_matrice_tantiemes(tuple(int(i) for i in copro_df['id']), date_appel)
+            # Charges de l'appel + cotisation Alur (répartie sur les tantièmes de la clé générale), au centime
+            appels_df = appels.completer_appel(calculer_appels(copro_df, montants, date_appel), label_trim,
+                                               nb_appels, alur_par_appel, mat_appel, CHARGES_CONFIG)
+
+            tableau_appels(appels_df, label_trim, annee_appel, montants, alur_par_appel, nb_appels, mat_appel)
+
+            # ---- ÉMISSION : montants figés par lot et par clé, débit du compte de chaque lot ----
+            col_em1, col_em2 = st.columns([3, 1])
+            col_em1.caption(f"Émettre l'appel {label_trim} {annee_appel} enregistre définitivement les montants par lot "
+                            "et par clé (relus par la régularisation) et débite le compte de chaque copropriétaire. "
+                            "Un appel déjà émis n'est ni recalculé ni redébité.")
+            if col_em2.button(f"📤 Émettre l'appel {label_trim}", key="btn_emettre_appel", use_container_width=True):
+                try:
+                    emis = get_appels_fonds(int(annee_appel))
+                    emis = emis[emis['periode'] == label_trim] if not emis.empty else emis
+                    # Une seule requête ; après une émission interrompue, seules les lignes
+                    # (lot, clé) manquantes sont écrites, et seulement si les lignes déjà
+                    # figées correspondent au calcul courant (même base : montants, nb d'appels)
+                    recs = appels.lignes_manquantes(
+                        emis.to_dict('records'),
+                        lignes_appels_fonds(copro_df, appels_df, annee_appel, label_trim, nb_appels))
+                    if recs:
+                        supabase.table('appels_fonds').insert(recs).execute()
+                        get_appels_fonds.clear()
+                        emis = pd.DataFrame(recs) if emis.empty else \
+                            pd.concat([emis.astype({'cle': str}), pd.DataFrame(recs)], ignore_index=True)
+                    date_em = pd.Timestamp(int(annee_appel), {'T1':1,'T2':4,'T3':7,'T4':10}[label_trim], 1).strftime('%Y-%m-%d')
+                    dus = emis.groupby('coproprietaire_id')['montant'].sum().round(2)
+                    nb_em = passer_ecritures([{
+                        'coproprietaire_id': int(cop_id), 'date': date_em, 'nature': 'appel',
+                        'libelle': f"Appel de fonds {label_trim} {annee_appel}",
+                        'debit': float(montant), 'credit': 0.0,
+                        'reference': f"appel:{annee_appel}-{label_trim}:{int(cop_id)}",
+                    } for cop_id, montant in dus.items() if montant > 0])
+                    if nb_em:
+                        st.success(f"✅ Appel {label_trim} {annee_appel} émis sur {nb_em} compte(s).")
+                    else:
+                        st.info(f"ℹ️ Appel {label_trim} {annee_appel} déjà émis.")
+                except Exception as e:
+                    st.error(f"❌ {e}")
+
+            st.divider()
+            col1, col2 = st.columns(2)
+            with col1:
+                top15 = appels_df.nlargest(15, f'🎯 APPEL {label_trim} (€)')
+                fig = px.bar(top15, x='Copropriétaire', y=f'🎯 APPEL {label_trim} (€)',
+                    color='Usage', title=f"Top 15 — Appel {label_trim} {annee_appel}",
+                    text=f'🎯 APPEL {label_trim} (€)')
+                fig.update_traces(texttemplate='%{text:.0f}€', textposition='outside')
+                fig.update_layout(xaxis_tickangle=45)
+                afficher_graphique(fig)
+            with col2:
+                type_data = pd.DataFrame([
+                    {'Type': f"{cfg['emoji']} {cfg['label']}", 'Montant': montants[k]}
+                    for k, cfg in CHARGES_CONFIG.items() if montants[k] > 0
+                ])
+                if not type_data.empty:
+                    fig = px.pie(type_data, values='Montant', names='Type', title="Répartition par type de charge")
+                    afficher_graphique(fig)
+
+# ==================== ONGLET 2 : 5ÈME APPEL RÉGULARISATION ====================
+with tab2:
+    st.subheader("5ème appel — Régularisation sur dépenses réelles")
+    st.info("""
+        **Principe :** Appels de fonds = Budget_type × (tantièmes_copro / total)  
+        Charges réelles = Dépenses_réelles_type × (tantièmes_copro / total)  
+        **5ème appel = Charges réelles − Appels de fonds versés**  
+        → Positif = complément à payer | Négatif = remboursement
+        """)
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        annee_reg = st.selectbox("📅 Année à régulariser", annees_bud, key="reg_annee")
+    with col2:
+        nb_appels_reg = st.selectbox("Nb appels provisionnels versés", [4,3,2,1], key="nb_reg",
+            help="Nombre d'appels provisionnels déjà versés dans l'année")
+    with col3:
+        alur_taux_reg = st.number_input("🏛️ Taux Alur (%)", min_value=5.0, max_value=20.0,
+            value=5.0, step=0.5, key="alur_taux_reg")
+
+    if depenses_df.empty:
+        st.warning("⚠️ Aucune dépense disponible.")
+    else:
+        # Préparer dépenses réelles de l'année
+        depenses_df_reg = depenses_df.copy()
+        depenses_df_reg['date'] = pd.to_datetime(depenses_df_reg['date'])
+        depenses_df_reg['montant_du'] = pd.to_numeric(depenses_df_reg['montant_du'], errors='coerce')
+        dep_reg = depenses_df_reg[depenses_df_reg['date'].dt.year == annee_reg].copy()
+
+        # Exclure Alur et Travaux Votés
+        alur_ids_reg = get_depenses_alur_ids()
+        tv_ids_reg   = get_travaux_votes_depense_ids()
+        ids_exclus   = set(alur_ids_reg) | set(tv_ids_reg)
+        dep_reg_net  = dep_reg[~dep_reg['id'].isin(ids_exclus)]
+
+        montant_alur_exclus = dep_reg[dep_reg['id'].isin(alur_ids_reg)]['montant_du'].sum()
+        montant_tv_exclus   = dep_reg[dep_reg['id'].isin(tv_ids_reg)]['montant_du'].sum()
+        if montant_alur_exclus > 0 or montant_tv_exclus > 0:
+            st.info(f"🔒 Exclus du calcul : 🏛️ Alur {montant_alur_exclus:,.2f} € | "
+                    f"🏗️ Travaux votés {montant_tv_exclus:,.2f} €")
+
+        # Dépenses réelles nettes par type
+        dep_reel_type = appels.depenses_par_cle(dep_reg_net, CHARGES_CONFIG)
+
+        # Budget CSV de référence
+        bud_reg = budget_df[budget_df['annee'] == annee_reg] if not budget_df.empty else pd.DataFrame()
+
+        # Appels émis (montants figés par lot et par clé lors de l'émission)
+        # Tantièmes de l'exercice : ceux en vigueur à la clôture (31/12), même pour une année passée
+        cloture_reg = f"{int(annee_reg)}-12-31"
+        mat_reg = get_matrice_tantiemes(tuple(int(i) for i in copro_df['id']), cloture_reg)
+        debut_tant_reg = get_index_tantiemes().debut_segment(cloture_reg)
+        if debut_tant_reg is not None and debut_tant_reg.year == int(annee_reg):
+            st.info(f"🔑 Tantièmes modifiés le {debut_tant_reg:%d/%m/%Y} : la régularisation {annee_reg} "
+                    "utilise ceux en vigueur au 31/12.")
+
+        emis_reg = get_appels_fonds(int(annee_reg))
+        emis_par_lot = appels.emis_par_lot(emis_reg)
+        if emis_par_lot:
+            periodes_emises = sorted(emis_reg['periode'].unique())
+            nb_appels_reg = len(periodes_emises)
+
+        # ---- BUDGETS APPELÉS ----
+        st.divider()
+        st.subheader("⚙️ Budgets annuels utilisés pour les appels de fonds")
+        if emis_par_lot:
+            st.caption(f"Montants relus des appels émis ({', '.join(periodes_emises)}) — "
+                       "la part de chaque lot est celle qui lui a été appelée.")
+        else:
+            st.caption("Aucun appel émis pour cette année (🔄 Répartition › Appels T1-T4 › 📤 Émettre) : "
+                       "montants pré-remplis depuis le budget, à ajuster si besoin.")
+
+        col1, col2, col3 = st.columns(3)
+        budgets_appel = {}
+        for i, (key, cfg) in enumerate(CHARGES_CONFIG.items()):
+            # Priorité : appels émis > budget CSV > 0
+            if emis_par_lot:
+                val_defaut = float(emis_reg.loc[emis_reg['cle'] == key, 'montant'].sum())
+            elif not bud_reg.empty:
+                val_defaut = float(bud_reg[bud_reg['classe'].isin(cfg['classes'])]['montant_budget'].sum())
+            else:
+                val_defaut = 0.0
+            with [col1, col2, col3][i % 3]:
+                budgets_appel[key] = st.number_input(
+                    f"{cfg['emoji']} {cfg['label']} (€/an)",
+                    min_value=0.0, value=euros(centimes(val_defaut)),
+                    step=0.01, format="%.2f", key=f"bud_reg_{key}_{'-'.join(periodes_emises) if emis_par_lot else 'budget'}",
+                    disabled=bool(emis_par_lot),
+                    help=f"Total annuel réparti sur {cfg['total']:,g} tantièmes"
+                )
+
+        total_budget_appel = sum(budgets_appel.values())
+
+        # Calcul Alur
+        if emis_par_lot:
+            alur_annuel_reg = round(float(emis_reg.loc[emis_reg['cle'] == 'alur', 'montant'].sum()), 2)
+            alur_verse_reg  = alur_annuel_reg
+        else:
+            alur_annuel_reg    = round(total_budget_appel * alur_taux_reg / 100, 2)
+            alur_par_appel_reg = round(alur_annuel_reg / 4, 2)
+            alur_verse_reg     = round(alur_par_appel_reg * nb_appels_reg, 2)
+
+        st.divider()
+
+        # ---- TABLEAU RÉCAP PAR TYPE ----
+        st.subheader(f"📊 Récapitulatif {annee_reg} par type de charge")
+
+        recap = []
+        for key, cfg in CHARGES_CONFIG.items():
+            budget_an  = budgets_appel[key]
+            dep_reel   = dep_reel_type[key]
+            appels_cop = budget_an  # total appelé à tous les copros (base de répartition)
+            recap.append({
+                'Type':               f"{cfg['emoji']} {cfg['label']}",
+                'Budget appelé (€)':  round(budget_an, 2),
+                'Dépenses réelles (€)': round(dep_reel, 2),
+                'Écart (€)':           round(dep_reel - budget_an, 2),
+            })
+        # Ligne Alur
+        recap.append({
+            'Type':               '🏛️ Fonds Alur',
+            'Budget appelé (€)':  alur_annuel_reg,
+            'Dépenses réelles (€)': alur_annuel_reg,
+            'Écart (€)':           0,
+        })
+        recap.append({
+            'Type':               '💰 TOTAL',
+            'Budget appelé (€)':  round(sum(r['Budget appelé (€)'] for r in recap[:-1]), 2),
+            'Dépenses réelles (€)': round(sum(r['Dépenses réelles (€)'] for r in recap[:-1]), 2),
+            'Écart (€)':           round(sum(r['Écart (€)'] for r in recap[:-1]), 2),
+        })
+
+        st.dataframe(pd.DataFrame(recap), use_container_width=True, hide_index=True,
+            column_config={
+                'Budget appelé (€)':    st.column_config.NumberColumn(format="%,.2f"),
+                'Dépenses réelles (€)': st.column_config.NumberColumn(format="%,.2f"),
+                'Écart (€)':            st.column_config.NumberColumn(format="%+,.2f"),
+            })
+
+        c1, c2, c3, c4 = st.columns(4)
+        total_dep_reel = sum(dep_reel_type.values())
+        c1.metric("Budget total appelé", f"{total_budget_appel:,.2f} €")
+        c2.metric("🏛️ Alur versé (info)", f"{alur_verse_reg:,.2f} €",
+            help="L'Alur ne fait pas l'objet d'une régularisation — il reste dans le fonds de travaux")
+        c3.metric("Dépenses réelles nettes", f"{total_dep_reel:,.2f} €")
+        c4.metric("Écart global", f"{total_dep_reel - total_budget_appel:+,.2f} €",
+            delta_color="inverse" if total_dep_reel > total_budget_appel else "normal")
+
+        if total_budget_appel == 0:
+            st.warning("⚠️ Saisissez les budgets par type pour calculer la régularisation.")
+        else:
+            st.divider()
+            st.subheader(f"📋 5ème appel de régularisation — {annee_reg}")
+
+            # ---- CALCUL PAR COPROPRIÉTAIRE ----
+            # Formule : Appels_cop   = Budget_type × (tant_cop / total_tant)
+            #           Charges_cop  = Dep_reel_type × (tant_cop / total_tant)
+            #           5ème appel   = Charges_cop − Appels_cop
+            reg_df = appels.regularisation_par_lot(copro_df, budgets_appel, dep_reel_type, alur_annuel_reg,
+                                                   emis_par_lot, mat_reg, CHARGES_CONFIG)
+
+            tableau_regularisation(reg_df, annee_reg, budgets_appel, dep_reel_type, alur_annuel_reg,
+                                   nb_appels_reg, emis_par_lot, mat_reg)
+
+# ==================== ONGLET 3 : VUE GLOBALE ====================
+with tab3:
+    st.subheader("📊 Vue globale annuelle — Charges + Alur par copropriétaire")
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        annee_glob = st.selectbox("📅 Année", annees_bud, key="glob_annee")
+    with col2:
+        nb_appels_glob = st.selectbox("Nb appels / an", [4,3,2,1], key="glob_nb")
+    with col3:
+        alur_taux_glob = st.number_input("🏛️ Taux Alur (%)", min_value=5.0, max_value=20.0,
+            value=5.0, step=0.5, key="alur_taux_glob")
+
+    bud_glob = budget_df[budget_df['annee'] == annee_glob] if not budget_df.empty else pd.DataFrame()
+    total_bud_glob = float(bud_glob['montant_budget'].sum()) if not bud_glob.empty else 0
+    alur_glob_annuel = round(total_bud_glob * alur_taux_glob / 100, 2)
+    alur_glob_appel = round(alur_glob_annuel / nb_appels_glob, 2)
+
+    st.info(f"Budget {annee_glob} : **{total_bud_glob:,.0f} €** "
+            f"+ 🏛️ Alur ({alur_taux_glob:.0f}%) : **{alur_glob_annuel:,.0f} €/an** "
+            f"= **{total_bud_glob + alur_glob_annuel:,.0f} €** total | {len(copro_df)} copropriétaires")
+    st.divider()
+
+    # Montants auto depuis budget
+    montants_glob_auto = {}
+    for key, cfg in CHARGES_CONFIG.items():
+        if not bud_glob.empty:
+            montants_glob_auto[key] = float(bud_glob[bud_glob['classe'].isin(cfg['classes'])]['montant_budget'].sum())
+        else:
+            montants_glob_auto[key] = 0.0
+
+    st.subheader("⚙️ Ventilation du budget par type de charge")
+    col1, col2, col3 = st.columns(3)
+    montants_glob = {}
+    for i, (key, cfg) in enumerate(CHARGES_CONFIG.items()):
+        col = [col1, col2, col3][i % 3]
+        with col:
+            montants_glob[key] = st.number_input(
+                f"{cfg['emoji']} {cfg['label']} (€)",
+                min_value=0.0, value=euros(centimes(montants_glob_auto.get(key, 0))),
+                step=0.01, format="%.2f", key=f"glob_{key}"
+            )
+
+    total_glob = sum(montants_glob.values())
+    st.divider()
+
+    date_glob = f"{int(annee_glob)}-01-01"
+    mat_glob = get_matrice_tantiemes(tuple(int(i) for i in copro_df['id']), date_glob)
+    glob_df = calculer_appels(copro_df, montants_glob, date_glob).drop(columns=['_part_alur'])
+
+    # Alur par copropriétaire via tantième général, au centime
+    alur_glob_lot = mat_glob.repartir_cle_centimes(CLE_GENERALE, alur_glob_annuel)
+    glob_df['🏛️ Alur Annuel (€)'] = euros(alur_glob_lot)
+    glob_df['💰 TOTAL + Alur Annuel (€)'] = euros(centimes(glob_df['💰 TOTAL Annuel (€)'].to_numpy()) + alur_glob_lot)
+
+    # Colonnes par appel (mêmes montants que l'onglet Appels de fonds)
+    alur_glob_t = mat_glob.repartir_cle_centimes(CLE_GENERALE, alur_glob_appel)
+    for t in ['T1','T2','T3','T4']:
+        charges_t = appels.parts_appel(glob_df, t, nb_appels_glob, CHARGES_CONFIG).sum(axis=1)
+        glob_df[f'Charges {t} (€)'] = euros(charges_t)
+        glob_df[f'Alur {t} (€)'] = euros(alur_glob_t)
+        glob_df[f'🎯 TOTAL {t} (€)'] = euros(charges_t + alur_glob_t)
+
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Budget charges", f"{total_glob:,.2f} €")
+    c2.metric(f"🏛️ Alur ({alur_taux_glob:.0f}%)", f"{alur_glob_annuel:,.0f} €")
+    c3.metric("💰 TOTAL annuel + Alur", f"{glob_df['💰 TOTAL + Alur Annuel (€)'].sum():,.2f} €")
+    c4.metric("Appel moyen / copro", f"{glob_df['💰 TOTAL + Alur Annuel (€)'].mean():,.2f} €")
+
+    st.divider()
+
+    tableau_vue_globale(glob_df)
+
+    fig = px.bar(
+        glob_df.sort_values('💰 TOTAL + Alur Annuel (€)', ascending=False),
+        x='Copropriétaire', y=['💰 TOTAL Annuel (€)', '🏛️ Alur Annuel (€)'],
+        title=f"Charges annuelles + Alur {annee_glob} par copropriétaire",
+        labels={'value': 'Montant (€)', 'variable': 'Type'},
+        color_discrete_map={'💰 TOTAL Annuel (€)': '#1f77b4', '🏛️ Alur Annuel (€)': '#ff7f0e'},
+        barmode='stack'
+    )
+    fig.update_layout(xaxis_tickangle=45, height=500)
+    afficher_graphique(fig)
+
+    csv_glob = glob_df.to_csv(index=False, sep=';', decimal=',').encode('utf-8-sig')
+    st.download_button(f"📥 Exporter vue globale {annee_glob} (avec Alur)",
+        csv_glob, f"charges_{annee_glob}.csv", "text/csv")
@@ -0,0 +1,150 @@
+"""
+vues/tableau_de_bord.py — 📊 Tableau de Bord
+
+Budget et dépenses de l'année : indicateurs et graphiques.
+"""
+
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+from donnees import get_budget, get_depenses, get_travaux_votes_depense_ids
+from composants import afficher_graphique
+
+@st.fragment
+def tableau_annee(budget_df, depenses_df, tv_ids_tdb):
+    """Indicateurs et graphiques de l'année filtrée. Fragment : changer d'année, de classe
+    ou de compte ne recharge pas les dépenses."""
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        annee_filter = st.selectbox("📅 Année", sorted(depenses_df['annee'].unique(), reverse=True), key="tdb_annee")
+    with col2:
+        classes_dispo = ['Toutes'] + sorted([str(c) for c in depenses_df['classe'].dropna().unique()]) if 'classe' in depenses_df.columns else ['Toutes']
+        classe_filter = st.selectbox("🏷️ Classe", classes_dispo, key="tdb_classe")
+    with col3:
+        comptes_dispo = ['Tous'] + sorted(depenses_df['compte'].dropna().unique().tolist())
+        compte_filter = st.selectbox("🔢 Compte", comptes_dispo, key="tdb_compte")
+    with col4:
+        alur_taux_tdb = st.number_input("🏛️ Taux Alur (%)", min_value=5.0, max_value=20.0,
+            value=5.0, step=0.5, key="alur_taux_tdb")
+
+    dep_f = depenses_df[depenses_df['annee'] == annee_filter].copy()
+    if classe_filter != 'Toutes' and 'classe' in dep_f.columns:
+        dep_f = dep_f[dep_f['classe'] == classe_filter]
+    if compte_filter != 'Tous':
+        dep_f = dep_f[dep_f['compte'] == compte_filter]
+
+    bud_f = budget_df[budget_df['annee'] == annee_filter].copy()
+    if classe_filter != 'Toutes' and 'classe' in bud_f.columns:
+        bud_f = bud_f[bud_f['classe'] == classe_filter]
+    if compte_filter != 'Tous':
+        bud_f = bud_f[bud_f['compte'] == compte_filter]
+
+    # Alur toujours calculé sur le budget TOTAL de l'année (pas filtré)
+    bud_total_annee_tdb = float(budget_df[budget_df['annee'] == annee_filter]['montant_budget'].sum())
+    alur_tdb = round(bud_total_annee_tdb * alur_taux_tdb / 100, 2)
+
+    total_budget = float(bud_f['montant_budget'].sum())
+    total_dep = float(dep_f['montant_du'].sum())
+    total_a_appeler = bud_total_annee_tdb + alur_tdb
+
+    # Travaux votés : montant des dépenses affectées (diminution des charges courantes)
+    dep_tv_tdb = dep_f[dep_f['id'].isin(tv_ids_tdb)] if not dep_f.empty and tv_ids_tdb else pd.DataFrame()
+    montant_tv_tdb = float(dep_tv_tdb['montant_du'].sum()) if not dep_tv_tdb.empty else 0
+
+    # Dépenses courantes nettes = total − travaux votés
+    total_dep_net = total_dep - montant_tv_tdb
+
+    ecart = total_a_appeler - total_dep_net
+    pct = (total_dep_net / total_a_appeler * 100) if total_a_appeler > 0 else 0
+
+    st.divider()
+    c1, c2, c3, c4, c5, c6, c7 = st.columns(7)
+    c1.metric("Budget charges", f"{bud_total_annee_tdb:,.0f} €")
+    c2.metric(f"🏛️ Alur ({alur_taux_tdb:.0f}%)", f"{alur_tdb:,.0f} €")
+    c3.metric("💰 Total à appeler", f"{total_a_appeler:,.0f} €")
+    c4.metric("Dépenses réelles", f"{total_dep:,.2f} €")
+    if montant_tv_tdb > 0:
+        c5.metric("🏗️ — Travaux votés", f"-{montant_tv_tdb:,.2f} €",
+            help="Dépenses affectées aux travaux votés en AG — déduites des charges courantes")
+        c6.metric("Dépenses nettes", f"{total_dep_net:,.2f} €",
+            help="Dépenses réelles − Travaux votés")
+        c7.metric("Écart", f"{ecart:,.2f} €",
+            delta_color="normal" if ecart >= 0 else "inverse",
+            help="Total à appeler − Dépenses nettes")
+    else:
+        c5.metric("Écart", f"{ecart:,.2f} €",
+            delta_color="normal" if ecart >= 0 else "inverse",
+            help="Total à appeler − Dépenses réelles")
+        c6.metric("% Réalisé", f"{pct:.1f}%")
+
+    # Bandeau info
+    info_parts = [f"🏛️ **Loi Alur** — {alur_tdb:,.0f} € /an "
+                  f"({alur_taux_tdb:.0f}% × {bud_total_annee_tdb:,.0f} €) "
+                  f"— soit **{alur_tdb/4:,.2f} €** par appel trimestriel"]
+    if montant_tv_tdb > 0:
+        info_parts.append(f"🏗️ **Travaux votés** — {montant_tv_tdb:,.2f} € déduits des charges courantes")
+    st.info("   |   ".join(info_parts))
+    st.divider()
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader("Budget + Alur vs Dépenses par Classe")
+        if 'classe' in bud_f.columns and 'classe' in dep_f.columns:
+            bud_cl = bud_f.groupby('classe', observed=True)['montant_budget'].sum().reset_index()
+            # Ajouter Alur comme classe distincte
+            alur_bar = pd.DataFrame([{'classe': f'Alur ({alur_taux_tdb:.0f}%)', 'montant_budget': alur_tdb}])
+            bud_cl_total = pd.concat([bud_cl, alur_bar], ignore_index=True)
+            dep_cl = dep_f.groupby('classe', observed=True)['montant_du'].sum().reset_index()
+            comp = bud_cl_total.merge(dep_cl, on='classe', how='left').fillna(0)
+            comp.columns = ['Classe', 'Budget', 'Dépenses']
+            fig = go.Figure()
+            fig.add_trace(go.Bar(name='Budget + Alur', x=comp['Classe'], y=comp['Budget'], marker_color='lightblue'))
+            fig.add_trace(go.Bar(name='Dépenses réelles', x=comp['Classe'], y=comp['Dépenses'], marker_color='salmon'))
+            fig.update_layout(barmode='group', height=400)
+            afficher_graphique(fig)
+    with col2:
+        st.subheader("Répartition Budget + Alur")
+        if 'classe' in bud_f.columns and not bud_f.empty:
+            bud_cl = bud_f.groupby('classe', observed=True)['montant_budget'].sum().reset_index()
+            bud_cl_pie = pd.concat([bud_cl, pd.DataFrame([{
+                'classe': f'Alur ({alur_taux_tdb:.0f}%)', 'montant_budget': alur_tdb
+            }])], ignore_index=True)
+            fig = px.pie(bud_cl_pie, values='montant_budget', names='classe',
+                title=f'Distribution budget + Alur {annee_filter}')
+            fig.update_traces(textposition='inside', textinfo='percent+label')
+            afficher_graphique(fig)
+
+    st.subheader(f"Évolution Mensuelle — {annee_filter}")
+    if not dep_f.empty:
+        dep_f['mois'] = dep_f['date'].dt.to_period('M').astype(str)
+        ev = dep_f.groupby('mois')['montant_du'].sum().reset_index()
+        # Ajouter ligne budget mensuel moyen
+        bud_mensuel = total_a_appeler / 12
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=ev['mois'], y=ev['montant_du'], mode='lines+markers',
+            name='Dépenses réelles', line=dict(color='#1f77b4', width=3)))
+        fig.add_hline(y=bud_mensuel, line_dash='dash', line_color='orange',
+            annotation_text=f"Moy. budget+Alur/mois ({bud_mensuel:,.0f} €)")
+        fig.update_layout(xaxis_title='Mois', yaxis_title='Montant (€)')
+        afficher_graphique(fig)
+
+    st.subheader(f"Top 10 Dépenses — {annee_filter}")
+    if not dep_f.empty:
+        top = dep_f.nlargest(10, 'montant_du')[['date','fournisseur','montant_du','commentaire']].copy()
+        top['date'] = top['date'].dt.strftime('%d/%m/%Y')
+        st.dataframe(top, use_container_width=True, hide_index=True,
+            column_config={"montant_du": st.column_config.NumberColumn("Montant (€)", format="%,.2f")})
+
+st.markdown("<h1 class='main-header'>📊 Tableau de Bord</h1>", unsafe_allow_html=True)
+budget_df = get_budget()
+depenses_df = get_depenses()
+
+if not budget_df.empty and not depenses_df.empty:
+    depenses_df['date'] = pd.to_datetime(depenses_df['date'])
+    depenses_df['annee'] = depenses_df['date'].dt.year
+    depenses_df['montant_du'] = pd.to_numeric(depenses_df['montant_du'], errors='coerce')
+
+    tableau_annee(budget_df, depenses_df, get_travaux_votes_depense_ids())
+else:
+    st.warning("⚠️ Données insuffisantes")